@@ -0,0 +1,404 @@
+"""BLF 记录文件读取器
+
+纯 Python 实现的 Vector BLF（Binary Logging Format）流式读取器，
+用于离线分析脚本通过 ``STLA_CAN.DBC.ConfigureSetting(..., RecordFileType.BLF, ...)``
+录制的 CAN 报文。
+
+- 文件通过 mmap 映射，顶层只扫描对象头，不预先解压；
+- LOG_CONTAINER 在迭代到时才解压（zlib），跨容器的对象自动拼接；
+- ``build_index`` 生成按仲裁ID分组的时间戳索引（NumPy 数组），
+  报文计数和平均/最小/最大周期由索引向量化计算。
+"""
+
+import mmap
+import struct
+import zlib
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+
+import numpy as np
+
+
+# 文件头（固定部分；实际文件头长度由 header_size 字段给出）
+FILE_HEADER_STRUCT = struct.Struct('<4sLBBBBBBBBQQLL8H8H')
+# 对象基本头：signature, header_size, header_version, obj_size, obj_type
+OBJ_HEADER_BASE_STRUCT = struct.Struct('<4sHHLL')
+# 对象头 V1：flags, client_index, object_version, timestamp
+OBJ_HEADER_V1_STRUCT = struct.Struct('<LHHQ')
+# 对象头 V2：flags, timestamp_status, reserved, object_version, timestamp, original_timestamp
+OBJ_HEADER_V2_STRUCT = struct.Struct('<LBBHQQ')
+# 容器头：compression_method, uncompressed_size
+LOG_CONTAINER_STRUCT = struct.Struct('<H6xL4x')
+# CAN 报文：channel, flags, dlc, arbitration_id（其后为8字节数据）
+CAN_MSG_STRUCT = struct.Struct('<HBBL')
+# CAN FD 报文：channel, flags, dlc, arbitration_id, frame_length, bit_count, fd_flags, valid_data_bytes
+CAN_FD_MSG_STRUCT = struct.Struct('<HBBLLBBB5x')
+# CAN FD 64 报文：channel, dlc, valid_data_bytes, tx_count, arbitration_id
+CAN_FD_MSG_64_STRUCT = struct.Struct('<BBBBL')
+
+# 对象类型
+CAN_MESSAGE = 1
+LOG_CONTAINER = 10
+CAN_MESSAGE2 = 86
+CAN_FD_MESSAGE = 100
+CAN_FD_MESSAGE_64 = 101
+
+# 压缩方式
+NO_COMPRESSION = 0
+ZLIB_DEFLATE = 2
+
+# 时间戳单位标志
+TIME_TEN_MICS = 0x00000001
+
+# 扩展帧标志（仲裁ID最高位）
+CAN_MSG_EXT = 0x80000000
+
+
+class BLFParseError(Exception):
+    """BLF 文件解析错误"""
+    pass
+
+
+def _systemtime_to_timestamp(systemtime) -> float:
+    """将 SYSTEMTIME（年、月、星期、日、时、分、秒、毫秒）转换为 Unix 时间戳"""
+    year, month, _, day, hour, minute, second, millisecond = systemtime
+    try:
+        return datetime(year, month, day, hour, minute, second, millisecond * 1000).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class BLFIndex:
+    """按仲裁ID分组的报文时间戳索引
+
+    时间戳为 Unix 秒（float64），每个仲裁ID对应一个升序数组。
+    """
+
+    def __init__(self, timestamps: Dict[int, np.ndarray], start_timestamp: float = 0.0):
+        """初始化索引
+
+        Args:
+            timestamps: {仲裁ID: 时间戳数组}
+            start_timestamp: 录制开始时间（Unix 秒）
+        """
+        self._timestamps = timestamps
+        self.start_timestamp = start_timestamp
+
+    @property
+    def arbitration_ids(self) -> List[int]:
+        """索引中的仲裁ID列表（升序）"""
+        return sorted(self._timestamps)
+
+    def timestamps(self, arbitration_id: int) -> np.ndarray:
+        """获取指定仲裁ID的时间戳数组
+
+        Args:
+            arbitration_id: 仲裁ID
+
+        Returns:
+            时间戳数组（不存在时为空数组）
+        """
+        return self._timestamps.get(arbitration_id, np.empty(0))
+
+    def message_stats(
+        self,
+        arbitration_id: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """计算报文在时间窗口内的计数和周期统计
+
+        Args:
+            arbitration_id: 仲裁ID
+            start: 窗口开始时间（Unix 秒，None表示录制开始）
+            end: 窗口结束时间（Unix 秒，None表示录制结束）
+
+        Returns:
+            {'count', 'period_avg', 'period_min', 'period_max'}，周期单位为毫秒；
+            报文少于两帧时周期为 None
+        """
+        ts = self.timestamps(arbitration_id)
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side='right'))
+        window = ts[lo:hi]
+
+        stats = {
+            'arbitration_id': arbitration_id,
+            'count': int(len(window)),
+            'period_avg': None,
+            'period_min': None,
+            'period_max': None,
+        }
+        if len(window) >= 2:
+            periods = np.diff(window) * 1000.0
+            stats['period_avg'] = float(periods.mean())
+            stats['period_min'] = float(periods.min())
+            stats['period_max'] = float(periods.max())
+        return stats
+
+    def all_message_stats(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """计算全部仲裁ID在时间窗口内的统计
+
+        Args:
+            start: 窗口开始时间（Unix 秒，可选）
+            end: 窗口结束时间（Unix 秒，可选）
+
+        Returns:
+            {仲裁ID: 统计结果}
+        """
+        return {aid: self.message_stats(aid, start, end) for aid in self.arbitration_ids}
+
+    def save(self, path: str):
+        """保存索引为 .npz 文件（所有时间戳连续存放，按偏移切分）
+
+        Args:
+            path: 文件路径
+        """
+        ids = np.array(self.arbitration_ids, dtype=np.uint32)
+        arrays = [self._timestamps[int(aid)] for aid in ids]
+        counts = np.array([len(a) for a in arrays], dtype=np.int64)
+        data = np.concatenate(arrays) if arrays else np.empty(0)
+        with open(path, 'wb') as f:
+            np.savez(f, ids=ids, counts=counts, timestamps=data,
+                     start_timestamp=np.array([self.start_timestamp]))
+
+    @classmethod
+    def load(cls, path: str) -> 'BLFIndex':
+        """从 .npz 文件加载索引
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            索引对象
+        """
+        with np.load(path) as npz:
+            ids = npz['ids']
+            counts = npz['counts']
+            data = npz['timestamps']
+            start_timestamp = float(npz['start_timestamp'][0])
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        timestamps = {
+            int(aid): data[offsets[i]:offsets[i + 1]] for i, aid in enumerate(ids)
+        }
+        return cls(timestamps, start_timestamp)
+
+
+class BLFReader:
+    """BLF 文件流式读取器
+
+    用法::
+
+        with BLFReader(path) as reader:
+            for timestamp, arbitration_id, channel, dlc, data in reader:
+                ...
+            index = reader.build_index()
+    """
+
+    def __init__(self, path: str):
+        """打开 BLF 文件并解析文件头
+
+        Args:
+            path: 文件路径
+
+        Raises:
+            BLFParseError: 文件格式不正确
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._file.close()
+            raise BLFParseError(f"Empty BLF file: {path}")
+
+        if len(self._map) < FILE_HEADER_STRUCT.size:
+            self.close()
+            raise BLFParseError(f"BLF file too short: {path}")
+        header = FILE_HEADER_STRUCT.unpack_from(self._map, 0)
+        if header[0] != b'LOGG':
+            self.close()
+            raise BLFParseError(f"Unexpected file signature: {header[0]!r}")
+
+        self.header_size = header[1]
+        self.file_size = header[10]
+        self.uncompressed_size = header[11]
+        self.object_count = header[12]
+        self.start_timestamp = _systemtime_to_timestamp(header[14:22])
+        self.stop_timestamp = _systemtime_to_timestamp(header[22:30])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self):
+        return self.iter_messages()
+
+    def close(self):
+        """关闭文件"""
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def iter_objects(self) -> Iterator[Tuple[int, int, int]]:
+        """遍历顶层对象（只读对象头，不解压）
+
+        Yields:
+            (偏移, 对象类型, 对象大小) 元组
+        """
+        data = self._map
+        pos = self.header_size
+        end = len(data)
+        base_size = OBJ_HEADER_BASE_STRUCT.size
+
+        while pos + base_size <= end:
+            signature, _, _, obj_size, obj_type = OBJ_HEADER_BASE_STRUCT.unpack_from(data, pos)
+            if signature != b'LOBJ':
+                # 顶层对象之间可能存在填充，向后查找下一个对象
+                next_pos = data.find(b'LOBJ', pos, pos + 8)
+                if next_pos < 0:
+                    break
+                pos = next_pos
+                continue
+            if obj_size < base_size:
+                raise BLFParseError(f"Invalid object size {obj_size} at offset {pos}")
+            yield pos, obj_type, obj_size
+            pos += obj_size + (obj_size % 4)
+
+    def iter_container_data(self) -> Iterator[bytes]:
+        """按顺序解压并返回各容器的数据
+
+        Yields:
+            容器解压后的数据
+        """
+        base_size = OBJ_HEADER_BASE_STRUCT.size
+        for pos, obj_type, obj_size in self.iter_objects():
+            if obj_type != LOG_CONTAINER:
+                continue
+            body = pos + base_size
+            method, uncompressed_size = LOG_CONTAINER_STRUCT.unpack_from(self._map, body)
+            payload = self._map[body + LOG_CONTAINER_STRUCT.size:pos + obj_size]
+            if method == NO_COMPRESSION:
+                yield payload
+            elif method == ZLIB_DEFLATE:
+                yield zlib.decompress(payload, 15, uncompressed_size)
+            else:
+                raise BLFParseError(f"Unknown compression method {method}")
+
+    def iter_messages(self) -> Iterator[Tuple[float, int, int, int, bytes]]:
+        """遍历 CAN/CAN FD 报文
+
+        Yields:
+            (时间戳(Unix 秒), 仲裁ID, 通道, DLC, 数据) 元组；扩展帧仲裁ID已去掉最高位标志
+        """
+        for timestamp, arbitration_id, channel, dlc, data_offset, data_length, data in self._iter_raw():
+            yield timestamp, arbitration_id, channel, dlc, bytes(data[data_offset:data_offset + data_length])
+
+    def build_index(self, channel: Optional[int] = None) -> BLFIndex:
+        """构建按仲裁ID分组的时间戳索引
+
+        Args:
+            channel: 只索引指定通道（None表示全部通道）
+
+        Returns:
+            BLFIndex 对象
+        """
+        buckets: Dict[int, array] = {}
+        for timestamp, arbitration_id, msg_channel, _, _, _, _ in self._iter_raw():
+            if channel is not None and msg_channel != channel:
+                continue
+            bucket = buckets.get(arbitration_id)
+            if bucket is None:
+                bucket = buckets[arbitration_id] = array('d')
+            bucket.append(timestamp)
+
+        timestamps = {}
+        for arbitration_id, bucket in buckets.items():
+            ts = np.frombuffer(bucket, dtype=np.float64).copy()
+            # 多通道/多容器合并后可能乱序
+            if len(ts) > 1 and np.any(ts[1:] < ts[:-1]):
+                ts.sort()
+            timestamps[arbitration_id] = ts
+        return BLFIndex(timestamps, self.start_timestamp)
+
+    def _iter_raw(self):
+        """遍历报文的原始字段（数据以偏移形式返回，避免为每帧复制）"""
+        base_size = OBJ_HEADER_BASE_STRUCT.size
+        v1_size = OBJ_HEADER_V1_STRUCT.size
+        v2_size = OBJ_HEADER_V2_STRUCT.size
+        unpack_base = OBJ_HEADER_BASE_STRUCT.unpack_from
+        unpack_v1 = OBJ_HEADER_V1_STRUCT.unpack_from
+        unpack_v2 = OBJ_HEADER_V2_STRUCT.unpack_from
+        unpack_can = CAN_MSG_STRUCT.unpack_from
+        unpack_fd = CAN_FD_MSG_STRUCT.unpack_from
+        can_size = CAN_MSG_STRUCT.size
+        fd_size = CAN_FD_MSG_STRUCT.size
+        unpack_fd64 = CAN_FD_MSG_64_STRUCT.unpack_from
+        start_timestamp = self.start_timestamp
+
+        tail = b''
+        for container in self.iter_container_data():
+            data = tail + container if tail else container
+            pos = 0
+            max_pos = len(data)
+
+            while True:
+                # 容器内对象按4字节对齐，跳过填充
+                if data[pos:pos + 4] != b'LOBJ':
+                    next_pos = data.find(b'LOBJ', pos, pos + 8)
+                    if next_pos < 0:
+                        if pos + 8 > max_pos:
+                            break
+                        raise BLFParseError(f"Could not find next object in {self.path}")
+                    pos = next_pos
+                if pos + base_size > max_pos:
+                    break
+                _, _, header_version, obj_size, obj_type = unpack_base(data, pos)
+                next_pos = pos + obj_size
+                if obj_size < base_size:
+                    raise BLFParseError(f"Invalid object size {obj_size} in {self.path}")
+                if next_pos > max_pos:
+                    # 对象延续到下一个容器
+                    break
+
+                body = pos + base_size
+                if header_version == 1:
+                    flags, _, _, raw_timestamp = unpack_v1(data, body)
+                    body += v1_size
+                elif header_version == 2:
+                    flags, _, _, _, raw_timestamp, _ = unpack_v2(data, body)
+                    body += v2_size
+                else:
+                    pos = next_pos
+                    continue
+
+                if obj_type in (CAN_MESSAGE, CAN_MESSAGE2, CAN_FD_MESSAGE, CAN_FD_MESSAGE_64):
+                    factor = 1e-5 if flags == TIME_TEN_MICS else 1e-9
+                    timestamp = raw_timestamp * factor + start_timestamp
+                    if obj_type == CAN_FD_MESSAGE_64:
+                        channel, dlc, valid_bytes, _, can_id = unpack_fd64(data, body)
+                        # 数据位于 40 字节固定头之后
+                        data_offset, data_length = body + 40, valid_bytes
+                    elif obj_type == CAN_FD_MESSAGE:
+                        channel, _, dlc, can_id, _, _, _, valid_bytes = unpack_fd(data, body)
+                        data_offset, data_length = body + fd_size, valid_bytes
+                    else:
+                        channel, _, dlc, can_id = unpack_can(data, body)
+                        data_offset, data_length = body + can_size, min(dlc, 8)
+                    yield (timestamp, can_id & ~CAN_MSG_EXT, channel, dlc,
+                           data_offset, data_length, data)
+
+                pos = next_pos
+
+            tail = data[pos:] if pos < max_pos else b''
@@ -44,6 +44,10 @@ class Container:
         # 缓存管理器
         self.register_singleton('cache_manager', self._create_cache_manager)
         
+        # 运行指标
+        self.register_singleton('metrics', self._create_metrics)
+        self.register_singleton('metrics_exporter', self._create_metrics_exporter)
+        
         # 数据访问层
         self.register_singleton('data_access', self._create_data_access)
         
@@ -53,12 +57,20 @@ class Container:
         self.register_singleton('performance_metrics_repo', self._create_performance_metrics_repo)
         self.register_singleton('user_repo', self._create_user_repo)
         self.register_singleton('test_suite_repository', self._create_test_suite_repo)
+        self.register_singleton('measurement_repo', self._create_measurement_repo)
+        self.register_singleton('recording_repo', self._create_recording_repo)
+        self.register_singleton('execution_artifact_repo', self._create_execution_artifact_repo)
         
         # 核心层
         self.register_singleton('script_manager', self._create_script_manager)
+        self.register_singleton('process_registry', self._create_process_registry)
         self.register_singleton('execution_engine', self._create_execution_engine)
         self.register_singleton('result_analyzer', self._create_result_analyzer)
         self.register_singleton('plugin_manager', self._create_plugin_manager)
+        self.register_singleton('measurement_extractor', self._create_measurement_extractor)
+        self.register_singleton('trend_engine', self._create_trend_engine)
+        self.register_singleton('script_analyzer', self._create_script_analyzer)
+        self.register_singleton('script_fingerprinter', self._create_script_fingerprinter)
         
         # 服务层
         self.register_singleton('script_service', self._create_script_service)
@@ -68,6 +80,8 @@ class Container:
         self.register_singleton('backup_service', self._create_backup_service)
         self.register_singleton('user_service', self._create_user_service)
         self.register_singleton('test_suite_service', self._create_test_suite_service)
+        self.register_singleton('measurement_service', self._create_measurement_service)
+        self.register_singleton('recording_service', self._create_recording_service)
     
     def register_singleton(self, name: str, factory: Callable):
         """注册单例服务
@@ -128,8 +142,17 @@ class Container:
     
     def _create_log_manager(self):
         """创建日志管理器"""
-        from AppCode.infrastructure.log_manager import LogManager
-        return LogManager()
+        from AppCode.infrastructure.log_manager import LogManager, DEFAULT_LOG_QUEUE_SIZE
+        from AppCode.utils.constants import DEFAULT_LOG_MAX_SIZE, DEFAULT_LOG_BACKUP_COUNT
+        config = self.resolve('config_manager')
+        return LogManager(
+            log_dir=config.get('logging.dir', 'logs'),
+            queue_size=config.get('logging.queue_size', DEFAULT_LOG_QUEUE_SIZE),
+            json_format=config.get('logging.format', 'text') == 'json',
+            max_bytes=config.get('logging.max_mb', DEFAULT_LOG_MAX_SIZE // (1024 * 1024)) * 1024 * 1024,
+            backup_count=config.get('logging.backup_count', DEFAULT_LOG_BACKUP_COUNT),
+            compress=config.get('logging.compress', True)
+        )
     
     def _create_config_manager(self):
         """创建配置管理器"""
@@ -141,12 +164,59 @@ class Container:
         from AppCode.infrastructure.cache import CacheManager
         return CacheManager()
     
+    def _create_metrics(self):
+        """创建指标注册表"""
+        from AppCode.infrastructure.metrics import MetricsRegistry
+        registry = MetricsRegistry()
+        registry.register_collector(self.resolve('cache_manager').collect_metrics)
+        return registry
+    
+    def _create_metrics_exporter(self):
+        """创建指标导出器（Prometheus 文本和 JSON 文件）"""
+        from AppCode.infrastructure.metrics import MetricsExporter
+        config = self.resolve('config_manager')
+        return MetricsExporter(
+            self.resolve('metrics'),
+            config.get('metrics.export_dir', 'data/metrics'),
+            interval=config.get('metrics.export_interval', 15),
+            logger=self.resolve('log_manager').get_logger('metrics')
+        )
+    
     def _create_data_access(self):
         """创建数据访问层"""
         from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+        from AppCode.data_access.query_cache import QueryCache
         config = self.resolve('config_manager')
         db_path = config.get('database.path', 'data/script_executor.db')
-        return SQLiteDataAccess(db_path)
+        # 查询结果缓存预算（MB），0 表示关闭
+        cache_mb = config.get('database.query_cache_mb', 32)
+        query_cache = None
+        if cache_mb:
+            query_cache = QueryCache(int(cache_mb * 1024 * 1024), cache_manager=self.resolve('cache_manager'))
+        # SQL 剖析（按需开启）：语句耗时分布、慢查询日志，退出时保存供报告命令分析
+        profiler = None
+        if config.get('database.profile', False):
+            from AppCode.data_access.sql_profiler import SqlProfiler, DEFAULT_SLOW_QUERY_MS
+            profiler = SqlProfiler(
+                config.get('database.slow_query_ms', DEFAULT_SLOW_QUERY_MS),
+                logger=self.resolve('log_manager').get_logger('sql_profiler'),
+                output_path=config.get('database.profile_path', 'data/sql_profile.json')
+            )
+        # 执行历史按月归档（超过保留天数的记录移到归档文件，按日期查询时自动附加）
+        archive = None
+        if config.get('database.archive.enabled', False):
+            from AppCode.data_access.history_archive import HistoryArchive, DEFAULT_ARCHIVE_AFTER_DAYS
+            archive = HistoryArchive(
+                config.get('database.archive.dir', 'data/archive'),
+                after_days=config.get('database.archive.after_days', DEFAULT_ARCHIVE_AFTER_DAYS),
+                interval=config.get('database.archive.interval_hours', 24) * 3600,
+                vacuum=config.get('database.archive.vacuum', False),
+                logger=self.resolve('log_manager').get_logger('history_archive')
+            )
+        return SQLiteDataAccess(
+            db_path, query_cache=query_cache, metrics=self.resolve('metrics'), profiler=profiler,
+            archive=archive
+        )
     
     def _create_execution_history_repo(self):
         """创建执行历史仓储"""
@@ -173,7 +243,19 @@ class Container:
         logger = self.resolve('log_manager').get_logger('execution_engine')
         config_manager = self.resolve('config_manager')
         # 车载ECU测试必须顺序执行，硬件资源独占
-        return ExecutionEngine(logger, max_workers=1, config_manager=config_manager)
+        return ExecutionEngine(
+            logger, max_workers=1, config_manager=config_manager,
+            process_registry=self.resolve('process_registry'),
+            metrics=self.resolve('metrics')
+        )
+
+    def _create_process_registry(self):
+        """创建脚本进程登记（孤儿进程回收）"""
+        from AppCode.core.process_registry import ProcessRegistry
+        config = self.resolve('config_manager')
+        logger = self.resolve('log_manager').get_logger('process_registry')
+        state_path = config.get('execution.process_state_file', 'data/running_processes.json')
+        return ProcessRegistry(state_path, logger)
     
     def _create_result_analyzer(self):
         """创建结果分析器"""
@@ -189,7 +271,11 @@ class Container:
         execution_repo = self.resolve('execution_history_repo')
         logger = self.resolve('log_manager').get_logger('script_service')
         cache_manager = self.resolve('cache_manager')
-        return ScriptService(script_manager, execution_repo, logger, cache_manager)
+        script_analyzer = self.resolve('script_analyzer')
+        return ScriptService(
+            script_manager, execution_repo, logger, cache_manager,
+            script_analyzer=script_analyzer
+        )
     
     def _create_execution_service(self):
         """创建执行服务"""
@@ -198,7 +284,14 @@ class Container:
         execution_repo = self.resolve('execution_history_repo')
         batch_repo = self.resolve('batch_execution_repo')
         logger = self.resolve('log_manager').get_logger('execution_service')
-        return ExecutionService(execution_engine, execution_repo, batch_repo, logger)
+        measurement_service = self.resolve('measurement_service')
+        return ExecutionService(
+            execution_engine, execution_repo, batch_repo, logger,
+            measurement_service=measurement_service,
+            recording_service=self.resolve('recording_service'),
+            artifact_repo=self.resolve('execution_artifact_repo'),
+            fingerprinter=self.resolve('script_fingerprinter')
+        )
     
     def _create_analysis_service(self):
         """创建分析服务"""
@@ -207,7 +300,13 @@ class Container:
         execution_repo = self.resolve('execution_history_repo')
         batch_repo = self.resolve('batch_execution_repo')
         logger = self.resolve('log_manager').get_logger('analysis_service')
-        return AnalysisService(result_analyzer, execution_repo, batch_repo, logger)
+        measurement_service = self.resolve('measurement_service')
+        return AnalysisService(
+            result_analyzer, execution_repo, batch_repo, logger,
+            measurement_service=measurement_service,
+            trend_engine=self.resolve('trend_engine'),
+            cache_manager=self.resolve('cache_manager')
+        )
     
     def _create_performance_metrics_repo(self):
         """创建性能指标仓储"""
@@ -232,18 +331,26 @@ class Container:
     def _create_performance_monitor_service(self):
         """创建性能监控服务"""
         from AppCode.services.performance_monitor_service import PerformanceMonitorService
+        config = self.resolve('config_manager')
         metrics_repo = self.resolve('performance_metrics_repo')
         logger = self.resolve('log_manager').get_logger('performance_monitor')
-        return PerformanceMonitorService(metrics_repo, logger)
+        return PerformanceMonitorService(
+            metrics_repo, logger, retention_days=config.get('performance.retention_days', None)
+        )
     
     def _create_backup_service(self):
         """创建备份服务"""
         from AppCode.services.backup_service import BackupService
         import os
+        config = self.resolve('config_manager')
         logger = self.resolve('log_manager').get_logger('backup_service')
         data_dir = 'data'
         backup_dir = os.path.join(data_dir, 'backups')
-        return BackupService(data_dir, backup_dir, logger)
+        return BackupService(
+            data_dir, backup_dir, logger,
+            full_every=config.get('backup.full_every', 7),
+            pages_per_step=config.get('backup.pages_per_step', 1024)
+        )
     
     def _create_user_service(self):
         """创建用户服务"""
@@ -261,4 +368,88 @@ class Container:
     def _create_test_suite_service(self):
         """创建测试方案服务"""
         from AppCode.services.test_suite_service import TestSuiteService
-        return TestSuiteService(self)
\ No newline at end of file
+        return TestSuiteService(self)
+    
+    def _create_measurement_repo(self):
+        """创建测量值仓储"""
+        from AppCode.repositories.measurement_repository import MeasurementRepository
+        data_access = self.resolve('data_access')
+        return MeasurementRepository(data_access)
+    
+    def _create_measurement_extractor(self):
+        """创建测量值提取器（加载配置中的自定义解析器）"""
+        from AppCode.core.measurement_extractor import MeasurementExtractor, default_parsers
+        logger = self.resolve('log_manager').get_logger('measurement_extractor')
+        config = self.resolve('config_manager')
+        extractor = MeasurementExtractor(
+            parsers=default_parsers(config.get('measurements.period_tolerance_ms', 2.0)), logger=logger
+        )
+        for spec in config.get('measurements.parsers', []):
+            try:
+                extractor.load_parser(spec)
+            except Exception as e:
+                logger.error(f"Failed to load measurement parser {spec}: {e}")
+        return extractor
+    
+    def _create_measurement_service(self):
+        """创建测量值服务"""
+        from AppCode.services.measurement_service import MeasurementService
+        extractor = self.resolve('measurement_extractor')
+        measurement_repo = self.resolve('measurement_repo')
+        logger = self.resolve('log_manager').get_logger('measurement_service')
+        execution_repo = self.resolve('execution_history_repo')
+        return MeasurementService(extractor, measurement_repo, logger, execution_repo=execution_repo)
+    
+    def _create_trend_engine(self):
+        """创建趋势统计引擎"""
+        from AppCode.core.trend_engine import TrendEngine
+        return TrendEngine()
+    
+    def _create_recording_repo(self):
+        """创建CAN记录文件仓储"""
+        from AppCode.repositories.recording_repository import RecordingRepository
+        data_access = self.resolve('data_access')
+        return RecordingRepository(data_access)
+    
+    def _create_execution_artifact_repo(self):
+        """创建执行附加数据仓储"""
+        from AppCode.repositories.execution_artifact_repository import ExecutionArtifactRepository
+        data_access = self.resolve('data_access')
+        return ExecutionArtifactRepository(data_access)
+    
+    def _create_recording_service(self):
+        """创建CAN记录文件服务"""
+        from AppCode.services.recording_service import RecordingService
+        import os
+        recording_repo = self.resolve('recording_repo')
+        logger = self.resolve('log_manager').get_logger('recording_service')
+        config = self.resolve('config_manager')
+        return RecordingService(
+            recording_repo,
+            index_dir=config.get('recordings.index_dir', os.path.join('data', 'recording_index')),
+            logger=logger,
+            search_dirs=config.get('recordings.directories', []),
+            match_slack=config.get('recordings.match_slack', 5.0),
+            index_cache_bytes=config.get('recordings.index_cache_mb', 256) * 1024 * 1024,
+            cache_manager=self.resolve('cache_manager')
+        )
+    
+    def _create_script_analyzer(self):
+        """创建脚本静态分析器"""
+        from AppCode.core.script_analyzer import ScriptAnalyzer
+        import os
+        logger = self.resolve('log_manager').get_logger('script_analyzer')
+        cache_file = os.path.join('data', 'script_analysis_cache.json')
+        return ScriptAnalyzer(cache_file, logger)
+
+    def _create_script_fingerprinter(self):
+        """创建脚本输入指纹计算器"""
+        from AppCode.core.script_fingerprint import ScriptFingerprinter
+        config = self.resolve('config_manager')
+        logger = self.resolve('log_manager').get_logger('script_fingerprint')
+        return ScriptFingerprinter(
+            search_paths=config.get('selection.helper_paths', None) or None,
+            ecu_version=config.get('selection.ecu_version', ''),
+            dbc_path=config.get('selection.dbc_path', '') or None,
+            logger=logger
+        )
@@ -0,0 +1,174 @@
+"""脚本耗时模型
+
+根据执行历史学习每个脚本的耗时分布：
+
+- 墙钟耗时（开始到结束）的中位数、P95、P99，用于批次剩余时间预估；
+- 收尾耗时（检测到结果关键词到进程自行退出），用于缩短结果关键词后的空闲等待。
+
+自适应超时只会收紧全局配置的超时，不会放宽；历史样本不足的脚本沿用全局配置。
+"""
+
+import math
+from typing import Dict, List, Optional, Any
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """计算分位数（线性插值）
+
+    Args:
+        values: 数值列表
+        q: 分位（0~100）
+
+    Returns:
+        分位数，列表为空时返回None
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[int(position)]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class DurationModel:
+    """每个脚本的耗时分布模型"""
+
+    def __init__(
+        self,
+        min_samples: int = 5,
+        timeout_multiplier: float = 1.5,
+        min_timeout: float = 60.0,
+        min_idle_timeout: float = 10.0
+    ):
+        """初始化耗时模型
+
+        Args:
+            min_samples: 启用自适应超时所需的最少历史样本数
+            timeout_multiplier: 自适应超时相对 P99 的倍数
+            min_timeout: 自适应总超时的下限（秒）
+            min_idle_timeout: 自适应结果空闲超时的下限（秒）
+        """
+        self.min_samples = max(1, int(min_samples))
+        self.timeout_multiplier = max(1.0, float(timeout_multiplier))
+        self.min_timeout = min_timeout
+        self.min_idle_timeout = min_idle_timeout
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def fit(self, durations: Dict[str, List[float]], tails: Optional[Dict[str, List[float]]] = None):
+        """根据历史样本建立模型
+
+        Args:
+            durations: {脚本路径: 墙钟耗时列表（秒）}
+            tails: {脚本路径: 结果关键词到进程退出的耗时列表（秒）}
+        """
+        tails = tails or {}
+        self._stats = {}
+        for script_path in set(durations) | set(tails):
+            values = [v for v in durations.get(script_path, []) if v is not None and v >= 0]
+            tail_values = [v for v in tails.get(script_path, []) if v is not None and v >= 0]
+            self._stats[script_path] = {
+                'count': len(values),
+                'median': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'max': max(values) if values else None,
+                'tail_count': len(tail_values),
+                'tail_median': percentile(tail_values, 50),
+                'tail_p99': percentile(tail_values, 99),
+            }
+
+    def get(self, script_path: str) -> Optional[Dict[str, Any]]:
+        """获取脚本的耗时统计
+
+        Args:
+            script_path: 脚本路径
+
+        Returns:
+            统计信息（count、median、p95、p99、max、tail_*），没有历史时返回None
+        """
+        return self._stats.get(script_path)
+
+    def estimate(self, script_path: str, default: Optional[float] = None) -> Optional[float]:
+        """预估脚本耗时（历史中位数）
+
+        Args:
+            script_path: 脚本路径
+            default: 没有历史时的返回值
+
+        Returns:
+            预估耗时（秒）
+        """
+        stats = self._stats.get(script_path)
+        if stats and stats['median'] is not None:
+            return stats['median']
+        return default
+
+    def estimate_remaining(
+        self,
+        pending_paths: List[str],
+        running_path: Optional[str] = None,
+        running_elapsed: float = 0.0,
+        default: Optional[float] = None
+    ) -> Optional[float]:
+        """预估剩余执行时间
+
+        正在执行的脚本按"预估耗时 - 已运行时间"计算（已超出预估时按 0 计），
+        没有历史的脚本使用 default。
+
+        Args:
+            pending_paths: 尚未开始的脚本路径列表
+            running_path: 正在执行的脚本路径
+            running_elapsed: 正在执行的脚本已运行秒数
+            default: 没有历史的脚本的预估耗时（None表示无法预估）
+
+        Returns:
+            剩余秒数，存在无法预估的脚本时返回None
+        """
+        total = 0.0
+        for script_path in pending_paths:
+            value = self.estimate(script_path, default)
+            if value is None:
+                return None
+            total += value
+        if running_path:
+            value = self.estimate(running_path, default)
+            if value is None:
+                return None
+            total += max(0.0, value - running_elapsed)
+        return total
+
+    def adaptive_limits(
+        self,
+        script_path: str,
+        timeout: float,
+        result_idle_timeout: float
+    ) -> Dict[str, float]:
+        """计算脚本的自适应超时
+
+        总超时取 P99 × 倍数，结果空闲超时取收尾耗时 P99 × 倍数，
+        均不低于下限、不超过全局配置。样本不足的项不返回。
+
+        Args:
+            script_path: 脚本路径
+            timeout: 全局总超时（秒）
+            result_idle_timeout: 全局结果空闲超时（秒）
+
+        Returns:
+            {'timeout': 秒, 'result_idle_timeout': 秒} 中可用的项
+        """
+        stats = self._stats.get(script_path)
+        limits = {}
+        if not stats:
+            return limits
+        if stats['count'] >= self.min_samples and stats['p99'] is not None:
+            learned = max(self.min_timeout, stats['p99'] * self.timeout_multiplier)
+            if learned < timeout:
+                limits['timeout'] = round(learned, 1)
+        if stats['tail_count'] >= self.min_samples and stats['tail_p99'] is not None:
+            learned = max(self.min_idle_timeout, stats['tail_p99'] * self.timeout_multiplier)
+            if learned < result_idle_timeout:
+                limits['result_idle_timeout'] = round(learned, 1)
+        return limits
@@ -3,7 +3,10 @@
 负责脚本的执行、监控和控制。
 """
 
+import json
+import os
 import subprocess
+import tempfile
 import threading
 import time
 import queue
@@ -16,6 +19,16 @@ from AppCode.interfaces.i_execution_engine import IExecutionEngine
 from AppCode.utils.constants import ExecutionStatus, DEFAULT_TIMEOUT
 from AppCode.utils.exceptions import ExecutionError
 from AppCode.core.output_monitor import OutputMonitor
+from AppCode.core.zygote import ZygoteLauncher, zygote_supported
+from AppCode.core.process_group import (
+    ProcessGroup, popen_group_kwargs, DEFAULT_TERMINATE_GRACE, DEFAULT_KILL_TIMEOUT
+)
+from AppCode.core.resource_limits import apply_limits, merge_limits, HostAffinity
+from AppCode.core.hang_diagnostics import (
+    HangMonitor, HANG_DUMP_ENV, dump_path_for, DEFAULT_HANG_SILENCE, DEFAULT_HANG_CPU_THRESHOLD
+)
+from AppCode.core.process_sampler import ProcessTreeSampler, DEFAULT_SAMPLE_INTERVAL
+from AppCode.infrastructure.metrics import MetricsRegistry, TimedLock
 
 
 # 结果关键词正则（用于快速检测输出中的结果）
@@ -26,6 +39,13 @@ _FAIL_EN_PATTERN = re.compile(r'(?<!\w)fail(?!ed?\w)', re.IGNORECASE)
 _PENDING_PATTERN = re.compile(r'待判定|需要确认')
 _ERROR_PATTERN = re.compile(r'exception|traceback', re.IGNORECASE)
 
+# 子进程启动垫片目录（sitecustomize.py），剖析模式下加入子进程 PYTHONPATH
+SCRIPT_SHIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'script_shim')
+# 垫片写出剖析结果的文件路径（与 script_shim/sitecustomize.py 保持一致）
+PROFILE_OUTPUT_ENV = 'AUTOTEST_PROFILE_OUTPUT'
+# 模拟台架模式：应答配置文件路径或 1（与 script_shim/bench_emulator.py 保持一致）
+DRY_RUN_ENV = 'AUTOTEST_DRY_RUN'
+
 
 class ExecutionEngine(IExecutionEngine):
     """执行引擎实现"""
@@ -33,13 +53,16 @@ class ExecutionEngine(IExecutionEngine):
     # 结果关键词后无输出的默认超时秒数（可由用户在设置中配置）
     DEFAULT_RESULT_IDLE_TIMEOUT = 30
 
-    def __init__(self, logger=None, max_workers: int = 1, config_manager=None):
+    def __init__(self, logger=None, max_workers: int = 1, config_manager=None,
+                 process_registry=None, metrics=None):
         """初始化执行引擎
 
         Args:
             logger: 日志记录器
             max_workers: 最大并发执行数（车载ECU测试必须为1，硬件资源独占）
             config_manager: 配置管理器
+            process_registry: 脚本进程登记（程序异常退出后回收遗留进程）
+            metrics: 指标注册表（MetricsRegistry），None 时使用独立的注册表
         """
         self.logger = logger
         self.max_workers = 1  # 强制设置为1，确保顺序执行
@@ -48,15 +71,26 @@ class ExecutionEngine(IExecutionEngine):
                 f"max_workers={max_workers} ignored, forcing sequential execution (max_workers=1) for ECU safety"
             )
         self.config_manager = config_manager
+        self.process_registry = process_registry
         self._executions = {}  # execution_id -> execution_info
         self._processes = {}   # execution_id -> subprocess.Popen
+        self._groups = {}      # execution_id -> ProcessGroup
         self._threads = {}     # execution_id -> threading.Thread
-        self._lock = threading.Lock()
+        # 运行指标：锁只在发生争用时记录等待时间
+        self.metrics = metrics or MetricsRegistry()
+        self._lock = TimedLock(self.metrics.histogram('engine_lock_wait_seconds', '执行引擎锁的争用等待时间'))
         self._task_queue = queue.Queue()
         self._worker_threads = []
         self._running = False
+        self._host_affinity = HostAffinity(logger)
+        self._event_callbacks = {}  # 事件名称 -> 回调列表
         self._paused_executions = set()  # 新增：暂停的执行ID集合
         self._pause_lock = threading.Lock()  # 新增：暂停操作锁
+        self.metrics.gauge('engine_queue_depth', '等待执行的任务数', fn=self._task_queue.qsize)
+        self.metrics.gauge('engine_running_processes', '运行中的脚本进程数', fn=lambda: len(self._processes))
+        self._queue_wait = self.metrics.histogram('engine_queue_wait_seconds', '任务从排队到开始执行的时间')
+        self._spawn_latency = self.metrics.histogram('engine_spawn_seconds', '脚本进程启动耗时')
+        self._output_lines = self.metrics.counter('engine_output_lines_total', '脚本输出行数')
 
         # 从配置读取超时时间，默认3600秒（1小时）
         if config_manager:
@@ -64,9 +98,47 @@ class ExecutionEngine(IExecutionEngine):
             self._result_idle_timeout = config_manager.get(
                 'execution.result_idle_timeout', self.DEFAULT_RESULT_IDLE_TIMEOUT
             )
+            self._profiling = bool(config_manager.get('execution.profiling', False))
+            self._terminate_grace = config_manager.get('execution.terminate_grace', DEFAULT_TERMINATE_GRACE)
+            self._kill_timeout = config_manager.get('execution.kill_timeout', DEFAULT_KILL_TIMEOUT)
+            self._hang_silence = config_manager.get('execution.hang_silence', DEFAULT_HANG_SILENCE)
+            self._hang_cpu_threshold = config_manager.get(
+                'execution.hang_cpu_threshold', DEFAULT_HANG_CPU_THRESHOLD
+            )
+            self._hang_action = config_manager.get('execution.hang_action', 'continue')
+            self._sample_interval = config_manager.get('execution.sample_interval', DEFAULT_SAMPLE_INTERVAL)
+            self._resource_limits = config_manager.get('execution.resource_limits', {}) or {}
+            self._suite_resource_limits = config_manager.get('execution.suite_resource_limits', {}) or {}
+            self._dry_run = bool(config_manager.get('execution.dry_run', False))
+            self._dry_run_config = config_manager.get('execution.dry_run_config', '') or None
+            self._adaptive_timeouts = bool(config_manager.get('execution.adaptive_timeouts', False))
+            self._adaptive_multiplier = config_manager.get('execution.adaptive_timeout_multiplier', 1.5)
+            self._adaptive_min_samples = config_manager.get('execution.adaptive_min_samples', 5)
+            use_zygote = bool(config_manager.get('execution.zygote', False))
+            zygote_preload = config_manager.get('execution.zygote_preload', None)
         else:
             self._timeout = DEFAULT_TIMEOUT
             self._result_idle_timeout = self.DEFAULT_RESULT_IDLE_TIMEOUT
+            self._profiling = False
+            self._terminate_grace = DEFAULT_TERMINATE_GRACE
+            self._kill_timeout = DEFAULT_KILL_TIMEOUT
+            self._hang_silence = DEFAULT_HANG_SILENCE
+            self._hang_cpu_threshold = DEFAULT_HANG_CPU_THRESHOLD
+            self._hang_action = 'continue'
+            self._sample_interval = DEFAULT_SAMPLE_INTERVAL
+            self._resource_limits = {}
+            self._suite_resource_limits = {}
+            self._dry_run = False
+            self._dry_run_config = None
+            self._adaptive_timeouts = False
+            self._adaptive_multiplier = 1.5
+            self._adaptive_min_samples = 5
+            use_zygote = False
+            zygote_preload = None
+
+        # 预热进程（Linux，可选）：由已导入公共模块的常驻进程 fork 脚本进程
+        self._zygote = None
+        self.set_zygote(use_zygote, zygote_preload)
 
         if self.logger:
             self.logger.info(
@@ -79,7 +151,9 @@ class ExecutionEngine(IExecutionEngine):
         script_path: str,
         params: Optional[Dict[str, Any]] = None,
         callback: Optional[Callable] = None,
-        batch_id: Optional[str] = None
+        batch_id: Optional[str] = None,
+        limits: Optional[Dict[str, float]] = None,
+        resources: Optional[Dict[str, Any]] = None
     ) -> str:
         """执行脚本
         
@@ -88,6 +162,8 @@ class ExecutionEngine(IExecutionEngine):
             params: 执行参数
             callback: 完成回调函数
             batch_id: 批次ID（如果属于批次执行）
+            limits: 本次执行的超时（timeout、result_idle_timeout，秒），未给出的项使用全局配置
+            resources: 脚本进程的资源限制（见 resource_limits.py），None表示使用全局配置
             
         Returns:
             执行ID
@@ -105,7 +181,10 @@ class ExecutionEngine(IExecutionEngine):
             'error': None,
             'callback': callback,
             'progress': 0,
-            'batch_id': batch_id  # 添加batch_id
+            'batch_id': batch_id,  # 添加batch_id
+            'limits': dict(limits or {}),
+            'resource_limits': self.get_resource_limits() if resources is None else dict(resources),
+            'timeline': {'queued': time.time()}  # 时间线事件（Unix时间戳）
         }
         
         with self._lock:
@@ -300,99 +379,69 @@ class ExecutionEngine(IExecutionEngine):
         return False
     
     def _terminate_process_safe(self, process, execution_id: str):
-        """安全地终止进程（增强版 - 支持暂停状态的进程）
+        """终止脚本进程组（含暂停的进程和后代进程）
+
+        按 SIGTERM → SIGKILL（Windows 最后 taskkill）阶梯升级，
+        总耗时不超过 terminate_grace + kill_timeout。
 
         Args:
             process: 进程对象
             execution_id: 执行ID
         """
+        with self._lock:
+            execution_info = self._executions.get(execution_id)
+            group = self._groups.get(execution_id)
+        if execution_info is not None:
+            self._mark(execution_info, 'terminate_start')
         try:
-            # 首先检查进程是否已结束
-            if process.poll() is not None:
-                if self.logger:
-                    self.logger.info(f"Process already ended: {execution_id}")
-                return
-
-            # 尝试使用 psutil 恢复进程（如果被暂停）然后再终止
-            try:
-                parent = psutil.Process(process.pid)
-                # 检查进程是否被暂停，如果是则先恢复
-                if parent.status() == psutil.STATUS_STOPPED:
-                    if self.logger:
-                        self.logger.info(f"Process is stopped, resuming before terminate: {execution_id}")
-                    try:
-                        parent.resume()
-                        time.sleep(0.1)  # 等待恢复
-                    except Exception as e:
-                        if self.logger:
-                            self.logger.warning(f"Failed to resume process: {e}")
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass  # 进程不存在或无权限，继续尝试终止
-
-            # 首先尝试温和终止
+            if group is None:
+                group = ProcessGroup(process.pid, self.logger)
+            survivors = group.terminate(process, self._terminate_grace, self._kill_timeout)
+            if self.logger:
+                if survivors:
+                    self.logger.error(f"Failed to terminate process group for {execution_id}: {survivors}")
+                else:
+                    self.logger.info(f"Process group terminated: {execution_id}")
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error terminating process: {e}")
+            # 不抛出异常，确保方法能正常返回
             try:
-                process.terminate()
-                process.wait(timeout=1)  # 减少超时时间到1秒
-                if self.logger:
-                    self.logger.info(f"Process terminated gracefully: {execution_id}")
-                return
-            except subprocess.TimeoutExpired:
+                process.kill()
+            except Exception:
                 pass
-            except Exception as e:
-                if self.logger:
-                    self.logger.debug(f"Terminate failed: {e}")
+        finally:
+            if execution_info is not None:
+                self._mark(execution_info, 'terminate_end')
 
-            # 温和终止失败，使用 psutil 强制杀死进程树
-            if self.logger:
-                self.logger.warning(f"Process did not terminate, force killing process tree: {execution_id}")
+    def _reap_process_group(self, execution_id: str, process):
+        """确认脚本的后代进程已全部退出（有遗留时按阶梯终止）
 
-            try:
-                parent = psutil.Process(process.pid)
-                # 先杀死所有子进程
-                children = parent.children(recursive=True)
-                for child in children:
-                    try:
-                        child.kill()
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
-                # 再杀死主进程
-                parent.kill()
-                if self.logger:
-                    self.logger.info(f"Killed process tree for PID {process.pid}")
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                # psutil 失败，使用 process.kill()
-                try:
-                    process.kill()
-                except Exception:
-                    pass
-
-            try:
-                process.wait(timeout=1)
-            except subprocess.TimeoutExpired:
-                # 最后的尝试：使用 Windows taskkill 命令
-                import platform
-                if platform.system() == 'Windows':
-                    try:
-                        # /F 强制终止 /T 终止进程树
-                        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
-                                       capture_output=True, timeout=5)
-                        if self.logger:
-                            self.logger.info(f"Used taskkill for PID {process.pid}")
-                        # 等待进程结束
-                        try:
-                            process.wait(timeout=1)
-                        except Exception:
-                            pass
-                    except Exception as e:
-                        if self.logger:
-                            self.logger.warning(f"taskkill failed: {e}")
+        脚本自行退出后，其启动的子进程（如 C# DLL 宿主）可能仍占用 CAN 设备，
+        必须在下一条脚本启动前清理。
 
+        Args:
+            execution_id: 执行ID
+            process: 进程对象
+        """
+        with self._lock:
+            group = self._groups.pop(execution_id, None)
+        if group is None:
+            return
+        survivors = []
+        try:
+            leftovers = group.survivors()
+            if leftovers:
+                if self.logger:
+                    self.logger.warning(f"Leftover processes after {execution_id}: {leftovers}, terminating")
+                survivors = group.terminate(process, self._terminate_grace, self._kill_timeout)
         except Exception as e:
             if self.logger:
-                self.logger.error(f"Error terminating process: {e}")
-            # 不再抛出异常，确保方法能正常返回
-            # raise
-    
+                self.logger.error(f"Failed to reap process group for {execution_id}: {e}")
+        # 进程组已结束才移除登记，无法终止的进程留待下次启动时回收
+        if self.process_registry and not survivors:
+            self.process_registry.unregister(execution_id)
+
     def get_execution_status(self, execution_id: str) -> Dict[str, Any]:
         """获取执行状态
         
@@ -833,6 +882,11 @@ class ExecutionEngine(IExecutionEngine):
         3. 进程退出码检测: 进程已退出但循环未退出时的兜底
         """
         output_monitor = None
+        profile_path = None
+        process = None
+        hang_monitor = None
+        sampler = None
+        pending_lines = 0  # 尚未计入指标的输出行数（批量累加，避免每行加锁）
         try:
             # 检查是否已取消
             with self._lock:
@@ -843,6 +897,10 @@ class ExecutionEngine(IExecutionEngine):
             with self._lock:
                 execution_info['status'] = ExecutionStatus.RUNNING
                 execution_info['start_time'] = datetime.now()
+                self._mark(execution_info, 'started')
+                timeline = execution_info['timeline']
+                if 'queued' in timeline:
+                    self._queue_wait.observe(timeline['started'] - timeline['queued'])
 
             if self.logger:
                 self.logger.info(f"Executing script: {execution_info['script_path']}")
@@ -866,12 +924,33 @@ class ExecutionEngine(IExecutionEngine):
                 cmd.extend([f'--{key}', str(value)])
 
             # 启动进程（实时输出模式，使用unbuffered模式）
-            import os
             import sys
             env = os.environ.copy()
             env['PYTHONUNBUFFERED'] = '1'  # 禁用Python输出缓冲
             env['PYTHONIOENCODING'] = 'utf-8'  # 设置Python输出编码为UTF-8，支持emoji等特殊字符
 
+            # 模拟台架模式：注入模拟的设备/CAN辅助模块和虚拟时钟
+            dry_run = self._dry_run
+            if dry_run:
+                self._add_shim_path(env)
+                env[DRY_RUN_ENV] = self._dry_run_config or '1'
+                with self._lock:
+                    execution_info['dry_run'] = {'config': self._dry_run_config}
+
+            # 剖析模式：注入计时垫片
+            if self._profiling:
+                profile_path = self._prepare_profiling(env, execution_id)
+
+            # 挂起诊断：脚本启用 faulthandler，长时间无输出时可按需输出调用栈
+            hang_silence = self._hang_silence
+            hang_dump_path = None
+            if hang_silence:
+                hang_dump_path = dump_path_for(execution_id)
+                if os.path.exists(hang_dump_path):
+                    os.remove(hang_dump_path)
+                self._add_shim_path(env)
+                env[HANG_DUMP_ENV] = hang_dump_path
+
             # Windows平台下隐藏控制台窗口
             startupinfo = None
             creationflags = 0
@@ -881,19 +960,59 @@ class ExecutionEngine(IExecutionEngine):
                 startupinfo.wShowWindow = subprocess.SW_HIDE
                 creationflags = subprocess.CREATE_NO_WINDOW
 
-            # 使用二进制模式读取，避免编码问题
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                bufsize=1,  # 行缓冲
-                env=env,
-                startupinfo=startupinfo,
-                creationflags=creationflags
+            # 脚本独占CPU核时本程序让出这些核（在启动前设置，脚本不应继承受限的亲和性）
+            resource_limits = execution_info.get('resource_limits') or {}
+            host_cores = self._host_affinity.isolate(
+                resource_limits.get('cpu_affinity') if resource_limits.get('isolate_host') else None
             )
+            if host_cores is not None and resource_limits.get('isolate_host'):
+                execution_info['host_affinity'] = host_cores
 
+            # 使用二进制模式读取，避免编码问题
+            self._mark(execution_info, 'spawn_start')
+            spawn_started = time.perf_counter()
+            process = None
+            # 剖析和模拟台架模式依赖启动时导入的垫片，只能使用全新进程
+            if self._zygote is not None and not profile_path and not dry_run:
+                try:
+                    process = self._zygote.spawn(cmd[1:], env)
+                except ExecutionError as e:
+                    if self.logger:
+                        self.logger.warning(f"Zygote spawn failed, falling back to subprocess: {e}")
+            if process is None:
+                # 每个脚本在独立进程组中运行，终止时连同后代进程一起结束
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    bufsize=1,  # 行缓冲
+                    env=env,
+                    startupinfo=startupinfo,
+                    **popen_group_kwargs(creationflags)
+                )
+
+            self._mark(execution_info, 'spawned')
+            self._spawn_latency.observe(time.perf_counter() - spawn_started)
+            group = ProcessGroup(process.pid, self.logger)
             with self._lock:
                 self._processes[execution_id] = process
+                self._groups[execution_id] = group
+            self._apply_resource_limits(process.pid, execution_info)
+            if self.process_registry:
+                self.process_registry.register(
+                    execution_id, process.pid, execution_info['script_path'], group.pgid
+                )
+            if hang_dump_path:
+                hang_monitor = HangMonitor(
+                    process.pid, hang_dump_path, hang_silence, self._hang_cpu_threshold, self.logger
+                )
+            if self._sample_interval:
+                sampler = ProcessTreeSampler(
+                    process.pid, self._sample_interval, self.logger,
+                    on_sample=lambda sample: self._emit('resource_sample', execution_id, sample)
+                )
+                sampler.start()
+            last_track_time = time.time()
 
             # 智能解码函数：尝试多种编码
             def smart_decode(byte_data):
@@ -918,8 +1037,15 @@ class ExecutionEngine(IExecutionEngine):
 
             # ===== 防卡死机制变量 =====
             stderr_lines = []
-            timeout = getattr(self, '_timeout', DEFAULT_TIMEOUT)
-            result_idle_timeout = getattr(self, '_result_idle_timeout', self.DEFAULT_RESULT_IDLE_TIMEOUT)
+            limits = execution_info.get('limits') or {}
+            timeout = limits.get('timeout') or getattr(self, '_timeout', DEFAULT_TIMEOUT)
+            result_idle_timeout = limits.get('result_idle_timeout') or \
+                getattr(self, '_result_idle_timeout', self.DEFAULT_RESULT_IDLE_TIMEOUT)
+            if limits and self.logger:
+                self.logger.info(
+                    f"Adaptive limits for {execution_id}: timeout={timeout}s, "
+                    f"result_idle_timeout={result_idle_timeout}s"
+                )
             start_time = time.time()
             result_detected = False              # 是否已检测到结果关键词
             result_detected_time = 0.0           # 检测到结果关键词的时间
@@ -946,12 +1072,18 @@ class ExecutionEngine(IExecutionEngine):
 
             reader = threading.Thread(target=reader_thread, daemon=True, name=f"stdout-reader-{execution_id}")
             reader.start()
+            last_lines_flush = time.time()
 
             while True:
                 now = time.time()
+                if pending_lines and now - last_lines_flush >= 1.0:
+                    self._output_lines.inc(pending_lines)
+                    pending_lines = 0
+                    last_lines_flush = now
 
                 # === 机制1: 总超时（用户配置的单脚本最大运行时间） ===
                 if now - start_time > timeout:
+                    self._mark(execution_info, 'timeout')
                     if self.logger:
                         self.logger.warning(f"Script execution timeout ({timeout}s): {execution_id}")
                     self._terminate_process_safe(process, execution_id)
@@ -969,6 +1101,7 @@ class ExecutionEngine(IExecutionEngine):
                     if current_output_count == last_output_count:
                         idle_check_count += 1
                         if idle_check_count >= 2:
+                            self._mark(execution_info, 'idle_timeout')
                             if self.logger:
                                 self.logger.info(
                                     f"Result detected and no output for {result_idle_timeout}s "
@@ -996,13 +1129,36 @@ class ExecutionEngine(IExecutionEngine):
                         should_cancel = True
 
                 if should_cancel:
-                    try:
-                        process.terminate()
-                        process.wait(timeout=3)
-                    except Exception:
-                        process.kill()
+                    # 取消/跳过时通常已由 _cancel_single_execution 终止，这里确保整组结束
+                    self._terminate_process_safe(process, execution_id)
                     break
 
+                # 定期记录后代进程（Windows 没有进程组信号；POSIX 下自行 setsid 的后代
+                # 不在进程组中），脚本退出后据此清理
+                if now - last_track_time > 1.0:
+                    group.track()
+                    if self.process_registry:
+                        self.process_registry.update_descendants(execution_id, group.members())
+                    last_track_time = now
+
+                # === 挂起诊断: 无结果、长时间无输出且 CPU 空闲时记录调用栈 ===
+                if hang_monitor and not result_detected:
+                    hang_dump = hang_monitor.check(now)
+                    if hang_dump:
+                        self._mark(execution_info, 'hang_dump')
+                        with self._lock:
+                            execution_info['hang_dumps'] = list(hang_monitor.dumps)
+                        if self._hang_action == 'terminate':
+                            self._terminate_process_safe(process, execution_id)
+                            with self._lock:
+                                execution_info['output'].append(
+                                    f"脚本 {hang_dump['silence_s']:.0f} 秒无输出，判定为挂起"
+                                )
+                                execution_info['status'] = ExecutionStatus.TIMEOUT
+                                execution_info['end_time'] = datetime.now()
+                                execution_info['test_result'] = 'timeout'
+                            break
+
                 # === 检查进程是否已结束 ===
                 poll_result = process.poll()
 
@@ -1011,14 +1167,19 @@ class ExecutionEngine(IExecutionEngine):
                     msg_type, data = output_queue.get(timeout=0.1)
                     if msg_type == 'line':
                         line = smart_decode(data).rstrip()
+                        self._mark(execution_info, 'first_output')
+                        if hang_monitor:
+                            hang_monitor.on_output(time.time())
                         with self._lock:
                             execution_info['output'].append(line)
                             execution_info['progress'] = min(90, len(execution_info['output']) * 2)
+                        pending_lines += 1
 
                         # 检测结果关键词
                         if not result_detected and self._has_result_keyword(execution_info['output']):
                             result_detected = True
                             result_detected_time = time.time()
+                            self._mark(execution_info, 'result_detected')
                             with self._lock:
                                 last_output_count = len(execution_info['output'])
                             if self.logger:
@@ -1035,6 +1196,9 @@ class ExecutionEngine(IExecutionEngine):
                 except queue_module.Empty:
                     # 队列为空（100ms内无新输出）
                     if poll_result is not None:
+                        self._mark(execution_info, 'process_exit')
+                        # 遗留的后代进程会继承并占住输出管道，先清理再读取剩余输出
+                        self._reap_process_group(execution_id, process)
                         # 进程已退出，等待reader线程耗尽
                         reader.join(timeout=1)
                         # 清空队列中剩余的行
@@ -1043,9 +1207,11 @@ class ExecutionEngine(IExecutionEngine):
                                 msg_type, data = output_queue.get(timeout=0.1)
                                 if msg_type == 'line':
                                     line = smart_decode(data).rstrip()
+                                    self._mark(execution_info, 'first_output')
                                     with self._lock:
                                         execution_info['output'].append(line)
                                         execution_info['progress'] = min(90, len(execution_info['output']) * 2)
+                                    pending_lines += 1
                             except queue_module.Empty:
                                 break
 
@@ -1066,6 +1232,23 @@ class ExecutionEngine(IExecutionEngine):
 
             return_code = process.returncode
 
+            # 下一条脚本启动前确认没有遗留的后代进程
+            self._reap_process_group(execution_id, process)
+
+            if sampler:
+                samples = sampler.stop()
+                if samples['count']:
+                    with self._lock:
+                        execution_info['resource_samples'] = samples
+
+            # 收集剖析结果（须在回调保存结果之前）
+            if profile_path:
+                profile = self._collect_profile(profile_path)
+                if profile:
+                    with self._lock:
+                        execution_info['profile'] = profile
+                profile_path = None
+
             # 更新状态（使用锁保护）
             with self._lock:
                 # 只有在未被取消或超时的情况下才更新为成功/失败
@@ -1092,6 +1275,7 @@ class ExecutionEngine(IExecutionEngine):
                     elif execution_info['status'] == ExecutionStatus.TIMEOUT:
                         execution_info['test_result'] = 'timeout'
 
+            self._mark(execution_info, 'finished')
             if self.logger:
                 self.logger.info(
                     f"Script execution completed: {execution_id} - "
@@ -1119,11 +1303,24 @@ class ExecutionEngine(IExecutionEngine):
                 self.logger.error(f"Execution error for {execution_id}: {e}", exc_info=True)
 
         finally:
+            if pending_lines:
+                self._output_lines.inc(pending_lines)
+
             # 停止输出监控器
             if output_monitor:
                 output_monitor.stop()
 
-            # 清理进程引用
+            # 异常退出时清理剖析文件
+            if profile_path:
+                self._collect_profile(profile_path)
+            if hang_monitor:
+                hang_monitor.cleanup()
+            if sampler:
+                sampler.stop()
+
+            # 清理进程引用（异常退出时也确保进程组已结束）
+            if process is not None:
+                self._reap_process_group(execution_id, process)
             with self._lock:
                 self._processes.pop(execution_id, None)
     
@@ -1199,14 +1396,42 @@ class ExecutionEngine(IExecutionEngine):
     def register_callback(self, event: str, callback: Callable):
         """注册事件回调
         
+        回调在引擎的后台线程中调用，界面需自行转到主线程。支持的事件：
+        
+        - ``resource_sample``：脚本进程树的最新资源采样，参数 (execution_id, sample)
+        
         Args:
             event: 事件名称
             callback: 回调函数
         """
-        # 简单实现，可以扩展为事件系统
+        with self._lock:
+            self._event_callbacks.setdefault(event, []).append(callback)
         if self.logger:
             self.logger.info(f"Callback registered for event: {event}")
     
+    def unregister_callback(self, event: str, callback: Callable):
+        """取消事件回调
+        
+        Args:
+            event: 事件名称
+            callback: 注册时的回调函数
+        """
+        with self._lock:
+            callbacks = self._event_callbacks.get(event, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+    
+    def _emit(self, event: str, *args):
+        """调用事件回调（单个回调出错不影响其它回调）"""
+        with self._lock:
+            callbacks = list(self._event_callbacks.get(event, []))
+        for callback in callbacks:
+            try:
+                callback(*args)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Event callback error ({event}): {e}")
+    
     def set_max_parallel(self, max_parallel: int):
         """设置最大并行数
         
@@ -1243,6 +1468,217 @@ class ExecutionEngine(IExecutionEngine):
         if self.logger:
             self.logger.info(f"Result idle timeout set to: {timeout} seconds")
     
+    def set_adaptive_timeouts(self, enabled: bool):
+        """设置自适应超时（按脚本历史耗时收紧超时，对之后启动的脚本生效）
+
+        Args:
+            enabled: 是否启用
+        """
+        self._adaptive_timeouts = bool(enabled)
+        if self.logger:
+            self.logger.info(f"Adaptive timeouts {'enabled' if self._adaptive_timeouts else 'disabled'}")
+
+    def get_timeout_settings(self) -> Dict[str, Any]:
+        """获取超时配置
+
+        Returns:
+            timeout、result_idle_timeout（秒）、adaptive（是否自适应）、
+            multiplier（自适应倍数）、min_samples（自适应所需最少样本数）
+        """
+        return {
+            'timeout': self._timeout,
+            'result_idle_timeout': self._result_idle_timeout,
+            'adaptive': self._adaptive_timeouts,
+            'multiplier': self._adaptive_multiplier,
+            'min_samples': self._adaptive_min_samples,
+        }
+
+    def set_zygote(self, enabled: bool, preload: Optional[list] = None):
+        """设置预热进程模式（仅 Linux 支持，其他平台忽略）
+
+        Args:
+            enabled: 是否启用
+            preload: 预加载的模块名列表（None表示默认的公共模块）
+        """
+        # 配置未变化时保留正在运行的预热进程（重启会使其正在执行的脚本失去退出码）
+        if enabled and self._zygote is not None and \
+                (preload is None or list(preload) == self._zygote.preload):
+            return
+
+        if self._zygote is not None:
+            self._zygote.stop()
+            self._zygote = None
+
+        if enabled and not zygote_supported():
+            if self.logger:
+                self.logger.warning("Script zygote is only supported on Linux, using subprocess")
+            return
+
+        if enabled:
+            self._zygote = ZygoteLauncher('python', preload, logger=self.logger)
+            if self.logger:
+                self.logger.info("Script zygote enabled")
+
+    @staticmethod
+    def _mark(execution_info: Dict[str, Any], event: str):
+        """记录执行时间线事件（Unix时间戳，同名事件只记录第一次）
+
+        Args:
+            execution_info: 执行信息
+            event: 事件名
+        """
+        execution_info.setdefault('timeline', {}).setdefault(event, time.time())
+
+    def set_dry_run(self, enabled: bool, config_path: Optional[str] = None):
+        """设置模拟台架模式（对之后启动的脚本生效）
+
+        Args:
+            enabled: 是否以模拟的设备/CAN辅助模块运行脚本（无需硬件，等待使用虚拟时钟）
+            config_path: 信号、SCPI、Modbus 应答配置文件（None表示全部使用默认值）
+        """
+        self._dry_run = bool(enabled)
+        self._dry_run_config = os.path.abspath(config_path) if config_path else None
+        if self.logger:
+            self.logger.info(
+                f"Dry-run bench {'enabled' if self._dry_run else 'disabled'}"
+                + (f" ({self._dry_run_config})" if self._dry_run and self._dry_run_config else '')
+            )
+
+    def set_profiling(self, enabled: bool):
+        """设置剖析模式（对之后启动的脚本生效）
+
+        Args:
+            enabled: 是否在脚本进程中注入计时垫片
+        """
+        self._profiling = bool(enabled)
+        if self.logger:
+            self.logger.info(f"Script profiling {'enabled' if self._profiling else 'disabled'}")
+
+    def get_resource_limits(self, suite_name: Optional[str] = None) -> Dict[str, Any]:
+        """获取脚本进程的资源限制（全局配置，测试方案有单独配置时覆盖）
+
+        Args:
+            suite_name: 测试方案名称
+
+        Returns:
+            生效的资源限制，未配置时为空字典
+        """
+        suite_limits = self._suite_resource_limits.get(suite_name) if suite_name else None
+        return merge_limits(self._resource_limits, suite_limits)
+
+    def set_resource_limits(self, limits: Dict[str, Any], suite_limits: Optional[Dict[str, Any]] = None):
+        """设置脚本进程的资源限制（对之后加入队列的脚本生效）
+
+        Args:
+            limits: 全局资源限制
+            suite_limits: 按测试方案名称的资源限制 {方案名称: 资源限制}
+        """
+        self._resource_limits = dict(limits or {})
+        if suite_limits is not None:
+            self._suite_resource_limits = dict(suite_limits)
+        if self.logger:
+            self.logger.info(f"Script resource limits: {self.get_resource_limits() or 'none'}")
+
+    def _apply_resource_limits(self, pid: int, execution_info: Dict[str, Any]):
+        """对刚启动的脚本进程设置资源限制，并记录实际生效的值
+
+        Args:
+            pid: 脚本进程PID
+            execution_info: 执行信息
+        """
+        limits = execution_info.get('resource_limits') or {}
+        if not limits:
+            return
+        report = apply_limits(pid, limits, self.logger)
+        report['limits'] = limits
+        if execution_info.get('host_affinity') is not None:
+            report['host_affinity'] = execution_info.pop('host_affinity')
+        with self._lock:
+            execution_info['resources'] = report
+
+    def set_hang_diagnostics(self, silence: float, action: str = 'continue'):
+        """设置挂起诊断（对之后启动的脚本生效）
+
+        Args:
+            silence: 未出现结果时无输出多少秒（且 CPU 空闲）后记录调用栈，0表示关闭
+            action: 记录调用栈后 continue 继续等待，terminate 终止脚本并标记为超时
+        """
+        self._hang_silence = silence
+        self._hang_action = action
+        if self.logger:
+            self.logger.info(
+                f"Hang diagnostics: silence={silence}s, action={action}" if silence
+                else "Hang diagnostics disabled"
+            )
+
+    def set_sample_interval(self, interval: float):
+        """设置脚本进程树资源采样间隔（对之后启动的脚本生效）
+
+        Args:
+            interval: 采样间隔（秒），0表示关闭
+        """
+        self._sample_interval = interval
+        if self.logger:
+            self.logger.info(
+                f"Resource sampling interval: {interval}s" if interval else "Resource sampling disabled"
+            )
+
+    def _prepare_profiling(self, env: Dict[str, str], execution_id: str) -> str:
+        """在子进程环境中注入计时垫片
+
+        Args:
+            env: 子进程环境变量（就地修改）
+            execution_id: 执行ID
+
+        Returns:
+            剖析结果文件路径
+        """
+        profile_path = os.path.join(tempfile.gettempdir(), f"autotest_profile_{execution_id}.json")
+        for path in (profile_path, profile_path + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+
+        self._add_shim_path(env)
+        env[PROFILE_OUTPUT_ENV] = profile_path
+        return profile_path
+
+    @staticmethod
+    def _add_shim_path(env: Dict[str, str]):
+        """把启动垫片目录加到子进程 PYTHONPATH 最前面（已存在时不重复添加）
+
+        Args:
+            env: 子进程环境变量（就地修改）
+        """
+        python_path = env.get('PYTHONPATH')
+        if python_path and python_path.split(os.pathsep)[0] == SCRIPT_SHIM_DIR:
+            return
+        env['PYTHONPATH'] = SCRIPT_SHIM_DIR + (os.pathsep + python_path if python_path else '')
+
+    def _collect_profile(self, profile_path: str) -> Optional[Dict[str, Any]]:
+        """读取并删除垫片写出的剖析结果
+
+        Args:
+            profile_path: 剖析结果文件路径
+
+        Returns:
+            剖析结果，脚本未写出时返回None
+        """
+        profile = None
+        try:
+            if os.path.exists(profile_path):
+                with open(profile_path, 'r', encoding='utf-8') as f:
+                    profile = json.load(f)
+        except (OSError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"Failed to read profile {profile_path}: {e}")
+
+        for path in (profile_path, profile_path + '.tmp'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return profile
+
     def _parse_test_result(self, output_lines: list) -> str:
         """解析测试结果 — 仅认定中文"合格"/"不合格"为最终结果
 
@@ -1275,10 +1711,15 @@ class ExecutionEngine(IExecutionEngine):
         """关闭执行引擎"""
         self._running = False
         
-        # 取消所有执行
+        # 取消所有执行（cancel_execution 自己加锁，须在锁外调用）
         with self._lock:
-            for execution_id in list(self._executions.keys()):
-                self.cancel_execution(execution_id)
+            execution_ids = list(self._executions.keys())
+        for execution_id in execution_ids:
+            self.cancel_execution(execution_id)
+        
+        # 停止预热进程
+        if self._zygote is not None:
+            self._zygote.stop()
         
         if self.logger:
             self.logger.info("Execution engine shutdown")
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""脚本挂起检测
+
+脚本在 ``silence`` 秒内没有任何输出、尚未出现结果关键词、且进程树 CPU 占用低于
+``cpu_threshold``（百分比）时视为疑似挂起（等待设备应答、死锁等），请求脚本进程输出
+所有线程的调用栈（见 script_shim/hang_dump.py）：
+
+- POSIX：向脚本进程（不是整个进程组，后代进程没有注册 SIGUSR1）发送 ``SIGUSR1``；
+- Windows：创建触发文件 ``<输出文件>.request``。
+
+每段静默只输出一次，脚本恢复输出后重新计时。CPU 占用持续较高的脚本在计算，不视为挂起。
+"""
+
+import os
+import signal
+import tempfile
+import time
+from typing import Dict, Any, Optional, List
+
+import psutil
+
+# 挂起诊断的调用栈输出文件（与 script_shim/hang_dump.py 保持一致）
+HANG_DUMP_ENV = 'AUTOTEST_HANG_DUMP'
+REQUEST_SUFFIX = '.request'
+
+DEFAULT_HANG_SILENCE = 120
+DEFAULT_HANG_CPU_THRESHOLD = 5.0
+# CPU 占用的采样间隔（秒）
+CPU_SAMPLE_INTERVAL = 2.0
+# 等待脚本写出调用栈的时间（秒）
+DUMP_WAIT = 2.0
+# 单次执行最多保留的调用栈数量
+MAX_DUMPS = 5
+
+
+def dump_path_for(execution_id: str) -> str:
+    """执行对应的调用栈输出文件路径"""
+    return os.path.join(tempfile.gettempdir(), f"autotest_hang_{execution_id}.txt")
+
+
+def _tree_cpu_seconds(pid: int) -> Optional[float]:
+    """进程及其后代累计的 CPU 时间（秒），进程不存在时返回None"""
+    try:
+        parent = psutil.Process(pid)
+        processes = [parent] + parent.children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+    total = 0.0
+    for process in processes:
+        try:
+            times = process.cpu_times()
+            total += times.user + times.system
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total
+
+
+class HangMonitor:
+    """单次执行的挂起检测"""
+
+    def __init__(
+        self,
+        pid: int,
+        dump_path: str,
+        silence: float = DEFAULT_HANG_SILENCE,
+        cpu_threshold: float = DEFAULT_HANG_CPU_THRESHOLD,
+        logger=None
+    ):
+        """初始化挂起检测
+
+        Args:
+            pid: 脚本进程PID
+            dump_path: 调用栈输出文件路径（脚本进程启动时已通过环境变量获知）
+            silence: 无输出多少秒后开始检查
+            cpu_threshold: 低于该 CPU 占用（百分比）视为挂起
+            logger: 日志记录器
+        """
+        self.pid = pid
+        self.dump_path = dump_path
+        self.silence = silence
+        self.cpu_threshold = cpu_threshold
+        self.logger = logger
+        self.dumps: List[Dict[str, Any]] = []
+        self._last_output = time.time()
+        self._dumped = False
+        self._sample = None  # (时间, 累计CPU秒)
+
+    def on_output(self, now: float):
+        """脚本有输出，重新计时"""
+        self._last_output = now
+        self._dumped = False
+        self._sample = None
+
+    def check(self, now: float) -> Optional[Dict[str, Any]]:
+        """检查是否挂起，挂起时请求并收集调用栈
+
+        Args:
+            now: 当前时间
+
+        Returns:
+            新的调用栈记录（silence_s、cpu_percent、time、stack），未挂起时返回None
+        """
+        silent = now - self._last_output
+        if self._dumped or silent < self.silence or len(self.dumps) >= MAX_DUMPS:
+            return None
+
+        cpu_seconds = _tree_cpu_seconds(self.pid)
+        if cpu_seconds is None:
+            return None
+        if self._sample is None:
+            self._sample = (now, cpu_seconds)
+            return None
+        sampled_at, sampled_cpu = self._sample
+        if now - sampled_at < CPU_SAMPLE_INTERVAL:
+            return None
+        cpu_percent = (cpu_seconds - sampled_cpu) * 100.0 / (now - sampled_at)
+        self._sample = (now, cpu_seconds)
+        if cpu_percent >= self.cpu_threshold:
+            return None
+
+        self._dumped = True
+        stack = self.request_dump()
+        dump = {
+            'time': now,
+            'silence_s': round(silent, 1),
+            'cpu_percent': round(cpu_percent, 1),
+            'stack': stack,
+        }
+        self.dumps.append(dump)
+        if self.logger:
+            self.logger.warning(
+                f"Script {self.pid} silent for {silent:.0f}s at {cpu_percent:.1f}% CPU, "
+                f"stack {'captured' if stack else 'unavailable'}"
+            )
+        return dump
+
+    def request_dump(self) -> Optional[str]:
+        """请求脚本输出调用栈并读取（脚本未启用诊断或未响应时返回None）"""
+        try:
+            offset = os.path.getsize(self.dump_path)
+        except OSError:
+            # 输出文件由脚本启动时创建，不存在说明垫片未生效，发送信号会结束脚本
+            return None
+
+        try:
+            if hasattr(signal, 'SIGUSR1'):
+                os.kill(self.pid, signal.SIGUSR1)
+            else:
+                with open(self.dump_path + REQUEST_SUFFIX, 'w', encoding='utf-8'):
+                    pass
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"Failed to request stack dump from {self.pid}: {e}")
+            return None
+
+        # 等待输出完成：文件增长后不再变化
+        deadline = time.time() + DUMP_WAIT
+        size = offset
+        while time.time() < deadline:
+            time.sleep(0.1)
+            try:
+                current = os.path.getsize(self.dump_path)
+            except OSError:
+                return None
+            if current > offset and current == size:
+                break
+            size = current
+
+        try:
+            with open(self.dump_path, 'r', encoding='utf-8', errors='replace') as f:
+                f.seek(offset)
+                stack = f.read().strip()
+        except OSError:
+            return None
+        return stack or None
+
+    def cleanup(self):
+        """删除调用栈输出文件和触发文件"""
+        for path in (self.dump_path, self.dump_path + REQUEST_SUFFIX):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,347 @@
+"""测量值提取器
+
+在保存执行结果时，从脚本输出中解析出结构化的测量值（信号名/指标名、数值、单位、上下限）。
+
+支持可插拔的解析器：内置键值对解析器（``IFB_CCCP_CC_Res:{CCRes}``）、
+报文周期统计解析器（Case03_Period 的 MsgStatisticsInfo 输出）和
+``$Report:...#`` 报告块解析器，也可以通过 ``register_parser`` 注册自定义解析器。
+"""
+
+import importlib
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Iterable
+
+
+# 数值（支持整数、小数和科学计数法）
+_NUMBER = r'[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?'
+
+# 常见单位（按长度降序，保证 mA 优先于 A）
+_UNITS = ('kOhm', 'Ohm', 'mA', 'mV', 'ms', 'us', 'kW', 'Hz', 'A', 'V', 'W', 's', 'Ω', '℃', '%')
+_UNIT_PATTERN = '|'.join(re.escape(u) for u in _UNITS)
+
+# 键值对：信号名必须包含下划线（如 IFB_CCCP_CC_Res），避免误匹配普通日志文本
+_KEY_VALUE_PATTERN = re.compile(
+    r'(?<![A-Za-z0-9_.])(?P<name>[A-Za-z][A-Za-z0-9]*(?:_[A-Za-z0-9]+)+)\s*[:=：]\s*'
+    r'(?P<value>' + _NUMBER + r')\s*(?P<unit>' + _UNIT_PATTERN + r')?(?![A-Za-z0-9_.])'
+)
+
+# 报告块：$Key:Value#
+_REPORT_BLOCK_PATTERN = re.compile(r'\$(?P<key>[^:#$]+):(?P<body>[^#]*)#')
+
+# 报文周期统计（print 输出）
+_MSG_STATS_PATTERN = re.compile(
+    r'MsgStatisticsInfo:\s*报文累计收发次数\s*(?P<count>' + _NUMBER + r')\s*,\s*'
+    r'报文平均周期\s*(?P<avg>' + _NUMBER + r')\s*,\s*'
+    r'报文最大周期\s*(?P<max>' + _NUMBER + r')\s*,\s*'
+    r'报文最小周期\s*(?P<min>' + _NUMBER + r')'
+)
+
+# 报文周期统计（Log4NetWrapper 输出）
+_MSG_COUNT_PATTERN = re.compile(r'实测报文累计收发次数:\s*(?P<count>' + _NUMBER + r')')
+_MSG_PERIOD_PATTERN = re.compile(
+    r'实测报文平均周期:\s*(?P<avg>' + _NUMBER + r')ms;\s*'
+    r'实测报文最小周期:\s*(?P<min>' + _NUMBER + r')ms;\s*'
+    r'实测报文最大周期:\s*(?P<max>' + _NUMBER + r')ms'
+)
+_MSG_EXPECT_PATTERN = re.compile(r'预期报文周期为:\s*(?P<expect>' + _NUMBER + r')ms')
+
+# 报文周期脚本名：MessagePeriod_01-VCU_BSI_Wakeup_27A.py
+_MSG_SCRIPT_PATTERN = re.compile(r'MessagePeriod_\d+-(?P<message>[^.]+)')
+
+
+def _to_float(value: str) -> Optional[float]:
+    """转换为浮点数，失败返回None"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MeasurementParser(ABC):
+    """测量值解析器接口
+
+    解析器接收输出行列表和上下文（execution_id、script_path 等），
+    返回测量值字典列表。每个字典至少包含 ``name``，以及 ``value``（数值）
+    或 ``text_value``（文本）之一，可选 ``unit``、``lower_limit``、
+    ``upper_limit``、``line_no``。
+    """
+
+    #: 解析器名称（写入 measurements.source 字段）
+    name = 'base'
+
+    @abstractmethod
+    def parse(self, lines: List[str], context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """解析输出
+
+        Args:
+            lines: 输出行列表
+            context: 上下文信息
+
+        Returns:
+            测量值列表
+        """
+        pass
+
+
+class KeyValueParser(MeasurementParser):
+    """键值对解析器
+
+    解析 ``IFB_CCCP_CC_Res:120,OBC_CHRG_CONN_CONF:2`` 和
+    ``DCDC_STATE_BB=2`` 形式的输出。报告块（``$...#``）由 ReportBlockParser 处理，此处跳过。
+    """
+
+    name = 'key_value'
+
+    def parse(self, lines: List[str], context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        measurements = []
+        for line_no, line in enumerate(lines):
+            if '$' in line and '#' in line:
+                line = _REPORT_BLOCK_PATTERN.sub('', line)
+            for match in _KEY_VALUE_PATTERN.finditer(line):
+                measurements.append({
+                    'name': match.group('name'),
+                    'value': float(match.group('value')),
+                    'unit': match.group('unit'),
+                    'line_no': line_no
+                })
+        return measurements
+
+
+class MessagePeriodParser(MeasurementParser):
+    """报文周期统计解析器
+
+    解析 Case03_Period 脚本的 MsgStatisticsInfo 输出，生成
+    ``<报文名>.count``、``.period_avg``、``.period_min``、``.period_max`` 四个指标。
+    平均周期的上下限取"预期周期 ± 容差"。
+    """
+
+    name = 'message_period'
+
+    def __init__(self, tolerance_ms: float = 2.0):
+        """初始化解析器
+
+        Args:
+            tolerance_ms: 平均周期允许偏差（毫秒），与脚本中的判定保持一致
+        """
+        self.tolerance_ms = tolerance_ms
+
+    def parse(self, lines: List[str], context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        stats = {}
+        expect = None
+        stats_line = None
+
+        for line_no, line in enumerate(lines):
+            match = _MSG_STATS_PATTERN.search(line)
+            if match:
+                stats.update({k: match.group(k) for k in ('count', 'avg', 'max', 'min')})
+                stats_line = line_no
+                continue
+            match = _MSG_COUNT_PATTERN.search(line)
+            if match:
+                stats.setdefault('count', match.group('count'))
+                stats_line = line_no if stats_line is None else stats_line
+                continue
+            match = _MSG_PERIOD_PATTERN.search(line)
+            if match:
+                for key in ('avg', 'min', 'max'):
+                    stats.setdefault(key, match.group(key))
+                stats_line = line_no if stats_line is None else stats_line
+                continue
+            match = _MSG_EXPECT_PATTERN.search(line)
+            if match:
+                expect = _to_float(match.group('expect'))
+
+        if not stats:
+            return []
+
+        message = self._message_name(context.get('script_path', ''))
+        lower = upper = None
+        if expect is not None:
+            lower = expect - self.tolerance_ms
+            upper = expect + self.tolerance_ms
+
+        measurements = []
+        for key, suffix, unit in (('count', 'count', None), ('avg', 'period_avg', 'ms'),
+                                  ('min', 'period_min', 'ms'), ('max', 'period_max', 'ms')):
+            value = _to_float(stats.get(key))
+            if value is None:
+                continue
+            measurements.append({
+                'name': f"{message}.{suffix}",
+                'value': value,
+                'unit': unit,
+                'lower_limit': lower if key == 'avg' else None,
+                'upper_limit': upper if key == 'avg' else None,
+                'line_no': stats_line
+            })
+        return measurements
+
+    @staticmethod
+    def _message_name(script_path: str) -> str:
+        """从脚本名提取报文名"""
+        basename = os.path.splitext(os.path.basename(script_path or ''))[0]
+        match = _MSG_SCRIPT_PATTERN.search(basename)
+        if match:
+            return match.group('message')
+        return basename or 'message'
+
+
+class ReportBlockParser(MeasurementParser):
+    """报告块解析器
+
+    解析 ``$Report:Test result:合格#,$Actual test result:IFB_CCCP_CC_Res:120,...#``。
+    块内的键值对作为数值测量值，其余块作为文本测量值（如 ``Report.Test result``）。
+    """
+
+    name = 'report'
+
+    def parse(self, lines: List[str], context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        measurements = []
+        for line_no, line in enumerate(lines):
+            if '$' not in line:
+                continue
+            for block in _REPORT_BLOCK_PATTERN.finditer(line):
+                key = block.group('key').strip()
+                body = block.group('body').strip()
+                pairs = list(_KEY_VALUE_PATTERN.finditer(body))
+                if pairs:
+                    for match in pairs:
+                        measurements.append({
+                            'name': match.group('name'),
+                            'value': float(match.group('value')),
+                            'unit': match.group('unit'),
+                            'line_no': line_no
+                        })
+                    continue
+                # 形如 "Test result:合格" 的子键值
+                sub_key, sep, sub_value = body.partition(':')
+                if sep:
+                    name = f"{key}.{sub_key.strip()}"
+                    text = sub_value.strip()
+                else:
+                    name = key
+                    text = body
+                value = _to_float(text)
+                measurements.append({
+                    'name': name,
+                    'value': value,
+                    'text_value': None if value is not None else text,
+                    'line_no': line_no
+                })
+        return measurements
+
+
+def default_parsers(period_tolerance_ms: float = 2.0) -> List[MeasurementParser]:
+    """内置解析器（按调用顺序）
+
+    Args:
+        period_tolerance_ms: 报文周期上下限相对预期周期的容差（毫秒）
+
+    Returns:
+        解析器列表
+    """
+    return [KeyValueParser(), MessagePeriodParser(period_tolerance_ms), ReportBlockParser()]
+
+
+class MeasurementExtractor:
+    """测量值提取器
+
+    依次调用已注册的解析器，合并结果并补齐通用字段。
+    """
+
+    def __init__(self, parsers: Optional[Iterable[MeasurementParser]] = None, logger=None):
+        """初始化提取器
+
+        Args:
+            parsers: 解析器列表，None表示使用内置解析器
+            logger: 日志记录器
+        """
+        self.logger = logger
+        if parsers is None:
+            parsers = default_parsers()
+        self._parsers: List[MeasurementParser] = list(parsers)
+
+    def register_parser(self, parser: MeasurementParser):
+        """注册解析器（同名解析器会被替换）
+
+        Args:
+            parser: 解析器实例
+        """
+        self._parsers = [p for p in self._parsers if p.name != parser.name]
+        self._parsers.append(parser)
+        if self.logger:
+            self.logger.info(f"Measurement parser registered: {parser.name}")
+
+    def unregister_parser(self, name: str) -> bool:
+        """注销解析器
+
+        Args:
+            name: 解析器名称
+
+        Returns:
+            是否注销成功
+        """
+        count = len(self._parsers)
+        self._parsers = [p for p in self._parsers if p.name != name]
+        return len(self._parsers) != count
+
+    def load_parser(self, spec: str):
+        """按 ``module:ClassName`` 加载并注册解析器
+
+        Args:
+            spec: 解析器类路径
+        """
+        module_name, _, class_name = spec.partition(':')
+        module = importlib.import_module(module_name)
+        parser_class = getattr(module, class_name)
+        self.register_parser(parser_class())
+
+    def get_parser_names(self) -> List[str]:
+        """获取已注册的解析器名称"""
+        return [p.name for p in self._parsers]
+
+    def extract(self, output, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """提取测量值
+
+        Args:
+            output: 输出文本或输出行列表
+            context: 上下文（execution_id、script_path、timestamp）
+
+        Returns:
+            测量值行列表（已补齐 execution_id、script_path、timestamp、source 字段）
+        """
+        context = context or {}
+        if not output:
+            return []
+        lines = output.split('\n') if isinstance(output, str) else list(output)
+        # OutputMonitor 捕获的文件输出带有 [FILE] 前缀
+        lines = [line[7:] if line.startswith('[FILE] ') else line for line in lines]
+
+        rows = []
+        for parser in self._parsers:
+            try:
+                parsed = parser.parse(lines, context)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"Measurement parser {parser.name} failed: {e}")
+                continue
+
+            for item in parsed:
+                if not item.get('name'):
+                    continue
+                rows.append({
+                    'execution_id': context.get('execution_id'),
+                    'script_path': context.get('script_path'),
+                    'name': item['name'],
+                    'value': item.get('value'),
+                    'text_value': item.get('text_value'),
+                    'unit': item.get('unit'),
+                    'lower_limit': item.get('lower_limit'),
+                    'upper_limit': item.get('upper_limit'),
+                    'source': parser.name,
+                    'line_no': item.get('line_no'),
+                    'timestamp': context.get('timestamp')
+                })
+        return rows
@@ -0,0 +1,263 @@
+"""脚本进程组
+
+每个脚本在独立的进程组中运行（POSIX 为新会话，进程组ID即脚本PID；
+Windows 为 CREATE_NEW_PROCESS_GROUP），取消、跳过和超时时对整组按阶梯升级终止：
+
+1. 继续运行被暂停的进程（SIGCONT / psutil.resume），向整组发送 SIGTERM；
+2. 等待 ``grace`` 秒，仍有存活进程时向整组和已知后代发送 SIGKILL；
+3. 再等待 ``kill_timeout`` 秒，Windows 下最后使用 ``taskkill /F /T``。
+
+总耗时不超过 ``grace + kill_timeout``（Windows 另加 taskkill 的超时）。
+脚本自行退出后也要确认组内没有遗留进程（如 C# DLL 宿主仍占用 CAN 设备），
+有遗留时同样按阶梯终止，下一条脚本在此之后才启动。
+
+后代进程另外按 psutil 快照记录，用于 Windows（没有进程组信号）
+以及自行 setsid 脱离进程组的后代。
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+import psutil
+
+# 默认的温和终止等待和强制终止等待（秒）
+DEFAULT_TERMINATE_GRACE = 0.5
+DEFAULT_KILL_TIMEOUT = 1.0
+
+_IS_POSIX = os.name == 'posix'
+
+
+def popen_group_kwargs(creationflags: int = 0) -> Dict[str, Any]:
+    """让子进程在独立进程组中启动的 ``subprocess.Popen`` 参数
+
+    Args:
+        creationflags: 已有的 Windows 创建标志
+
+    Returns:
+        Popen 关键字参数
+    """
+    if _IS_POSIX:
+        return {'start_new_session': True, 'creationflags': creationflags}
+    return {'creationflags': creationflags | getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)}
+
+
+class ProcessGroup:
+    """脚本进程及其后代"""
+
+    def __init__(self, pid: int, logger=None):
+        """初始化进程组
+
+        Args:
+            pid: 脚本进程PID（POSIX 下应为新会话的首进程）
+            logger: 日志记录器
+        """
+        self.pid = pid
+        self.logger = logger
+        self.pgid = self._own_group(pid)
+        self._known: Dict[int, psutil.Process] = {}
+        self.track()
+
+    @staticmethod
+    def _own_group(pid: int) -> Optional[int]:
+        """脚本自己的进程组ID（与本进程同组或无法获取时返回None，避免误杀自身）"""
+        if not _IS_POSIX:
+            return None
+        try:
+            pgid = os.getpgid(pid)
+        except (ProcessLookupError, PermissionError):
+            return None
+        if pgid != pid or pgid == os.getpgrp():
+            return None
+        return pgid
+
+    def track(self):
+        """记录当前的后代进程快照（进程退出后仍可按快照清理）"""
+        try:
+            parent = psutil.Process(self.pid)
+            processes = [parent] + parent.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
+        for process in processes:
+            self._known.setdefault(process.pid, process)
+
+    def members(self) -> List[Tuple[int, float]]:
+        """已记录的进程（含脚本进程）的 (PID, 创建时间)"""
+        members = []
+        for pid, process in list(self._known.items()):
+            try:
+                members.append((pid, process.create_time()))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return members
+
+    def survivors(self) -> List[int]:
+        """仍存活的组内进程和已知后代的PID"""
+        alive = set()
+        for pid, process in list(self._known.items()):
+            try:
+                if process.is_running() and process.status() != psutil.STATUS_ZOMBIE:
+                    alive.add(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        if self.pgid is not None and self._group_alive():
+            for process in psutil.process_iter(['pid']):
+                try:
+                    if os.getpgid(process.pid) == self.pgid and process.status() != psutil.STATUS_ZOMBIE:
+                        alive.add(process.pid)
+                except (ProcessLookupError, PermissionError, psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+        return sorted(alive)
+
+    def _group_alive(self) -> bool:
+        """进程组中是否还有进程（含僵尸）"""
+        try:
+            os.killpg(self.pgid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+    def _signal(self, sig: int):
+        """向整组和已知后代发送信号"""
+        if self.pgid is not None:
+            try:
+                os.killpg(self.pgid, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+        for process in list(self._known.values()):
+            try:
+                process.send_signal(sig)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, ProcessLookupError):
+                pass
+
+    def _resume(self):
+        """让被暂停的进程继续运行，以便处理终止信号"""
+        if self.pgid is not None:
+            try:
+                os.killpg(self.pgid, signal.SIGCONT)
+            except (ProcessLookupError, PermissionError):
+                pass
+        for process in list(self._known.values()):
+            try:
+                if process.status() == psutil.STATUS_STOPPED:
+                    process.resume()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+    def _wait(self, process, timeout: float) -> List[int]:
+        """等待脚本进程和组内进程退出，返回超时后仍存活的PID"""
+        deadline = time.monotonic() + timeout
+        if process is not None:
+            try:
+                process.wait(timeout=max(0.0, timeout))
+            except subprocess.TimeoutExpired:
+                pass
+            except Exception:
+                pass
+        while True:
+            alive = self.survivors()
+            if not alive or time.monotonic() >= deadline:
+                return alive
+            time.sleep(0.02)
+
+    def terminate(
+        self,
+        process=None,
+        grace: float = DEFAULT_TERMINATE_GRACE,
+        kill_timeout: float = DEFAULT_KILL_TIMEOUT
+    ) -> List[int]:
+        """按阶梯终止整组进程
+
+        Args:
+            process: 脚本的 Popen（或 ZygoteProcess）对象，用于回收退出码
+            grace: SIGTERM 后等待的秒数
+            kill_timeout: SIGKILL 后等待的秒数
+
+        Returns:
+            终止后仍存活的PID（正常应为空）
+        """
+        self.track()
+        if not self.survivors():
+            return []
+
+        # 第1级：温和终止（POSIX 先 SIGTERM 再 SIGCONT，确保暂停的进程也能收到）
+        if _IS_POSIX:
+            self._signal(signal.SIGTERM)
+            self._resume()
+        else:
+            self._resume()
+            for known in list(self._known.values()):
+                try:
+                    known.terminate()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+        alive = self._wait(process, grace)
+        if not alive:
+            return []
+
+        # 第2级：强制终止
+        if self.logger:
+            self.logger.warning(
+                f"Process group {self.pgid or self.pid} still alive after {grace}s, killing: {alive}"
+            )
+        self._signal(signal.SIGKILL if _IS_POSIX else signal.SIGTERM)
+        if not _IS_POSIX:
+            for known in list(self._known.values()):
+                try:
+                    known.kill()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+        alive = self._wait(process, kill_timeout)
+
+        # 第3级：Windows 下按进程树强制结束
+        if alive and sys.platform == 'win32':
+            try:
+                subprocess.run(
+                    ['taskkill', '/F', '/T', '/PID', str(self.pid)],
+                    capture_output=True, timeout=kill_timeout
+                )
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"taskkill failed: {e}")
+            alive = self.survivors()
+
+        if alive and self.logger:
+            self.logger.error(f"Processes survived termination of group {self.pgid or self.pid}: {alive}")
+        return alive
+
+
+def terminate_processes(
+    processes: List[psutil.Process],
+    grace: float = DEFAULT_TERMINATE_GRACE,
+    kill_timeout: float = DEFAULT_KILL_TIMEOUT
+) -> List[int]:
+    """按阶梯终止一组不属于本进程的进程（如上次会话遗留的脚本）
+
+    Args:
+        processes: psutil 进程对象列表
+        grace: terminate 后等待的秒数
+        kill_timeout: kill 后等待的秒数
+
+    Returns:
+        终止后仍存活的PID
+    """
+    for process in processes:
+        try:
+            process.terminate()
+            if _IS_POSIX:
+                process.resume()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    _, alive = psutil.wait_procs(processes, timeout=grace)
+    for process in alive:
+        try:
+            process.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    _, alive = psutil.wait_procs(alive, timeout=kill_timeout)
+    return sorted(process.pid for process in alive)
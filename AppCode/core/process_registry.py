@@ -0,0 +1,296 @@
+"""脚本进程登记（孤儿进程回收和台架占用恢复）
+
+执行引擎把正在运行的脚本进程（PID、创建时间、进程组ID、已知后代）写入状态文件，
+脚本结束后移除。程序异常退出时记录会留下，下次启动时：
+
+- 记录所属的会话（程序进程的 PID + 创建时间）已不存在，则其中仍存活的脚本进程
+  （按 PID 和创建时间核对，避免误杀复用了 PID 的进程）及其进程组成员视为孤儿进程，
+  可以一并终止，释放 CAN 卡和电源等台架设备；
+- 其他仍在运行的会话表示另一个程序实例正在使用台架，不会回收它的进程。
+
+状态文件以临时文件 + 替换的方式写入，异常退出时不会留下半个文件。
+"""
+
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+import psutil
+
+from AppCode.core.process_group import (
+    terminate_processes, DEFAULT_TERMINATE_GRACE, DEFAULT_KILL_TIMEOUT
+)
+
+# 核对进程创建时间的允许误差（秒）
+_CREATE_TIME_TOLERANCE = 0.05
+
+
+def _process_identity(pid: int) -> Optional[Tuple[int, float]]:
+    """进程的 (PID, 创建时间)，进程不存在时返回None"""
+    try:
+        return pid, psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+def _find_process(pid: int, create_time: float) -> Optional[psutil.Process]:
+    """按 PID 和创建时间查找仍存活的进程（PID 被复用时返回None）"""
+    try:
+        process = psutil.Process(pid)
+        if abs(process.create_time() - create_time) > _CREATE_TIME_TOLERANCE:
+            return None
+        if process.status() == psutil.STATUS_ZOMBIE:
+            return None
+        return process
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+class ProcessRegistry:
+    """脚本进程登记"""
+
+    def __init__(self, state_path: str, logger=None):
+        """初始化进程登记
+
+        Args:
+            state_path: 状态文件路径
+            logger: 日志记录器
+        """
+        self.state_path = state_path
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._session = _process_identity(os.getpid())
+
+    def _load(self) -> Dict[str, Any]:
+        """读取状态文件（不存在或损坏时返回空状态）"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state, dict):
+                state.setdefault('sessions', [])
+                state.setdefault('processes', {})
+                return state
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"Ignoring unreadable process state file {self.state_path}: {e}")
+        return {'sessions': [], 'processes': {}}
+
+    def _save(self, state: Dict[str, Any]):
+        """原子写入状态文件"""
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='.running_', suffix='.json', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.state_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _update(self, modify):
+        """读取-修改-写回状态文件（失败只记录日志，不影响脚本执行）"""
+        with self._lock:
+            try:
+                state = self._load()
+                modify(state)
+                self._save(state)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Failed to update process state file: {e}")
+
+    @staticmethod
+    def _session_alive(session) -> bool:
+        return bool(session) and _find_process(session[0], session[1]) is not None
+
+    def claim(self):
+        """登记本会话（占用台架），同时清除已结束会话的登记"""
+        def modify(state):
+            state['sessions'] = [
+                item for item in state['sessions']
+                if tuple(item.get('id') or ()) != self._session
+                and self._session_alive(tuple(item.get('id') or ()))
+            ]
+            state['sessions'].append({'id': list(self._session), 'started': datetime.now().isoformat()})
+
+        if self._session:
+            self._update(modify)
+
+    def release(self):
+        """注销本会话（正常退出时调用）"""
+        def modify(state):
+            state['sessions'] = [
+                s for s in state['sessions'] if tuple(s.get('id') or ()) != self._session
+            ]
+
+        self._update(modify)
+
+    def other_sessions(self) -> List[Dict[str, Any]]:
+        """仍在运行的其他程序实例（正在使用台架）
+
+        Returns:
+            [{'pid': 进程ID, 'started': 会话开始时间}]
+        """
+        with self._lock:
+            state = self._load()
+        sessions = []
+        for item in state['sessions']:
+            session = tuple(item.get('id') or ())
+            if session and session != self._session and self._session_alive(session):
+                sessions.append({'pid': session[0], 'started': item.get('started')})
+        return sessions
+
+    def register(self, execution_id: str, pid: int, script_path: Optional[str] = None,
+                 pgid: Optional[int] = None):
+        """登记启动的脚本进程
+
+        Args:
+            execution_id: 执行ID
+            pid: 脚本进程PID
+            script_path: 脚本路径
+            pgid: 脚本独立进程组ID（POSIX）
+        """
+        identity = _process_identity(pid)
+        if identity is None:
+            return
+
+        def modify(state):
+            state['processes'][execution_id] = {
+                'pid': pid,
+                'create_time': identity[1],
+                'pgid': pgid,
+                'script_path': script_path,
+                'session': list(self._session) if self._session else None,
+                'started': datetime.now().isoformat(),
+                'descendants': [],
+            }
+
+        self._update(modify)
+
+    def update_descendants(self, execution_id: str, members: List[Tuple[int, float]]):
+        """更新脚本的已知后代进程（没有进程组信号的平台据此回收）
+
+        Args:
+            execution_id: 执行ID
+            members: [(PID, 创建时间)]
+        """
+        def modify(state):
+            record = state['processes'].get(execution_id)
+            if record is not None:
+                record['descendants'] = [list(m) for m in members if m[0] != record['pid']]
+
+        self._update(modify)
+
+    def unregister(self, execution_id: str):
+        """脚本及其后代已结束，移除登记
+
+        Args:
+            execution_id: 执行ID
+        """
+        def modify(state):
+            state['processes'].pop(execution_id, None)
+
+        self._update(modify)
+
+    def _orphan_processes(self, state: Dict[str, Any]) -> Dict[str, List[psutil.Process]]:
+        """已结束会话遗留的存活进程 {执行ID: [进程]}"""
+        orphans = {}
+        for execution_id, record in state['processes'].items():
+            session = tuple(record.get('session') or ())
+            if session == self._session or self._session_alive(session):
+                continue
+            found = {}
+            for pid, create_time in [(record['pid'], record['create_time'])] + \
+                    [tuple(d) for d in record.get('descendants') or []]:
+                process = _find_process(pid, create_time)
+                if process is not None:
+                    found[pid] = process
+            # 进程组中还有登记过的进程时，组内后启动的进程也属于该脚本
+            pgid = record.get('pgid')
+            if pgid and os.name == 'posix' and (found or self._group_has_original(pgid, record)):
+                for process in psutil.process_iter():
+                    try:
+                        if os.getpgid(process.pid) == pgid and process.status() != psutil.STATUS_ZOMBIE:
+                            found.setdefault(process.pid, process)
+                    except (ProcessLookupError, PermissionError, psutil.NoSuchProcess, psutil.AccessDenied):
+                        pass
+            orphans[execution_id] = list(found.values())
+        return orphans
+
+    @staticmethod
+    def _group_has_original(pgid: int, record: Dict[str, Any]) -> bool:
+        """进程组是否仍为登记时的那个（组长PID在组存在期间不会被复用）"""
+        if pgid != record.get('pid'):
+            return False
+        try:
+            os.killpg(pgid, 0)
+        except (ProcessLookupError, PermissionError):
+            return False
+        # 组长已退出但组仍存在：组长 PID 不会分配给新进程，组内进程必然来自该脚本
+        return _process_identity(pgid) is None
+
+    def find_orphans(self) -> List[Dict[str, Any]]:
+        """查找上次异常退出遗留的脚本进程
+
+        Returns:
+            [{'execution_id', 'script_path', 'pid', 'name'}]
+        """
+        with self._lock:
+            state = self._load()
+        orphans = []
+        for execution_id, processes in self._orphan_processes(state).items():
+            record = state['processes'][execution_id]
+            for process in processes:
+                try:
+                    name = process.name()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    name = ''
+                orphans.append({
+                    'execution_id': execution_id,
+                    'script_path': record.get('script_path'),
+                    'pid': process.pid,
+                    'name': name,
+                })
+        return orphans
+
+    def reap_orphans(
+        self,
+        grace: float = DEFAULT_TERMINATE_GRACE,
+        kill_timeout: float = DEFAULT_KILL_TIMEOUT
+    ) -> Dict[str, Any]:
+        """终止上次异常退出遗留的脚本进程，并移除已清理的登记
+
+        Args:
+            grace: terminate 后等待的秒数
+            kill_timeout: kill 后等待的秒数
+
+        Returns:
+            {'terminated': [PID], 'survivors': [PID]}
+        """
+        with self._lock:
+            state = self._load()
+            orphans = self._orphan_processes(state)
+            processes = [p for items in orphans.values() for p in items]
+            survivors = terminate_processes(processes, grace, kill_timeout) if processes else []
+            for execution_id, items in orphans.items():
+                if not any(p.pid in survivors for p in items):
+                    state['processes'].pop(execution_id, None)
+            try:
+                self._save(state)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Failed to update process state file: {e}")
+
+        terminated = sorted(p.pid for p in processes if p.pid not in survivors)
+        if self.logger and processes:
+            self.logger.warning(
+                f"Reaped orphan script processes from a previous session: {terminated}"
+                + (f", survivors: {survivors}" if survivors else '')
+            )
+        return {'terminated': terminated, 'survivors': survivors}
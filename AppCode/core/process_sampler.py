@@ -0,0 +1,259 @@
+"""脚本进程树资源采样
+
+执行期间由后台线程按固定间隔采样脚本进程及其全部后代（汇总值）：
+
+- ``cpu``：CPU 使用率（%，多核可超过100）；
+- ``rss``：常驻内存（字节）；
+- ``read`` / ``write``：累计读写字节数（仅统计仍存活的进程，平台不支持时为0）；
+- ``threads``：线程数；
+- ``handles``：打开的文件描述符（POSIX）或句柄（Windows）数；
+- ``procs``：进程数。
+
+每列保存在 ``array.array`` 中，执行结束后打包为压缩的二进制列（base64），
+一次执行只保存一条附加数据，而不是每个采样一行。采样数达到上限后隔一个丢一个，
+并把采样间隔加倍，长时间运行的脚本占用的内存和存储保持有界。
+"""
+
+import base64
+import sys
+import threading
+import time
+import zlib
+from array import array
+from typing import Dict, Any, Optional, Callable, List
+
+import psutil
+
+# 默认采样间隔（秒）和每次执行最多保留的采样数
+DEFAULT_SAMPLE_INTERVAL = 0.5
+DEFAULT_MAX_SAMPLES = 7200
+
+# 列名和 array 类型码（t 为相对执行开始的秒数）
+COLUMNS = (
+    ('t', 'd'),
+    ('cpu', 'f'),
+    ('rss', 'Q'),
+    ('read', 'Q'),
+    ('write', 'Q'),
+    ('threads', 'I'),
+    ('handles', 'I'),
+    ('procs', 'I'),
+)
+
+
+def _open_handles(process: psutil.Process) -> int:
+    if hasattr(process, 'num_fds'):
+        return process.num_fds()
+    return process.num_handles()
+
+
+class ProcessTreeSampler:
+    """脚本进程树采样器"""
+
+    def __init__(
+        self,
+        pid: int,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        logger=None,
+        on_sample: Optional[Callable[[Dict[str, Any]], None]] = None,
+        push_interval: float = 1.0,
+        max_samples: int = DEFAULT_MAX_SAMPLES
+    ):
+        """初始化采样器
+
+        Args:
+            pid: 脚本进程PID
+            interval: 采样间隔（秒）
+            logger: 日志记录器
+            on_sample: 最新采样的推送回调（在采样线程中调用）
+            push_interval: 推送最小间隔（秒）
+            max_samples: 保留的最大采样数
+        """
+        self.pid = pid
+        self.interval = interval
+        self.logger = logger
+        self.on_sample = on_sample
+        self.push_interval = push_interval
+        self.max_samples = max(2, max_samples)
+        self._columns = {name: array(code) for name, code in COLUMNS}
+        self._processes: Dict[int, psutil.Process] = {}
+        self._stride = 1
+        self._ticks = 0
+        self._last_push = 0.0
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._result = None
+
+    def start(self):
+        """开始采样"""
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"sampler-{self.pid}")
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Any]:
+        """停止采样（可重复调用）
+
+        Returns:
+            打包后的采样数据（见 pack_samples）
+        """
+        if self._result is None:
+            self._stop.set()
+            if self._thread:
+                self._thread.join(timeout=max(2.0, self.interval * 2))
+            self._result = pack_samples(self._columns, self.interval * self._stride)
+        return self._result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._ticks += 1
+            if self._ticks % self._stride:
+                continue
+            try:
+                sample = self.sample()
+            except Exception as e:
+                if self.logger:
+                    self.logger.debug(f"Resource sampling failed for {self.pid}: {e}")
+                continue
+            if sample is None:
+                continue
+            self._append(sample)
+            if self.on_sample and sample['t'] - self._last_push >= self.push_interval:
+                self._last_push = sample['t']
+                try:
+                    self.on_sample(sample)
+                except Exception as e:
+                    if self.logger:
+                        self.logger.debug(f"Resource sample listener error: {e}")
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """采样一次进程树，脚本进程已退出时返回None"""
+        root = self._processes.get(self.pid)
+        try:
+            if root is None:
+                root = self._processes[self.pid] = psutil.Process(self.pid)
+            tree = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return None
+
+        totals = {'cpu': 0.0, 'rss': 0, 'read': 0, 'write': 0, 'threads': 0, 'handles': 0, 'procs': 0}
+        alive = set()
+        for process in tree:
+            # 复用 Process 对象，cpu_percent 才能按两次采样之间计算
+            process = self._processes.setdefault(process.pid, process)
+            try:
+                with process.oneshot():
+                    totals['cpu'] += process.cpu_percent(None)
+                    totals['rss'] += process.memory_info().rss
+                    totals['threads'] += process.num_threads()
+                    try:
+                        io = process.io_counters()
+                        totals['read'] += io.read_bytes
+                        totals['write'] += io.write_bytes
+                    except (psutil.AccessDenied, AttributeError, NotImplementedError):
+                        pass
+                    try:
+                        totals['handles'] += _open_handles(process)
+                    except (psutil.AccessDenied, AttributeError):
+                        pass
+                totals['procs'] += 1
+                alive.add(process.pid)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                pass
+        for pid in list(self._processes):
+            if pid not in alive:
+                del self._processes[pid]
+
+        totals['t'] = round(time.time() - self._started, 3)
+        totals['cpu'] = round(totals['cpu'], 1)
+        totals['pid'] = self.pid
+        return totals
+
+    def _append(self, sample: Dict[str, Any]):
+        if len(self._columns['t']) >= self.max_samples:
+            # 降采样：隔一个保留一个，之后的采样间隔加倍
+            for name, column in self._columns.items():
+                self._columns[name] = column[::2]
+            self._stride *= 2
+        for name, _ in COLUMNS:
+            self._columns[name].append(sample[name])
+
+
+def pack_samples(columns: Dict[str, array], interval: float) -> Dict[str, Any]:
+    """把采样列打包为可 JSON 序列化的紧凑格式
+
+    Args:
+        columns: {列名: array}
+        interval: 采样间隔（秒）
+
+    Returns:
+        {'interval', 'count', 'byteorder', 'types', 'data': {列名: base64(zlib(字节))}, 'summary'}
+    """
+    return {
+        'interval': interval,
+        'count': len(columns['t']),
+        'byteorder': sys.byteorder,
+        'types': {name: code for name, code in COLUMNS},
+        'data': {
+            name: base64.b64encode(zlib.compress(columns[name].tobytes())).decode('ascii')
+            for name, _ in COLUMNS
+        },
+        'summary': summarize(columns),
+    }
+
+
+def unpack_samples(packed: Dict[str, Any]) -> Dict[str, List[float]]:
+    """还原采样列
+
+    Args:
+        packed: pack_samples 的结果
+
+    Returns:
+        {列名: 数值列表}
+    """
+    columns = {}
+    for name, code in packed.get('types', {}).items():
+        values = array(code)
+        values.frombytes(zlib.decompress(base64.b64decode(packed['data'][name])))
+        if packed.get('byteorder', sys.byteorder) != sys.byteorder:
+            values.byteswap()
+        columns[name] = values.tolist()
+    return columns
+
+
+def summarize(columns: Dict[str, array]) -> Dict[str, Any]:
+    """采样摘要：峰值、平均值和内存增长趋势
+
+    Args:
+        columns: {列名: array}
+
+    Returns:
+        摘要字典，没有采样时为空字典
+    """
+    t, rss, cpu = columns['t'], columns['rss'], columns['cpu']
+    count = len(t)
+    if not count:
+        return {}
+    mb = 1024 * 1024
+    summary = {
+        'samples': count,
+        'peak_cpu_percent': round(max(cpu), 1),
+        'avg_cpu_percent': round(sum(cpu) / count, 1),
+        'peak_rss_mb': round(max(rss) / mb, 1),
+        'rss_growth_mb': round((rss[-1] - rss[0]) / mb, 1),
+        'rss_slope_mb_per_min': 0.0,
+        'peak_threads': max(columns['threads']),
+        'peak_handles': max(columns['handles']),
+        'peak_procs': max(columns['procs']),
+        'read_mb': round(max(columns['read']) / mb, 2),
+        'write_mb': round(max(columns['write']) / mb, 2),
+    }
+    # 内存随时间的最小二乘斜率，持续为正说明可能泄漏
+    if count >= 2:
+        mean_t = sum(t) / count
+        mean_rss = sum(rss) / count
+        var = sum((x - mean_t) ** 2 for x in t)
+        if var > 0:
+            cov = sum((x - mean_t) * (y - mean_rss) for x, y in zip(t, rss))
+            summary['rss_slope_mb_per_min'] = round(cov / var * 60 / mb, 2)
+    return summary
@@ -0,0 +1,175 @@
+"""脚本进程资源限制
+
+防止失控脚本（内存泄漏、不断启动辅助进程）拖垮运行界面和执行引擎的主机，
+影响输出读取和对时间敏感的测试（如 ±2 ms 报文周期检查）。可配置项：
+
+- ``memory_mb``：地址空间上限（RLIMIT_AS，仅 Linux），超出时脚本内分配失败（MemoryError）；
+- ``max_processes``：进程数上限（RLIMIT_NPROC，仅 Linux，按用户统计，脚本再 fork 时生效）；
+- ``nice``：调度优先级（POSIX 为 nice 值，Windows 映射为低于正常/空闲优先级类）；
+- ``ionice``：I/O 优先级，``idle`` 或 ``best-effort`` / ``best-effort:0-7``；
+- ``cpu_affinity``：脚本可用的 CPU 核列表；
+- ``isolate_host``：本程序（界面和执行引擎）固定在其余核上，与脚本互不抢占。
+
+限制在脚本进程启动后由父进程通过 psutil（prlimit 等）设置，对全新进程和预热进程
+的子进程同样有效（启动后到设置完成的几毫秒内解释器尚在初始化，不受限制），
+脚本之后启动的子进程继承这些限制。无法设置的项（权限不足、
+平台不支持）记录在返回结果的 errors 中，不影响脚本执行。
+"""
+
+import os
+import sys
+from typing import Dict, Any, Optional, List
+
+import psutil
+
+LIMIT_KEYS = ('memory_mb', 'max_processes', 'nice', 'ionice', 'cpu_affinity', 'isolate_host')
+
+
+def merge_limits(default: Optional[Dict[str, Any]], override: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并全局和测试方案的资源限制（方案中值为 null 的项表示取消全局限制）
+
+    Args:
+        default: 全局资源限制
+        override: 测试方案的资源限制
+
+    Returns:
+        生效的资源限制（只含已设置的项）
+    """
+    merged = dict(default or {})
+    merged.update(override or {})
+    return {key: merged[key] for key in LIMIT_KEYS if merged.get(key) not in (None, '', [])}
+
+
+def _set_rlimit(process: psutil.Process, name: str, value: int):
+    """设置软、硬上限（不超过现有硬上限）"""
+    resource = getattr(psutil, name)
+    _, hard = process.rlimit(resource)
+    if hard != psutil.RLIM_INFINITY and value > hard:
+        value = hard
+    process.rlimit(resource, (value, value))
+    return value
+
+
+def _set_nice(process: psutil.Process, nice: int):
+    if os.name == 'posix':
+        process.nice(nice)
+        return nice
+    # Windows 使用优先级类
+    if nice >= 10:
+        process.nice(psutil.IDLE_PRIORITY_CLASS)
+        return 'idle'
+    if nice > 0:
+        process.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
+        return 'below_normal'
+    return 'normal'
+
+
+def _set_ionice(process: psutil.Process, ionice: str):
+    io_class, _, level = str(ionice).partition(':')
+    if sys.platform.startswith('linux'):
+        if io_class == 'idle':
+            process.ionice(psutil.IOPRIO_CLASS_IDLE)
+        elif io_class == 'best-effort':
+            process.ionice(psutil.IOPRIO_CLASS_BE, int(level or 7))
+        else:
+            raise ValueError(f"unknown ionice class: {ionice}")
+        return ionice
+    if sys.platform == 'win32':
+        process.ionice(psutil.IOPRIO_VERYLOW if io_class == 'idle' else psutil.IOPRIO_LOW)
+        return io_class
+    raise NotImplementedError('ionice is not supported on this platform')
+
+
+def _available_cores(cores: List[int]) -> List[int]:
+    count = psutil.cpu_count() or 1
+    return sorted({int(core) for core in cores if 0 <= int(core) < count})
+
+
+def apply_limits(pid: int, limits: Dict[str, Any], logger=None) -> Dict[str, Any]:
+    """对脚本进程设置资源限制
+
+    Args:
+        pid: 脚本进程PID
+        limits: 资源限制（见模块说明）
+        logger: 日志记录器
+
+    Returns:
+        {'applied': 实际生效的值, 'errors': 无法设置的项及原因}
+    """
+    applied, errors = {}, {}
+    try:
+        process = psutil.Process(pid)
+    except psutil.NoSuchProcess as e:
+        return {'applied': applied, 'errors': {'process': str(e)}}
+
+    def attempt(key, setter):
+        if limits.get(key) in (None, '', []):
+            return
+        try:
+            applied[key] = setter()
+        except (psutil.Error, OSError, ValueError, AttributeError, NotImplementedError) as e:
+            errors[key] = str(e) or type(e).__name__
+
+    def need_rlimit(name):
+        if not hasattr(psutil, name) or not hasattr(process, 'rlimit'):
+            raise NotImplementedError(f'{name} is not supported on this platform')
+
+    def memory():
+        need_rlimit('RLIMIT_AS')
+        return _set_rlimit(process, 'RLIMIT_AS', int(limits['memory_mb']) * 1024 * 1024) // (1024 * 1024)
+
+    def nproc():
+        need_rlimit('RLIMIT_NPROC')
+        return _set_rlimit(process, 'RLIMIT_NPROC', int(limits['max_processes']))
+
+    def affinity():
+        cores = _available_cores(limits['cpu_affinity'])
+        if not cores:
+            raise ValueError(f"no such cores: {limits['cpu_affinity']}")
+        process.cpu_affinity(cores)
+        return cores
+
+    attempt('memory_mb', memory)
+    attempt('max_processes', nproc)
+    attempt('nice', lambda: _set_nice(process, int(limits['nice'])))
+    attempt('ionice', lambda: _set_ionice(process, limits['ionice']))
+    attempt('cpu_affinity', affinity)
+
+    if errors and logger:
+        logger.warning(f"Resource limits not fully applied to {pid}: {errors}")
+    return {'applied': applied, 'errors': errors}
+
+
+class HostAffinity:
+    """本程序的 CPU 亲和性（脚本独占核时让出这些核，之后恢复）"""
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self._original = None
+
+    def isolate(self, script_cores: Optional[List[int]]) -> Optional[List[int]]:
+        """把本进程固定到脚本未使用的核上，script_cores 为空时恢复
+
+        Args:
+            script_cores: 脚本独占的核
+
+        Returns:
+            本进程当前可用的核（平台不支持时返回None）
+        """
+        if not script_cores and self._original is None:
+            return None
+        try:
+            process = psutil.Process()
+            if self._original is None:
+                self._original = process.cpu_affinity()
+            target = self._original
+            if script_cores:
+                rest = [core for core in self._original if core not in set(_available_cores(script_cores))]
+                target = rest or self._original
+            if process.cpu_affinity() != target:
+                process.cpu_affinity(target)
+            return target
+        except (psutil.Error, OSError, AttributeError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"Failed to set host CPU affinity: {e}")
+            return None
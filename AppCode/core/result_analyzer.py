@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 
 from AppCode.interfaces.i_result_analyzer import IResultAnalyzer
+from AppCode.data_access.time_columns import record_duration
 from AppCode.utils.constants import ExecutionStatus
 
 
@@ -55,11 +56,7 @@ class ResultAnalyzer(IResultAnalyzer):
         }
         
         # 计算执行时长
-        if execution.get('start_time') and execution.get('end_time'):
-            start = datetime.fromisoformat(execution['start_time'])
-            end = datetime.fromisoformat(execution['end_time'])
-            duration = (end - start).total_seconds()
-            analysis['duration'] = duration
+        analysis['duration'] = record_duration(execution)
         
         # 分析输出
         output = execution.get('output', '')
@@ -129,10 +126,8 @@ class ResultAnalyzer(IResultAnalyzer):
                 analysis['cancelled'] += 1
             
             # 计算时长
-            if execution.get('start_time') and execution.get('end_time'):
-                start = datetime.fromisoformat(execution['start_time'])
-                end = datetime.fromisoformat(execution['end_time'])
-                duration = (end - start).total_seconds()
+            duration = record_duration(execution)
+            if duration is not None:
                 durations.append(duration)
                 analysis['total_duration'] += duration
             
@@ -140,7 +135,7 @@ class ResultAnalyzer(IResultAnalyzer):
             analysis['scripts'].append({
                 'script_path': execution.get('script_path'),
                 'status': status,
-                'duration': durations[-1] if durations else None
+                'duration': duration
             })
         
         # 计算平均时长
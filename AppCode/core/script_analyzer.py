@@ -0,0 +1,378 @@
+"""脚本静态分析器
+
+基于 AST 分析测试脚本，提取：
+
+- 静态等待预算：``Sleep(ms)`` 与 ``time.sleep(s)`` 的总时长（毫秒），
+  常量次数的 ``for ... in range(N)`` 循环会按次数累计，脚本内定义的函数按调用处展开；
+- 使用的设备：以中文设备实例开头的调用（如 ``低压辅源.SCPI.Write``、``高压源载一体机.Set.Volt``）；
+- 读写的信号：``STLA_CAN.DBC.GetSignal/SetSignal/FindValueOfSignal`` 中的信号名。
+
+分析结果按文件内容哈希缓存，文件不变时不会重新解析；批量分析使用多进程并行。
+"""
+
+import ast
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+
+# 分析结果格式版本，规则变化时递增以淘汰旧缓存
+ANALYSIS_VERSION = 1
+
+# 读取信号的调用及信号名参数位置
+_SIGNAL_READ_CALLS = {'GetSignal': 2, 'FindValueOfSignal': 1}
+# 写入信号的调用及信号名参数位置
+_SIGNAL_WRITE_CALLS = {'SetSignal': 2}
+
+# 少于该数量的待分析脚本直接在当前进程分析，避免进程池启动开销
+_PARALLEL_THRESHOLD = 32
+
+
+def _attribute_chain(node: ast.AST) -> List[str]:
+    """将 a.b.c 形式的调用目标展开为 ['a', 'b', 'c']，无法展开时返回空列表"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return list(reversed(parts))
+    return []
+
+
+def _constant_number(node: ast.AST) -> Optional[float]:
+    """获取数值常量（支持负号），非常量返回None"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+            and not isinstance(node.value, bool):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _constant_number(node.operand)
+        return -value if value is not None else None
+    return None
+
+
+def _constant_string(node: ast.AST) -> Optional[str]:
+    """获取字符串常量，非常量返回None"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _range_count(node: ast.AST) -> Optional[int]:
+    """计算 range(常量...) 的迭代次数，非常量返回None"""
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id == 'range' and node.args and not node.keywords):
+        return None
+    values = [_constant_number(arg) for arg in node.args]
+    if any(v is None for v in values):
+        return None
+    return len(range(*(int(v) for v in values)))
+
+
+def _is_device_name(name: str) -> bool:
+    """设备实例名以中文命名（如 低压辅源、电阻控制板）"""
+    return any(ord(ch) > 0x7F for ch in name)
+
+
+class _BudgetVisitor:
+    """统计语句块的等待预算、设备和信号"""
+
+    def __init__(self, functions: Dict[str, ast.FunctionDef]):
+        self.functions = functions
+        self._function_budget: Dict[str, float] = {}
+        self._in_progress = set()
+        self.sleep_calls = 0
+        self.dynamic_sleeps = 0
+        self.unbounded_sleeps = 0
+        self.devices: Dict[str, int] = {}
+        self.signals_read = set()
+        self.signals_written = set()
+
+    def block_budget(self, statements, unbounded: bool = False) -> float:
+        """计算语句块的等待时长（毫秒）"""
+        return sum(self._node_budget(stmt, unbounded) for stmt in statements)
+
+    def _node_budget(self, node: ast.AST, unbounded: bool) -> float:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            # 定义本身不执行，函数在调用处展开
+            return 0.0
+
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            count = _range_count(node.iter)
+            budget = self._node_budget(node.iter, unbounded)
+            loop_unbounded = unbounded or count is None
+            body = self.block_budget(node.body, loop_unbounded)
+            budget += body * (count if count is not None else 1)
+            return budget + self.block_budget(node.orelse, unbounded)
+
+        if isinstance(node, ast.While):
+            # while 循环次数未知，按一次计入并单独标记
+            budget = self._node_budget(node.test, True)
+            budget += self.block_budget(node.body, True)
+            return budget + self.block_budget(node.orelse, unbounded)
+
+        if isinstance(node, ast.If):
+            # 分支取较长的一支，作为静态上限
+            budget = self._node_budget(node.test, unbounded)
+            return budget + max(self.block_budget(node.body, unbounded),
+                                self.block_budget(node.orelse, unbounded))
+
+        if isinstance(node, ast.Try):
+            # 异常处理分支与 else 分支互斥，取较长者
+            alternatives = [self.block_budget(h.body, unbounded) for h in node.handlers]
+            alternatives.append(self.block_budget(node.orelse, unbounded))
+            return (self.block_budget(node.body, unbounded) + max(alternatives)
+                    + self.block_budget(node.finalbody, unbounded))
+
+        budget = 0.0
+        if isinstance(node, ast.Call):
+            budget += self._call_budget(node, unbounded)
+        for child in ast.iter_child_nodes(node):
+            budget += self._node_budget(child, unbounded)
+        return budget
+
+    def _call_budget(self, node: ast.Call, unbounded: bool) -> float:
+        chain = _attribute_chain(node.func)
+        if not chain:
+            return 0.0
+
+        # 等待
+        if chain in (['Sleep'], ['time', 'sleep']):
+            self.sleep_calls += 1
+            if unbounded:
+                self.unbounded_sleeps += 1
+            value = _constant_number(node.args[0]) if node.args else None
+            if value is None:
+                self.dynamic_sleeps += 1
+                return 0.0
+            return value if chain == ['Sleep'] else value * 1000.0
+
+        # 设备
+        if len(chain) > 1 and _is_device_name(chain[0]):
+            self.devices[chain[0]] = self.devices.get(chain[0], 0) + 1
+
+        # 信号
+        method = chain[-1]
+        if method in _SIGNAL_READ_CALLS or method in _SIGNAL_WRITE_CALLS:
+            position = _SIGNAL_READ_CALLS.get(method, _SIGNAL_WRITE_CALLS.get(method))
+            if len(node.args) > position:
+                signal = _constant_string(node.args[position])
+                if signal:
+                    target = self.signals_read if method in _SIGNAL_READ_CALLS else self.signals_written
+                    target.add(signal)
+
+        # 脚本内定义的函数：按调用处展开（递归调用只计一次）
+        if len(chain) == 1 and chain[0] in self.functions:
+            return self._expand_function(chain[0], unbounded)
+        return 0.0
+
+    def _expand_function(self, name: str, unbounded: bool) -> float:
+        if name in self._in_progress:
+            return 0.0
+        if name in self._function_budget:
+            return self._function_budget[name]
+        self._in_progress.add(name)
+        try:
+            budget = self.block_budget(self.functions[name].body, unbounded)
+        finally:
+            self._in_progress.discard(name)
+        self._function_budget[name] = budget
+        return budget
+
+
+def analyze_source(source: str, script_path: str = '') -> Dict[str, Any]:
+    """分析脚本源码
+
+    Args:
+        source: 脚本源码
+        script_path: 脚本路径（仅用于错误信息）
+
+    Returns:
+        分析结果字典
+    """
+    result = {
+        'version': ANALYSIS_VERSION,
+        'sleep_ms': 0.0,
+        'sleep_calls': 0,
+        'dynamic_sleeps': 0,
+        'unbounded_sleeps': 0,
+        'devices': {},
+        'signals_read': [],
+        'signals_written': [],
+        'error': None,
+    }
+    try:
+        tree = ast.parse(source, filename=script_path or '<script>')
+    except (SyntaxError, ValueError) as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    functions = {
+        node.name: node for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+    visitor = _BudgetVisitor(functions)
+    result['sleep_ms'] = visitor.block_budget(tree.body)
+    result['sleep_calls'] = visitor.sleep_calls
+    result['dynamic_sleeps'] = visitor.dynamic_sleeps
+    result['unbounded_sleeps'] = visitor.unbounded_sleeps
+    result['devices'] = dict(sorted(visitor.devices.items()))
+    result['signals_read'] = sorted(visitor.signals_read)
+    result['signals_written'] = sorted(visitor.signals_written)
+    return result
+
+
+def _read_script(script_path: str):
+    """读取脚本内容，返回 (源码, 内容哈希)"""
+    with open(script_path, 'rb') as f:
+        data = f.read()
+    return data.decode('utf-8', errors='replace'), hashlib.sha1(data).hexdigest()
+
+
+def _analyze_worker(script_path: str) -> Dict[str, Any]:
+    """进程池工作函数"""
+    source, digest = _read_script(script_path)
+    result = analyze_source(source, script_path)
+    result['hash'] = digest
+    return result
+
+
+class ScriptAnalyzer:
+    """脚本静态分析器"""
+
+    def __init__(self, cache_file: Optional[str] = None, logger=None, max_workers: Optional[int] = None):
+        """初始化分析器
+
+        Args:
+            cache_file: 分析结果缓存文件（JSON，按文件内容哈希索引），None表示只使用内存缓存
+            logger: 日志记录器
+            max_workers: 并行分析的最大进程数（None表示CPU核数）
+        """
+        self.cache_file = cache_file
+        self.logger = logger
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load_cache()
+
+    def analyze(self, script_path: str) -> Dict[str, Any]:
+        """分析单个脚本
+
+        Args:
+            script_path: 脚本路径
+
+        Returns:
+            分析结果（附带 path 和 hash）
+        """
+        return self.analyze_many([script_path])[script_path]
+
+    def analyze_many(self, script_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量分析脚本（未命中缓存的脚本并行分析）
+
+        Args:
+            script_paths: 脚本路径列表
+
+        Returns:
+            {脚本路径: 分析结果}
+        """
+        results = {}
+        pending = []
+        for path in dict.fromkeys(script_paths):
+            try:
+                with open(path, 'rb') as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+            except OSError as e:
+                results[path] = self._error_result(path, f"OSError: {e}")
+                continue
+            with self._lock:
+                cached = self._cache.get(digest)
+            if cached is not None:
+                results[path] = dict(cached, path=path, hash=digest)
+            else:
+                pending.append(path)
+
+        for path, result in self._run(pending).items():
+            digest = result.get('hash')
+            if digest and not (result.get('error') or '').startswith('OSError'):
+                with self._lock:
+                    self._cache[digest] = {k: v for k, v in result.items() if k not in ('path', 'hash')}
+                    self._dirty = True
+            results[path] = dict(result, path=path)
+
+        if pending:
+            if self.logger:
+                self.logger.info(f"Analyzed {len(pending)} scripts ({len(results) - len(pending)} cached)")
+            self.save_cache()
+        return results
+
+    def save_cache(self):
+        """保存缓存到文件"""
+        if not self.cache_file or not self._dirty:
+            return
+        with self._lock:
+            data = {'version': ANALYSIS_VERSION, 'entries': self._cache}
+            self._dirty = False
+        try:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.cache_file + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"Failed to save script analysis cache: {e}")
+
+    def clear_cache(self):
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()
+            self._dirty = True
+        self.save_cache()
+
+    def _run(self, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """执行分析（数量较多时使用进程池）"""
+        if not paths:
+            return {}
+
+        if len(paths) >= _PARALLEL_THRESHOLD and self.max_workers != 1:
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    return dict(zip(paths, executor.map(_analyze_worker, paths, chunksize=16)))
+            except Exception as e:
+                # 进程池不可用时（如受限环境）退回单进程
+                if self.logger:
+                    self.logger.warning(f"Parallel script analysis unavailable, falling back: {e}")
+
+        results = {}
+        for path in paths:
+            try:
+                results[path] = _analyze_worker(path)
+            except OSError as e:
+                results[path] = self._error_result(path, f"OSError: {e}")
+        return results
+
+    def _load_cache(self):
+        """从文件加载缓存"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == ANALYSIS_VERSION:
+                self._cache = data.get('entries', {})
+        except (OSError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"Failed to load script analysis cache: {e}")
+
+    @staticmethod
+    def _error_result(path: str, error: str) -> Dict[str, Any]:
+        """构造错误结果"""
+        result = analyze_source('', path)
+        result.update({'path': path, 'hash': None, 'error': error})
+        return result
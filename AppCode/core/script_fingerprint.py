@@ -0,0 +1,305 @@
+"""脚本输入指纹
+
+为增量执行计算每个脚本的输入指纹：
+
+- 脚本文件内容哈希；
+- 脚本导入的辅助模块（CommonFunction/UtilityClass 等）源文件哈希，按导入关系递归，
+  统计能在脚本目录和辅助模块搜索路径中找到的文件（包括没有 __init__.py 的命名空间包）；
+- 标准库不计入。找不到的模块和安装在环境中的第三方包无法确认是否变化，
+  指纹中记录为 unresolved/installed，并且与任何历史指纹都不相同（脚本总会重新执行）；
+- 用户声明的 ECU 软件版本；
+- 可选的 DBC 文件内容哈希。
+
+任一部分变化时指纹摘要（digest）变化，``diff_fingerprints`` 给出变化的部分。
+文件哈希和导入解析结果按 (mtime, size) 缓存。
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sys
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+
+# 指纹格式版本，计算规则变化时递增（旧指纹视为已变化）
+FINGERPRINT_VERSION = 2
+
+# 参与比较的指纹组成部分
+FINGERPRINT_PARTS = ('script', 'helpers', 'ecu_version', 'dbc')
+
+_STDLIB_MODULES = set(getattr(sys, 'stdlib_module_names', ())) | set(sys.builtin_module_names)
+
+
+def _file_stat_key(path: str) -> Optional[Tuple[int, int]]:
+    """文件的 (mtime_ns, size)，文件不存在时返回None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def diff_fingerprints(current: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> List[str]:
+    """比较两个指纹
+
+    Args:
+        current: 当前指纹
+        previous: 上次执行时的指纹
+
+    Returns:
+        变化的组成部分（script、helpers、ecu_version、dbc），上次指纹缺失或格式版本不同时
+        返回 ['version']；当前指纹含有无法确认的辅助模块时包含 'unresolved'（代替 helpers）
+    """
+    if not previous or previous.get('version') != current.get('version'):
+        return ['version']
+    changes = [part for part in FINGERPRINT_PARTS if current.get(part) != previous.get(part)]
+    if current.get('unresolved') or current.get('installed'):
+        changes = [part for part in changes if part != 'helpers'] + ['unresolved']
+    return changes
+
+
+class ScriptFingerprinter:
+    """脚本输入指纹计算器"""
+
+    def __init__(
+        self,
+        search_paths: Optional[List[str]] = None,
+        ecu_version: str = '',
+        dbc_path: Optional[str] = None,
+        logger=None
+    ):
+        """初始化指纹计算器
+
+        Args:
+            search_paths: 辅助模块搜索路径（None表示使用 PYTHONPATH）
+            ecu_version: ECU 软件版本
+            dbc_path: DBC 文件路径（可选）
+            logger: 日志记录器
+        """
+        self.logger = logger
+        self.search_paths: List[str] = []
+        self.ecu_version = ''
+        self.dbc_path = None
+        self._file_hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._imports: Dict[str, Tuple[Tuple[int, int], List[Tuple[int, str, bool]]]] = {}
+        self._lock = threading.Lock()
+        self.configure(search_paths, ecu_version, dbc_path)
+
+    def configure(
+        self,
+        search_paths: Optional[List[str]] = None,
+        ecu_version: Optional[str] = None,
+        dbc_path: Optional[str] = None
+    ):
+        """更新指纹输入配置（None表示保持不变；search_paths 为 None 时使用 PYTHONPATH）
+
+        Args:
+            search_paths: 辅助模块搜索路径
+            ecu_version: ECU 软件版本
+            dbc_path: DBC 文件路径（空字符串表示不使用）
+        """
+        if search_paths is None:
+            search_paths = [p for p in os.environ.get('PYTHONPATH', '').split(os.pathsep) if p]
+        self.search_paths = [os.path.abspath(p) for p in search_paths]
+        if ecu_version is not None:
+            self.ecu_version = str(ecu_version).strip()
+        if dbc_path is not None:
+            self.dbc_path = dbc_path or None
+
+    def fingerprint(self, script_path: str) -> Dict[str, Any]:
+        """计算脚本的输入指纹
+
+        Args:
+            script_path: 脚本路径
+
+        Returns:
+            指纹字典（version、script、helpers、helper_files、unresolved、installed、
+            ecu_version、dbc、digest）
+        """
+        script_path = os.path.abspath(script_path)
+        roots = [os.path.dirname(script_path)] + self.search_paths
+
+        helper_files: Dict[str, str] = {}
+        unresolved = set()
+        installed = set()
+        pending = [script_path]
+        visited = {script_path}
+        while pending:
+            current = pending.pop()
+            for level, module, optional in self._get_imports(current):
+                files = self._resolve(module, level, current, roots)
+                if files is None:
+                    top = module.split('.')[0]
+                    if optional or level > 0 or not top or top in _STDLIB_MODULES:
+                        continue
+                    if self._is_installed(top):
+                        installed.add(top)
+                    else:
+                        unresolved.add(module)
+                    continue
+                for path in files:
+                    if path not in visited:
+                        visited.add(path)
+                        helper_files[self._display_name(path, roots)] = self._hash_file(path)
+                        pending.append(path)
+
+        helpers_hash = hashlib.sha1()
+        for name in sorted(helper_files):
+            helpers_hash.update(f"{name}:{helper_files[name]}\n".encode('utf-8'))
+        if unresolved or installed:
+            # 无法确认这些模块是否变化：加入随机值，使指纹与任何历史指纹都不相同
+            helpers_hash.update(os.urandom(16))
+
+        result = {
+            'version': FINGERPRINT_VERSION,
+            'script': self._hash_file(script_path),
+            'helpers': helpers_hash.hexdigest(),
+            'helper_files': helper_files,
+            'unresolved': sorted(unresolved),
+            'installed': sorted(installed),
+            'ecu_version': self.ecu_version,
+            'dbc': self._hash_file(self.dbc_path) if self.dbc_path else None,
+        }
+        result['digest'] = hashlib.sha1(json.dumps(
+            [result[part] for part in FINGERPRINT_PARTS]
+        ).encode('utf-8')).hexdigest()
+        return result
+
+    def fingerprint_many(self, script_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量计算指纹
+
+        Args:
+            script_paths: 脚本路径列表
+
+        Returns:
+            {脚本路径: 指纹}，无法读取的脚本不包含在内
+        """
+        results = {}
+        for script_path in script_paths:
+            try:
+                results[script_path] = self.fingerprint(script_path)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"Failed to fingerprint {script_path}: {e}")
+        return results
+
+    def _hash_file(self, path: str) -> Optional[str]:
+        """文件内容哈希（按 mtime 和大小缓存），文件不存在时返回None"""
+        key = _file_stat_key(path)
+        if key is None:
+            return None
+        with self._lock:
+            cached = self._file_hashes.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self._file_hashes[path] = (key, value)
+        return value
+
+    def _get_imports(self, path: str) -> List[Tuple[int, str, bool]]:
+        """解析文件的导入语句
+
+        Returns:
+            [(相对导入层级, 模块名, 是否可选)]，``from 包 import 名称`` 中的名称
+            可能是子模块也可能是变量，作为可选项（找不到时不记为未解析）
+        """
+        key = _file_stat_key(path)
+        if key is None:
+            return []
+        with self._lock:
+            cached = self._imports.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        imports = []
+        try:
+            with open(path, 'rb') as f:
+                tree = ast.parse(f.read().decode('utf-8-sig', errors='replace'))
+        except (SyntaxError, ValueError, OSError):
+            tree = None
+        if tree is not None:
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    imports.extend((0, alias.name, False) for alias in node.names)
+                elif isinstance(node, ast.ImportFrom):
+                    base = node.module or ''
+                    imports.append((node.level, base, False))
+                    # from 包 import 子模块
+                    for alias in node.names:
+                        if alias.name != '*':
+                            imports.append((node.level, f"{base}.{alias.name}" if base else alias.name, True))
+
+        with self._lock:
+            self._imports[path] = (key, imports)
+        return imports
+
+    @staticmethod
+    def _resolve(module: str, level: int, importer: str, roots: List[str]) -> Optional[List[str]]:
+        """将模块名解析为搜索路径中的源文件（含途经的包 __init__.py）
+
+        没有 __init__.py 的目录按命名空间包处理：可以跨多个搜索路径，本身不对应文件。
+
+        Returns:
+            源文件列表（导入的是命名空间包本身时为空列表），找不到时返回None
+        """
+        if level > 0:
+            base = os.path.dirname(importer)
+            for _ in range(level - 1):
+                base = os.path.dirname(base)
+            roots = [base]
+        parts = [p for p in module.split('.') if p]
+
+        if level > 0 and not parts:
+            init_path = os.path.join(roots[0], '__init__.py')
+            return [init_path] if os.path.isfile(init_path) else []
+
+        namespace = False
+        for root in roots:
+            files = []
+            directory = root
+            for index, part in enumerate(parts):
+                candidate = os.path.join(directory, part)
+                init_path = os.path.join(candidate, '__init__.py')
+                last = index == len(parts) - 1
+                if os.path.isfile(init_path):
+                    files.append(init_path)
+                    directory = candidate
+                elif last and os.path.isfile(candidate + '.py'):
+                    files.append(candidate + '.py')
+                elif os.path.isdir(candidate):
+                    # 命名空间包
+                    directory = candidate
+                    if last:
+                        namespace = True
+                        files = None
+                        break
+                else:
+                    files = None
+                    break
+            if files:
+                return files
+        return [] if namespace else None
+
+    @staticmethod
+    def _is_installed(top_level: str) -> bool:
+        """顶层模块是否为当前环境中已安装的第三方包"""
+        import importlib.util
+        try:
+            return importlib.util.find_spec(top_level) is not None
+        except (ImportError, ValueError):
+            return False
+
+    @staticmethod
+    def _display_name(path: str, roots: List[str]) -> str:
+        """辅助模块文件相对于所在搜索路径的名称"""
+        for root in roots:
+            if path.startswith(root + os.sep):
+                return os.path.relpath(path, root).replace(os.sep, '/')
+        return path.replace(os.sep, '/')
@@ -12,7 +12,10 @@ from AppCode.interfaces.i_script_manager import IScriptManager
 from AppCode.utils.validators import PathValidator
 from AppCode.utils.exceptions import ScriptNotFoundError, ValidationError
 from AppCode.utils.constants import ScriptStatus
-from AppCode.infrastructure.cache import LRUCache
+from AppCode.infrastructure.cache import BoundedCache
+
+# 脚本信息缓存的内存预算（字节）
+SCRIPT_CACHE_BYTES = 32 * 1024 * 1024
 
 
 class ScriptManager(IScriptManager):
@@ -27,7 +30,9 @@ class ScriptManager(IScriptManager):
         """
         self.logger = logger
         self.cache_manager = cache_manager
-        self._scripts_cache = LRUCache(capacity=500)
+        self._scripts_cache = BoundedCache('scripts', max_bytes=SCRIPT_CACHE_BYTES)
+        if cache_manager:
+            cache_manager.register_cache('scripts', self._scripts_cache)
     
     def scan_scripts(self, root_path: str) -> List[Dict[str, Any]]:
         """扫描脚本目录
@@ -87,11 +92,11 @@ class ScriptManager(IScriptManager):
         Returns:
             脚本信息字典
         """
-        # 检查缓存
-        cached = self._scripts_cache.get(script_path)
-        if cached is not None:
-            return cached
-        
+        # 检查缓存（并发请求同一脚本时只读取一次）
+        return self._scripts_cache.get_or_load(script_path, lambda: self._load_script_info(script_path))
+    
+    def _load_script_info(self, script_path: str) -> Dict[str, Any]:
+        """读取脚本信息（不经过缓存）"""
         PathValidator.validate_script_path(script_path)
         
         if not os.path.exists(script_path):
@@ -109,9 +114,6 @@ class ScriptManager(IScriptManager):
             'status': ScriptStatus.IDLE
         }
         
-        # 缓存结果
-        self._scripts_cache.put(script_path, script_info)
-        
         return script_info
     
     def validate_script(self, script_path: str) -> bool:
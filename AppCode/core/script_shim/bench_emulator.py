@@ -0,0 +1,475 @@
+"""模拟台架（dry-run）
+
+执行引擎在模拟台架模式下设置 ``AUTOTEST_DRY_RUN`` 并把本目录加入子进程 PYTHONPATH，
+由 sitecustomize 调用 ``install``，脚本无需硬件即可运行：
+
+- 公共辅助包（CommonFunction、CommonFuction、UtilityClass、clr 等）由模拟模块代替，
+  星号导入会导出脚本中用到的所有外部名称；环境中不存在的其他模块也会被模拟；
+- ``STLA_CAN.DBC.GetSignal/SetSignal/FindValueOfSignal/FindMsg`` 按配置的信号值应答，
+  SetSignal 写入的值会被之后的 GetSignal 读到；
+- 设备实例的 ``SCPI.Query``、``Modbus.GetRegister`` 按配置应答，其余设备调用直接返回；
+- ``Log4NetWrapper.WriteToOutput*`` 写到标准输出（执行引擎据此判定结果）；
+- ``Sleep(ms)`` / ``time.sleep`` 只推进虚拟时钟，``time.time/monotonic/perf_counter``
+  返回加上虚拟时间后的值，脚本中的等待和轮询立即完成。
+
+``AUTOTEST_DRY_RUN`` 为 JSON 配置文件路径时读取应答配置（为 ``1`` 时全部使用默认值）::
+
+    {
+        "signals": {"DCDC_STATE_BB": 2, "ACDC_CONVERSION_STATE": [0, 0, 1]},
+        "default_signal": 0,
+        "scpi": {":MEAS:CURR? CH1": "0.52", "低压辅源 :MEAS:VOLT? CH1": "13.5,0.8"},
+        "default_scpi": "0",
+        "modbus": {"1:3072": 220},
+        "default_value": 1.0,
+        "find_count": 200,
+        "packages": ["ActionPower"]
+    }
+
+信号值为列表时每次读取依次返回，读完后保持最后一个值。SCPI 应答按逗号拆分为数值列表。
+其他未模拟的调用（如功率分析仪测量）返回通用模拟对象，参与数值运算时取 ``default_value``。
+本模块在脚本解释器中运行，不能导入 AppCode。
+"""
+
+import ast
+import builtins
+import dis
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import sys
+import threading
+import time
+
+DRY_RUN_ENV = 'AUTOTEST_DRY_RUN'
+
+# 始终使用模拟模块的顶层包（CommonFuction 为部分旧脚本中的拼写）
+EMULATED_PACKAGES = ('CommonFunction', 'CommonFuction', 'UtilityClass', 'clr', 'System', 'ActionPower')
+
+# 返回 (状态, 值) 的查询类设备方法
+_QUERY_METHODS = ('Query', 'Read', 'GetRegister', 'ReadRegister')
+
+
+class VirtualClock:
+    """虚拟时钟：等待只推进偏移量，不阻塞"""
+
+    def __init__(self):
+        self.offset = 0.0
+        self._lock = threading.Lock()
+        self._time = time.time
+        self._monotonic = time.monotonic
+        self._perf_counter = time.perf_counter
+
+    def advance(self, seconds):
+        """推进虚拟时间（秒）"""
+        try:
+            seconds = float(seconds)
+        except (TypeError, ValueError):
+            return
+        if seconds > 0:
+            with self._lock:
+                self.offset += seconds
+
+    def now_ms(self):
+        """当前虚拟时间（毫秒，从进程启动算起）"""
+        return round(self.offset * 1000.0, 3)
+
+    def install(self):
+        """替换 time 模块的等待和计时函数"""
+        time.sleep = self.advance
+        time.time = lambda: self._time() + self.offset
+        time.monotonic = lambda: self._monotonic() + self.offset
+        time.perf_counter = lambda: self._perf_counter() + self.offset
+
+
+class BenchState:
+    """模拟台架状态：信号、SCPI 和 Modbus 应答"""
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.signals = dict(config.get('signals') or {})
+        self.default_signal = config.get('default_signal', 0)
+        self.scpi = dict(config.get('scpi') or {})
+        self.default_scpi = config.get('default_scpi', '0')
+        self.modbus = {str(k): v for k, v in (config.get('modbus') or {}).items()}
+        self.default_value = float(config.get('default_value', 1.0))
+        self.find_count = max(1, int(config.get('find_count', 200)))
+        self.calls = 0
+
+    def get_signal(self, name, default=None):
+        """读取信号值（列表按顺序消费，保留最后一个值）"""
+        value = self.signals.get(name, self.default_signal if default is None else default)
+        if isinstance(value, list):
+            if not value:
+                return self.default_signal
+            if len(value) > 1:
+                self.signals[name] = value[1:]
+            return value[0]
+        return value
+
+    def set_signal(self, name, value):
+        """写入信号值"""
+        self.signals[name] = value
+
+    def scpi_response(self, device, command):
+        """SCPI 查询应答（先按"设备 命令"匹配，再按命令匹配），返回数值列表"""
+        response = self.default_scpi
+        for key in (f"{device} {command}", str(command)):
+            if key in self.scpi:
+                response = self.scpi[key]
+                break
+        values = []
+        for item in str(response).split(','):
+            try:
+                values.append(float(item))
+            except ValueError:
+                values.append(item.strip())
+        return values
+
+    def modbus_value(self, kwargs, args):
+        """Modbus 寄存器应答（按"站号:寄存器"匹配）"""
+        station = kwargs.get('iID', args[0] if args else '')
+        register = kwargs.get('Reg', args[1] if len(args) > 1 else '')
+        return self.modbus.get(f"{station}:{register}", 0)
+
+
+def _unpack_count(frame):
+    """调用方正在解包的元素个数（不是解包时返回None）"""
+    if frame is None:
+        return None
+    try:
+        for instruction in dis.get_instructions(frame.f_code):
+            if instruction.offset == frame.f_lasti:
+                if instruction.opname == 'UNPACK_SEQUENCE':
+                    return instruction.arg
+                if instruction.opname in ('GET_ITER', 'FOR_ITER'):
+                    return 0
+                return None
+    except Exception:
+        pass
+    return None
+
+
+class Emulated:
+    """通用模拟对象：属性访问和调用都返回新的模拟对象，数值运算时取 default_value"""
+
+    __slots__ = ('_name',)
+
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return Emulated(f"{self._name}.{attr}")
+
+    def __setattr__(self, attr, value):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        _bench.state.calls += 1
+        return _bench.call(self._name, args, kwargs)
+
+    def __iter__(self):
+        # 解包（如 Test, Value = 设备.Query(...)）时第一个为状态码 0，其余为模拟对象；
+        # 其他情况（如 list(x)[4]）返回 find_count 个元素
+        count = _unpack_count(sys._getframe(1))
+        if count is None:
+            return iter([Emulated(f"{self._name}[{i}]") for i in range(_bench.state.find_count)])
+        return iter(([0] + [Emulated(f"{self._name}[{i}]") for i in range(1, count)])[:count])
+
+    def __getitem__(self, key):
+        return Emulated(f"{self._name}[{key!r}]")
+
+    def __bool__(self):
+        return True
+
+    def __float__(self):
+        return _bench.state.default_value
+
+    def __int__(self):
+        return int(_bench.state.default_value)
+
+    def __index__(self):
+        return int(_bench.state.default_value)
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return id(self)
+
+    def __lt__(self, other):
+        return float(self) < other
+
+    def __le__(self, other):
+        return float(self) <= other
+
+    def __gt__(self, other):
+        return float(self) > other
+
+    def __ge__(self, other):
+        return float(self) >= other
+
+    def __abs__(self):
+        return abs(float(self))
+
+    def __neg__(self):
+        return -float(self)
+
+    def __add__(self, other):
+        if isinstance(other, str):
+            return str(self) + other
+        return float(self) + other
+
+    def __radd__(self, other):
+        if isinstance(other, str):
+            return other + str(self)
+        return other + float(self)
+
+    def __sub__(self, other):
+        return float(self) - other
+
+    def __rsub__(self, other):
+        return other - float(self)
+
+    def __mul__(self, other):
+        return float(self) * other
+
+    def __rmul__(self, other):
+        return other * float(self)
+
+    def __truediv__(self, other):
+        return float(self) / other
+
+    def __rtruediv__(self, other):
+        return other / float(self)
+
+    def __mro_entries__(self, bases):
+        # 脚本继承模拟模块中的类时使用 EmulatedBase 作为基类
+        return (EmulatedBase,)
+
+    def __format__(self, spec):
+        return format(float(self), spec) if spec else str(self)
+
+    def __str__(self):
+        return self._name
+
+    def __repr__(self):
+        return f"<dry-run {self._name}>"
+
+
+class EmulatedBase:
+    """脚本继承模拟类时的基类：接受任意构造参数，未定义的属性返回模拟对象"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return Emulated(f"{type(self).__name__}.{attr}")
+
+
+class Bench:
+    """模拟台架：按调用路径分派到具体的模拟实现"""
+
+    def __init__(self, state, clock):
+        self.state = state
+        self.clock = clock
+
+    def call(self, name, args, kwargs):
+        """模拟调用"""
+        parts = name.split('.')
+        method = parts[-1]
+
+        if parts[0] == 'STLA_CAN':
+            return self._can_call(method, args, kwargs)
+        if parts[0] == 'Log4NetWrapper':
+            if method.startswith('WriteToOutput'):
+                print(*[str(a) for a in args], flush=True)
+            return None
+        if len(parts) >= 3 and parts[-2] == 'SCPI':
+            if method == 'Query':
+                return 0, self.state.scpi_response(parts[0], args[0] if args else kwargs.get('cmd', ''))
+            return 0
+        if len(parts) >= 3 and parts[-2] == 'Modbus':
+            if method in _QUERY_METHODS:
+                return 0, self.state.modbus_value(kwargs, args)
+            return 0
+        return Emulated(f"{name}()")
+
+    def _can_call(self, method, args, kwargs):
+        """STLA_CAN.DBC 调用"""
+        if method == 'GetSignal':
+            name = args[2] if len(args) > 2 else kwargs.get('signal')
+            default = args[3] if len(args) > 3 else None
+            return 0, self.state.get_signal(name, default)
+        if method == 'SetSignal':
+            if len(args) > 3:
+                self.state.set_signal(args[2], args[3])
+            return 0
+        if method == 'FindValueOfSignal':
+            name = args[1] if len(args) > 1 else None
+            target = args[2] if len(args) > 2 else None
+            condition = str(args[3]).rsplit('.', 1)[-1] if len(args) > 3 else 'Equal'
+            value = self.state.get_signal(name)
+            now = self.clock.now_ms()
+            stamps = [now + 100.0 * i for i in range(self.state.find_count)]
+            code = 0 if _compare(value, condition, target) else -1
+            return code, stamps, list(stamps)
+        if method == 'FindMsg':
+            return 0, self.clock.now_ms()
+        if method == 'MsgStatisticsInfo':
+            return 0, 0.0, 0.0, 0.0, 0
+        if method == 'GetMessage':
+            return 0, [0] * 8
+        return 0
+
+
+def _compare(value, condition, target):
+    """按 ConditionEnum 名称比较信号值"""
+    try:
+        if condition == 'Equal':
+            return value == target
+        if condition == 'Unequal':
+            return value != target
+        if condition == 'Morethan':
+            return value > target
+        if condition == 'Lessthan':
+            return value < target
+    except TypeError:
+        return False
+    return True
+
+
+def Sleep(ms):
+    """毫秒等待（只推进虚拟时钟）"""
+    _bench.clock.advance(float(ms) / 1000.0)
+
+
+def start_capture_prints():
+    """开始记录输出（模拟台架下输出直接写到标准输出）"""
+
+
+def stop_capture_prints():
+    """结束记录输出"""
+    return ''
+
+
+def get_message_for_signal(signal):
+    """信号所在报文名"""
+    return f"MSG_{signal}"
+
+
+def get_messages_for_signals(signals):
+    """信号列表对应的报文名列表"""
+    return [get_message_for_signal(s) for s in signals]
+
+
+def replace_zeros(values):
+    """光标位置（原样返回）"""
+    return list(values)
+
+
+# 模拟模块中具体实现的名称，其余名称均为通用模拟对象
+_EXPORTS = {
+    'Sleep': Sleep,
+    'start_capture_prints': start_capture_prints,
+    'stop_capture_prints': stop_capture_prints,
+    'get_message_for_signal': get_message_for_signal,
+    'get_messages_for_signals': get_messages_for_signals,
+    'replace_zeros': replace_zeros,
+}
+
+_bench = Bench(BenchState(), VirtualClock())
+
+
+def _script_free_names():
+    """主脚本中使用但未定义的名称（来自星号导入）"""
+    path = sys.argv[0] if sys.argv else ''
+    try:
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read().decode('utf-8-sig', errors='replace'))
+    except (OSError, SyntaxError, ValueError):
+        return set()
+
+    defined, used = set(dir(builtins)), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            (used if isinstance(node.ctx, ast.Load) else defined).add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defined.add(node.name)
+        elif isinstance(node, ast.arg):
+            defined.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name != '*':
+                    defined.add((alias.asname or alias.name).split('.')[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            defined.add(node.name)
+    return used - defined
+
+
+class EmulatorLoader(importlib.abc.Loader):
+    """创建模拟模块"""
+
+    _free_names = None
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        if EmulatorLoader._free_names is None:
+            EmulatorLoader._free_names = _script_free_names()
+        module.__path__ = []
+        names = {}
+        for name in EmulatorLoader._free_names:
+            names[name] = _EXPORTS.get(name) or Emulated(name)
+        names.update(_EXPORTS)
+        names['STLA_CAN'] = Emulated('STLA_CAN')
+        names['Log4NetWrapper'] = Emulated('Log4NetWrapper')
+        module.__dict__.update(names)
+        module.__all__ = sorted(names)
+        module.__getattr__ = lambda attr: _EXPORTS.get(attr) or Emulated(attr)
+
+
+class EmulatorFinder(importlib.abc.MetaPathFinder):
+    """为公共辅助包（放在最前）或环境中不存在的模块（放在最后）提供模拟模块"""
+
+    def __init__(self, packages=None):
+        self.packages = set(packages) if packages is not None else None
+
+    def find_spec(self, fullname, path=None, target=None):
+        if self.packages is not None and fullname.split('.')[0] not in self.packages:
+            return None
+        if fullname in ('sitecustomize', 'usercustomize'):
+            return None
+        if self.packages is None:
+            sys.stderr.write(f"[dry-run] emulating missing module {fullname}\n")
+        return importlib.machinery.ModuleSpec(fullname, EmulatorLoader(), is_package=True)
+
+
+def install(config_path=None):
+    """安装模拟台架
+
+    Args:
+        config_path: 应答配置文件路径（None表示全部使用默认值）
+
+    Returns:
+        Bench 对象
+    """
+    config = {}
+    if config_path and os.path.isfile(config_path):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+    _bench.state = BenchState(config)
+    _bench.clock.install()
+    packages = set(EMULATED_PACKAGES) | set(config.get('packages') or [])
+    for name in list(sys.modules):
+        if name.split('.')[0] in packages:
+            del sys.modules[name]
+    sys.meta_path.insert(0, EmulatorFinder(packages))
+    sys.meta_path.append(EmulatorFinder())
+    return _bench
@@ -0,0 +1,63 @@
+"""脚本挂起诊断：按需输出所有线程的调用栈
+
+执行引擎设置 ``AUTOTEST_HANG_DUMP``（堆栈输出文件路径）时，由 sitecustomize.py
+（全新进程）或 zygote_server.py（预热进程的子进程）调用 ``install``：
+
+- 启用 faulthandler，脚本崩溃（如 .NET 互操作中的段错误）时堆栈写到标准错误；
+- POSIX：收到 ``SIGUSR1`` 时把所有线程的调用栈追加到输出文件。信号由 C 层处理，
+  主线程卡在设备 DLL 调用中也能输出；
+- Windows（没有 SIGUSR1）：后台线程轮询 ``<输出文件>.request``，出现时删除并输出调用栈。
+
+输出后脚本继续运行，是否终止由执行引擎决定。
+本模块在脚本进程中运行，不能导入 AppCode。
+"""
+
+import faulthandler
+import os
+import signal
+import sys
+import threading
+import time
+
+HANG_DUMP_ENV = 'AUTOTEST_HANG_DUMP'
+# Windows 下请求输出调用栈的触发文件后缀
+REQUEST_SUFFIX = '.request'
+POLL_INTERVAL = 0.5
+
+_dump_file = None
+
+
+def _watch_requests(dump_path):
+    """轮询触发文件（没有 SIGUSR1 的平台）"""
+    request_path = dump_path + REQUEST_SUFFIX
+    while True:
+        time.sleep(POLL_INTERVAL)
+        if not os.path.exists(request_path):
+            continue
+        try:
+            os.remove(request_path)
+        except OSError:
+            pass
+        try:
+            faulthandler.dump_traceback(file=_dump_file, all_threads=True)
+            _dump_file.flush()
+        except Exception:
+            pass
+
+
+def install(dump_path):
+    """启用崩溃堆栈和按需调用栈输出
+
+    Args:
+        dump_path: 调用栈输出文件路径
+    """
+    global _dump_file
+    faulthandler.enable(file=sys.stderr, all_threads=True)
+    # faulthandler 保存的是文件描述符，文件对象须在进程生命周期内保持打开
+    _dump_file = open(dump_path, 'a', encoding='utf-8')
+    if hasattr(signal, 'SIGUSR1'):
+        faulthandler.register(signal.SIGUSR1, file=_dump_file, all_threads=True)
+    else:
+        threading.Thread(
+            target=_watch_requests, args=(dump_path,), daemon=True, name='autotest-hang-dump'
+        ).start()
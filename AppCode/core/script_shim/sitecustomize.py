@@ -0,0 +1,298 @@
+"""脚本子进程启动垫片
+
+执行引擎在剖析模式下把本目录加入子进程的 PYTHONPATH，Python 启动时会自动导入
+本模块（sitecustomize）。设置了 ``AUTOTEST_PROFILE_OUTPUT`` 时安装计时：
+
+- ``Sleep`` / ``time.sleep`` 计入 sleep；
+- 中文命名的设备实例（如 ``低压辅源.SCPI.Write``、``电阻控制板.Modbus.SetRegister``）的调用计入 device；
+- ``STLA_CAN`` 下的调用（``DBC.GetSignal/SetSignal`` 等）计入 can；
+- ``CommonFunction`` / ``UtilityClass`` 模块的导入计入 import。
+
+只统计主线程，嵌套调用只计最外层（如 Sleep 内部的 time.sleep 不会重复计入）。
+汇总结果定期和退出时以 JSON 写入 ``AUTOTEST_PROFILE_OUTPUT`` 指定的文件，
+不占用脚本的标准输出。
+
+设置了 ``AUTOTEST_DRY_RUN`` 时先安装模拟台架（见 bench_emulator.py），
+设置了 ``AUTOTEST_HANG_DUMP`` 时启用挂起诊断（见 hang_dump.py）。
+本模块在脚本进程中运行，不能导入 AppCode。
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILE_OUTPUT_ENV = 'AUTOTEST_PROFILE_OUTPUT'
+PROFILE_INTERVAL_ENV = 'AUTOTEST_PROFILE_INTERVAL'
+# 模拟台架模式（见 bench_emulator.py）
+DRY_RUN_ENV = 'AUTOTEST_DRY_RUN'
+# 挂起诊断的调用栈输出文件（见 hang_dump.py）
+HANG_DUMP_ENV = 'AUTOTEST_HANG_DUMP'
+
+# 需要计时导入并插桩的顶层包（CommonFuction 为部分旧脚本中的拼写）
+TRACKED_PACKAGES = ('CommonFunction', 'CommonFuction', 'UtilityClass')
+SLEEP_NAMES = ('Sleep',)
+CAN_ROOTS = ('STLA_CAN',)
+CATEGORIES = ('sleep', 'device', 'can', 'import')
+
+# 不需要代理的属性值类型
+_PLAIN_TYPES = (int, float, complex, str, bytes, bool, list, tuple, dict, set, frozenset, type(None))
+
+
+class Profiler:
+    """调用计时汇总"""
+
+    def __init__(self, output_path, flush_interval=10.0):
+        self.output_path = output_path
+        self.flush_interval = flush_interval
+        self.started = time.perf_counter()
+        self.stats = {}  # (category, name) -> [count, total, max]
+        self._main_ident = threading.get_ident()
+        self._active = False
+        self._lock = threading.Lock()
+
+    def call(self, category, name, func, *args, **kwargs):
+        """计时调用（只统计主线程的最外层调用）"""
+        if self._active or threading.get_ident() != self._main_ident:
+            return func(*args, **kwargs)
+        self._active = True
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._active = False
+            with self._lock:
+                entry = self.stats.get((category, name))
+                if entry is None:
+                    self.stats[(category, name)] = [1, elapsed, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    if elapsed > entry[2]:
+                        entry[2] = elapsed
+
+    def timed(self, category, name, func):
+        """返回计时包装函数"""
+        def wrapper(*args, **kwargs):
+            return self.call(category, name, func, *args, **kwargs)
+
+        try:
+            functools.update_wrapper(wrapper, func)
+        except Exception:
+            wrapper.__wrapped__ = func
+        wrapper._autotest_profiled = True
+        return wrapper
+
+    def instrument_namespace(self, namespace):
+        """替换命名空间中的 Sleep、设备实例和 CAN 对象"""
+        for name, value in list(namespace.items()):
+            if name.startswith('_') or getattr(value, '_autotest_profiled', False):
+                continue
+            if name in SLEEP_NAMES and callable(value):
+                namespace[name] = self.timed('sleep', name, value)
+            elif name in CAN_ROOTS and not isinstance(value, _PLAIN_TYPES):
+                namespace[name] = InstrumentedObject(value, name, 'can', self)
+            elif _is_device(name, value):
+                namespace[name] = InstrumentedObject(value, name, 'device', self)
+
+    def summary(self, complete):
+        """生成汇总结果"""
+        wall = time.perf_counter() - self.started
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self.stats.items()]
+
+        categories = dict.fromkeys(CATEGORIES, 0.0)
+        calls = []
+        for (category, name), (count, total, maximum) in items:
+            categories[category] = categories.get(category, 0.0) + total * 1000.0
+            calls.append({
+                'category': category,
+                'name': name,
+                'count': count,
+                'total_ms': round(total * 1000.0, 3),
+                'max_ms': round(maximum * 1000.0, 3),
+            })
+        calls.sort(key=lambda item: item['total_ms'], reverse=True)
+
+        breakdown = {f'{category}_ms': round(value, 3) for category, value in categories.items()}
+        breakdown['python_ms'] = round(max(0.0, wall * 1000.0 - sum(categories.values())), 3)
+        return {
+            'version': 1,
+            'complete': complete,
+            'pid': os.getpid(),
+            'wall_ms': round(wall * 1000.0, 3),
+            'breakdown': breakdown,
+            'calls': calls,
+        }
+
+    def dump(self, complete=False):
+        """写出汇总结果（先写临时文件再替换，避免读到半个文件）"""
+        try:
+            tmp_path = self.output_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.summary(complete), f, ensure_ascii=False)
+            os.replace(tmp_path, self.output_path)
+        except Exception:
+            pass
+
+    def start_flusher(self):
+        """定期写出，进程被强制结束时仍保留最近的数据"""
+        if self.flush_interval <= 0:
+            return
+
+        def flush_loop():
+            while True:
+                time.sleep(self.flush_interval)
+                self.dump()
+
+        threading.Thread(target=flush_loop, daemon=True, name='autotest-profile-flush').start()
+
+
+class InstrumentedObject:
+    """设备/CAN对象代理：可调用属性计时，对象属性继续代理"""
+
+    __slots__ = ('_target', '_label', '_category', '_profiler')
+
+    def __init__(self, target, label, category, profiler):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_label', label)
+        object.__setattr__(self, '_category', category)
+        object.__setattr__(self, '_profiler', profiler)
+
+    _autotest_profiled = True
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name.startswith('_') or isinstance(value, _PLAIN_TYPES) or isinstance(value, type):
+            return value
+        label = f'{self._label}.{name}'
+        if callable(value):
+            return self._profiler.timed(self._category, label, value)
+        return InstrumentedObject(value, label, self._category, self._profiler)
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __repr__(self):
+        return repr(self._target)
+
+    def __str__(self):
+        return str(self._target)
+
+
+def _is_device(name, value):
+    """设备实例以中文命名，且不是模块、函数、类或普通数据"""
+    if not any(ord(ch) > 0x7F for ch in name):
+        return False
+    if isinstance(value, _PLAIN_TYPES) or isinstance(value, type) or callable(value):
+        return False
+    return type(value).__name__ != 'module'
+
+
+class _TimedLoader:
+    """包装加载器：计时模块执行，执行后插桩模块命名空间"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.call('import', module.__name__, self._loader.exec_module, module)
+        self._profiler.instrument_namespace(module.__dict__)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportTimer:
+    """元路径查找器：为被跟踪包的模块包装加载器"""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname.split('.', 1)[0] not in TRACKED_PACKAGES:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self.profiler)
+        return spec
+
+
+def install(output_path, flush_interval=10.0):
+    """安装计时
+
+    Args:
+        output_path: 汇总结果文件路径
+        flush_interval: 定期写出间隔（秒），0表示只在退出时写出
+
+    Returns:
+        Profiler 对象
+    """
+    profiler = Profiler(output_path, flush_interval)
+    time.sleep = profiler.timed('sleep', 'time.sleep', time.sleep)
+    sys.meta_path.insert(0, ImportTimer(profiler))
+    atexit.register(profiler.dump, True)
+    profiler.start_flusher()
+    return profiler
+
+
+def _chain_next_sitecustomize():
+    """导入 PYTHONPATH 中排在本目录之后的 sitecustomize（如有），保持环境原有行为"""
+    import importlib
+
+    shim_dir = os.path.dirname(os.path.abspath(__file__))
+    this_module = sys.modules.get(__name__)
+    saved_path = list(sys.path)
+    try:
+        sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != shim_dir]
+        del sys.modules[__name__]
+        importlib.import_module('sitecustomize')
+    except ImportError:
+        pass
+    finally:
+        sys.path[:] = saved_path
+        if this_module is not None:
+            sys.modules[__name__] = this_module
+
+
+if __name__ == 'sitecustomize':
+    try:
+        _chain_next_sitecustomize()
+    except Exception as e:
+        sys.stderr.write(f"[autotest] sitecustomize chaining failed: {e}\n")
+    if os.environ.get(HANG_DUMP_ENV):
+        try:
+            import hang_dump
+            hang_dump.install(os.environ[HANG_DUMP_ENV])
+        except Exception as e:
+            sys.stderr.write(f"[autotest] hang diagnostics disabled: {e}\n")
+    if os.environ.get(DRY_RUN_ENV):
+        try:
+            import bench_emulator
+            config_path = os.environ[DRY_RUN_ENV]
+            bench_emulator.install(None if config_path == '1' else config_path)
+        except Exception as e:
+            sys.stderr.write(f"[autotest] dry-run emulator failed: {e}\n")
+    if os.environ.get(PROFILE_OUTPUT_ENV):
+        try:
+            install(
+                os.environ[PROFILE_OUTPUT_ENV],
+                float(os.environ.get(PROFILE_INTERVAL_ENV, '10'))
+            )
+        except Exception as e:  # 垫片失败不能影响脚本执行
+            sys.stderr.write(f"[autotest] profiling disabled: {e}\n")
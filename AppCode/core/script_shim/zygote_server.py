@@ -0,0 +1,305 @@
+"""脚本预热进程（zygote）服务端
+
+由执行引擎以 ``python zygote_server.py <socket_path> [模块 ...]`` 启动（仅 Linux）。
+启动时预先导入公共辅助模块（CommonFunction/UtilityClass 等），然后在 Unix 套接字上
+等待请求，每个请求 fork 一个子进程执行脚本，省去解释器启动和公共模块导入的时间。
+
+请求协议（每个脚本一个连接）：
+
+1. 客户端发送一行 JSON（argv、env、cwd），并通过 SCM_RIGHTS 附带 stdout、stderr 两个管道写端；
+2. 服务端 fork 子进程，等子进程建立独立会话后回复 ``{"pid": 子进程PID}``；
+3. 子进程退出后回复 ``{"exit": 退出码}``（被信号结束时为负的信号值，与 subprocess 一致）并关闭连接。
+
+fork 只在单线程进程中安全：预加载后（如 pythonnet/CLR 会启动线程）仍有其他线程时，
+服务端回复未就绪并退出，由客户端改用普通子进程方式。
+
+子进程尽量与全新进程保持一致：替换环境变量、工作目录、sys.argv 和 sys.path[0]，
+重建标准输入输出，以 ``__main__`` 运行脚本，退出前执行 atexit 并等待非守护线程。
+本模块在脚本解释器中运行，不能导入 AppCode。
+"""
+
+import atexit
+import importlib
+import io
+import json
+import os
+import runpy
+import selectors
+import signal
+import socket
+import sys
+import threading
+import traceback
+
+MAX_FDS = 2
+MAX_REQUEST = 1024 * 1024
+
+
+def _preload(modules):
+    """预先导入公共模块，返回 (成功的模块, 失败信息)"""
+    loaded, failed = [], {}
+    for name in modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except BaseException as e:  # 预加载失败不影响服务，子进程中会重新导入
+            failed[name] = f"{type(e).__name__}: {e}"
+    return loaded, failed
+
+
+def _thread_count():
+    """当前进程的线程数（含原生线程；Linux 下读取 /proc/self/task）"""
+    count = threading.active_count()
+    try:
+        count = max(count, len(os.listdir('/proc/self/task')))
+    except OSError:
+        pass
+    return count
+
+
+def _module_files():
+    """已加载模块的源文件（用于客户端判断预热进程是否过期）"""
+    files = set()
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if path and not path.startswith(sys.prefix) and not path.startswith(sys.base_prefix):
+            files.add(os.path.abspath(path))
+    return sorted(files)
+
+
+def _make_stream(fd, encoding, errors):
+    """在文件描述符上创建无缓冲文本流（等同 PYTHONUNBUFFERED）"""
+    return io.TextIOWrapper(
+        io.FileIO(fd, 'w', closefd=False), encoding=encoding, errors=errors,
+        line_buffering=True, write_through=True
+    )
+
+
+def _run_child(request, stdout_fd, stderr_fd, close_fds, ready_fd):
+    """在子进程中执行脚本（不返回）"""
+    code = 0
+    try:
+        # 与 subprocess 方式一致：脚本在独立会话/进程组中运行，便于引擎整组终止。
+        # 建立会话后才通知服务端回复 PID，引擎拿到 PID 时进程组已经存在
+        try:
+            os.setsid()
+        finally:
+            os.close(ready_fd)
+        for fd in close_fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        os.close(stdout_fd)
+        os.close(stderr_fd)
+
+        env = request.get('env') or {}
+        os.environ.clear()
+        os.environ.update(env)
+        encoding, _, errors = env.get('PYTHONIOENCODING', 'utf-8').partition(':')
+        sys.stdin = io.TextIOWrapper(io.FileIO(0, 'r', closefd=False), encoding=encoding or 'utf-8')
+        sys.stdout = _make_stream(1, encoding or 'utf-8', errors or 'strict')
+        sys.stderr = _make_stream(2, encoding or 'utf-8', errors or 'backslashreplace')
+
+        # 预热进程不会重新执行 sitecustomize，挂起诊断在这里启用（须在替换 sys.path[0] 之前导入）
+        if env.get('AUTOTEST_HANG_DUMP'):
+            try:
+                import hang_dump
+                hang_dump.install(env['AUTOTEST_HANG_DUMP'])
+            except Exception as e:
+                sys.stderr.write(f"[autotest] hang diagnostics disabled: {e}\n")
+
+        if request.get('cwd'):
+            os.chdir(request['cwd'])
+        argv = list(request['argv'])
+        script = os.path.abspath(argv[0])
+        sys.argv = argv
+        sys.path[0] = os.path.dirname(script)
+
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+
+    # 与解释器正常退出一致：等待非守护线程、执行 atexit、刷新输出
+    try:
+        for thread in threading.enumerate():
+            if thread is not threading.main_thread() and not thread.daemon:
+                thread.join()
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except BaseException:
+        pass
+    os._exit(code & 0xFF)
+
+
+class ZygoteServer:
+    """预热进程服务端（单线程事件循环，fork 时没有其他线程）"""
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.selector = selectors.DefaultSelector()
+        self.children = {}  # pid -> 连接
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.listener.bind(socket_path)
+        os.chmod(socket_path, 0o600)
+        self.listener.listen(16)
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ, 'accept')
+
+        # SIGCHLD 通过自管道唤醒事件循环
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        signal.set_wakeup_fd(self.wakeup_w)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ, 'wakeup')
+
+    def serve_forever(self):
+        """事件循环：接受请求、回收子进程；父进程（引擎）退出或连接关闭时结束"""
+        while True:
+            for key, _ in self.selector.select(timeout=1.0):
+                if key.data == 'accept':
+                    self._accept()
+                elif key.data == 'wakeup':
+                    try:
+                        os.read(self.wakeup_r, 512)
+                    except BlockingIOError:
+                        pass
+                elif key.data == 'control':
+                    if not key.fileobj.read(1):
+                        return
+            self._reap()
+
+    def watch_parent(self, stream):
+        """监听标准输入，引擎关闭管道时退出"""
+        self.selector.register(stream, selectors.EVENT_READ, 'control')
+
+    def _accept(self):
+        try:
+            conn, _ = self.listener.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(True)
+        conn.settimeout(10)
+        fds = []
+        try:
+            data, fds, _, _ = socket.recv_fds(conn, MAX_REQUEST, MAX_FDS)
+            while not data.endswith(b'\n'):
+                chunk = conn.recv(MAX_REQUEST)
+                if not chunk:
+                    break
+                data += chunk
+            if len(fds) != 2:
+                raise ValueError('stdout/stderr descriptors required')
+            request = json.loads(data.decode('utf-8'))
+        except Exception as e:
+            for fd in fds:
+                os.close(fd)
+            self._send(conn, {'error': f"{type(e).__name__}: {e}"})
+            conn.close()
+            return
+
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            close_fds = [self.listener.fileno(), self.wakeup_r, self.wakeup_w, ready_r]
+            if hasattr(self.selector, 'fileno'):
+                close_fds.append(self.selector.fileno())
+            close_fds += [c.fileno() for c in self.children.values()]
+            close_fds += [conn.fileno()]
+            _run_child(request, fds[0], fds[1], close_fds, ready_w)
+
+        for fd in fds:
+            os.close(fd)
+        # 子进程 setsid 后关闭写端，这里读到 EOF
+        os.close(ready_w)
+        try:
+            os.read(ready_r, 1)
+        finally:
+            os.close(ready_r)
+        self.children[pid] = conn
+        self._send(conn, {'pid': pid})
+
+    def _reap(self):
+        """回收已退出的子进程并通知客户端"""
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            conn = self.children.pop(pid, None)
+            if conn is None:
+                continue
+            if os.WIFSIGNALED(status):
+                code = -os.WTERMSIG(status)
+            else:
+                code = os.WEXITSTATUS(status)
+            self._send(conn, {'exit': code})
+            conn.close()
+
+    @staticmethod
+    def _send(conn, message):
+        try:
+            conn.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        except OSError:
+            pass
+
+
+def main(argv):
+    socket_path, modules = argv[0], argv[1:]
+    loaded, failed = _preload(modules)
+    threads = _thread_count()
+    if threads != 1:
+        # 多线程进程 fork 后子进程可能死锁（其他线程持有的锁不会被释放）
+        sys.stdout.write(json.dumps({
+            'ready': False, 'pid': os.getpid(), 'threads': threads,
+            'error': f"{threads} threads running after preload", 'files': _module_files()
+        }) + '\n')
+        sys.stdout.flush()
+        return
+
+    server = ZygoteServer(socket_path)
+    server.watch_parent(sys.stdin.buffer)
+
+    # 通知客户端已就绪（stdout 只用于这一行）
+    sys.stdout.write(json.dumps({
+        'ready': True, 'pid': os.getpid(), 'loaded': loaded, 'failed': failed,
+        'files': _module_files()
+    }) + '\n')
+    sys.stdout.flush()
+
+    try:
+        server.serve_forever()
+    finally:
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
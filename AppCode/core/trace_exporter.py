@@ -0,0 +1,147 @@
+"""执行时间线导出
+
+把执行引擎记录的时间线事件转换为 Chrome trace-event 格式（可在 chrome://tracing
+或 Perfetto 中打开），用于查看批次执行的时间花在了哪里：排队、进程启动、脚本运行、
+结果关键词后的空闲等待、进程终止、结果保存以及脚本之间的间隔。
+"""
+
+import json
+import os
+from typing import List, Dict, Any, Optional
+
+
+# 轨道（trace 中的 tid）
+TRACK_SCRIPTS = 1
+TRACK_QUEUE = 2
+
+# 脚本阶段：(阶段名, 开始事件, 候选结束事件)，取第一个存在且不早于开始事件的结束事件
+PHASES = (
+    ('spawn', 'spawn_start', ('spawned',)),
+    ('startup', 'spawned', ('first_output', 'process_exit', 'terminate_start')),
+    ('running', 'first_output', ('result_detected', 'timeout', 'terminate_start', 'process_exit')),
+    ('result_idle_wait', 'result_detected', ('idle_timeout', 'terminate_start', 'process_exit')),
+    ('terminate', 'terminate_start', ('terminate_end',)),
+    ('finalize', ('terminate_end', 'process_exit'), ('persist_start', 'finished')),
+    ('persist', 'persist_start', ('persist_end',)),
+)
+
+# 显示为瞬时事件的时间点
+INSTANT_EVENTS = ('first_output', 'result_detected', 'timeout', 'idle_timeout')
+
+# 脚本结束的候选事件（按优先级）
+_END_EVENTS = ('persist_end', 'finished', 'terminate_end', 'process_exit')
+
+
+def _first(timeline: Dict[str, float], events, not_before: float = None) -> Optional[float]:
+    """返回候选事件中第一个存在（且不早于 not_before）的时间"""
+    if isinstance(events, str):
+        events = (events,)
+    for event in events:
+        value = timeline.get(event)
+        if value is not None and (not_before is None or value >= not_before):
+            return value
+    return None
+
+
+def _latest(timeline: Dict[str, float], events) -> Optional[float]:
+    """返回候选事件中最晚的时间"""
+    values = [timeline[event] for event in events if timeline.get(event) is not None]
+    return max(values) if values else None
+
+
+def build_chrome_trace(
+    executions: List[Dict[str, Any]],
+    name: str = 'batch',
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """构建 Chrome trace-event 数据
+
+    Args:
+        executions: 执行记录列表，每条包含 id、script_path、status、test_result 和
+            timeline（{事件名: Unix时间戳}）
+        name: 进程名（显示为 trace 的顶层分组）
+        metadata: 附加信息（写入 otherData）
+
+    Returns:
+        trace 数据（JSON 对象格式）
+    """
+    items = [e for e in executions if e.get('timeline') and e['timeline'].get('started')]
+    items.sort(key=lambda e: e['timeline']['started'])
+
+    origin = min(
+        (min(e['timeline'].values()) for e in items), default=0.0
+    )
+
+    def us(timestamp: float) -> float:
+        return round((timestamp - origin) * 1e6, 1)
+
+    events = [
+        {'name': 'process_name', 'ph': 'M', 'pid': 1, 'tid': 0, 'args': {'name': name}},
+        {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': TRACK_SCRIPTS, 'args': {'name': 'scripts'}},
+        {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': TRACK_QUEUE, 'args': {'name': 'queue'}},
+    ]
+
+    def span(label, category, start, end, tid=TRACK_SCRIPTS, args=None):
+        if start is None or end is None or end < start:
+            return
+        event = {
+            'name': label, 'cat': category, 'ph': 'X', 'pid': 1, 'tid': tid,
+            'ts': us(start), 'dur': round((end - start) * 1e6, 1)
+        }
+        if args:
+            event['args'] = args
+        events.append(event)
+
+    totals = {}
+    previous_end = None
+    for execution in items:
+        timeline = execution['timeline']
+        script_name = os.path.basename(execution.get('script_path') or execution.get('id', ''))
+        started = timeline['started']
+        ended = _first(timeline, _END_EVENTS, started) or started
+
+        if previous_end is not None:
+            span('gap', 'gap', previous_end, started)
+            totals['gap'] = totals.get('gap', 0.0) + max(0.0, started - previous_end)
+        previous_end = ended
+
+        span(script_name, 'script', started, ended, args={
+            'execution_id': execution.get('id'),
+            'status': execution.get('status'),
+            'test_result': execution.get('test_result'),
+        })
+        span(script_name, 'queue', timeline.get('queued'), started, tid=TRACK_QUEUE)
+
+        for phase, start_events, end_events in PHASES:
+            start = _latest(timeline, start_events) if isinstance(start_events, tuple) \
+                else timeline.get(start_events)
+            end = _first(timeline, end_events, start) if start is not None else None
+            if start is not None and end is not None:
+                span(phase, 'phase', start, end)
+                totals[phase] = totals.get(phase, 0.0) + (end - start)
+
+        for event in INSTANT_EVENTS:
+            if timeline.get(event) is not None:
+                events.append({
+                    'name': event, 'cat': 'event', 'ph': 'i', 's': 't',
+                    'pid': 1, 'tid': TRACK_SCRIPTS, 'ts': us(timeline[event])
+                })
+
+    other = dict(metadata or {})
+    other['scripts'] = len(items)
+    other['phase_totals_s'] = {phase: round(value, 3) for phase, value in totals.items()}
+    return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': other}
+
+
+def write_chrome_trace(trace: Dict[str, Any], file_path: str):
+    """写入 trace 文件
+
+    Args:
+        trace: build_chrome_trace 的返回值
+        file_path: 输出文件路径（.json）
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f, ensure_ascii=False)
@@ -0,0 +1,211 @@
+"""趋势统计引擎
+
+基于 NumPy 对历史测量值做批量统计：均值、标准差、最值、分位数、
+Cp/Cpk 过程能力指数以及滑动窗口统计。
+
+所有信号的数值连续存放在一个数组中，按分组长度用 ``reduceat`` 等向量化
+运算求值，不在 Python 层逐条循环。
+"""
+
+import math
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+
+def _to_float_array(values) -> np.ndarray:
+    """转换为浮点数组（None 转为 NaN）"""
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _clean(value) -> Optional[float]:
+    """将 NaN/inf 转为 None，其余转为 Python float"""
+    if value is None or not math.isfinite(value):
+        return None
+    return float(value)
+
+
+class TrendEngine:
+    """趋势统计引擎"""
+
+    def __init__(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES):
+        """初始化统计引擎
+
+        Args:
+            percentiles: 默认计算的分位数（0-100）
+        """
+        self.percentiles = tuple(percentiles)
+
+    def summarize(
+        self,
+        groups: List[tuple],
+        values: Sequence[float],
+        percentiles: Optional[Sequence[float]] = None,
+        lower_limit: Optional[float] = None,
+        upper_limit: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """按信号分组统计
+
+        Args:
+            groups: (name, count, first_time, last_time, lower_limit, upper_limit) 元组列表
+            values: 按分组顺序连续排列的数值
+            percentiles: 分位数列表（None表示使用默认值）
+            lower_limit: 下限（覆盖测量值自带的下限）
+            upper_limit: 上限（覆盖测量值自带的上限）
+
+        Returns:
+            {信号名: 统计结果} 字典
+        """
+        if not groups:
+            return {}
+        percentiles = self.percentiles if percentiles is None else tuple(percentiles)
+
+        values = np.asarray(values, dtype=float)
+        counts = np.array([group[1] for group in groups], dtype=np.int64)
+        if counts.sum() != len(values):
+            raise ValueError("Group counts do not match number of values")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        means = np.add.reduceat(values, starts) / counts
+        # 组内离差平方和，用于样本标准差
+        deviations = values - np.repeat(means, counts)
+        sq_sums = np.add.reduceat(deviations * deviations, starts)
+        stds = np.sqrt(sq_sums / np.maximum(counts - 1, 1))
+        mins = np.minimum.reduceat(values, starts)
+        maxs = np.maximum.reduceat(values, starts)
+        pct_values = self._group_percentiles(values, starts, counts, percentiles)
+
+        # 上下限：参数优先，否则取测量值自带的限值
+        if lower_limit is None:
+            lsl = _to_float_array([group[4] for group in groups])
+        else:
+            lsl = np.full(len(groups), lower_limit, dtype=float)
+        if upper_limit is None:
+            usl = _to_float_array([group[5] for group in groups])
+        else:
+            usl = np.full(len(groups), upper_limit, dtype=float)
+        cp, cpk = self._capability(means, stds, lsl, usl)
+
+        # 统一转换为 Python 列表后再组装结果，避免逐个访问 NumPy 标量
+        columns = [a.tolist() for a in (means, stds, mins, maxs, lsl, usl, cp, cpk)]
+        pct_columns = [a.tolist() for a in pct_values]
+        pct_keys = [f"p{p:g}" for p in percentiles]
+
+        result = {}
+        for i, group in enumerate(groups):
+            name = group[0]
+            mean, std, vmin, vmax, lower, upper, cp_i, cpk_i = (_clean(c[i]) for c in columns)
+            result[name] = {
+                'name': name,
+                'count': int(counts[i]),
+                'mean': mean,
+                'std': std,
+                'min': vmin,
+                'max': vmax,
+                'percentiles': {
+                    key: _clean(pct_columns[j][i]) for j, key in enumerate(pct_keys)
+                },
+                'lower_limit': lower,
+                'upper_limit': upper,
+                'cp': cp_i,
+                'cpk': cpk_i,
+                'first_time': group[2],
+                'last_time': group[3],
+            }
+        return result
+
+    def rolling(self, values: Sequence[float], window: int) -> Dict[str, List[Optional[float]]]:
+        """计算滑动窗口均值和标准差
+
+        Args:
+            values: 按时间排序的数值序列
+            window: 窗口大小
+
+        Returns:
+            {'mean': [...], 'std': [...]}，前 window-1 个位置为 None
+        """
+        data = np.asarray(values, dtype=float)
+        n = len(data)
+        if window <= 0 or n < window:
+            return {'mean': [None] * n, 'std': [None] * n}
+
+        # 累加和求窗口和，先减去整体均值以降低大数相消误差
+        shifted = data - data.mean()
+        cumsum = np.concatenate(([0.0], np.cumsum(shifted)))
+        cumsq = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+        win_sum = cumsum[window:] - cumsum[:-window]
+        win_sq = cumsq[window:] - cumsq[:-window]
+
+        win_mean = win_sum / window
+        if window > 1:
+            win_var = np.maximum((win_sq - win_sum * win_mean) / (window - 1), 0.0)
+        else:
+            win_var = np.zeros_like(win_mean)
+        win_mean = win_mean + data.mean()
+
+        pad = [None] * (window - 1)
+        return {
+            'mean': pad + [float(v) for v in win_mean],
+            'std': pad + [float(v) for v in np.sqrt(win_var)],
+        }
+
+    def capability(
+        self,
+        values: Sequence[float],
+        lower_limit: Optional[float],
+        upper_limit: Optional[float]
+    ) -> Dict[str, Optional[float]]:
+        """计算单个信号的过程能力指数
+
+        Args:
+            values: 数值序列
+            lower_limit: 下限
+            upper_limit: 上限
+
+        Returns:
+            {'cp': ..., 'cpk': ...}
+        """
+        data = np.asarray(values, dtype=float)
+        if len(data) < 2:
+            return {'cp': None, 'cpk': None}
+        mean = np.array([data.mean()])
+        std = np.array([data.std(ddof=1)])
+        lsl = np.array([np.nan if lower_limit is None else lower_limit], dtype=float)
+        usl = np.array([np.nan if upper_limit is None else upper_limit], dtype=float)
+        cp, cpk = self._capability(mean, std, lsl, usl)
+        return {'cp': _clean(cp[0]), 'cpk': _clean(cpk[0])}
+
+    @staticmethod
+    def _capability(means, stds, lsl, usl):
+        """向量化计算 Cp/Cpk（缺少上下限或标准差为0时为 NaN；单边限值时 Cpk 取单边值）"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sigma = np.where(stds > 0, stds, np.nan)
+            cp = (usl - lsl) / (6 * sigma)
+            cpu = (usl - means) / (3 * sigma)
+            cpl = (means - lsl) / (3 * sigma)
+            cpk = np.fmin(cpu, cpl)
+        return cp, cpk
+
+    @staticmethod
+    def _group_percentiles(values, starts, counts, percentiles) -> List[np.ndarray]:
+        """向量化计算各组分位数（线性插值，与 numpy.percentile 默认方法一致）"""
+        if not percentiles:
+            return []
+        # 各组分段排序（按组循环，组内排序在 C 层完成），排序后各组仍位于原区间
+        sorted_values = np.empty_like(values)
+        for start, count in zip(starts.tolist(), counts.tolist()):
+            sorted_values[start:start + count] = np.sort(values[start:start + count])
+
+        result = []
+        for p in percentiles:
+            position = (counts - 1) * (p / 100.0)
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, counts - 1)
+            fraction = position - low
+            low_values = sorted_values[starts + low]
+            high_values = sorted_values[starts + high]
+            result.append(low_values + (high_values - low_values) * fraction)
+        return result
@@ -0,0 +1,319 @@
+"""脚本预热进程（zygote）客户端
+
+Linux 下可选的脚本启动方式：常驻一个已导入公共辅助模块的 Python 进程
+（见 script_shim/zygote_server.py），每个脚本由它 fork 出子进程执行，
+省去每次的解释器启动和 CommonFunction/UtilityClass 导入时间。
+
+``ZygoteLauncher.spawn`` 返回的 ``ZygoteProcess`` 提供执行引擎用到的
+``subprocess.Popen`` 接口（pid、stdout、stderr、poll、wait、terminate、kill、returncode），
+脚本的标准输出和错误输出通过管道直接连到引擎，与 ``subprocess`` 方式一致。
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+from AppCode.utils.exceptions import ExecutionError
+
+# 服务端脚本（以源文件形式随包发布）
+ZYGOTE_SERVER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'script_shim', 'zygote_server.py'
+)
+
+# 默认预加载的公共模块（脚本中最常见的导入；CommonFuction 为旧脚本中的拼写）
+DEFAULT_PRELOAD = [
+    'CommonFunction.FunctionClass_V2',
+    'UtilityClass.UtilityClass01_DeviceConnectInit',
+    'CommonFunction.Common00_Fuction',
+    'CommonFunction.Common01_InitDevice',
+    'CommonFunction.Common01_CloseDevice',
+    'CommonFunction.Common02_InitCANMessage',
+    'CommonFunction.Common03_CloseCANMessage',
+]
+
+
+def zygote_supported() -> bool:
+    """当前平台是否支持预热进程（需要 fork 和 SCM_RIGHTS 传递文件描述符）"""
+    return sys.platform.startswith('linux') and hasattr(os, 'fork') and hasattr(socket, 'send_fds')
+
+
+class ZygoteProcess:
+    """由预热进程 fork 的脚本进程（兼容 subprocess.Popen 的常用接口）"""
+
+    def __init__(self, conn: socket.socket, pid: int, stdout, stderr):
+        self._conn = conn
+        self._buffer = b''
+        self._lock = threading.Lock()
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = None
+
+    def poll(self) -> Optional[int]:
+        """检查进程是否结束
+
+        Returns:
+            退出码，未结束时返回None
+        """
+        if self.returncode is None:
+            self._read_exit(block=False)
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """等待进程结束
+
+        Args:
+            timeout: 超时秒数，None表示一直等待
+
+        Returns:
+            退出码
+
+        Raises:
+            subprocess.TimeoutExpired: 超时
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.returncode is None:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+            self._read_exit(block=True, timeout=remaining)
+        return self.returncode
+
+    def send_signal(self, sig: int):
+        """向进程发送信号"""
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        """温和终止（SIGTERM）"""
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        """强制终止（SIGKILL）"""
+        self.send_signal(signal.SIGKILL)
+
+    def _read_exit(self, block: bool, timeout: Optional[float] = None):
+        """读取服务端发来的退出码"""
+        with self._lock:
+            if self.returncode is not None:
+                return
+            try:
+                self._conn.settimeout(timeout if block else 0.0)
+                chunk = self._conn.recv(4096)
+            except (BlockingIOError, socket.timeout):
+                return
+            except OSError:
+                chunk = b''
+
+            if not chunk:
+                # 服务端异常退出：子进程已被回收或成为孤儿，按被杀死处理
+                self.returncode = -signal.SIGKILL
+                self._conn.close()
+                return
+
+            self._buffer += chunk
+            while b'\n' in self._buffer:
+                line, self._buffer = self._buffer.split(b'\n', 1)
+                message = json.loads(line.decode('utf-8'))
+                if 'exit' in message:
+                    self.returncode = message['exit']
+                    self._conn.close()
+                    return
+
+
+class ZygoteLauncher:
+    """预热进程管理（按需启动，公共模块源文件变化或进程退出后自动重启）"""
+
+    def __init__(
+        self,
+        python: str = 'python',
+        preload: Optional[List[str]] = None,
+        logger=None,
+        startup_timeout: float = 60.0
+    ):
+        """初始化预热进程管理
+
+        Args:
+            python: Python 解释器（与直接启动脚本时相同）
+            preload: 预加载的模块名列表
+            logger: 日志记录器
+            startup_timeout: 等待预热进程就绪的超时秒数
+        """
+        self.python = python
+        self.preload = list(DEFAULT_PRELOAD if preload is None else preload)
+        self.logger = logger
+        self.startup_timeout = startup_timeout
+        self._server = None
+        self._socket_path = None
+        self._file_mtimes: Dict[str, float] = {}
+        self._env_key = None
+        # 预加载后仍有多个线程（不能安全 fork）的环境，模块未变化前不再启动
+        self._unforkable_key = None
+        self._lock = threading.Lock()
+        self.info: Dict[str, Any] = {}
+
+    def spawn(self, argv: List[str], env: Dict[str, str], cwd: Optional[str] = None) -> ZygoteProcess:
+        """由预热进程启动脚本
+
+        Args:
+            argv: 脚本路径及参数（不含解释器）
+            env: 环境变量
+            cwd: 工作目录（None表示当前目录）
+
+        Returns:
+            ZygoteProcess 对象
+
+        Raises:
+            ExecutionError: 预热进程不可用
+        """
+        with self._lock:
+            self._ensure_server(env)
+            socket_path = self._socket_path
+
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.settimeout(10)
+            conn.connect(socket_path)
+            request = {'argv': list(argv), 'env': dict(env), 'cwd': cwd or os.getcwd()}
+            socket.send_fds(conn, [json.dumps(request).encode('utf-8') + b'\n'], [stdout_w, stderr_w])
+            os.close(stdout_w)
+            os.close(stderr_w)
+            stdout_w = stderr_w = None
+
+            reply = b''
+            while not reply.endswith(b'\n'):
+                chunk = conn.recv(4096)
+                if not chunk:
+                    raise ExecutionError('Zygote closed connection before reporting pid')
+                reply += chunk
+            message = json.loads(reply.decode('utf-8'))
+            if 'pid' not in message:
+                raise ExecutionError(f"Zygote rejected request: {message.get('error')}")
+        except Exception as e:
+            conn.close()
+            for fd in (stdout_r, stderr_r, stdout_w, stderr_w):
+                if fd is not None:
+                    os.close(fd)
+            if isinstance(e, ExecutionError):
+                raise
+            raise ExecutionError(f"Zygote spawn failed: {e}") from e
+
+        return ZygoteProcess(
+            conn, message['pid'], os.fdopen(stdout_r, 'rb'), os.fdopen(stderr_r, 'rb')
+        )
+
+    def stop(self):
+        """停止预热进程"""
+        with self._lock:
+            self._stop_server()
+
+    def _ensure_server(self, env: Dict[str, str]):
+        """确保预热进程可用（未启动、已退出、环境变化或公共模块被修改时重启）"""
+        env_key = (env.get('PYTHONPATH'), env.get('PATH'))
+        if env_key == self._unforkable_key and not self._modules_changed():
+            raise ExecutionError('Script zygote is not single-threaded after preload')
+        if self._server is not None and self._server.poll() is None \
+                and env_key == self._env_key and not self._modules_changed():
+            return
+
+        if self._server is not None and self.logger:
+            self.logger.info("Restarting script zygote")
+        self._stop_server()
+        self._unforkable_key = None
+        try:
+            self._start_server(env)
+        except ExecutionError:
+            if self.info.get('threads', 1) != 1:
+                self._unforkable_key = env_key
+            raise
+        self._env_key = env_key
+
+    def _start_server(self, env: Dict[str, str]):
+        """启动预热进程并等待就绪"""
+        self._socket_path = os.path.join(
+            tempfile.gettempdir(), f"autotest_zygote_{os.getpid()}_{id(self)}.sock"
+        )
+        self._server = subprocess.Popen(
+            [self.python, ZYGOTE_SERVER_SCRIPT, self._socket_path] + self.preload,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env
+        )
+
+        ready = {}
+        result = {}
+
+        def read_ready():
+            try:
+                result['line'] = self._server.stdout.readline()
+            except Exception as e:
+                result['error'] = e
+
+        reader = threading.Thread(target=read_ready, daemon=True)
+        reader.start()
+        reader.join(self.startup_timeout)
+        if result.get('line'):
+            ready = json.loads(result['line'].decode('utf-8'))
+        self.info = ready
+        self._file_mtimes = {}
+        for path in ready.get('files', []):
+            try:
+                self._file_mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                pass
+        if not ready.get('ready'):
+            self._stop_server()
+            if ready.get('threads', 1) != 1:
+                # 预加载的模块启动了线程，fork 出的子进程可能死锁
+                if self.logger:
+                    self.logger.warning(f"Script zygote disabled: {ready.get('error')}, using subprocess")
+                raise ExecutionError(f"Script zygote is not forkable: {ready.get('error')}")
+            raise ExecutionError('Script zygote failed to start')
+
+        if self.logger:
+            self.logger.info(
+                f"Script zygote started (pid={ready['pid']}), preloaded: {ready.get('loaded')}"
+            )
+            for name, error in (ready.get('failed') or {}).items():
+                self.logger.warning(f"Zygote failed to preload {name}: {error}")
+
+    def _stop_server(self):
+        """停止预热进程（关闭其标准输入即退出）"""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.stdin.close()
+            server.wait(timeout=5)
+        except Exception:
+            server.kill()
+        finally:
+            if server.stdout:
+                server.stdout.close()
+        if self._socket_path and os.path.exists(self._socket_path):
+            try:
+                os.unlink(self._socket_path)
+            except OSError:
+                pass
+
+    def _modules_changed(self) -> bool:
+        """预加载模块的源文件是否被修改"""
+        for path, mtime in self._file_mtimes.items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
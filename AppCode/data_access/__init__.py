@@ -4,5 +4,7 @@
 """
 
 from .sqlite_data_access import SQLiteDataAccess
+from .query_cache import QueryCache
+from .history_archive import HistoryArchive
 
-__all__ = ['SQLiteDataAccess']
\ No newline at end of file
+__all__ = ['SQLiteDataAccess', 'QueryCache', 'HistoryArchive']
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""执行历史按月归档
+
+超过保留期（``database.archive.after_days``）的执行历史从主数据库移到按月份划分的归档
+数据库文件（``history_YYYY_MM.db``），主数据库只保留日常界面需要的近期记录：
+
+- 归档按月进行，每月一个事务：在附加了归档文件的连接上把行复制过去再从主库删除。
+  复制使用 INSERT OR REPLACE，中途失败重跑不会产生重复；
+- 归档文件的表结构取自主库，主库后来新增的列在下次归档时补到归档文件中；
+- 按日期范围查询时，只有范围覆盖到已归档月份才附加对应的归档文件（每个连接最多附加
+  ``MAX_ATTACHED`` 个），结果与主库结果合并，同一 ID 以主库为准；
+- 按 ID 或批次查询在主库中找不到时，从 ID 中的时间戳所在月份起查找归档文件
+  （执行和批次ID都以 ``<前缀>_<微秒时间戳>_`` 开头，记录只会归档到该月或之后的月份）。
+  归档的记录只读，更新不会写入归档文件；
+- 按脚本、状态、最近记录和统计类查询由 ExecutionHistoryRepository 通过 ``query`` 在各月份
+  归档上执行同一语句后合并。归档文件只在归档时变化，聚合结果按月份缓存。
+
+只归档 execution_history；批次、测量值、附加数据等其他表仍在主库中（趋势统计需要）。
+"""
+
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .time_columns import to_epoch_ms, batch_epoch_ms
+
+# 默认保留天数（更早的执行历史归档）
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+# 每个连接附加的归档文件数上限（SQLite 默认上限为 10）
+MAX_ATTACHED = 8
+ARCHIVE_TABLE = 'execution_history'
+
+_ARCHIVE_FILE = re.compile(r'^history_(\d{4})_(\d{2})\.db$')
+_EXECUTION_ID = re.compile(r'^exec_(\d{13,})_')
+_CREATE_TABLE = re.compile(r'^CREATE TABLE\s+(?:IF NOT EXISTS\s+)?["`\[]?\w+["`\]]?', re.IGNORECASE)
+_ARCHIVE_INDEXES = (
+    ('start_ms', 'start_ms'),
+    ('script_path', 'script_path'),
+    ('batch_id', 'batch_id'),
+)
+
+
+def month_of(epoch_ms: int) -> str:
+    """毫秒时间戳所在月份（本地时间，格式 YYYY-MM）"""
+    return datetime.fromtimestamp(epoch_ms / 1000).strftime('%Y-%m')
+
+
+def month_bounds(month: str) -> Tuple[int, int]:
+    """月份的毫秒时间戳区间 [月初, 下月初)"""
+    year, mon = int(month[:4]), int(month[5:7])
+    start = datetime(year, mon, 1)
+    end = datetime(year + mon // 12, mon % 12 + 1, 1)
+    return to_epoch_ms(start), to_epoch_ms(end)
+
+
+class HistoryArchive:
+    """执行历史归档"""
+
+    def __init__(
+        self,
+        archive_dir: str,
+        after_days: int = DEFAULT_ARCHIVE_AFTER_DAYS,
+        interval: float = 86400,
+        vacuum: bool = False,
+        logger=None
+    ):
+        """初始化归档
+
+        Args:
+            archive_dir: 归档文件目录
+            after_days: 保留天数，更早的执行历史归档
+            interval: 后台归档间隔（秒）
+            vacuum: 归档后是否压缩主数据库文件（VACUUM 期间阻塞写入）
+            logger: 日志记录器
+        """
+        self.archive_dir = archive_dir
+        self.after_days = after_days
+        self.interval = interval
+        self.vacuum = vacuum
+        self.logger = logger
+        self.db = None
+        self._months = None
+        # (月份, 语句, 参数) -> 查询结果，月份再次归档时清除
+        self._results: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def bind(self, data_access):
+        """绑定主数据库的数据访问对象"""
+        self.db = data_access
+
+    def archive_path(self, month: str) -> str:
+        """月份对应的归档文件路径"""
+        return os.path.join(self.archive_dir, f"history_{month[:4]}_{month[5:7]}.db")
+
+    def months(self) -> List[str]:
+        """已有归档文件的月份（升序）"""
+        with self._lock:
+            if self._months is None:
+                found = set()
+                if os.path.isdir(self.archive_dir):
+                    for name in os.listdir(self.archive_dir):
+                        match = _ARCHIVE_FILE.match(name)
+                        if match:
+                            found.add(f"{match.group(1)}-{match.group(2)}")
+                self._months = found
+            return sorted(self._months)
+
+    def months_in_range(self, start_ms: int, end_ms: int) -> List[str]:
+        """时间范围（两端包含）覆盖到的已归档月份"""
+        first, last = month_of(start_ms), month_of(end_ms)
+        return [month for month in self.months() if first <= month <= last]
+
+    def months_since(self, epoch_ms: Optional[int]) -> List[str]:
+        """时间戳所在月份及之后的已归档月份（时间戳为 None 时返回全部）"""
+        if epoch_ms is None:
+            return self.months()
+        first = month_of(epoch_ms)
+        return [month for month in self.months() if month >= first]
+
+    def query_range(self, start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
+        """查询归档中开始时间在范围内的执行历史
+
+        Args:
+            start_ms: 开始时间下限（毫秒时间戳，包含）
+            end_ms: 开始时间上限（毫秒时间戳，包含）
+
+        Returns:
+            执行记录列表，按月份顺序
+        """
+        return self.query(
+            "SELECT * FROM {table} WHERE start_ms >= ? AND start_ms <= ?", (start_ms, end_ms),
+            months=self.months_in_range(start_ms, end_ms)
+        )
+
+    def find_by_id(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """在归档中查找执行记录
+
+        Args:
+            record_id: 执行ID
+
+        Returns:
+            执行记录，找不到时返回None
+        """
+        match = _EXECUTION_ID.match(record_id) if isinstance(record_id, str) else None
+        months = self.months_since(int(match.group(1)) // 1000 if match else None)
+        rows = self.query("SELECT * FROM {table} WHERE id = ?", (record_id,), months=months,
+                          stop=lambda found: bool(found))
+        return rows[0] if rows else None
+
+    def query_batch(self, batch_id: str) -> List[Dict[str, Any]]:
+        """查询归档中批次的执行记录
+
+        Args:
+            batch_id: 批次ID
+
+        Returns:
+            执行记录列表，按月份顺序
+        """
+        months = self.months_since(batch_epoch_ms(batch_id))
+        return self.query("SELECT * FROM {table} WHERE batch_id = ?", (batch_id,), months=months)
+
+    def query(
+        self,
+        sql: str,
+        params: tuple = (),
+        months: Optional[List[str]] = None,
+        newest_first: bool = False,
+        stop=None,
+        cached: bool = False
+    ) -> List[Dict[str, Any]]:
+        """在各月份的归档文件上分别执行同一查询（每次附加不超过 MAX_ATTACHED 个文件）
+
+        Args:
+            sql: 查询语句，归档表写作 ``{table}``
+            params: 查询参数
+            months: 查询的月份，默认全部已归档月份
+            newest_first: 是否从最近的月份开始查询
+            stop: 每个月份查询后调用 stop(已得到的行)，返回 True 时不再查询更早/更晚的月份
+            cached: 是否按月份缓存结果（适用于聚合等结果较小的查询）
+
+        Returns:
+            各月份结果依次拼接的行列表
+        """
+        months = self.months() if months is None else list(months)
+        if newest_first:
+            months.reverse()
+        rows = []
+        pending = []
+        for month in months:
+            key = (month, sql, tuple(params))
+            hit = self._results.get(key) if cached else None
+            if hit is None:
+                pending.append(month)
+                continue
+            # 缓存命中前先执行之前未命中的月份，保持月份顺序
+            if self._run_months(pending, sql, params, rows, stop, cached):
+                return rows
+            pending = []
+            rows.extend(hit)
+            if stop and stop(rows):
+                return rows
+        self._run_months(pending, sql, params, rows, stop, cached)
+        return rows
+
+    def _run_months(self, months, sql, params, rows, stop, cached) -> bool:
+        """附加归档文件执行查询，结果追加到 rows；stop 满足时返回 True"""
+        for i in range(0, len(months), MAX_ATTACHED):
+            chunk = months[i:i + MAX_ATTACHED]
+            databases = {f"archive_{n}": self.archive_path(month) for n, month in enumerate(chunk)}
+            with self.db.attached(databases) as conn:
+                # 各归档文件的列可能不同，分别查询
+                for alias, month in zip(databases, chunk):
+                    cursor = conn.execute(sql.format(table=f"{alias}.{ARCHIVE_TABLE}"), params)
+                    result = [dict(row) for row in cursor.fetchall()]
+                    if cached:
+                        with self._lock:
+                            self._results[(month, sql, tuple(params))] = result
+                    rows.extend(result)
+                    if stop and stop(rows):
+                        return True
+        return False
+
+    def archive_older_than(self, days: Optional[int] = None) -> Dict[str, int]:
+        """归档开始时间早于指定天数的执行历史
+
+        Args:
+            days: 保留天数，默认 after_days
+
+        Returns:
+            {月份: 归档行数}
+        """
+        days = self.after_days if days is None else days
+        cutoff_ms = to_epoch_ms(datetime.now()) - days * 86400 * 1000
+        return self.archive_before(cutoff_ms)
+
+    def archive_before(self, cutoff_ms: int) -> Dict[str, int]:
+        """归档开始时间早于 cutoff_ms 的执行历史
+
+        Args:
+            cutoff_ms: 截止时间（毫秒时间戳，不包含）
+
+        Returns:
+            {月份: 归档行数}
+        """
+        oldest = self.db.execute_query(
+            f"SELECT MIN(start_ms) AS oldest FROM {ARCHIVE_TABLE} WHERE start_ms < ?", (cutoff_ms,)
+        )[0]['oldest']
+        if oldest is None:
+            return {}
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        moved = {}
+        month = month_of(oldest)
+        try:
+            while True:
+                month_start, month_end = month_bounds(month)
+                if month_start >= cutoff_ms:
+                    break
+                count = self._archive_month(month, month_start, min(month_end, cutoff_ms))
+                if count:
+                    moved[month] = count
+                month = month_of(month_end)
+        finally:
+            if moved and self.db.query_cache:
+                self.db.query_cache.invalidate_table(ARCHIVE_TABLE)
+
+        if moved:
+            if self.logger:
+                self.logger.info(f"Archived {sum(moved.values())} execution records: {moved}")
+            if self.vacuum:
+                with self.db.attached({}) as conn:
+                    conn.execute('VACUUM')
+        return moved
+
+    def _archive_month(self, month: str, start_ms: int, end_ms: int) -> int:
+        """把 [start_ms, end_ms) 内的行移到该月的归档文件"""
+        path = self.archive_path(month)
+        with self.db.attached({'archive': path}) as conn:
+            columns = self._prepare_archive(conn)
+            column_list = ', '.join(columns)
+            where = "start_ms >= ? AND start_ms < ?"
+            cursor = conn.execute(
+                f"INSERT OR REPLACE INTO archive.{ARCHIVE_TABLE} ({column_list}) "
+                f"SELECT {column_list} FROM main.{ARCHIVE_TABLE} WHERE {where}",
+                (start_ms, end_ms)
+            )
+            count = cursor.rowcount
+            conn.execute(f"DELETE FROM main.{ARCHIVE_TABLE} WHERE {where}", (start_ms, end_ms))
+        with self._lock:
+            if self._months is not None:
+                self._months.add(month)
+            for key in [key for key in self._results if key[0] == month]:
+                del self._results[key]
+        return count
+
+    def _prepare_archive(self, conn) -> List[str]:
+        """按主库结构创建或补齐归档表
+
+        Returns:
+            主库表的列名
+        """
+        create_sql = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (ARCHIVE_TABLE,)
+        ).fetchone()[0]
+        conn.execute(_CREATE_TABLE.sub(f'CREATE TABLE IF NOT EXISTS archive.{ARCHIVE_TABLE}', create_sql, count=1))
+
+        main_columns = conn.execute(f"PRAGMA main.table_info({ARCHIVE_TABLE})").fetchall()
+        archive_columns = {row[1] for row in conn.execute(f"PRAGMA archive.table_info({ARCHIVE_TABLE})")}
+        for row in main_columns:
+            if row[1] not in archive_columns:
+                conn.execute(f"ALTER TABLE archive.{ARCHIVE_TABLE} ADD COLUMN {row[1]} {row[2]}")
+        for name, column in _ARCHIVE_INDEXES:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS archive.idx_{ARCHIVE_TABLE}_{name} ON {ARCHIVE_TABLE}({column})"
+            )
+        return [row[1] for row in main_columns]
+
+    def start(self):
+        """启动后台归档线程（立即归档一次，之后按间隔执行）"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='HistoryArchive')
+        self._thread.start()
+
+    def stop(self):
+        """停止后台归档线程"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.archive_older_than()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Failed to archive execution history: {e}")
+            if self._stop.wait(self.interval):
+                break
@@ -0,0 +1,230 @@
+"""仓储查询结果缓存
+
+按规范化的 SQL 和参数缓存查询结果，写入时精确失效：
+
+- 每个缓存项登记依赖的表和范围（scope）。范围为 None 表示依赖整张表，否则是条件元组
+  ``(('eq', 列, 值), ('ge', 列, 下限), ('le', 列, 上限), ...)``；
+- 通过 SQLiteDataAccess 的 insert/update/delete 写入时，只删除条件与写入行（更新前后的行）
+  匹配的缓存项；行中缺少条件列时按匹配处理（宁可多删）；
+- 任意 SQL 写语句（execute_non_query/execute_many）按表整体失效；
+- 每张表有写入代数，加载期间表被写入时结果不放入缓存，避免把旧数据缓存下来。
+
+返回值是缓存行的浅拷贝，调用方修改结果不会影响缓存。
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from AppCode.infrastructure.cache import BoundedCache
+
+# 默认内存预算（字节）
+DEFAULT_QUERY_CACHE_BYTES = 32 * 1024 * 1024
+
+_WHITESPACE = re.compile(r'\s+')
+_WRITE_TABLES = re.compile(
+    r'\b(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+["`\[]?(\w+)',
+    re.IGNORECASE
+)
+
+Scope = Optional[Tuple[Tuple[str, str, Any], ...]]
+
+
+def normalize_sql(sql: str) -> str:
+    """规范化 SQL（合并空白），作为缓存键的一部分"""
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def written_tables(sql: str) -> List[str]:
+    """解析写语句涉及的表名（小写）"""
+    return [name.lower() for name in _WRITE_TABLES.findall(sql)]
+
+
+def conditions_scope(conditions: Optional[Dict[str, Any]]) -> Scope:
+    """把仓储的查询条件字典转换为范围（支持 ``列>=`` / ``列<=`` 键）"""
+    if not conditions:
+        return None
+    scope = []
+    for key, value in conditions.items():
+        if key.endswith('>='):
+            scope.append(('ge', key[:-2], value))
+        elif key.endswith('<='):
+            scope.append(('le', key[:-2], value))
+        else:
+            scope.append(('eq', key, value))
+    return tuple(scope)
+
+
+def _values_equal(a: Any, b: Any) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    # SQLite 按列亲和性转换类型，'5' 和 5 可能指同一行
+    return str(a) == str(b)
+
+
+def _condition_holds(op: str, value: Any, bound: Any) -> bool:
+    if op == 'eq':
+        return _values_equal(value, bound)
+    if value is None or bound is None:
+        return False
+    try:
+        return value >= bound if op == 'ge' else value <= bound
+    except TypeError:
+        return True
+
+
+def scope_matches(scope: Scope, row: Optional[Dict[str, Any]]) -> bool:
+    """写入的行是否可能影响该范围的查询结果
+
+    Args:
+        scope: 缓存项的范围
+        row: 写入的行，None 表示未知（按匹配处理）
+
+    Returns:
+        是否需要失效
+    """
+    if scope is None or row is None:
+        return True
+    for op, column, bound in scope:
+        if column in row and not _condition_holds(op, row[column], bound):
+            return False
+    return True
+
+
+def _copy_result(value: Any) -> Any:
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+class QueryCache:
+    """查询结果缓存，线程安全"""
+
+    def __init__(self, max_bytes: int = DEFAULT_QUERY_CACHE_BYTES, cache_manager=None, logger=None):
+        """初始化查询缓存
+
+        Args:
+            max_bytes: 内存预算（字节）
+            cache_manager: 缓存管理器（注册后在性能面板显示统计）
+            logger: 日志记录器
+        """
+        self.logger = logger
+        self.cache = BoundedCache('queries', max_bytes=max_bytes)
+        if cache_manager:
+            cache_manager.register_cache('queries', self.cache)
+        self._lock = threading.Lock()
+        # {表名: {缓存键: 范围}}
+        self._dependents: Dict[str, Dict[Any, Scope]] = {}
+        self._generations: Dict[str, int] = {}
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(sql: str, params: Sequence[Any] = ()) -> Tuple[str, tuple]:
+        """缓存键：规范化 SQL + 参数"""
+        return normalize_sql(sql), tuple(params or ())
+
+    def get_or_load(
+        self,
+        sql: str,
+        params: Sequence[Any],
+        loader: Callable[[], Any],
+        tables: Iterable[str],
+        scope: Scope = None
+    ) -> Any:
+        """获取缓存结果，未命中时调用 loader 查询并缓存
+
+        Args:
+            sql: 查询语句（缓存键）
+            params: 查询参数（缓存键）
+            loader: 执行查询的函数
+            tables: 结果依赖的表
+            scope: 结果依赖的范围（对每张表相同），None 表示整表
+
+        Returns:
+            查询结果（拷贝）
+        """
+        key = self.make_key(sql, params)
+        tables = tuple(table.lower() for table in tables)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _copy_result(cached)
+
+        with self._lock:
+            generations = [self._generations.get(table, 0) for table in tables]
+        value = loader()
+
+        with self._lock:
+            # 加载期间表被写入过，结果可能已过期，不缓存
+            if generations == [self._generations.get(table, 0) for table in tables]:
+                self.cache.put(key, value)
+                if key in self.cache:
+                    for table in tables:
+                        dependents = self._dependents.setdefault(table, {})
+                        dependents[key] = scope
+                        if len(dependents) > 2 * len(self.cache) + 64:
+                            self._prune(table)
+        return _copy_result(value)
+
+    def has_entries(self, table: str) -> bool:
+        """表是否有缓存的查询结果"""
+        with self._lock:
+            return bool(self._dependents.get(table.lower()))
+
+    def invalidate_rows(self, table: str, rows: Iterable[Optional[Dict[str, Any]]]) -> int:
+        """写入若干行后失效可能受影响的缓存项
+
+        Args:
+            table: 表名
+            rows: 写入的行（更新时包括更新前后的行），None 表示未知行
+
+        Returns:
+            删除的缓存项数
+        """
+        table = table.lower()
+        rows = list(rows)
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            dependents = self._dependents.get(table)
+            if not dependents:
+                return 0
+            stale = [
+                key for key, scope in dependents.items()
+                if any(scope_matches(scope, row) for row in rows)
+            ]
+            for key in stale:
+                del dependents[key]
+                self.cache.remove(key)
+            self._invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_table(self, table: str) -> int:
+        """失效依赖该表的全部缓存项"""
+        return self.invalidate_rows(table, [None])
+
+    def invalidate_sql(self, sql: str) -> int:
+        """按写语句涉及的表整体失效"""
+        return sum(self.invalidate_table(table) for table in written_tables(sql))
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for table in self._dependents:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self._dependents.clear()
+            self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        stats = self.cache.stats()
+        stats['invalidations'] = self._invalidations
+        return stats
+
+    def _prune(self, table: str):
+        # 删除依赖索引中已被淘汰的缓存键
+        dependents = self._dependents[table]
+        for key in [key for key in dependents if key not in self.cache]:
+            del dependents[key]
@@ -0,0 +1,326 @@
+"""SQL 语句剖析器和慢查询日志
+
+按需启用（配置 ``database.profile``）。SQLiteDataAccess 在执行语句前后计时并调用
+``record``，同时给每个连接设置 sqlite3 的 trace 回调，统计实际执行的全部语句
+（包括事务语句和逐行读取的查询）。
+
+- 语句按规范化文本聚合：合并空白，字面量替换为 ``?``，``IN (?, ?, ...)`` 合并为 ``IN (?...)``；
+- 每条语句统计执行次数、总耗时、p50/p99/最大耗时；
+- 超过阈值的语句记录到慢查询日志并输出 EXPLAIN QUERY PLAN（每条语句只分析一次）；
+- 结果保存为 JSON，报告命令据此重新分析查询计划并标出大表的全表扫描::
+
+    python -m AppCode.data_access.sql_profiler [--db data/script_executor.db] [--profile data/sql_profile.json]
+"""
+
+import argparse
+import atexit
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+from AppCode.infrastructure.metrics import Histogram
+
+# 默认慢查询阈值（毫秒）
+DEFAULT_SLOW_QUERY_MS = 100
+# 报告中检查全表扫描的表
+SCAN_WATCH_TABLES = ('execution_history', 'batch_executions')
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])')
+# trace 回调收到的是绑定参数后的语句，None 参数展开为 NULL（IS NULL / NOT NULL 除外）
+_NULL_LITERAL = re.compile(r'(?<!\bIS )(?<!\bNOT )\bNULL\b', re.IGNORECASE)
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(.*)$')
+
+
+def normalize_statement(sql: str) -> str:
+    """规范化语句：字面量替换为 ?，合并空白和 IN 列表"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    sql = _NULL_LITERAL.sub('?', sql)
+    return _IN_LIST.sub('(?...)', sql)
+
+
+def explain(conn: sqlite3.Connection, sql: str, param_count: int) -> List[str]:
+    """获取查询计划（参数以 NULL 代替，不影响索引选择）
+
+    Returns:
+        计划步骤描述列表，语句不支持分析时为空列表
+    """
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')):
+        return []
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', (None,) * param_count).fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan: Sequence[str], tables: Sequence[str] = SCAN_WATCH_TABLES) -> List[str]:
+    """计划中对指定表的全表扫描步骤（``SCAN 表`` 而不是 ``SEARCH 表``）"""
+    scans = []
+    for step in plan:
+        match = _SCAN.match(step)
+        if match and match.group(1) in tables:
+            scans.append(step)
+    return scans
+
+
+class _StatementStats:
+    def __init__(self, sql: str, param_count: int):
+        self.sql = sql
+        self.param_count = param_count
+        self.latency = Histogram()
+        self.plan: Optional[List[str]] = None
+
+
+class SqlProfiler:
+    """SQL 语句剖析器，线程安全"""
+
+    def __init__(
+        self,
+        slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+        logger=None,
+        output_path: Optional[str] = None,
+        max_slow_entries: int = 200
+    ):
+        """初始化剖析器
+
+        Args:
+            slow_query_ms: 慢查询阈值（毫秒）
+            logger: 日志记录器
+            output_path: 结果 JSON 路径，设置后程序退出时自动保存
+            max_slow_entries: 慢查询日志保留条数
+        """
+        self.slow_query_s = slow_query_ms / 1000
+        self.logger = logger
+        self.output_path = output_path
+        self.db_path = None
+        self._stats: Dict[str, _StatementStats] = {}
+        self._executed: Dict[str, int] = {}
+        self._slow = deque(maxlen=max_slow_entries)
+        self._lock = threading.Lock()
+        self._started = time.time()
+        if output_path:
+            atexit.register(self.save)
+
+    def bind(self, db_path: str):
+        """绑定数据库（分析查询计划时使用）"""
+        self.db_path = db_path
+
+    def trace(self, statement: str):
+        """sqlite3 trace 回调：统计实际执行的语句"""
+        key = normalize_statement(statement)
+        with self._lock:
+            self._executed[key] = self._executed.get(key, 0) + 1
+
+    def record(self, sql: str, params: Sequence[Any], elapsed: float):
+        """记录一次语句执行
+
+        Args:
+            sql: 语句（带 ? 占位符）
+            params: 参数
+            elapsed: 耗时（秒）
+        """
+        key = normalize_statement(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _StatementStats(sql, len(params or ()))
+        stats.latency.observe(elapsed)
+        if elapsed < self.slow_query_s:
+            return
+
+        plan = self._plan_for(stats)
+        with self._lock:
+            self._slow.append({
+                'time': time.time(), 'statement': key,
+                'elapsed_ms': round(elapsed * 1000, 2), 'plan': plan,
+            })
+        if self.logger:
+            self.logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms): {key}\n  plan: " + ('; '.join(plan) or '-')
+            )
+
+    def _plan_for(self, stats: _StatementStats) -> List[str]:
+        if stats.plan is None:
+            stats.plan = []
+            if self.db_path:
+                try:
+                    conn = sqlite3.connect(self.db_path)
+                    try:
+                        stats.plan = explain(conn, stats.sql, stats.param_count)
+                    finally:
+                        conn.close()
+                except sqlite3.Error as e:
+                    if self.logger:
+                        self.logger.debug(f"EXPLAIN QUERY PLAN failed: {e}")
+        return stats.plan
+
+    def get_statistics(self) -> List[Dict[str, Any]]:
+        """按总耗时降序的语句统计
+
+        Returns:
+            [{'statement', 'sql', 'params', 'count', 'executed', 'total_ms', 'p50_ms', 'p99_ms', 'max_ms', 'plan'}]
+        """
+        with self._lock:
+            items = list(self._stats.items())
+            executed = dict(self._executed)
+        result = []
+        for key, stats in items:
+            summary = stats.latency.summary()
+            result.append({
+                'statement': key,
+                'sql': _WHITESPACE.sub(' ', stats.sql).strip(),
+                'params': stats.param_count,
+                'count': summary['count'],
+                'executed': executed.get(key, summary['count']),
+                'total_ms': round(summary['sum'] * 1000, 2),
+                'p50_ms': round(summary['p50'] * 1000, 3),
+                'p99_ms': round(summary['p99'] * 1000, 3),
+                'max_ms': round(summary['max'] * 1000, 3),
+                'plan': stats.plan,
+            })
+        # trace 看到但没有计时的语句（逐行读取、事务语句等）
+        known = {key for key, _ in items}
+        for key, count in executed.items():
+            if key not in known:
+                result.append({'statement': key, 'sql': key, 'params': None, 'count': 0, 'executed': count,
+                               'total_ms': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0, 'plan': None})
+        result.sort(key=lambda item: (item['total_ms'], item['executed']), reverse=True)
+        return result
+
+    def get_slow_queries(self) -> List[Dict[str, Any]]:
+        """慢查询日志（时间顺序）"""
+        with self._lock:
+            return list(self._slow)
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
+            self._executed.clear()
+            self._slow.clear()
+            self._started = time.time()
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """保存统计和慢查询日志为 JSON
+
+        Args:
+            path: 输出路径，默认 output_path
+
+        Returns:
+            是否成功
+        """
+        path = path or self.output_path
+        if not path:
+            return False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            data = {
+                'db_path': self.db_path,
+                'started': self._started,
+                'saved': time.time(),
+                'slow_query_ms': self.slow_query_s * 1000,
+                'statements': self.get_statistics(),
+                'slow_queries': self.get_slow_queries(),
+            }
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to save SQL profile: {e}")
+            return False
+
+
+def build_report(profile: Dict[str, Any], db_path: str, tables: Sequence[str] = SCAN_WATCH_TABLES,
+                 top: int = 20) -> Dict[str, Any]:
+    """根据保存的剖析结果生成报告，重新分析各语句的查询计划
+
+    Args:
+        profile: SqlProfiler.save 写出的数据
+        db_path: 数据库路径
+        tables: 检查全表扫描的表
+        top: 列出的语句数
+
+    Returns:
+        {'statements': 按总耗时排序的前 top 条, 'full_scans': [语句及扫描步骤], 'slow_queries': 数量}
+    """
+    statements = profile.get('statements', [])
+    scans = []
+    conn = sqlite3.connect(db_path)
+    try:
+        for item in statements:
+            if item.get('params') is None:
+                continue
+            try:
+                item['plan'] = explain(conn, item['sql'], item['params'])
+            except sqlite3.Error as e:
+                item['plan'] = [f"EXPLAIN failed: {e}"]
+                continue
+            steps = full_scans(item['plan'], tables)
+            if steps:
+                scans.append({
+                    'statement': item['statement'], 'count': item['count'],
+                    'total_ms': item['total_ms'], 'p99_ms': item['p99_ms'], 'scans': steps,
+                })
+    finally:
+        conn.close()
+    scans.sort(key=lambda item: item['total_ms'], reverse=True)
+    return {
+        'statements': statements[:top],
+        'full_scans': scans,
+        'slow_queries': len(profile.get('slow_queries', [])),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """报告的文本格式"""
+    lines = ['== 语句耗时（按总耗时） ==']
+    for item in report['statements']:
+        lines.append(
+            f"{item['total_ms']:>10.1f} ms  n={item['count']:<6} p50={item['p50_ms']:.2f}  "
+            f"p99={item['p99_ms']:.2f}  max={item['max_ms']:.2f}  {item['statement'][:120]}"
+        )
+    lines.append('')
+    lines.append(f"== 全表扫描（{len(report['full_scans'])} 条语句） ==")
+    for item in report['full_scans']:
+        lines.append(f"{item['total_ms']:>10.1f} ms  n={item['count']:<6} {item['statement'][:120]}")
+        for step in item['scans']:
+            lines.append(f"{'':>14}{step}")
+    lines.append('')
+    lines.append(f"慢查询记录: {report['slow_queries']} 条")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='SQL 剖析报告：语句耗时排行和全表扫描')
+    parser.add_argument('--db', default='data/script_executor.db', help='数据库路径')
+    parser.add_argument('--profile', default='data/sql_profile.json', help='剖析结果 JSON')
+    parser.add_argument('--top', type=int, default=20, help='列出的语句数')
+    parser.add_argument('--json', help='报告写入 JSON 文件')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.profile):
+        print(f"剖析结果不存在: {args.profile}（在配置中启用 database.profile 后运行程序）")
+        return 1
+    with open(args.profile, encoding='utf-8') as f:
+        profile = json.load(f)
+    report = build_report(profile, args.db, top=args.top)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 2 if report['full_scans'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
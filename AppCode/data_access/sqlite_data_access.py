@@ -1,33 +1,78 @@
 """SQLite数据访问实现
 
 提供基于SQLite的数据访问功能。
+
+配置了查询缓存（QueryCache）时，所有写入都会通知缓存失效：insert/update/delete
+按写入的行精确失效，execute_non_query/execute_many 按语句涉及的表整体失效。
+
+配置了指标注册表时，按语句类型和表（如 ``SELECT execution_history``）记录执行耗时；
+配置了 SqlProfiler 时，按规范化语句统计耗时分布并记录慢查询。
+
+配置了 HistoryArchive 时，旧的执行历史保存在按月归档的数据库文件中，按日期范围查询时
+通过 ``attached`` 临时附加需要的归档文件。
+
+execution_history/batch_executions 写入开始、结束时间或批次ID时，同时填充毫秒时间戳列
+（start_ms、end_ms、duration_ms、batch_started_at，见 time_columns）。
 """
 
 import sqlite3
 import os
+import re
+import time
 import logging
 from contextlib import contextmanager
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import json
 
+from . import time_columns
+
+_STATEMENT_VERB = re.compile(r'^\s*(?:WITH\b.*?\)\s*)?(\w+)', re.IGNORECASE | re.DOTALL)
+_STATEMENT_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+["`\[]?(\w+)', re.IGNORECASE)
+# 每条 SQL 对应的耗时直方图缓存上限（超过后清空重建）
+_MAX_STATEMENT_HISTOGRAMS = 1000
+_DATABASE_ALIAS = re.compile(r'^[A-Za-z_]\w*$')
+
+
+def statement_label(query: str) -> str:
+    """语句类型和第一个表名，作为耗时指标的标签"""
+    verb = _STATEMENT_VERB.match(query)
+    table = _STATEMENT_TABLE.search(query)
+    return ' '.join(part for part in (
+        verb.group(1).upper() if verb else '', table.group(1) if table else ''
+    ) if part) or 'OTHER'
+
 
 class SQLiteDataAccess:
     """SQLite数据访问类"""
 
     _ALLOWED_TABLES = frozenset({
         'execution_history', 'batch_executions', 'test_suites',
-        'performance_metrics', 'users'
+        'performance_metrics', 'users', 'measurements', 'can_recordings',
+        'execution_artifacts'
     })
 
-    def __init__(self, db_path: str, logger=None):
+    def __init__(self, db_path: str, logger=None, query_cache=None, metrics=None, profiler=None,
+                 archive=None):
         """初始化数据访问
 
         Args:
             db_path: 数据库文件路径
             logger: 日志记录器
+            query_cache: 查询结果缓存（QueryCache），None 表示不缓存
+            metrics: 指标注册表（MetricsRegistry），None 表示不记录耗时
+            profiler: SQL 剖析器（SqlProfiler），None 表示不剖析
+            archive: 执行历史归档（HistoryArchive），None 表示不归档
         """
         self.db_path = db_path
         self.logger = logger or logging.getLogger(__name__)
+        self.query_cache = query_cache
+        self.metrics = metrics
+        self._statement_histograms = {}
+        self.profiler = None
+        self.set_profiler(profiler)
+        self.archive = archive
+        if archive:
+            archive.bind(self)
 
         # 确保数据库目录存在
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
@@ -56,7 +101,11 @@ class SQLiteDataAccess:
                     suite_id INTEGER,
                     suite_name VARCHAR(100),
                     test_result VARCHAR(20),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    start_ms INTEGER,
+                    end_ms INTEGER,
+                    duration_ms INTEGER,
+                    batch_started_at INTEGER
                 )
             ''')
 
@@ -79,7 +128,11 @@ class SQLiteDataAccess:
                     suite_id INTEGER,
                     suite_name VARCHAR(100),
                     params TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    start_ms INTEGER,
+                    end_ms INTEGER,
+                    duration_ms INTEGER,
+                    batch_started_at INTEGER
                 )
             ''')
 
@@ -128,6 +181,48 @@ class SQLiteDataAccess:
                 )
             ''')
 
+            # 创建测量值表（保存时从脚本输出中提取的结构化测量值）
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS measurements (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    execution_id TEXT NOT NULL,
+                    script_path TEXT,
+                    name TEXT NOT NULL,
+                    value REAL,
+                    text_value TEXT,
+                    unit TEXT,
+                    lower_limit REAL,
+                    upper_limit REAL,
+                    source TEXT,
+                    line_no INTEGER,
+                    timestamp TEXT
+                )
+            ''')
+
+            # 创建CAN记录文件表（脚本录制的BLF文件，关联到执行记录）
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS can_recordings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    execution_id TEXT NOT NULL,
+                    script_path TEXT,
+                    file_path TEXT NOT NULL,
+                    file_size INTEGER,
+                    file_mtime REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # 创建执行附加数据表（剖析结果等按类型保存的JSON数据）
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS execution_artifacts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    execution_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    data TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
             # 创建索引
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_execution_history_batch_id ON execution_history(batch_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_execution_history_suite_id ON execution_history(suite_id)')
@@ -138,11 +233,35 @@ class SQLiteDataAccess:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_perf_timestamp ON performance_metrics(timestamp)')
             cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_username ON users(username)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_role ON users(role)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_measurements_execution ON measurements(execution_id)')
+            # (name, timestamp, value) 覆盖索引：趋势统计只扫描索引即可取到数值
+            cursor.execute('DROP INDEX IF EXISTS idx_measurements_name_time')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_measurements_name_time_value ON measurements(name, timestamp, value)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_measurements_script_name ON measurements(script_path, name)')
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_can_recordings_execution_file ON can_recordings(execution_id, file_path)')
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_execution_artifacts_execution_kind ON execution_artifacts(execution_id, kind)')
+
+            # 数值时间列（旧数据库添加列并回填）
+            backfilled = time_columns.migrate(conn)
+            if backfilled:
+                self.logger.info(f"Backfilled epoch-ms time columns for {backfilled} rows")
     
+    def set_profiler(self, profiler):
+        """启用或关闭 SQL 剖析（对之后打开的连接生效）
+
+        Args:
+            profiler: SqlProfiler，None 表示关闭
+        """
+        if profiler:
+            profiler.bind(self.db_path)
+        self.profiler = profiler
+
     def _get_connection(self) -> sqlite3.Connection:
         """获取数据库连接"""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        if self.profiler:
+            conn.set_trace_callback(self.profiler.trace)
         return conn
 
     @contextmanager
@@ -158,10 +277,81 @@ class SQLiteDataAccess:
         finally:
             conn.close()
 
+    @contextmanager
+    def attached(self, databases: Dict[str, str]):
+        """获取附加了其他数据库文件的连接（退出时提交并关闭）
+
+        Args:
+            databases: {别名: 数据库文件路径}，别名在语句中用作 ``别名.表名``
+
+        Yields:
+            数据库连接
+        """
+        for alias in databases:
+            if not _DATABASE_ALIAS.match(alias) or alias.lower() in ('main', 'temp'):
+                raise ValueError(f"Invalid database alias: {alias}")
+        with self._managed_connection() as conn:
+            for alias, path in databases.items():
+                conn.execute(f'ATTACH DATABASE ? AS {alias}', (path,))
+            yield conn
+
+    @contextmanager
+    def transaction(self, tables: Tuple[str, ...] = ()):
+        """获取在单个写事务中执行多条语句的连接（退出时提交，出错时整体回滚）
+
+        以 BEGIN IMMEDIATE 开始，并发的写事务依次执行，不会交错。
+
+        Args:
+            tables: 事务中写入的表，结束后使对应的查询缓存失效
+
+        Yields:
+            数据库连接
+        """
+        for table in tables:
+            self._validate_table(table)
+        try:
+            with self._managed_connection() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                yield conn
+        finally:
+            if self.query_cache:
+                for table in tables:
+                    self.query_cache.invalidate_table(table)
+
+    @contextmanager
+    def snapshot(self):
+        """获取在单个读事务中执行多条查询的连接（各查询看到同一份数据）
+
+        Yields:
+            数据库连接（行以元组返回）
+        """
+        with self._managed_connection() as conn:
+            conn.row_factory = None
+            conn.execute('BEGIN')
+            yield conn
+
     def _validate_table(self, table: str):
         """验证表名是否在白名单中"""
         if table not in self._ALLOWED_TABLES:
             raise ValueError(f"Invalid table name: {table}")
+
+    def _observe(self, query: str, started: float, params=()):
+        """记录语句耗时（started 为 perf_counter 时间）"""
+        if self.metrics is None and self.profiler is None:
+            return
+        elapsed = time.perf_counter() - started
+        if self.profiler:
+            self.profiler.record(query, params, elapsed)
+        if self.metrics is None:
+            return
+        histogram = self._statement_histograms.get(query)
+        if histogram is None:
+            if len(self._statement_histograms) >= _MAX_STATEMENT_HISTOGRAMS:
+                self._statement_histograms.clear()
+            histogram = self._statement_histograms[query] = self.metrics.histogram(
+                'db_query_seconds', 'SQL 语句执行耗时', {'statement': statement_label(query)}
+            )
+        histogram.observe(elapsed)
     
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """执行查询
@@ -173,12 +363,50 @@ class SQLiteDataAccess:
         Returns:
             查询结果列表
         """
+        started = time.perf_counter()
         with self._managed_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            result = [dict(row) for row in rows]
+        self._observe(query, started, params)
+        return result
     
+    def execute_query_rows(self, query: str, params: tuple = ()) -> List[tuple]:
+        """执行查询并返回元组行（不转换为字典，适合大批量数值读取）
+
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+
+        Returns:
+            元组列表
+        """
+        started = time.perf_counter()
+        with self._managed_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        self._observe(query, started, params)
+        return rows
+
+    def iter_query_rows(self, query: str, params: tuple = ()) -> Iterator[tuple]:
+        """执行查询并逐行返回元组（不一次性载入全部结果）
+
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+
+        Yields:
+            元组行
+        """
+        with self._managed_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            yield from cursor
+
     def execute_non_query(self, query: str, params: tuple = ()) -> int:
         """执行非查询语句
 
@@ -189,11 +417,51 @@ class SQLiteDataAccess:
         Returns:
             影响的行数
         """
+        try:
+            return self._execute_write(query, params)
+        finally:
+            if self.query_cache:
+                self.query_cache.invalidate_sql(query)
+    
+    def execute_many(self, query: str, params_list: List[tuple]) -> int:
+        """批量执行语句（单个事务）
+
+        Args:
+            query: SQL语句
+            params_list: 参数列表
+
+        Returns:
+            影响的行数
+        """
+        started = time.perf_counter()
+        try:
+            with self._managed_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(query, params_list)
+                rowcount = cursor.rowcount
+            self._observe(query, started, params_list[0] if params_list else ())
+            return rowcount
+        finally:
+            if self.query_cache:
+                self.query_cache.invalidate_sql(query)
+
+    def _execute_write(self, query: str, params: tuple = ()) -> int:
+        """执行写语句（不通知查询缓存，由调用方按行失效）"""
+        started = time.perf_counter()
         with self._managed_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            return cursor.rowcount
-    
+            rowcount = cursor.rowcount
+        self._observe(query, started, params)
+        return rowcount
+
+    def _cached_row(self, table: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """读取写入前的行，仅在该表有缓存结果时才需要"""
+        if not (self.query_cache and self.query_cache.has_entries(table)):
+            return None
+        rows = self.execute_query(f'SELECT * FROM {table} WHERE id = ?', (record_id,))
+        return rows[0] if rows else None
+
     def insert(self, table: str, data: Dict[str, Any]) -> str:
         """插入数据
 
@@ -205,14 +473,25 @@ class SQLiteDataAccess:
             插入的记录ID
         """
         self._validate_table(table)
+        data = dict(data, **time_columns.derive_time_fields(table, data))
         columns = ', '.join(data.keys())
         placeholders = ', '.join(['?' for _ in data])
         query = f'INSERT INTO {table} ({columns}) VALUES ({placeholders})'
 
-        with self._managed_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, tuple(data.values()))
-            return data.get('id', str(cursor.lastrowid))
+        started = time.perf_counter()
+        try:
+            with self._managed_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, tuple(data.values()))
+                record_id = data.get('id', str(cursor.lastrowid))
+            self._observe(query, started, tuple(data.values()))
+        except Exception:
+            if self.query_cache:
+                self.query_cache.invalidate_table(table)
+            raise
+        if self.query_cache:
+            self.query_cache.invalidate_rows(table, [dict(data, id=record_id)])
+        return record_id
     
     def update(self, table: str, record_id: str, data: Dict[str, Any]) -> bool:
         """更新数据
@@ -226,16 +505,30 @@ class SQLiteDataAccess:
             是否成功
         """
         self._validate_table(table)
+        derived = time_columns.derive_time_fields(table, data)
+        data = dict(data, **derived)
         set_clause = ', '.join([f'{k} = ?' for k in data.keys()])
+        params = tuple(data.values())
+        duration_clause, duration_params = time_columns.duration_assignment(table, derived)
+        if duration_clause:
+            set_clause += ', ' + duration_clause
+            params += duration_params
         query = f'UPDATE {table} SET {set_clause} WHERE id = ?'
 
         try:
-            params = tuple(data.values()) + (record_id,)
-            self.execute_non_query(query, params)
+            old_row = self._cached_row(table, record_id)
+            params += (record_id,)
+            self._execute_write(query, params)
             return True
         except Exception as e:
+            old_row = None
             self.logger.error(f"Update error: {e}", exc_info=True)
             return False
+        finally:
+            if self.query_cache:
+                # 更新前后的行都可能落在某个缓存范围内
+                new_row = dict(old_row or {'id': record_id}, **data)
+                self.query_cache.invalidate_rows(table, [old_row, new_row] if old_row else [new_row])
     
     def delete(self, table: str, record_id: str) -> bool:
         """删除数据
@@ -251,11 +544,16 @@ class SQLiteDataAccess:
         query = f'DELETE FROM {table} WHERE id = ?'
 
         try:
-            self.execute_non_query(query, (record_id,))
+            old_row = self._cached_row(table, record_id)
+            self._execute_write(query, (record_id,))
             return True
         except Exception as e:
+            old_row = None
             self.logger.error(f"Delete error: {e}", exc_info=True)
             return False
+        finally:
+            if self.query_cache:
+                self.query_cache.invalidate_rows(table, [old_row or {'id': record_id}])
     
     def get_by_id(self, table: str, id_value: str) -> Optional[Dict[str, Any]]:
         """根据ID获取记录
@@ -273,15 +571,15 @@ class SQLiteDataAccess:
         
         return results[0] if results else None
     
-    def query(self, table: str, conditions: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """查询数据
+    def build_select(self, table: str, conditions: Dict[str, Any] = None) -> Tuple[str, tuple]:
+        """生成 query 使用的查询语句
 
         Args:
             table: 表名
-            conditions: 查询条件字典
+            conditions: 查询条件字典（键以 >= 或 <= 结尾表示范围条件）
 
         Returns:
-            结果列表
+            (SQL, 参数)
         """
         self._validate_table(table)
         query = f'SELECT * FROM {table}'
@@ -300,4 +598,16 @@ class SQLiteDataAccess:
             
             query += ' WHERE ' + ' AND '.join(where_clauses)
         
-        return self.execute_query(query, tuple(params))
\ No newline at end of file
+        return query, tuple(params)
+
+    def query(self, table: str, conditions: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """查询数据
+
+        Args:
+            table: 表名
+            conditions: 查询条件字典
+
+        Returns:
+            结果列表
+        """
+        return self.execute_query(*self.build_select(table, conditions))
@@ -0,0 +1,110 @@
+"""SQLite 数据库在线快照和页面级差异
+
+- ``snapshot_database``：使用 sqlite3 在线备份 API 分步复制（每步 ``pages`` 页，步间休眠），
+  每步之间释放源库的读锁，写入方最多等待一步的时间，得到的副本是一致的；
+- ``page_digests``：按页计算摘要，与上一次快照的摘要比较即可得到变化的页；
+- ``write_pages`` / ``apply_pages``：变化页的紧凑记录格式（4字节页号 + 页内容）。
+"""
+
+import hashlib
+import sqlite3
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Tuple
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+# 页摘要长度（字节）
+DIGEST_SIZE = 16
+_PAGE_NUMBER = struct.Struct('>I')
+
+
+def is_sqlite_file(path: str) -> bool:
+    """是否为 SQLite 数据库文件（按文件头判断）"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def page_size_of(path: str) -> int:
+    """读取数据库文件头中的页大小"""
+    with open(path, 'rb') as f:
+        header = f.read(18)
+    size = struct.unpack('>H', header[16:18])[0]
+    return 65536 if size == 1 else size
+
+
+def snapshot_database(src_path: str, dst_path: str, pages: int = 1024, sleep: float = 0.005):
+    """在线复制数据库的一致快照
+
+    Args:
+        src_path: 源数据库路径（只读打开）
+        dst_path: 快照文件路径（已存在时覆盖）
+        pages: 每步复制的页数
+        sleep: 步间休眠秒数
+    """
+    src = sqlite3.connect(Path(src_path).resolve().as_uri() + '?mode=ro', uri=True)
+    try:
+        dst = sqlite3.connect(dst_path)
+        try:
+            src.backup(dst, pages=pages, sleep=sleep)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
+
+def iter_pages(stream: BinaryIO, page_size: int) -> Iterator[bytes]:
+    """逐页读取"""
+    while True:
+        page = stream.read(page_size)
+        if not page:
+            return
+        yield page
+
+
+def page_digests(path: str, page_size: int) -> Tuple[bytes, str]:
+    """计算每页摘要和整个文件的 SHA-256
+
+    Returns:
+        (按页拼接的摘要, 文件 SHA-256 十六进制)
+    """
+    digests = bytearray()
+    whole = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for page in iter_pages(f, page_size):
+            whole.update(page)
+            digests += hashlib.blake2b(page, digest_size=DIGEST_SIZE).digest()
+    return bytes(digests), whole.hexdigest()
+
+
+def changed_pages(digests: bytes, previous: bytes) -> List[int]:
+    """与上一次快照相比内容变化或新增的页号（从1开始）"""
+    changed = []
+    for index in range(len(digests) // DIGEST_SIZE):
+        start = index * DIGEST_SIZE
+        if digests[start:start + DIGEST_SIZE] != previous[start:start + DIGEST_SIZE]:
+            changed.append(index + 1)
+    return changed
+
+
+def write_pages(src: BinaryIO, out: BinaryIO, page_numbers: List[int], page_size: int):
+    """把指定页写成差异记录"""
+    for number in page_numbers:
+        src.seek((number - 1) * page_size)
+        out.write(_PAGE_NUMBER.pack(number))
+        out.write(src.read(page_size))
+
+
+def apply_pages(records: BinaryIO, target: BinaryIO, page_size: int) -> int:
+    """把差异记录写入目标文件，返回写入的页数"""
+    count = 0
+    while True:
+        head = records.read(_PAGE_NUMBER.size)
+        if not head:
+            return count
+        (number,) = _PAGE_NUMBER.unpack(head)
+        target.seek((number - 1) * page_size)
+        target.write(records.read(page_size))
+        count += 1
@@ -0,0 +1,179 @@
+"""执行记录的数值时间列
+
+execution_history 和 batch_executions 的 start_time/end_time 以 ISO 文本保存，按时间范围查询、
+统计耗时都需要逐行解析字符串。这两张表额外保存以下整数列（毫秒时间戳）并建立索引：
+
+- ``start_ms`` / ``end_ms``：开始、结束时间；
+- ``duration_ms``：耗时（end_ms - start_ms）；
+- ``batch_started_at``：批次开始时间，从批次ID（``batch_<微秒时间戳>_<随机数>``）解析。
+
+SQLiteDataAccess 在 insert/update 时根据写入的文本列填充这些列；已有数据由 ``migrate``
+在打开数据库时回填一次（以 ``PRAGMA user_version`` 记录）。
+"""
+
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# 数据库结构版本（PRAGMA user_version）
+SCHEMA_VERSION = 1
+
+# 表 -> 批次ID所在列
+TIME_TABLES = {
+    'execution_history': 'batch_id',
+    'batch_executions': 'id',
+}
+TIME_COLUMNS = ('start_ms', 'end_ms', 'duration_ms', 'batch_started_at')
+
+_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_execution_history_start_ms ON execution_history(start_ms)',
+    'CREATE INDEX IF NOT EXISTS idx_execution_history_batch_started_at ON execution_history(batch_started_at)',
+    # 按脚本取最近耗时样本：只扫描索引
+    'CREATE INDEX IF NOT EXISTS idx_execution_history_script_start_duration '
+    'ON execution_history(script_path, start_ms, duration_ms)',
+    'CREATE INDEX IF NOT EXISTS idx_batch_executions_start_ms ON batch_executions(start_ms)',
+)
+
+_BATCH_ID = re.compile(r'^batch_(\d{13,})_')
+
+
+def to_epoch_ms(value: Any) -> Optional[int]:
+    """时间转换为毫秒时间戳
+
+    Args:
+        value: datetime 或 ISO 格式字符串（不带时区时按本地时间）
+
+    Returns:
+        毫秒时间戳，无法解析时返回 None
+    """
+    if isinstance(value, str):
+        if not value:
+            return None
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return int(round(value.timestamp() * 1000))
+    return None
+
+
+def batch_epoch_ms(batch_id: Any) -> Optional[int]:
+    """从批次ID解析批次开始时间（毫秒时间戳）"""
+    match = _BATCH_ID.match(batch_id) if isinstance(batch_id, str) else None
+    return int(match.group(1)) // 1000 if match else None
+
+
+def day_range_ms(start_date: str, end_date: str) -> Tuple[int, int]:
+    """日期范围对应的毫秒时间戳区间（两端都包含）
+
+    Args:
+        start_date: 开始日期（yyyy-MM-dd，更长的 ISO 字符串只取日期部分）
+        end_date: 结束日期
+
+    Returns:
+        (开始日 0 点, 结束日最后一毫秒)
+    """
+    start = datetime.fromisoformat(start_date[:10])
+    end = datetime.fromisoformat(end_date[:10]) + timedelta(days=1)
+    return to_epoch_ms(start), to_epoch_ms(end) - 1
+
+
+def derive_time_fields(table: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """根据写入的文本列计算数值时间列
+
+    Args:
+        table: 表名
+        data: 写入的数据
+
+    Returns:
+        需要一并写入的列（只包含能由 data 确定的列，不是时间表时为空）
+    """
+    if table not in TIME_TABLES:
+        return {}
+    fields = {}
+    if 'start_time' in data:
+        fields['start_ms'] = to_epoch_ms(data['start_time'])
+    if 'end_time' in data:
+        fields['end_ms'] = to_epoch_ms(data['end_time'])
+    if 'start_ms' in fields and 'end_ms' in fields:
+        start_ms, end_ms = fields['start_ms'], fields['end_ms']
+        fields['duration_ms'] = end_ms - start_ms if start_ms is not None and end_ms is not None else None
+    batch_column = TIME_TABLES[table]
+    if batch_column in data:
+        fields['batch_started_at'] = batch_epoch_ms(data[batch_column])
+    return fields
+
+
+def duration_assignment(table: str, fields: Dict[str, Any]) -> Tuple[Optional[str], tuple]:
+    """只更新开始或结束时间之一时，耗时列的 SET 子句（另一端取表中现有值）
+
+    Args:
+        table: 表名
+        fields: derive_time_fields 的结果
+
+    Returns:
+        (SET 子句, 参数)，不需要时为 (None, ())
+    """
+    if table not in TIME_TABLES or 'duration_ms' in fields:
+        return None, ()
+    if 'end_ms' in fields:
+        return 'duration_ms = ? - start_ms', (fields['end_ms'],)
+    if 'start_ms' in fields:
+        return 'duration_ms = end_ms - ?', (fields['start_ms'],)
+    return None, ()
+
+
+def record_duration(record: Dict[str, Any]) -> Optional[float]:
+    """执行记录的耗时（秒），优先使用 duration_ms，没有时解析文本时间"""
+    duration_ms = record.get('duration_ms')
+    if duration_ms is not None:
+        return duration_ms / 1000
+    start_ms = to_epoch_ms(record.get('start_time'))
+    end_ms = to_epoch_ms(record.get('end_time'))
+    if start_ms is None or end_ms is None:
+        return None
+    return (end_ms - start_ms) / 1000
+
+
+def _existing_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """添加数值时间列和索引，首次执行时回填已有数据
+
+    Args:
+        conn: 数据库连接（由调用方提交）
+
+    Returns:
+        回填的行数
+    """
+    for table in TIME_TABLES:
+        existing = _existing_columns(conn, table)
+        for column in TIME_COLUMNS:
+            if column not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} INTEGER')
+    for sql in _INDEXES:
+        conn.execute(sql)
+
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return 0
+
+    conn.create_function('epoch_ms', 1, to_epoch_ms)
+    conn.create_function('batch_epoch_ms', 1, batch_epoch_ms)
+    backfilled = 0
+    for table, batch_column in TIME_TABLES.items():
+        backfilled += conn.execute(
+            f'UPDATE {table} SET start_ms = epoch_ms(start_time), end_ms = epoch_ms(end_time), '
+            f'batch_started_at = batch_epoch_ms({batch_column}) '
+            'WHERE start_ms IS NULL'
+        ).rowcount
+        conn.execute(
+            f'UPDATE {table} SET duration_ms = end_ms - start_ms '
+            'WHERE duration_ms IS NULL AND start_ms IS NOT NULL AND end_ms IS NOT NULL'
+        )
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return backfilled
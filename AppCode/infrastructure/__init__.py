@@ -3,8 +3,11 @@
 提供缓存等基础设施服务。
 """
 
-from .cache import CacheManager
+from .cache import CacheManager, BoundedCache
+from .metrics import MetricsRegistry
 
 __all__ = [
     'CacheManager',
+    'BoundedCache',
+    'MetricsRegistry',
 ]
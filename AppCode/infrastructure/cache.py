@@ -1,16 +1,28 @@
 """缓存管理模块
 
 提供LRU缓存和内存缓存功能。
+
+BoundedCache 按估算的字节数而不是条目数限制内存：
+
+- 淘汰策略为 LRU 或分段 LRU（slru：新条目进入试用段，再次命中后进入保护段，
+  一次性扫描不会冲掉常用条目）；
+- 过期条目在访问时惰性删除，CacheManager 的后台线程定期清理；
+- get_or_load 对同一键只执行一次加载（single-flight），并发请求等待同一结果；
+- 统计命中、未命中、淘汰、过期和加载次数，供性能面板显示。
 """
 
+import sys
 import time
-from typing import Any, Optional, Dict, Callable
+from typing import Any, Optional, Dict, Callable, List
 from collections import OrderedDict
-from threading import Lock
+from threading import Lock, Event, Thread
 
-from AppCode.utils.constants import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+from AppCode.utils.constants import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL, DEFAULT_CACHE_BYTES
 from AppCode.utils.decorators import singleton
 
+# 估算对象大小时递归的最大深度
+_SIZEOF_MAX_DEPTH = 6
+
 
 class LRUCache:
     """LRU缓存实现
@@ -224,6 +236,350 @@ class TTLCache:
         return self.size()
 
 
+def estimate_size(value: Any) -> int:
+    """估算对象占用的内存（字节，近似值）
+
+    递归统计容器和对象属性；numpy 数组等带 nbytes 的对象按 nbytes 计算，
+    对象可提供 cache_size() 给出自身大小。
+
+    Args:
+        value: 对象
+
+    Returns:
+        估算的字节数
+    """
+    seen = set()
+
+    def size(obj, depth):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        if hasattr(obj, 'cache_size') and callable(obj.cache_size):
+            return int(obj.cache_size())
+        total = sys.getsizeof(obj, 64)
+        nbytes = getattr(obj, 'nbytes', None)
+        if isinstance(nbytes, int):
+            return total + nbytes
+        if depth >= _SIZEOF_MAX_DEPTH or isinstance(obj, (str, bytes, bytearray, int, float, bool)):
+            return total
+        if isinstance(obj, dict):
+            return total + sum(size(k, depth + 1) + size(v, depth + 1) for k, v in obj.items())
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            return total + sum(size(item, depth + 1) for item in obj)
+        if hasattr(obj, '__dict__'):
+            total += size(vars(obj), depth + 1)
+        for slot in getattr(type(obj), '__slots__', ()):
+            if hasattr(obj, slot):
+                total += size(getattr(obj, slot), depth + 1)
+        return total
+
+    return size(value, 0)
+
+
+class _Entry:
+    """缓存条目"""
+
+    __slots__ = ('value', 'size', 'expire_time')
+
+    def __init__(self, value: Any, size: int, expire_time: Optional[float]):
+        self.value = value
+        self.size = size
+        self.expire_time = expire_time
+
+
+class _Loading:
+    """正在加载的键（并发请求等待同一结果）"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = Event()
+        self.value = None
+        self.error = None
+
+
+class BoundedCache:
+    """按字节预算淘汰的缓存，线程安全
+
+    接口与 LRUCache 兼容（get/put/remove/clear/values/keys），可直接替换。
+    """
+
+    def __init__(
+        self,
+        name: str = '',
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        policy: str = 'slru',
+        default_ttl: Optional[float] = None,
+        protected_ratio: float = 0.8,
+        sizeof: Callable[[Any], int] = estimate_size
+    ):
+        """初始化缓存
+
+        Args:
+            name: 缓存名称（统计显示用）
+            max_bytes: 内存预算（字节）
+            policy: 淘汰策略，'lru' 或 'slru'
+            default_ttl: 默认过期时间（秒），None 表示不过期
+            protected_ratio: slru 保护段占预算的比例
+            sizeof: 估算条目大小的函数
+        """
+        if policy not in ('lru', 'slru'):
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.name = name
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.default_ttl = default_ttl
+        self.protected_bytes = int(max_bytes * protected_ratio) if policy == 'slru' else 0
+        self.sizeof = sizeof
+        self.lock = Lock()
+        self._probation: OrderedDict = OrderedDict()
+        self._protected: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._protected_used = 0
+        self._loading: Dict[Any, _Loading] = {}
+        self._stats = {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+            'loads': 0, 'load_errors': 0, 'rejected': 0
+        }
+
+    def _lookup(self, key) -> Optional[_Entry]:
+        """查找条目并更新访问顺序（调用方持有锁），过期条目惰性删除"""
+        segment = self._protected if key in self._protected else self._probation
+        entry = segment.get(key)
+        if entry is None:
+            return None
+        if entry.expire_time is not None and time.time() > entry.expire_time:
+            self._discard(key)
+            self._stats['expirations'] += 1
+            return None
+        if segment is self._protected:
+            segment.move_to_end(key)
+        elif self.policy == 'slru':
+            # 试用段再次命中，晋升到保护段；保护段超出预算时把最久未用的降回试用段
+            del self._probation[key]
+            self._protected[key] = entry
+            self._protected_used += entry.size
+            while self._protected_used > self.protected_bytes and len(self._protected) > 1:
+                old_key, old_entry = self._protected.popitem(last=False)
+                self._protected_used -= old_entry.size
+                self._probation[old_key] = old_entry
+        else:
+            segment.move_to_end(key)
+        return entry
+
+    def _discard(self, key) -> Optional[_Entry]:
+        """删除条目（调用方持有锁）"""
+        entry = self._protected.pop(key, None)
+        if entry is not None:
+            self._protected_used -= entry.size
+        else:
+            entry = self._probation.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _evict(self):
+        """超出预算时淘汰：先淘汰试用段，再淘汰保护段（调用方持有锁）"""
+        while self._bytes > self.max_bytes:
+            segment = self._probation or self._protected
+            if not segment:
+                break
+            key = next(iter(segment))
+            self._discard(key)
+            self._stats['evictions'] += 1
+
+    def get(self, key, default=None) -> Optional[Any]:
+        """获取缓存值
+
+        Args:
+            key: 缓存键
+            default: 不存在或已过期时的返回值
+
+        Returns:
+            缓存值
+        """
+        with self.lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+            self._stats['hits'] += 1
+            return entry.value
+
+    def put(self, key, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """设置缓存值（单个条目超过预算时不缓存）
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 过期时间（秒），None 使用默认值
+            size: 条目大小（字节），None 时自动估算
+        """
+        size = self.sizeof(value) if size is None else size
+        ttl = self.default_ttl if ttl is None else ttl
+        expire_time = time.time() + ttl if ttl is not None else None
+        with self.lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                self._stats['rejected'] += 1
+                return
+            self._probation[key] = _Entry(value, size, expire_time)
+            self._bytes += size
+            self._evict()
+
+    def get_or_load(self, key, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """获取缓存值，不存在时调用 loader 加载并缓存
+
+        同一键同时只有一个线程执行 loader，其它线程等待并得到同一结果（或同一异常）。
+
+        Args:
+            key: 缓存键
+            loader: 加载函数
+            ttl: 过期时间（秒），None 使用默认值
+
+        Returns:
+            缓存值
+        """
+        with self.lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._stats['hits'] += 1
+                return entry.value
+            self._stats['misses'] += 1
+            loading = self._loading.get(key)
+            owner = loading is None
+            if owner:
+                loading = self._loading[key] = _Loading()
+
+        if not owner:
+            loading.done.wait()
+            if loading.error is not None:
+                raise loading.error
+            return loading.value
+
+        try:
+            loading.value = loader()
+            self.put(key, loading.value, ttl)
+            return loading.value
+        except Exception as e:
+            loading.error = e
+            raise
+        finally:
+            with self.lock:
+                self._stats['loads'] += 1
+                if loading.error is not None:
+                    self._stats['load_errors'] += 1
+                self._loading.pop(key, None)
+            loading.done.set()
+
+    def remove(self, key):
+        """删除缓存项
+
+        Args:
+            key: 缓存键
+        """
+        with self.lock:
+            self._discard(key)
+
+    def remove_where(self, predicate: Callable[[Any], bool]) -> int:
+        """删除键满足条件的缓存项
+
+        Args:
+            predicate: 键的判断函数
+
+        Returns:
+            删除的数量
+        """
+        with self.lock:
+            keys = [key for key in list(self._probation) + list(self._protected) if predicate(key)]
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+
+    def clear(self):
+        """清空缓存"""
+        with self.lock:
+            self._probation.clear()
+            self._protected.clear()
+            self._bytes = 0
+            self._protected_used = 0
+
+    def cleanup_expired(self) -> int:
+        """清理过期缓存项
+
+        Returns:
+            清理的数量
+        """
+        now = time.time()
+        with self.lock:
+            expired = [
+                key for segment in (self._probation, self._protected)
+                for key, entry in segment.items()
+                if entry.expire_time is not None and now > entry.expire_time
+            ]
+            for key in expired:
+                self._discard(key)
+            self._stats['expirations'] += len(expired)
+            return len(expired)
+
+    def size(self) -> int:
+        """获取缓存大小
+
+        Returns:
+            缓存项数量
+        """
+        with self.lock:
+            return len(self._probation) + len(self._protected)
+
+    def bytes_used(self) -> int:
+        """已用的估算字节数"""
+        with self.lock:
+            return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息
+
+        Returns:
+            命中、未命中、淘汰、过期、加载次数和内存占用
+        """
+        with self.lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._probation) + len(self._protected)
+            stats['bytes'] = self._bytes
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def values(self) -> List[Any]:
+        """获取所有未过期的缓存值（不影响访问顺序和统计）"""
+        now = time.time()
+        with self.lock:
+            return [
+                entry.value for segment in (self._probation, self._protected)
+                for entry in segment.values()
+                if entry.expire_time is None or now <= entry.expire_time
+            ]
+
+    def keys(self) -> List[Any]:
+        """获取所有缓存键"""
+        with self.lock:
+            return list(self._probation) + list(self._protected)
+
+    def __contains__(self, key) -> bool:
+        """检查键是否存在且未过期（不影响访问顺序和统计）"""
+        with self.lock:
+            entry = self._protected.get(key) or self._probation.get(key)
+            return entry is not None and (entry.expire_time is None or time.time() <= entry.expire_time)
+
+    def __iter__(self):
+        """迭代缓存键"""
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return self.size()
+
+
 @singleton
 class CacheManager:
     """缓存管理器
@@ -232,11 +588,16 @@ class CacheManager:
     采用单例模式确保全局统一的缓存管理。
     """
     
+    # 后台清理过期条目的间隔（秒）
+    CLEANUP_INTERVAL = 60
+    
     def __init__(self):
         """初始化缓存管理器"""
         self.lru_cache = LRUCache()
         self.ttl_cache = TTLCache()
         self._caches: Dict[str, Any] = {}
+        self._lock = Lock()
+        self._cleanup_thread = None
     
     def get_lru_cache(self) -> LRUCache:
         """获取LRU缓存
@@ -273,12 +634,53 @@ class CacheManager:
             cache = LRUCache(**kwargs)
         elif cache_type == 'ttl':
             cache = TTLCache(**kwargs)
+        elif cache_type == 'bounded':
+            cache = BoundedCache(name=name, **kwargs)
         else:
             raise ValueError(f"Unknown cache type: {cache_type}")
         
-        self._caches[name] = cache
+        return self.register_cache(name, cache)
+    
+    def register_cache(self, name: str, cache: Any) -> Any:
+        """登记缓存（同名时替换），用于统计和后台清理过期条目
+        
+        Args:
+            name: 缓存名称
+            cache: 缓存实例
+            
+        Returns:
+            缓存实例
+        """
+        with self._lock:
+            self._caches[name] = cache
+            if self._cleanup_thread is None:
+                self._cleanup_thread = Thread(target=self._cleanup_loop, daemon=True, name="CacheCleanup")
+                self._cleanup_thread.start()
         return cache
     
+    def cleanup_expired(self) -> int:
+        """清理所有缓存中的过期条目
+        
+        Returns:
+            清理的数量
+        """
+        removed = 0
+        with self._lock:
+            caches = [self.ttl_cache] + list(self._caches.values())
+        for cache in caches:
+            if hasattr(cache, 'cleanup_expired'):
+                removed += cache.cleanup_expired() or 0
+        return removed
+    
+    def _cleanup_loop(self):
+        """后台清理循环"""
+        while True:
+            time.sleep(self.CLEANUP_INTERVAL)
+            try:
+                self.cleanup_expired()
+            except Exception:
+                pass
+    
     def get_cache(self, name: str) -> Optional[Any]:
         """获取命名缓存
         
@@ -310,8 +712,36 @@ class CacheManager:
             'named_caches': {}
         }
         
-        for name, cache in self._caches.items():
+        for name, cache in list(self._caches.items()):
             if hasattr(cache, 'size'):
                 stats['named_caches'][name] = cache.size()
         
-        return stats
\ No newline at end of file
+        return stats
+    
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取按字节预算缓存的命中、淘汰等统计
+        
+        Returns:
+            {缓存名称: 统计信息}
+        """
+        return {
+            name: cache.stats() for name, cache in list(self._caches.items())
+            if isinstance(cache, BoundedCache)
+        }
+    def collect_metrics(self) -> List[tuple]:
+        """缓存统计转换为指标样本（供 MetricsRegistry.register_collector 使用）
+
+        Returns:
+            [(指标名, 类型, 说明, 标签, 值)]
+        """
+        samples = []
+        for name, stats in sorted(self.get_cache_stats().items()):
+            labels = {'cache': name}
+            samples.extend([
+                ('cache_hits_total', 'counter', '缓存命中次数', labels, stats['hits']),
+                ('cache_misses_total', 'counter', '缓存未命中次数', labels, stats['misses']),
+                ('cache_evictions_total', 'counter', '缓存淘汰次数', labels, stats['evictions']),
+                ('cache_hit_ratio', 'gauge', '缓存命中率', labels, stats['hit_rate']),
+                ('cache_bytes', 'gauge', '缓存估算内存占用（字节）', labels, stats['bytes']),
+            ])
+        return samples
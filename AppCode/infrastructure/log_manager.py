@@ -1,77 +1,243 @@
 """日志管理器
 
 统一管理应用程序的日志记录。
+
+日志记录不在调用线程写文件：根记录器只挂一个 QueueHandler，记录放入有界队列后立即返回，
+由 QueueListener 后台线程写入文件和控制台。文件轮转和旧日志的 gzip 压缩也在该线程中完成，
+磁盘卡顿不会阻塞执行引擎或界面线程。队列满时丢弃记录并按级别计数，后台线程随后写入一条
+丢弃统计警告。可选 JSON 格式（每行一个 JSON 对象）便于机器处理。
 """
 
+import atexit
+import gzip
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import shutil
+import threading
+from collections import Counter
 from datetime import datetime
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Optional
+
+from AppCode.utils.constants import DEFAULT_LOG_MAX_SIZE, DEFAULT_LOG_BACKUP_COUNT
+
+# 日志队列默认容量（条）
+DEFAULT_LOG_QUEUE_SIZE = 10000
+
+
+class JsonFormatter(logging.Formatter):
+    """每条记录输出为一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _gzip_namer(name: str) -> str:
+    return name + '.gz'
+
+
+def _gzip_rotator(source: str, dest: str):
+    """轮转时把旧日志压缩为 .gz（在监听线程中执行）"""
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
 
-from AppCode.utils.constants import DEFAULT_LOG_MAX_SIZE
+class _DroppingQueueHandler(QueueHandler):
+    """队列满时丢弃记录而不是阻塞调用线程"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = Counter()
+        self._drop_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped[record.levelname] += 1
+
+    def dropped_total(self) -> int:
+        with self._drop_lock:
+            return sum(self.dropped.values())
+
+
+class _ReportingQueueListener(QueueListener):
+    """写入记录前报告新丢弃的记录数"""
+
+    def __init__(self, log_queue, producer: _DroppingQueueHandler, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.producer = producer
+        self._reported = 0
+
+    def enqueue_sentinel(self):
+        # 停止标记必须入队：队列满时等待后台线程取走记录，线程已退出时超时放弃
+        self.queue.put(self._sentinel, timeout=5)
+
+    def handle(self, record: logging.LogRecord):
+        dropped = self.producer.dropped_total()
+        if dropped > self._reported:
+            notice = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f"日志队列已满，丢弃了 {dropped - self._reported} 条日志（累计 {dropped} 条）",
+                None, None
+            )
+            self._reported = dropped
+            super().handle(notice)
+        super().handle(record)
 
 
 class LogManager:
     """日志管理器"""
-    
-    def __init__(self, log_dir: str = 'logs'):
+
+    # 当前生效的实例（重复创建时替换旧的处理器，避免重复输出）
+    _active: Optional['LogManager'] = None
+
+    def __init__(
+        self,
+        log_dir: str = 'logs',
+        queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+        json_format: bool = False,
+        max_bytes: int = DEFAULT_LOG_MAX_SIZE,
+        backup_count: int = DEFAULT_LOG_BACKUP_COUNT,
+        compress: bool = True,
+        console_level: int = logging.INFO
+    ):
         """初始化日志管理器
-        
+
         Args:
             log_dir: 日志目录
+            queue_size: 日志队列容量（条），队列满时丢弃新记录
+            json_format: 文件日志是否使用 JSON 格式
+            max_bytes: 单个日志文件的最大字节数
+            backup_count: 保留的轮转文件数
+            compress: 轮转后的旧日志是否 gzip 压缩
+            console_level: 控制台输出级别
         """
         self.log_dir = log_dir
+        self.queue_size = queue_size
+        self.json_format = json_format
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.console_level = console_level
         self._loggers = {}
-        
+        self._queue = None
+        self._queue_handler = None
+        self._listener = None
+
         # 创建日志目录
         os.makedirs(log_dir, exist_ok=True)
-        
+
         # 配置根日志记录器
         self._configure_root_logger()
-    
+
     def _configure_root_logger(self):
         """配置根日志记录器"""
+        if LogManager._active is not None:
+            LogManager._active.shutdown()
+
         # 创建日志文件名
+        suffix = 'jsonl' if self.json_format else 'log'
         log_file = os.path.join(
             self.log_dir,
-            f"app_{datetime.now().strftime('%Y%m%d')}.log"
+            f"app_{datetime.now().strftime('%Y%m%d')}.{suffix}"
         )
-        
+
         # 配置日志格式
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-        
-        # 文件处理器
+
+        # 文件处理器（轮转和压缩在监听线程中执行）
         file_handler = RotatingFileHandler(
-            log_file, maxBytes=DEFAULT_LOG_MAX_SIZE, backupCount=5, encoding='utf-8'
+            log_file, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8'
         )
+        if self.compress:
+            file_handler.namer = _gzip_namer
+            file_handler.rotator = _gzip_rotator
         file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
-        
+        file_handler.setFormatter(JsonFormatter() if self.json_format else formatter)
+
         # 控制台处理器
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
+        console_handler.setLevel(self.console_level)
         console_handler.setFormatter(formatter)
-        
+
+        # 调用线程只把记录放入队列
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._queue_handler = _DroppingQueueHandler(self._queue)
+        self._listener = _ReportingQueueListener(
+            self._queue, self._queue_handler, file_handler, console_handler
+        )
+        self._listener.start()
+
         # 配置根记录器
         root_logger = logging.getLogger()
         root_logger.setLevel(logging.DEBUG)
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(console_handler)
-    
+        root_logger.addHandler(self._queue_handler)
+
+        LogManager._active = self
+        atexit.register(self.shutdown)
+
     def get_logger(self, name: str) -> logging.Logger:
         """获取日志记录器
-        
+
         Args:
             name: 记录器名称
-            
+
         Returns:
             日志记录器
         """
         if name not in self._loggers:
             self._loggers[name] = logging.getLogger(name)
-        
-        return self._loggers[name]
\ No newline at end of file
+
+        return self._loggers[name]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取日志队列统计
+
+        Returns:
+            {'queued': 队列中的记录数, 'capacity': 容量, 'dropped': 丢弃总数,
+             'dropped_by_level': {级别: 丢弃数}}
+        """
+        handler = self._queue_handler
+        if handler is None:
+            return {'queued': 0, 'capacity': self.queue_size, 'dropped': 0, 'dropped_by_level': {}}
+        with handler._drop_lock:
+            by_level = dict(handler.dropped)
+        return {
+            'queued': self._queue.qsize(),
+            'capacity': self.queue_size,
+            'dropped': sum(by_level.values()),
+            'dropped_by_level': by_level,
+        }
+
+    def shutdown(self):
+        """停止后台写日志线程（写完队列中剩余的记录），可重复调用"""
+        if self._listener is None:
+            return
+        logging.getLogger().removeHandler(self._queue_handler)
+        listener, self._listener = self._listener, None
+        try:
+            listener.stop()
+        except Exception:
+            pass
+        for handler in listener.handlers:
+            handler.close()
+        atexit.unregister(self.shutdown)
+        if LogManager._active is self:
+            LogManager._active = None
@@ -0,0 +1,460 @@
+"""进程内指标注册表
+
+提供计数器（Counter）、仪表（Gauge）和 HDR 风格的直方图（Histogram）：
+
+- 直方图按对数-线性分桶（每个2的幂区间再均分16个子桶），相对误差不超过约6%，
+  记录一次只是一次整数运算和一次字典累加，内存与样本数无关；
+- Gauge 可以绑定函数，在导出时才取值（如队列长度），热路径上没有开销；
+- 注册的收集函数（collector）在导出时返回额外的样本（如各缓存的命中率）；
+- MetricsExporter 后台线程定期把注册表写成 Prometheus 文本格式和 JSON 文件，
+  供外部采集。
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# 直方图分桶：小于 2 ** _SUB_BITS 的值精确计数，更大的值每个2的幂区间分 _SUB_HALF 个子桶
+_SUB_BITS = 5
+_SUB_HALF = 1 << (_SUB_BITS - 1)
+_SUB_COUNT = 1 << _SUB_BITS
+
+# 导出的分位数
+QUANTILES = (0.5, 0.9, 0.99)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_COUNT:
+        return value
+    shift = value.bit_length() - _SUB_BITS
+    return shift * _SUB_HALF + (value >> shift)
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """桶的取值范围 [下限, 上限]"""
+    if index < _SUB_COUNT:
+        return index, index
+    shift = index // _SUB_HALF - 1
+    mantissa = index % _SUB_HALF + _SUB_HALF
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class Counter:
+    """只增计数器"""
+
+    kind = 'counter'
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        """增加计数"""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """可增减的数值，或绑定函数在读取时取值"""
+
+    kind = 'gauge'
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self._value = 0.0
+        self._fn = fn
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        """设置数值"""
+        self._value = value
+
+    def inc(self, amount: float = 1):
+        """增加数值"""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        """减少数值"""
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return float('nan')
+        return self._value
+
+
+class Histogram:
+    """对数-线性分桶的直方图（HDR 风格）"""
+
+    kind = 'histogram'
+
+    def __init__(self, scale: float = 1e6):
+        """初始化直方图
+
+        Args:
+            scale: 记录前乘以的倍数，决定最小分辨率（默认把秒记录为微秒）
+        """
+        self.scale = scale
+        self._buckets: Dict[int, int] = {}
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """记录一个值（负值按0记录）"""
+        if value < 0:
+            value = 0.0
+        index = _bucket_index(int(value * self.scale))
+        with self._lock:
+            self._buckets[index] = self._buckets.get(index, 0) + 1
+            self._count += 1
+            self._sum += value
+            if value < self._min:
+                self._min = value
+            if value > self._max:
+                self._max = value
+
+    def time(self) -> '_Timer':
+        """计时上下文管理器，退出时记录耗时（秒）"""
+        return _Timer(self)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def percentile(self, q: float) -> float:
+        """分位数（桶中点），没有样本时为0
+
+        Args:
+            q: 0~1 之间的分位
+        """
+        with self._lock:
+            if not self._count:
+                return 0.0
+            buckets = sorted(self._buckets.items())
+            rank = max(1, math.ceil(q * self._count))
+            low, high = self._min, self._max
+        seen = 0
+        for index, count in buckets:
+            seen += count
+            if seen >= rank:
+                lower, upper = _bucket_bounds(index)
+                value = (lower + upper) / 2 / self.scale
+                return min(max(value, low), high)
+        return high
+
+    def summary(self) -> Dict[str, float]:
+        """数量、总和、最小/最大值和常用分位数"""
+        with self._lock:
+            count, total = self._count, self._sum
+            low = self._min if count else 0.0
+            high = self._max
+        result = {'count': count, 'sum': total, 'min': low, 'max': high}
+        for q in QUANTILES:
+            result[f'p{int(q * 100)}'] = self.percentile(q)
+        return result
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class TimedLock:
+    """记录争用等待时间的互斥锁
+
+    先尝试非阻塞获取，只有需要等待时才计时，无争用时几乎没有额外开销。
+    """
+
+    def __init__(self, histogram: Histogram, lock=None):
+        self.histogram = histogram
+        self._lock = lock or threading.Lock()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            return True
+        if not blocking:
+            return False
+        started = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        self.histogram.observe(time.perf_counter() - started)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class _Family:
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.children: Dict[LabelKey, Any] = {}
+
+
+class MetricsRegistry:
+    """指标注册表，线程安全"""
+
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, Any], float]]]] = []
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, kind: str, help_text: str, labels: Optional[Dict[str, Any]], factory: Callable):
+        key = _label_key(labels)
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = _Family(name, kind, help_text)
+            elif family.kind != kind:
+                raise ValueError(f"Metric {name} already registered as {family.kind}")
+            metric = family.children.get(key)
+            if metric is None:
+                metric = family.children[key] = factory()
+            return metric
+
+    def counter(self, name: str, help_text: str = '', labels: Optional[Dict[str, Any]] = None) -> Counter:
+        """获取（不存在时创建）计数器
+
+        Args:
+            name: 指标名
+            help_text: 说明
+            labels: 标签
+
+        Returns:
+            计数器，同名同标签返回同一对象
+        """
+        return self._get(name, 'counter', help_text, labels, Counter)
+
+    def gauge(
+        self,
+        name: str,
+        help_text: str = '',
+        labels: Optional[Dict[str, Any]] = None,
+        fn: Optional[Callable[[], float]] = None
+    ) -> Gauge:
+        """获取（不存在时创建）仪表
+
+        Args:
+            name: 指标名
+            help_text: 说明
+            labels: 标签
+            fn: 读取时调用的取值函数
+
+        Returns:
+            仪表
+        """
+        return self._get(name, 'gauge', help_text, labels, lambda: Gauge(fn))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str = '',
+        labels: Optional[Dict[str, Any]] = None,
+        scale: float = 1e6
+    ) -> Histogram:
+        """获取（不存在时创建）直方图
+
+        Args:
+            name: 指标名
+            help_text: 说明
+            labels: 标签
+            scale: 分辨率倍数（见 Histogram）
+
+        Returns:
+            直方图
+        """
+        return self._get(name, 'histogram', help_text, labels, lambda: Histogram(scale))
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, Any], float]]]):
+        """注册收集函数，导出时调用
+
+        Args:
+            collector: 返回 (指标名, 'counter'|'gauge', 说明, 标签, 值) 序列的函数
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[Dict[str, Any]]:
+        """当前全部指标
+
+        Returns:
+            [{'name', 'type', 'help', 'labels', 'value'}]，直方图的 value 为 summary() 字典
+        """
+        with self._lock:
+            families = [(f, list(f.children.items())) for f in self._families.values()]
+            collectors = list(self._collectors)
+
+        result = []
+        for family, children in sorted(families, key=lambda item: item[0].name):
+            for key, metric in sorted(children):
+                value = metric.summary() if family.kind == 'histogram' else metric.value
+                result.append({
+                    'name': family.name, 'type': family.kind, 'help': family.help,
+                    'labels': dict(key), 'value': value,
+                })
+        for collector in collectors:
+            try:
+                for name, kind, help_text, labels, value in collector():
+                    result.append({
+                        'name': name, 'type': kind, 'help': help_text,
+                        'labels': {str(k): str(v) for k, v in (labels or {}).items()}, 'value': value,
+                    })
+            except Exception:
+                continue
+        return result
+
+    def to_json(self) -> str:
+        """导出为 JSON"""
+        return json.dumps({'timestamp': time.time(), 'metrics': self.collect()}, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式（直方图导出为 summary）"""
+        # 同名样本必须连续输出
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for item in self.collect():
+            groups.setdefault(item['name'], []).append(item)
+
+        lines = []
+        for name, items in groups.items():
+            kind = items[0]['type']
+            if items[0]['help']:
+                lines.append(f"# HELP {name} {_escape_help(items[0]['help'])}")
+            lines.append(f"# TYPE {name} {'summary' if kind == 'histogram' else kind}")
+            for item in items:
+                labels = item['labels']
+                if kind == 'histogram':
+                    summary = item['value']
+                    for q in QUANTILES:
+                        quantile_labels = dict(labels, quantile=str(q))
+                        lines.append(
+                            f"{name}{_format_labels(quantile_labels)} {_format_value(summary[f'p{int(q * 100)}'])}"
+                        )
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(summary['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {summary['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(item['value'])}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value in (math.inf, -math.inf):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _write_atomic(path: str, content: str):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """定期把指标写入 metrics.prom 和 metrics.json"""
+
+    def __init__(self, registry: MetricsRegistry, directory: str, interval: float = 15.0, logger=None):
+        """初始化导出器
+
+        Args:
+            registry: 指标注册表
+            directory: 输出目录
+            interval: 导出间隔（秒）
+            logger: 日志记录器
+        """
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.logger = logger
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """启动后台导出线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='MetricsExporter')
+        self._thread.start()
+
+    def stop(self):
+        """停止导出线程并写最后一次"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.export()
+
+    def export(self) -> bool:
+        """立即导出一次
+
+        Returns:
+            是否成功
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            _write_atomic(os.path.join(self.directory, 'metrics.prom'), self.registry.to_prometheus())
+            _write_atomic(os.path.join(self.directory, 'metrics.json'), self.registry.to_json())
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to export metrics: {e}")
+            return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
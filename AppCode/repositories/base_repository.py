@@ -1,11 +1,16 @@
 """仓储基类
 
 提供通用的CRUD操作。
+
+数据访问层配置了查询缓存时，读操作的结果按 SQL 和参数缓存，并登记依赖的表和范围；
+create/update/delete 经数据访问层写入后，只有范围与写入行匹配的缓存项失效。
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Sequence
 from abc import ABC, abstractmethod
 
+from AppCode.data_access.query_cache import conditions_scope
+
 
 class BaseRepository(ABC):
     """仓储基类"""
@@ -25,6 +30,41 @@ class BaseRepository(ABC):
     def get_table_name(self) -> str:
         """获取表名"""
         pass
+
+    def _cached_query(
+        self,
+        sql: str,
+        params: Sequence[Any] = (),
+        scope=None,
+        loader: Optional[Callable[[], Any]] = None,
+        tables: Optional[Sequence[str]] = None
+    ) -> Any:
+        """执行查询，数据访问层配置了查询缓存时使用缓存结果
+
+        Args:
+            sql: 查询语句
+            params: 查询参数
+            scope: 结果依赖的范围（见 QueryCache），None 表示依赖整张表
+            loader: 查询函数，默认 execute_query(sql, params)
+            tables: 结果依赖的表，默认本仓储的表
+
+        Returns:
+            查询结果
+        """
+        if loader is None:
+            loader = lambda: self.db.execute_query(sql, tuple(params))
+        cache = getattr(self.db, 'query_cache', None)
+        if cache is None:
+            return loader()
+        return cache.get_or_load(sql, params, loader, tables or (self.get_table_name(),), scope)
+
+    def _cached_select(self, conditions: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按条件字典查询本表（带缓存）"""
+        table_name = self.get_table_name()
+        if getattr(self.db, 'query_cache', None) is None:
+            return self.db.query(table_name, conditions)
+        sql, params = self.db.build_select(table_name, conditions)
+        return self._cached_query(sql, params, conditions_scope(conditions))
     
     def create(self, data: Dict[str, Any]) -> str:
         """创建记录
@@ -61,7 +101,7 @@ class BaseRepository(ABC):
         table_name = self.get_table_name()
         
         try:
-            records = self.db.query(table_name, {'id': record_id})
+            records = self._cached_select({'id': record_id})
             return records[0] if records else None
         except Exception as e:
             if self.logger:
@@ -77,7 +117,7 @@ class BaseRepository(ABC):
         table_name = self.get_table_name()
         
         try:
-            return self.db.query(table_name, {})
+            return self._cached_select({})
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to get all records from {table_name}: {e}")
@@ -95,7 +135,7 @@ class BaseRepository(ABC):
         table_name = self.get_table_name()
         
         try:
-            return self.db.query(table_name, conditions)
+            return self._cached_select(conditions)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to query {table_name}: {e}")
@@ -172,7 +212,7 @@ class BaseRepository(ABC):
                 sql = f"SELECT COUNT(*) as cnt FROM {table_name}"
                 params = []
 
-            rows = self.db.execute_query(sql, tuple(params))
+            rows = self._cached_query(sql, params, conditions_scope(conditions))
             return rows[0]['cnt'] if rows else 0
         except Exception as e:
             if self.logger:
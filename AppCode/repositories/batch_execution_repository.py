@@ -7,6 +7,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from .base_repository import BaseRepository
+from AppCode.data_access.time_columns import day_range_ms
 
 
 class BatchExecutionRepository(BaseRepository):
@@ -50,16 +51,13 @@ class BatchExecutionRepository(BaseRepository):
         Returns:
             批次列表
         """
-        all_batches = self.get_all()
-        
-        # 按开始时间排序
-        sorted_batches = sorted(
-            all_batches,
-            key=lambda x: x.get('start_time', ''),
-            reverse=True
-        )
-        
-        return sorted_batches[:limit]
+        try:
+            sql = "SELECT * FROM batch_executions ORDER BY start_ms DESC LIMIT ?"
+            return self._cached_query(sql, (limit,))
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get recent batches: {e}")
+            return []
     
     def get_by_date_range(
         self,
@@ -69,21 +67,21 @@ class BatchExecutionRepository(BaseRepository):
         """获取日期范围内的批次
         
         Args:
-            start_date: 开始日期
-            end_date: 结束日期
+            start_date: 开始日期（格式：yyyy-MM-dd）
+            end_date: 结束日期（格式：yyyy-MM-dd）
             
         Returns:
             批次列表
         """
-        all_batches = self.get_all()
-        
-        filtered = []
-        for batch in all_batches:
-            start_time = batch.get('start_time', '')
-            if start_date <= start_time <= end_date:
-                filtered.append(batch)
-        
-        return filtered
+        try:
+            start_ms, end_ms = day_range_ms(start_date, end_date)
+            sql = "SELECT * FROM batch_executions WHERE start_ms >= ? AND start_ms <= ?"
+            scope = (('ge', 'start_ms', start_ms), ('le', 'start_ms', end_ms))
+            return self._cached_query(sql, (start_ms, end_ms), scope)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get batches by date range: {e}")
+            return []
     
     def get_statistics(self) -> Dict[str, Any]:
         """获取批次统计信息
@@ -91,10 +89,8 @@ class BatchExecutionRepository(BaseRepository):
         Returns:
             统计信息
         """
-        all_batches = self.get_all()
-        
         stats = {
-            'total': len(all_batches),
+            'total': 0,
             'by_status': {},
             'total_scripts': 0,
             'total_duration': 0,
@@ -102,35 +98,25 @@ class BatchExecutionRepository(BaseRepository):
             'average_scripts_per_batch': 0
         }
         
-        durations = []
-        script_counts = []
-        
-        for batch in all_batches:
-            # 统计状态
-            status = batch.get('status', 'unknown')
-            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-            
-            # 统计脚本数
-            script_count = batch.get('total_scripts', 0)
-            stats['total_scripts'] += script_count
-            script_counts.append(script_count)
-            
-            # 统计时长
-            if batch.get('start_time') and batch.get('end_time'):
-                try:
-                    start = datetime.fromisoformat(batch['start_time'])
-                    end = datetime.fromisoformat(batch['end_time'])
-                    duration = (end - start).total_seconds()
-                    durations.append(duration)
-                    stats['total_duration'] += duration
-                except Exception:
-                    pass
-        
-        if durations:
-            stats['average_duration'] = sum(durations) / len(durations)
-        
-        if script_counts:
-            stats['average_scripts_per_batch'] = sum(script_counts) / len(script_counts)
+        try:
+            for row in self.db.execute_query(
+                "SELECT status, COUNT(*) AS n FROM batch_executions GROUP BY status"
+            ):
+                stats['by_status'][row['status'] or 'unknown'] = row['n']
+            totals = self.db.execute_query(
+                "SELECT COUNT(*) AS n, SUM(total_scripts) AS total_scripts, "
+                "AVG(COALESCE(total_scripts, 0)) AS average_scripts, "
+                "SUM(duration_ms) / 1000.0 AS total_duration, "
+                "AVG(duration_ms) / 1000.0 AS average_duration FROM batch_executions"
+            )[0]
+            stats['total'] = totals['n']
+            stats['total_scripts'] = totals['total_scripts'] or 0
+            stats['average_scripts_per_batch'] = totals['average_scripts'] or 0
+            stats['total_duration'] = totals['total_duration'] or 0
+            stats['average_duration'] = totals['average_duration'] or 0
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get batch statistics: {e}")
         
         return stats
     
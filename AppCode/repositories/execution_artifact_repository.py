@@ -0,0 +1,111 @@
+"""执行附加数据仓储
+
+按类型保存与执行记录关联的 JSON 数据（如脚本剖析结果、执行时间线），每个执行每种类型一条。
+"""
+
+import json
+from typing import List, Dict, Any, Optional
+
+from .base_repository import BaseRepository
+
+
+class ExecutionArtifactRepository(BaseRepository):
+    """执行附加数据仓储"""
+
+    def get_table_name(self) -> str:
+        """获取表名"""
+        return 'execution_artifacts'
+
+    def save(self, execution_id: str, kind: str, data: Any) -> bool:
+        """保存附加数据（同一执行同一类型重复保存时覆盖）
+
+        Args:
+            execution_id: 执行ID
+            kind: 数据类型（如 profile）
+            data: 可JSON序列化的数据
+
+        Returns:
+            是否成功
+        """
+        try:
+            self.db.execute_non_query(
+                "INSERT INTO execution_artifacts (execution_id, kind, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(execution_id, kind) DO UPDATE SET "
+                "data = excluded.data, created_at = CURRENT_TIMESTAMP",
+                (execution_id, kind, json.dumps(data, ensure_ascii=False))
+            )
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to save {kind} for {execution_id}: {e}")
+            return False
+
+    def get(self, execution_id: str, kind: str) -> Optional[Any]:
+        """获取附加数据
+
+        Args:
+            execution_id: 执行ID
+            kind: 数据类型
+
+        Returns:
+            数据，不存在时返回None
+        """
+        try:
+            rows = self.db.execute_query(
+                "SELECT data FROM execution_artifacts WHERE execution_id = ? AND kind = ?",
+                (execution_id, kind)
+            )
+            return json.loads(rows[0]['data']) if rows and rows[0]['data'] else None
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get {kind} for {execution_id}: {e}")
+            return None
+
+    def get_many(self, execution_ids: List[str], kind: str) -> Dict[str, Any]:
+        """批量获取多个执行的同类附加数据
+
+        Args:
+            execution_ids: 执行ID列表
+            kind: 数据类型
+
+        Returns:
+            {执行ID: 数据}，没有数据的执行不包含在结果中
+        """
+        results = {}
+        try:
+            # 分批查询，避免超过SQLite参数数量限制
+            for offset in range(0, len(execution_ids), 500):
+                chunk = execution_ids[offset:offset + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.db.execute_query(
+                    f"SELECT execution_id, data FROM execution_artifacts "
+                    f"WHERE kind = ? AND execution_id IN ({placeholders})",
+                    (kind, *chunk)
+                )
+                for row in rows:
+                    if row['data']:
+                        results[row['execution_id']] = json.loads(row['data'])
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get {kind} artifacts: {e}")
+        return results
+
+    def get_by_execution(self, execution_id: str) -> Dict[str, Any]:
+        """获取执行的全部附加数据
+
+        Args:
+            execution_id: 执行ID
+
+        Returns:
+            {数据类型: 数据}
+        """
+        try:
+            rows = self.db.execute_query(
+                "SELECT kind, data FROM execution_artifacts WHERE execution_id = ?",
+                (execution_id,)
+            )
+            return {row['kind']: json.loads(row['data']) for row in rows if row['data']}
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get artifacts for {execution_id}: {e}")
+            return {}
@@ -1,12 +1,18 @@
 """执行历史仓储
 
-管理脚本执行历史记录。
+管理脚本执行历史记录。数据访问对象配置了 HistoryArchive 时，查询同时包含已归档的记录
+（同一 ID 两边都有时以主库为准）；归档的记录只读。
 """
 
+import re
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from .base_repository import BaseRepository
+from AppCode.data_access.time_columns import day_range_ms, to_epoch_ms
+
+
+_COLUMN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
 
 
 class ExecutionHistoryRepository(BaseRepository):
@@ -16,6 +22,50 @@ class ExecutionHistoryRepository(BaseRepository):
         """获取表名"""
         return 'execution_history'
     
+    def _archive(self):
+        """已有归档文件时返回 HistoryArchive，否则返回None"""
+        archive = getattr(self.db, 'archive', None)
+        return archive if archive and archive.months() else None
+    
+    @staticmethod
+    def _merge(records: List[Dict[str, Any]], archived: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """归档记录（较早）在前，主库记录在后；归档中途中断时同一记录可能两边都有，以主库为准"""
+        hot_ids = {record['id'] for record in records}
+        return [r for r in archived if r['id'] not in hot_ids] + records
+    
+    def get_all(self) -> List[Dict[str, Any]]:
+        """获取所有执行记录（包括已归档的记录）
+        
+        Returns:
+            记录列表
+        """
+        return self.query({})
+    
+    def query(self, conditions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """按列值相等条件查询执行记录（包括已归档的记录）
+        
+        Args:
+            conditions: 查询条件
+            
+        Returns:
+            记录列表
+        """
+        records = super().query(conditions)
+        archive = self._archive()
+        if archive is None:
+            return records
+        try:
+            for column in conditions:
+                if not _COLUMN.match(column):
+                    raise ValueError(f"Invalid column name: {column}")
+            where = ' AND '.join(f"{column} = ?" for column in conditions) or '1'
+            archived = archive.query(f"SELECT * FROM {{table}} WHERE {where}", tuple(conditions.values()))
+            return self._merge(records, archived)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to query archived records: {e}")
+            return records
+    
     def get_by_script(self, script_path: str) -> List[Dict[str, Any]]:
         """获取指定脚本的执行历史
         
@@ -38,8 +88,27 @@ class ExecutionHistoryRepository(BaseRepository):
         """
         return self.query({'status': status})
     
+    def get_by_id(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """根据ID获取执行记录（主库中没有时查找归档）
+        
+        Args:
+            record_id: 执行ID
+            
+        Returns:
+            执行记录或None
+        """
+        record = super().get_by_id(record_id)
+        archive = getattr(self.db, 'archive', None)
+        if record is None and archive:
+            try:
+                record = archive.find_by_id(record_id)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Failed to get archived record {record_id}: {e}")
+        return record
+    
     def get_by_batch(self, batch_id: str) -> List[Dict[str, Any]]:
-        """获取批次的所有执行记录
+        """获取批次的所有执行记录（包括已归档的记录）
         
         Args:
             batch_id: 批次ID
@@ -47,7 +116,16 @@ class ExecutionHistoryRepository(BaseRepository):
         Returns:
             执行记录列表
         """
-        return self.query({'batch_id': batch_id})
+        records = super().query({'batch_id': batch_id})
+        archive = self._archive()
+        if archive:
+            try:
+                # 只查找批次开始月份及之后的归档
+                records = self._merge(records, archive.query_batch(batch_id))
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Failed to get archived records for batch {batch_id}: {e}")
+        return records
     
     def get_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
         """获取最近的执行记录
@@ -59,8 +137,19 @@ class ExecutionHistoryRepository(BaseRepository):
             执行记录列表
         """
         try:
-            sql = "SELECT * FROM execution_history ORDER BY start_time DESC LIMIT ?"
-            return self.db.execute_query(sql, (limit,))
+            sql = "SELECT * FROM execution_history ORDER BY start_ms DESC LIMIT ?"
+            records = self._cached_query(sql, (limit,))
+            archive = self._archive()
+            if archive and len(records) < limit:
+                # 归档记录都早于主库记录：从最近的月份开始补足
+                need = limit - len(records)
+                archived = archive.query(
+                    "SELECT * FROM {table} ORDER BY start_ms DESC LIMIT ?", (need,),
+                    newest_first=True, stop=lambda rows: len(rows) >= need
+                )
+                hot_ids = {record['id'] for record in records}
+                records = records + [r for r in archived if r['id'] not in hot_ids][:need]
+            return records
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to get recent records: {e}")
@@ -73,6 +162,8 @@ class ExecutionHistoryRepository(BaseRepository):
     ) -> List[Dict[str, Any]]:
         """获取日期范围内的执行记录
         
+        范围覆盖到已归档的月份时，同时查询对应的归档文件。
+        
         Args:
             start_date: 开始日期（格式：yyyy-MM-dd）
             end_date: 结束日期（格式：yyyy-MM-dd）
@@ -81,61 +172,218 @@ class ExecutionHistoryRepository(BaseRepository):
             执行记录列表
         """
         try:
-            # 使用 T 前缀格式以匹配 isoformat() 存储的格式（如 2026-04-04T10:30:00）
-            start_datetime = f"{start_date}T00:00:00"
-            end_datetime = f"{end_date}T23:59:59"
-            sql = "SELECT * FROM execution_history WHERE start_time >= ? AND start_time <= ?"
-            return self.db.execute_query(sql, (start_datetime, end_datetime))
+            start_ms, end_ms = day_range_ms(start_date, end_date)
+            sql = "SELECT * FROM execution_history WHERE start_ms >= ? AND start_ms <= ?"
+            # 只有 start_ms 落在该范围内的写入才会使缓存失效
+            scope = (('ge', 'start_ms', start_ms), ('le', 'start_ms', end_ms))
+            records = self._cached_query(sql, (start_ms, end_ms), scope)
+            archive = self._archive()
+            if archive and archive.months_in_range(start_ms, end_ms):
+                records = self._merge(records, archive.query_range(start_ms, end_ms))
+            return records
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to get records by date range: {e}")
             return []
     
+    def get_average_durations(self, script_paths: List[str]) -> Dict[str, float]:
+        """获取脚本的历史平均耗时
+        
+        Args:
+            script_paths: 脚本路径列表
+            
+        Returns:
+            {脚本路径: 平均耗时（秒）}，没有完整执行记录的脚本不包含在内；
+            模拟台架执行（虚拟时钟）不计入
+        """
+        if not script_paths:
+            return {}
+        
+        totals = {}
+        archive = self._archive()
+        try:
+            # 分批查询，避免超过 SQLite 参数数量上限
+            for i in range(0, len(script_paths), 500):
+                chunk = script_paths[i:i + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                sql = (
+                    "SELECT script_path, SUM(duration_ms) AS total_ms, COUNT(duration_ms) AS n "
+                    "FROM {table} e "
+                    f"WHERE script_path IN ({placeholders}) AND duration_ms IS NOT NULL "
+                    "AND NOT EXISTS (SELECT 1 FROM execution_artifacts a "
+                    "WHERE a.execution_id = e.id AND a.kind = 'dry_run') "
+                    "GROUP BY script_path"
+                )
+                rows = self.db.execute_query(sql.format(table='execution_history'), tuple(chunk))
+                if archive:
+                    rows += archive.query(sql, tuple(chunk))
+                for row in rows:
+                    total = totals.setdefault(row['script_path'], [0, 0])
+                    total[0] += row['total_ms'] or 0
+                    total[1] += row['n']
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get average durations: {e}")
+        return {path: total_ms / n / 1000.0 for path, (total_ms, n) in totals.items() if n}
+
+    def get_duration_samples(
+        self,
+        script_paths: List[str],
+        limit_per_script: int = 30
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """获取脚本最近正常结束的执行耗时样本
+
+        只统计成功/失败结束的记录（超时、取消的耗时不反映脚本本身）。
+
+        Args:
+            script_paths: 脚本路径列表
+            limit_per_script: 每个脚本最多返回的最近样本数
+
+        Returns:
+            {脚本路径: [{'id': 执行ID, 'duration': 耗时（秒）}, ...]}，按时间倒序
+        """
+        if not script_paths:
+            return {}
+
+        samples = {}
+        archive = self._archive()
+        sql = (
+            "SELECT id, script_path, duration FROM ("
+            "SELECT id, script_path, duration_ms / 1000.0 AS duration, "
+            "ROW_NUMBER() OVER (PARTITION BY script_path ORDER BY start_ms DESC) AS rn "
+            "FROM {table} "
+            "WHERE script_path IN ({placeholders}) "
+            "AND status IN ('SUCCESS', 'FAILED') AND duration_ms IS NOT NULL"
+            ") WHERE rn <= ? ORDER BY script_path, rn"
+        )
+
+        def add(rows):
+            for row in rows:
+                items = samples.setdefault(row['script_path'], [])
+                if row['duration'] is not None and len(items) < limit_per_script \
+                        and all(item['id'] != row['id'] for item in items):
+                    items.append({'id': row['id'], 'duration': row['duration']})
+
+        try:
+            for i in range(0, len(script_paths), 500):
+                chunk = script_paths[i:i + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                add(self.db.execute_query(
+                    sql.format(table='execution_history', placeholders=placeholders),
+                    tuple(chunk) + (limit_per_script,)
+                ))
+                short = [path for path in chunk if len(samples.get(path, [])) < limit_per_script]
+                if archive and short:
+                    # 样本不足的脚本从最近的归档月份开始补足
+                    placeholders = ', '.join('?' for _ in short)
+                    add(archive.query(
+                        sql.format(table='{table}', placeholders=placeholders),
+                        tuple(short) + (limit_per_script,), newest_first=True,
+                        stop=lambda rows: all(
+                            len(samples.get(path, [])) + sum(r['script_path'] == path for r in rows)
+                            >= limit_per_script for path in short
+                        )
+                    ))
+            samples = {path: items for path, items in samples.items() if items}
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get duration samples: {e}")
+        return samples
+
+    def get_latest_by_scripts(self, script_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """获取每个脚本最近一次执行记录
+
+        Args:
+            script_paths: 脚本路径列表
+
+        Returns:
+            {脚本路径: 执行记录（id、status、test_result、start_time、end_time）}，
+            没有执行记录的脚本不包含在内
+        """
+        if not script_paths:
+            return {}
+
+        latest = {}
+        archive = self._archive()
+        sql = (
+            "SELECT id, script_path, status, test_result, start_time, end_time FROM ("
+            "SELECT id, script_path, status, test_result, start_time, end_time, "
+            "ROW_NUMBER() OVER (PARTITION BY script_path ORDER BY start_ms DESC) AS rn "
+            "FROM {table} "
+            "WHERE script_path IN ({placeholders})"
+            ") WHERE rn = 1"
+        )
+        try:
+            for i in range(0, len(script_paths), 500):
+                chunk = script_paths[i:i + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                for row in self.db.execute_query(
+                    sql.format(table='execution_history', placeholders=placeholders), tuple(chunk)
+                ):
+                    latest[row['script_path']] = row
+                missing = [path for path in chunk if path not in latest]
+                if archive and missing:
+                    # 主库中没有记录的脚本从最近的归档月份开始查找
+                    placeholders = ', '.join('?' for _ in missing)
+                    rows = archive.query(
+                        sql.format(table='{table}', placeholders=placeholders), tuple(missing),
+                        newest_first=True,
+                        stop=lambda found: len({r['script_path'] for r in found}) >= len(missing)
+                    )
+                    for row in rows:
+                        latest.setdefault(row['script_path'], row)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get latest executions: {e}")
+        return latest
+
     def get_statistics(self) -> Dict[str, Any]:
         """获取执行统计信息
         
         Returns:
             统计信息
         """
-        all_records = self.get_all()
-        
         stats = {
-            'total': len(all_records),
+            'total': 0,
             'by_status': {},
             'by_script': {},
             'total_duration': 0,
             'average_duration': 0
         }
         
-        durations = []
+        archive = self._archive()
+
+        def rows(sql):
+            result = self.db.execute_query(sql.format(table='execution_history'))
+            if archive:
+                # 归档文件只在归档时变化，按月份缓存聚合结果
+                result += archive.query(sql, cached=True)
+            return result
         
-        for record in all_records:
-            # 统计状态
-            status = record.get('status', 'unknown')
-            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-            
-            # 统计脚本
-            script = record.get('script_path', 'unknown')
-            stats['by_script'][script] = stats['by_script'].get(script, 0) + 1
-            
-            # 统计时长
-            if record.get('start_time') and record.get('end_time'):
-                try:
-                    start = datetime.fromisoformat(record['start_time'])
-                    end = datetime.fromisoformat(record['end_time'])
-                    duration = (end - start).total_seconds()
-                    durations.append(duration)
-                    stats['total_duration'] += duration
-                except Exception:
-                    pass
-        
-        if durations:
-            stats['average_duration'] = sum(durations) / len(durations)
+        try:
+            for row in rows("SELECT status, COUNT(*) AS n FROM {table} GROUP BY status"):
+                key = row['status'] or 'unknown'
+                stats['by_status'][key] = stats['by_status'].get(key, 0) + row['n']
+            for row in rows("SELECT script_path, COUNT(*) AS n FROM {table} GROUP BY script_path"):
+                key = row['script_path'] or 'unknown'
+                stats['by_script'][key] = stats['by_script'].get(key, 0) + row['n']
+            total_ms, timed = 0, 0
+            for row in rows(
+                "SELECT COUNT(*) AS n, SUM(duration_ms) AS total_ms, COUNT(duration_ms) AS timed FROM {table}"
+            ):
+                stats['total'] += row['n']
+                total_ms += row['total_ms'] or 0
+                timed += row['timed']
+            stats['total_duration'] = total_ms / 1000.0
+            stats['average_duration'] = total_ms / timed / 1000.0 if timed else 0
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get execution statistics: {e}")
         
         return stats
     
     def delete_old_records(self, days: int = 30) -> int:
-        """删除旧记录
+        """删除旧记录（需要保留旧记录时使用 HistoryArchive 归档）
         
         Args:
             days: 保留天数
@@ -145,17 +393,15 @@ class ExecutionHistoryRepository(BaseRepository):
         """
         from datetime import timedelta
         
-        cutoff_date = datetime.now() - timedelta(days=days)
-        cutoff_str = cutoff_date.isoformat()
-        
-        all_records = self.get_all()
+        cutoff_ms = to_epoch_ms(datetime.now() - timedelta(days=days))
+        old_records = self.db.execute_query(
+            "SELECT id FROM execution_history WHERE start_ms < ?", (cutoff_ms,)
+        )
         deleted_count = 0
         
-        for record in all_records:
-            start_time = record.get('start_time', '')
-            if start_time and start_time < cutoff_str:
-                if self.delete(record['id']):
-                    deleted_count += 1
+        for record in old_records:
+            if self.delete(record['id']):
+                deleted_count += 1
         
         if self.logger:
             self.logger.info(f"Deleted {deleted_count} old execution records")
@@ -0,0 +1,326 @@
+"""测量值仓储
+
+管理从脚本输出中提取的结构化测量值。
+"""
+
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+from .base_repository import BaseRepository
+
+
+# 已解析过输出但没有测量值的执行，在 execution_artifacts 中记录的标记类型
+SCANNED_KIND = 'measurements_scanned'
+
+
+class MeasurementRepository(BaseRepository):
+    """测量值仓储"""
+
+    _COLUMNS = (
+        'execution_id', 'script_path', 'name', 'value', 'text_value', 'unit',
+        'lower_limit', 'upper_limit', 'source', 'line_no', 'timestamp'
+    )
+
+    def __init__(self, db_manager, logger=None):
+        """初始化仓储
+
+        Args:
+            db_manager: 数据库管理器
+            logger: 日志记录器
+        """
+        super().__init__(db_manager, logger)
+        # 写入计数，参与数据版本计算
+        self._write_count = 0
+
+    def get_table_name(self) -> str:
+        """获取表名"""
+        return 'measurements'
+
+    def save_for_execution(self, execution_id: str, rows: List[Dict[str, Any]]) -> int:
+        """保存一次执行的全部测量值（先删除旧值，保证重复保存幂等）
+
+        Args:
+            execution_id: 执行ID
+            rows: 测量值行列表
+
+        Returns:
+            写入的行数
+        """
+        columns = ', '.join(self._COLUMNS)
+        placeholders = ', '.join('?' for _ in self._COLUMNS)
+        sql = f"INSERT INTO measurements ({columns}) VALUES ({placeholders})"
+        params = [
+            tuple(execution_id if col == 'execution_id' else row.get(col) for col in self._COLUMNS)
+            for row in rows
+        ]
+        try:
+            # 删除和写入在同一事务中：写入失败时保留旧值，并发保存不会产生重复行
+            with self.db.transaction(('measurements',)) as conn:
+                conn.execute("DELETE FROM measurements WHERE execution_id = ?", (execution_id,))
+                if params:
+                    conn.executemany(sql, params)
+            self._write_count += 1
+            if not rows:
+                return 0
+
+            if self.logger:
+                self.logger.info(f"Saved {len(rows)} measurements for {execution_id}")
+            return len(rows)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to save measurements for {execution_id}: {e}")
+            return 0
+
+    def get_by_execution(self, execution_id: str) -> List[Dict[str, Any]]:
+        """获取一次执行的测量值
+
+        Args:
+            execution_id: 执行ID
+
+        Returns:
+            测量值列表（按输出行顺序）
+        """
+        try:
+            sql = "SELECT * FROM measurements WHERE execution_id = ? ORDER BY line_no, id"
+            return self.db.execute_query(sql, (execution_id,))
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get measurements for {execution_id}: {e}")
+            return []
+
+    def get_by_name(
+        self,
+        name: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        script_path: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """获取指定信号/指标的历史测量值
+
+        Args:
+            name: 信号名或指标名
+            start_time: 开始时间（ISO格式，可选）
+            end_time: 结束时间（ISO格式，可选）
+            script_path: 脚本路径（可选）
+
+        Returns:
+            测量值列表（按时间升序）
+        """
+        sql = "SELECT * FROM measurements WHERE name = ?"
+        params = [name]
+        if start_time:
+            sql += " AND timestamp >= ?"
+            params.append(start_time)
+        if end_time:
+            sql += " AND timestamp <= ?"
+            params.append(end_time)
+        if script_path:
+            sql += " AND script_path = ?"
+            params.append(script_path)
+        sql += " ORDER BY timestamp, line_no"
+
+        try:
+            return self.db.execute_query(sql, tuple(params))
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get measurements by name {name}: {e}")
+            return []
+
+    @staticmethod
+    def _numeric_filter(
+        start_time: Optional[str],
+        end_time: Optional[str],
+        script_path: Optional[str],
+        max_id: Optional[int]
+    ):
+        """构建单个信号数值型测量值的过滤条件（第一个参数为信号名）"""
+        sql = " WHERE name = ? AND value IS NOT NULL"
+        params = []
+        if start_time:
+            sql += " AND timestamp >= ?"
+            params.append(start_time)
+        if end_time:
+            sql += " AND timestamp <= ?"
+            params.append(end_time)
+        if script_path:
+            sql += " AND script_path = ?"
+            params.append(script_path)
+        if max_id is not None:
+            sql += " AND id <= ?"
+            params.append(max_id)
+        return sql, params
+
+    def iter_numeric_series(
+        self,
+        names: Optional[List[str]] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        script_path: Optional[str] = None,
+        max_id: Optional[int] = None
+    ) -> Iterator[Tuple[tuple, List[tuple]]]:
+        """逐个信号返回数值型测量值及其分组汇总（按名称排序）
+
+        全部查询在同一个读事务中执行。每个信号的数值、首末时间和上下限都沿
+        (name, timestamp, value) 覆盖索引按信号定位读取，不对全表做分组排序。
+
+        Args:
+            names: 信号名列表（None表示全部）
+            start_time: 开始时间（ISO格式，可选）
+            end_time: 结束时间（ISO格式，可选）
+            script_path: 脚本路径（可选）
+            max_id: 只返回 id 不大于该值的行（与数据版本保持同一快照）
+
+        Yields:
+            (group, rows) 元组：group 为
+            (name, count, first_time, last_time, lower_limit, upper_limit)，
+            上下限取过滤范围内该信号最近一条记录的值；rows 为按时间排序的 (value,) 元组列表。
+            过滤后没有数值的信号不返回
+        """
+        where, params = self._numeric_filter(start_time, end_time, script_path, max_id)
+        values_sql = f"SELECT value FROM measurements{where} ORDER BY timestamp"
+        first_sql = f"SELECT MIN(timestamp) FROM measurements{where}"
+        # 最近一条：最大时间戳上 id 最大的记录
+        last_sql = (
+            "SELECT timestamp, lower_limit, upper_limit FROM measurements WHERE id = "
+            f"(SELECT MAX(id) FROM measurements{where} AND timestamp IS "
+            f"(SELECT MAX(timestamp) FROM measurements{where}))"
+        )
+        try:
+            with self.db.snapshot() as conn:
+                if names:
+                    names = sorted(set(names))
+                elif script_path:
+                    names = [row[0] for row in conn.execute(
+                        "SELECT DISTINCT name FROM measurements WHERE script_path = ? ORDER BY name",
+                        (script_path,)
+                    )]
+                else:
+                    names = [row[0] for row in conn.execute(
+                        "SELECT DISTINCT name FROM measurements ORDER BY name"
+                    )]
+
+                for name in names:
+                    name_params = (name, *params)
+                    rows = conn.execute(values_sql, name_params).fetchall()
+                    if not rows:
+                        continue
+                    first_time = conn.execute(first_sql, name_params).fetchone()[0]
+                    last = conn.execute(last_sql, name_params * 2).fetchone() or (None, None, None)
+                    yield (name, len(rows), first_time) + tuple(last), rows
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to load numeric measurements: {e}")
+
+    def get_data_version(self) -> tuple:
+        """获取测量值数据版本，数据变化后版本随之变化
+
+        版本由最大行ID和本仓储的写入计数组成：新增行会增大最大ID，
+        仅删除时由写入计数区分。两者都无需扫描全表。
+
+        Returns:
+            (max_id, write_count) 元组
+        """
+        try:
+            rows = self.db.execute_query_rows("SELECT MAX(id) FROM measurements")
+            max_id = rows[0][0] if rows else None
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get measurement data version: {e}")
+            max_id = None
+        return (max_id, self._write_count)
+
+    def get_uncaptured_execution_ids(
+        self,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> List[str]:
+        """获取有输出但尚未解析过测量值的执行ID（模拟台架执行除外）
+
+        Args:
+            start_time: 开始时间（ISO格式，可选）
+            end_time: 结束时间（ISO格式，可选）
+
+        Returns:
+            执行ID列表
+        """
+        sql = ("SELECT e.id FROM execution_history e WHERE e.output IS NOT NULL AND e.output != '' "
+               "AND NOT EXISTS (SELECT 1 FROM measurements m WHERE m.execution_id = e.id) "
+               "AND NOT EXISTS (SELECT 1 FROM execution_artifacts a "
+               "WHERE a.execution_id = e.id AND a.kind IN ('dry_run', ?))")
+        params = [SCANNED_KIND]
+        if start_time:
+            sql += " AND e.start_time >= ?"
+            params.append(start_time)
+        if end_time:
+            sql += " AND e.start_time <= ?"
+            params.append(end_time)
+
+        try:
+            return [row[0] for row in self.db.execute_query_rows(sql, tuple(params))]
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get uncaptured executions: {e}")
+            return []
+
+    def mark_scanned(self, execution_ids: List[str]) -> bool:
+        """记录已解析过输出但没有测量值的执行（持久保存，重启后不再解析）
+
+        Args:
+            execution_ids: 执行ID列表
+
+        Returns:
+            是否成功
+        """
+        if not execution_ids:
+            return True
+        try:
+            self.db.execute_many(
+                "INSERT OR IGNORE INTO execution_artifacts (execution_id, kind) VALUES (?, ?)",
+                [(execution_id, SCANNED_KIND) for execution_id in execution_ids]
+            )
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to mark scanned executions: {e}")
+            return False
+
+    def get_names(self, script_path: Optional[str] = None) -> List[str]:
+        """获取已记录的信号/指标名称
+
+        Args:
+            script_path: 脚本路径（可选）
+
+        Returns:
+            名称列表
+        """
+        try:
+            if script_path:
+                rows = self.db.execute_query(
+                    "SELECT DISTINCT name FROM measurements WHERE script_path = ? ORDER BY name",
+                    (script_path,)
+                )
+            else:
+                rows = self.db.execute_query("SELECT DISTINCT name FROM measurements ORDER BY name")
+            return [row['name'] for row in rows]
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get measurement names: {e}")
+            return []
+
+    def delete_by_execution(self, execution_id: str) -> int:
+        """删除一次执行的测量值
+
+        Args:
+            execution_id: 执行ID
+
+        Returns:
+            删除的行数
+        """
+        try:
+            self._write_count += 1
+            return self.db.execute_non_query(
+                "DELETE FROM measurements WHERE execution_id = ?", (execution_id,)
+            )
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to delete measurements for {execution_id}: {e}")
+            return 0
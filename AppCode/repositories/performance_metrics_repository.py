@@ -1,6 +1,12 @@
 """性能指标仓储
 
 负责性能指标数据的持久化操作。
+
+系统监控的时间序列分层保存（时间为 Unix 时间戳秒）：
+
+- performance_samples：原始采样，每个监控周期一行；
+- performance_rollups：按分辨率（秒）聚合的桶，主键 (resolution, bucket)，
+  保存采样数、平均值和最大值，聚合可重复执行（覆盖同一个桶）。
 """
 
 from typing import List, Dict, Any, Optional
@@ -48,6 +54,34 @@ class PerformanceMetricsRepository:
         self.db.execute_non_query(create_index_sql_1)
         self.db.execute_non_query(create_index_sql_2)
 
+        self.db.execute_non_query("""
+        CREATE TABLE IF NOT EXISTS performance_samples (
+            ts REAL NOT NULL,
+            cpu_percent REAL,
+            memory_percent REAL,
+            disk_percent REAL,
+            process_cpu REAL,
+            process_memory_mb REAL
+        )
+        """)
+        self.db.execute_non_query(
+            "CREATE INDEX IF NOT EXISTS idx_perf_samples_ts ON performance_samples(ts)"
+        )
+        self.db.execute_non_query("""
+        CREATE TABLE IF NOT EXISTS performance_rollups (
+            resolution INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            samples INTEGER NOT NULL,
+            cpu_avg REAL,
+            cpu_max REAL,
+            memory_avg REAL,
+            memory_max REAL,
+            disk_avg REAL,
+            process_memory_max REAL,
+            PRIMARY KEY (resolution, bucket)
+        ) WITHOUT ROWID
+        """)
+
     def create(self, metrics: Dict[str, Any]) -> str:
         """创建性能指标记录
 
@@ -214,6 +248,132 @@ class PerformanceMetricsRepository:
         # SQLiteDataAccess 不返回 rowcount，返回 0 表示操作完成
         return 0
 
+    def add_sample(self, sample: Dict[str, Any]):
+        """保存一条系统监控原始采样
+
+        Args:
+            sample: 采样数据（ts 为 Unix 时间戳秒）
+        """
+        self.db.execute_non_query(
+            "INSERT INTO performance_samples "
+            "(ts, cpu_percent, memory_percent, disk_percent, process_cpu, process_memory_mb) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (sample['ts'], sample.get('cpu_percent'), sample.get('memory_percent'),
+             sample.get('disk_percent'), sample.get('process_cpu'), sample.get('process_memory_mb'))
+        )
+
+    def latest_bucket(self, resolution: int) -> Optional[int]:
+        """指定分辨率已聚合的最新桶
+
+        Args:
+            resolution: 分辨率（秒）
+
+        Returns:
+            桶起始时间戳，没有聚合数据时返回None
+        """
+        rows = self.db.execute_query(
+            "SELECT MAX(bucket) AS bucket FROM performance_rollups WHERE resolution = ?", (resolution,)
+        )
+        return rows[0]['bucket'] if rows else None
+
+    def rollup(self, resolution: int, source_resolution: int, since: float, until: float):
+        """把 [since, until) 内的数据聚合为 resolution 秒的桶
+
+        Args:
+            resolution: 目标分辨率（秒）
+            source_resolution: 来源分辨率，0 表示原始采样
+            since: 开始时间戳（应与目标桶对齐）
+            until: 结束时间戳（只应包含已完整的桶）
+        """
+        upsert = """
+        ON CONFLICT(resolution, bucket) DO UPDATE SET
+            samples = excluded.samples, cpu_avg = excluded.cpu_avg, cpu_max = excluded.cpu_max,
+            memory_avg = excluded.memory_avg, memory_max = excluded.memory_max,
+            disk_avg = excluded.disk_avg, process_memory_max = excluded.process_memory_max
+        """
+        if source_resolution == 0:
+            sql = """
+            INSERT INTO performance_rollups
+            SELECT ?, CAST(ts / ? AS INTEGER) * ? AS b, COUNT(*),
+                   AVG(cpu_percent), MAX(cpu_percent), AVG(memory_percent), MAX(memory_percent),
+                   AVG(disk_percent), MAX(process_memory_mb)
+            FROM performance_samples
+            WHERE ts >= ? AND ts < ?
+            GROUP BY b
+            """ + upsert
+            params = (resolution, resolution, resolution, since, until)
+        else:
+            # 由较细的聚合再聚合，平均值按采样数加权
+            sql = """
+            INSERT INTO performance_rollups
+            SELECT ?, (bucket / ?) * ? AS b, SUM(samples),
+                   SUM(cpu_avg * samples) / SUM(samples), MAX(cpu_max),
+                   SUM(memory_avg * samples) / SUM(samples), MAX(memory_max),
+                   SUM(disk_avg * samples) / SUM(samples), MAX(process_memory_max)
+            FROM performance_rollups
+            WHERE resolution = ? AND bucket >= ? AND bucket < ?
+            GROUP BY b
+            """ + upsert
+            params = (resolution, resolution, resolution, source_resolution, since, until)
+        self.db.execute_non_query(sql, params)
+
+    def delete_samples_before(self, ts: float):
+        """删除指定时间之前的原始采样
+
+        Args:
+            ts: Unix 时间戳秒
+        """
+        self.db.execute_non_query("DELETE FROM performance_samples WHERE ts < ?", (ts,))
+
+    def delete_rollups_before(self, resolution: int, ts: float):
+        """删除指定分辨率在指定时间之前的聚合
+
+        Args:
+            resolution: 分辨率（秒）
+            ts: Unix 时间戳秒
+        """
+        self.db.execute_non_query(
+            "DELETE FROM performance_rollups WHERE resolution = ? AND bucket < ?", (resolution, ts)
+        )
+
+    def get_series(self, resolution: int, start: float, end: float, step: int) -> List[Dict[str, Any]]:
+        """按 step 秒的桶查询时间序列（在数据库中聚合，返回的点数不超过 (end-start)/step+1）
+
+        Args:
+            resolution: 数据来源分辨率，0 表示原始采样
+            start: 开始时间戳
+            end: 结束时间戳
+            step: 输出桶宽（秒，不小于来源分辨率）
+
+        Returns:
+            [{'ts', 'samples', 'cpu_avg', 'cpu_max', 'memory_avg', 'memory_max', 'disk_avg',
+              'process_memory_max'}]，按时间升序
+        """
+        if resolution == 0:
+            sql = """
+            SELECT CAST(ts / ? AS INTEGER) * ? AS ts, COUNT(*) AS samples,
+                   AVG(cpu_percent) AS cpu_avg, MAX(cpu_percent) AS cpu_max,
+                   AVG(memory_percent) AS memory_avg, MAX(memory_percent) AS memory_max,
+                   AVG(disk_percent) AS disk_avg, MAX(process_memory_mb) AS process_memory_max
+            FROM performance_samples
+            WHERE ts >= ? AND ts <= ?
+            GROUP BY 1 ORDER BY 1
+            """
+            params = (step, step, start, end)
+        else:
+            sql = """
+            SELECT (bucket / ?) * ? AS ts, SUM(samples) AS samples,
+                   SUM(cpu_avg * samples) / SUM(samples) AS cpu_avg, MAX(cpu_max) AS cpu_max,
+                   SUM(memory_avg * samples) / SUM(samples) AS memory_avg, MAX(memory_max) AS memory_max,
+                   SUM(disk_avg * samples) / SUM(samples) AS disk_avg,
+                   MAX(process_memory_max) AS process_memory_max
+            FROM performance_rollups
+            WHERE resolution = ? AND bucket >= ? AND bucket <= ?
+            GROUP BY 1 ORDER BY 1
+            """
+            params = (step, step, resolution, int(start) - int(start) % resolution, end)
+        return self.db.execute_query(sql, params)
+
     def delete_by_execution(self, execution_id: str) -> int:
         """删除指定执行的性能指标
 
@@ -0,0 +1,65 @@
+"""CAN记录文件仓储
+
+管理脚本录制的 BLF 文件与执行记录之间的关联。
+"""
+
+from typing import List, Dict, Any
+
+from .base_repository import BaseRepository
+
+
+class RecordingRepository(BaseRepository):
+    """CAN记录文件仓储"""
+
+    def get_table_name(self) -> str:
+        """获取表名"""
+        return 'can_recordings'
+
+    def link(self, execution_id: str, file_path: str, script_path: str = None,
+             file_size: int = None, file_mtime: float = None) -> bool:
+        """关联记录文件到执行记录（重复关联时更新文件信息）
+
+        Args:
+            execution_id: 执行ID
+            file_path: 记录文件路径
+            script_path: 脚本路径
+            file_size: 文件大小
+            file_mtime: 文件修改时间
+
+        Returns:
+            是否成功
+        """
+        try:
+            self.db.execute_non_query(
+                "INSERT INTO can_recordings (execution_id, script_path, file_path, file_size, file_mtime) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(execution_id, file_path) DO UPDATE SET "
+                "file_size = excluded.file_size, file_mtime = excluded.file_mtime",
+                (execution_id, script_path, file_path, file_size, file_mtime)
+            )
+            if self.logger:
+                self.logger.info(f"Linked recording {file_path} to {execution_id}")
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to link recording {file_path}: {e}")
+            return False
+
+    def get_by_execution(self, execution_id: str) -> List[Dict[str, Any]]:
+        """获取执行关联的记录文件
+
+        Args:
+            execution_id: 执行ID
+
+        Returns:
+            记录文件列表
+        """
+        try:
+            return self.db.execute_query(
+                "SELECT * FROM can_recordings WHERE execution_id = ? ORDER BY file_mtime, id",
+                (execution_id,)
+            )
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get recordings for {execution_id}: {e}")
+            return []
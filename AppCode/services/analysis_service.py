@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from AppCode.core.result_analyzer import ResultAnalyzer
 from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
 from AppCode.repositories.batch_execution_repository import BatchExecutionRepository
+from AppCode.infrastructure.cache import BoundedCache
+from AppCode.data_access.time_columns import record_duration
 
 
 class AnalysisService:
@@ -19,7 +21,10 @@ class AnalysisService:
         result_analyzer: ResultAnalyzer,
         execution_repo: ExecutionHistoryRepository,
         batch_repo: BatchExecutionRepository,
-        logger=None
+        logger=None,
+        measurement_service=None,
+        trend_engine=None,
+        cache_manager=None
     ):
         """初始化分析服务
         
@@ -28,11 +33,20 @@ class AnalysisService:
             execution_repo: 执行历史仓储
             batch_repo: 批次执行仓储
             logger: 日志记录器
+            measurement_service: 测量值服务（可选，信号趋势统计需要）
+            trend_engine: 趋势统计引擎（可选，信号趋势统计需要）
+            cache_manager: 缓存管理器（可选，登记缓存统计）
         """
         self.analyzer = result_analyzer
         self.execution_repo = execution_repo
         self.batch_repo = batch_repo
         self.logger = logger
+        self.measurement_service = measurement_service
+        self.trend_engine = trend_engine
+        # 信号统计结果缓存，键中包含测量值数据版本，数据不变时直接命中
+        self._stats_cache = BoundedCache('analysis_stats', max_bytes=8 * 1024 * 1024)
+        if cache_manager:
+            cache_manager.register_cache('analysis_stats', self._stats_cache)
     
     def analyze_execution(self, execution_id: str) -> Dict[str, Any]:
         """分析单次执行
@@ -237,13 +251,10 @@ class AnalysisService:
                     }
                 }
             
-            durations = []
-            for execution in executions:
-                if execution.get('start_time') and execution.get('end_time'):
-                    start = datetime.fromisoformat(execution['start_time'])
-                    end = datetime.fromisoformat(execution['end_time'])
-                    duration = (end - start).total_seconds()
-                    durations.append(duration)
+            durations = [
+                duration for duration in map(record_duration, executions)
+                if duration is not None
+            ]
             
             metrics = {
                 'total_executions': len(executions),
@@ -411,6 +422,135 @@ class AnalysisService:
                 'error': str(e)
             }
     
+    def get_signal_statistics(
+        self,
+        names: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        script_path: Optional[str] = None,
+        percentiles: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """获取信号统计（均值、标准差、最值、分位数、Cp/Cpk）
+        
+        Args:
+            names: 信号名列表（None表示全部信号）
+            start_date: 开始日期（yyyy-MM-dd，可选）
+            end_date: 结束日期（yyyy-MM-dd，可选）
+            script_path: 脚本路径（可选）
+            percentiles: 分位数列表（可选）
+            
+        Returns:
+            统计结果
+        """
+        try:
+            self._check_trend_support()
+            
+            cache_key = self._stats_cache_key(
+                'stats', names, start_date, end_date, script_path, percentiles
+            )
+            statistics = self._stats_cache.get(cache_key)
+            if statistics is None:
+                groups, values = self.measurement_service.load_numeric_series(
+                    names, start_date, end_date, script_path
+                )
+                statistics = self.trend_engine.summarize(groups, values, percentiles)
+                self._stats_cache.put(cache_key, statistics)
+            
+            return {
+                'success': True,
+                'statistics': statistics
+            }
+        
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get signal statistics: {e}")
+            
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_signal_trend(
+        self,
+        name: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        script_path: Optional[str] = None,
+        window: int = 20,
+        lower_limit: Optional[float] = None,
+        upper_limit: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """获取单个信号的漂移趋势（逐次数值、滑动窗口统计和整体统计）
+        
+        Args:
+            name: 信号名（如 VCU_BSI_Wakeup_27A.period_avg）
+            start_date: 开始日期（yyyy-MM-dd，可选）
+            end_date: 结束日期（yyyy-MM-dd，可选）
+            script_path: 脚本路径（可选）
+            window: 滑动窗口大小
+            lower_limit: 下限（可选，覆盖测量值自带的下限）
+            upper_limit: 上限（可选，覆盖测量值自带的上限）
+            
+        Returns:
+            趋势分析
+        """
+        try:
+            self._check_trend_support()
+            
+            cache_key = self._stats_cache_key(
+                'trend', name, start_date, end_date, script_path, window, lower_limit, upper_limit
+            )
+            trend = self._stats_cache.get(cache_key)
+            if trend is None:
+                groups, values = self.measurement_service.load_numeric_series(
+                    [name], start_date, end_date, script_path
+                )
+                summary = self.trend_engine.summarize(
+                    groups, values, lower_limit=lower_limit, upper_limit=upper_limit
+                ).get(name)
+                rows = [
+                    row for row in self.measurement_service.get_signal_history(
+                        name, start_date, end_date, script_path
+                    )
+                    if row.get('value') is not None
+                ]
+                values = [row['value'] for row in rows]
+                rolling = self.trend_engine.rolling(values, window)
+                trend = {
+                    'name': name,
+                    'window': window,
+                    'timestamps': [row['timestamp'] for row in rows],
+                    'values': values,
+                    'rolling_mean': rolling['mean'],
+                    'rolling_std': rolling['std'],
+                    'summary': summary
+                }
+                self._stats_cache.put(cache_key, trend)
+            
+            return {
+                'success': True,
+                'trend': trend
+            }
+        
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get signal trend: {e}")
+            
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _check_trend_support(self):
+        """检查信号统计依赖是否可用"""
+        if not self.measurement_service or not self.trend_engine:
+            raise RuntimeError("Signal statistics require measurement_service and trend_engine")
+    
+    def _stats_cache_key(self, *args) -> str:
+        """生成统计缓存键（包含测量值数据版本）"""
+        version = self.measurement_service.get_data_version()
+        return repr((version,) + args)
+    
     def export_report(
         self,
         report_type: str,
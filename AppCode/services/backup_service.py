@@ -1,9 +1,20 @@
 """备份服务
 
 提供数据库备份和恢复功能。
+
+备份为 ZIP 文件（metadata.txt 记录描述和结构）。数据目录中的 SQLite 数据库不直接压缩
+正在写入的文件，而是用在线备份 API 分步复制出一致快照后再存入：
+
+- 全量备份保存完整的数据库映像；
+- 增量备份只保存相对上一个备份变化的页（按页摘要比较），每隔 ``full_every`` 个备份
+  重新做一次全量备份；每个备份都保存全部页的摘要和数据库的 SHA-256，用于下次比较和恢复校验。
+
+恢复时沿增量链从全量映像开始依次应用变化页，流式写入临时文件并校验后原子替换。
+清理和删除旧备份时保留仍被较新增量备份依赖的备份。
 """
 
 import ast
+import hashlib
 import os
 import shutil
 import zipfile
@@ -13,6 +24,15 @@ from pathlib import Path
 import threading
 import time
 
+from AppCode.data_access.sqlite_snapshot import (
+    is_sqlite_file, page_size_of, snapshot_database, page_digests, changed_pages,
+    write_pages, apply_pages
+)
+
+# 数据库的临时文件（快照已包含其内容，不单独备份）
+_SQLITE_SIDE_FILES = ('-journal', '-wal', '-shm')
+_COPY_CHUNK = 1024 * 1024
+
 
 class BackupService:
     """备份服务"""
@@ -21,7 +41,9 @@ class BackupService:
         self,
         db_path: str,
         backup_dir: str,
-        logger=None
+        logger=None,
+        full_every: int = 7,
+        pages_per_step: int = 1024
     ):
         """初始化备份服务
         
@@ -29,6 +51,8 @@ class BackupService:
             db_path: 数据库文件路径或数据目录
             backup_dir: 备份目录
             logger: 日志记录器
+            full_every: 每隔多少个备份做一次全量备份（1表示总是全量）
+            pages_per_step: 在线备份每步复制的页数（越小写入方等待越短）
         """
         # 如果传入的是目录，则作为data_dir
         if os.path.isdir(db_path):
@@ -40,6 +64,8 @@ class BackupService:
         
         self.backup_dir = backup_dir
         self.logger = logger
+        self.full_every = max(1, full_every)
+        self.pages_per_step = pages_per_step
         
         # 确保备份目录存在
         Path(backup_dir).mkdir(parents=True, exist_ok=True)
@@ -50,6 +76,7 @@ class BackupService:
         self._auto_backup_thread = None
         self._auto_backup_running = False
         self._max_backups = 30  # 保留最多30个备份
+        self._backup_lock = threading.Lock()
     
     def create_backup(self, description: str = "") -> Dict[str, Any]:
         """创建备份
@@ -68,54 +95,19 @@ class BackupService:
                     'error': 'Data directory not found'
                 }
             
-            # 生成备份文件名
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_name = f"backup_{timestamp}.zip"
-            backup_path = os.path.join(self.backup_dir, backup_name)
-            
-            # 创建备份（压缩整个data目录）
-            with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # 遍历data目录中的所有文件
-                for root, dirs, files in os.walk(self.data_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        # 计算相对路径
-                        arcname = os.path.relpath(file_path, os.path.dirname(self.data_dir))
-                        zipf.write(file_path, arcname)
-                
-                # 如果目录为空，至少添加目录本身
-                if not os.listdir(self.data_dir):
-                    zipf.writestr('data/', '')
-                
-                # 添加元数据
-                total_size = sum(
-                    os.path.getsize(os.path.join(root, file))
-                    for root, dirs, files in os.walk(self.data_dir)
-                    for file in files
-                )
-                metadata = {
-                    'timestamp': timestamp,
-                    'description': description,
-                    'data_size': total_size
-                }
-                zipf.writestr('metadata.txt', str(metadata))
-            
-            backup_size = os.path.getsize(backup_path)
+            with self._backup_lock:
+                result = self._create_backup_locked(description)
             
             if self.logger:
-                self.logger.info(f"Backup created: {backup_name} ({backup_size} bytes)")
+                self.logger.info(
+                    f"Backup created: {result['backup_name']} ({result['backup_size']} bytes, "
+                    f"{result['type']}, {result['elapsed']:.2f}s)"
+                )
             
             # 清理旧备份
             self._cleanup_old_backups()
             
-            return {
-                'success': True,
-                'backup_name': backup_name,
-                'backup_path': backup_path,  # 返回完整路径
-                'backup_size': backup_size,
-                'timestamp': timestamp,
-                'description': description
-            }
+            return result
         
         except Exception as e:
             if self.logger:
@@ -126,9 +118,165 @@ class BackupService:
                 'error': str(e)
             }
     
+    def _create_backup_locked(self, description: str) -> Dict[str, Any]:
+        """创建备份（持有备份锁）"""
+        started = time.perf_counter()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        backup_name = self._unique_backup_name(timestamp)
+        backup_path = os.path.join(self.backup_dir, backup_name)
+        
+        # 增量备份的基准：最新的备份（增量链未满时）
+        previous = self._latest_backup_metadata()
+        base_name = None
+        if previous and previous.get('chain_length', 0) + 1 < self.full_every:
+            base_name = previous['name']
+        
+        databases, files = self._collect_files()
+        snapshot_path = os.path.join(self.backup_dir, f".snapshot_{os.getpid()}.db")
+        db_metadata = {}
+        total_size = 0
+        temp_path = backup_path + '.tmp'
+        try:
+            with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zipf:
+                for file_path, arcname in files:
+                    zipf.write(file_path, arcname)
+                    total_size += os.path.getsize(file_path)
+                
+                for file_path, arcname in databases:
+                    base_info = previous['databases'].get(arcname) if base_name else None
+                    info = self._add_database(zipf, file_path, arcname, snapshot_path, base_name, base_info)
+                    db_metadata[arcname] = info
+                    total_size += info['page_size'] * info['page_count']
+                
+                # 如果目录为空，至少添加目录本身
+                if not files and not databases:
+                    zipf.writestr('data/', '')
+                
+                incremental = any(info['mode'] == 'delta' for info in db_metadata.values())
+                metadata = {
+                    'timestamp': timestamp,
+                    'description': description,
+                    'data_size': total_size,
+                    'db_size': sum(info['page_size'] * info['page_count'] for info in db_metadata.values()),
+                    'type': 'incremental' if incremental else 'full',
+                    'base': base_name if incremental else None,
+                    'chain_length': previous['chain_length'] + 1 if incremental else 0,
+                    'databases': db_metadata,
+                }
+                zipf.writestr('metadata.txt', str(metadata))
+            os.replace(temp_path, backup_path)
+        finally:
+            for path in (snapshot_path, temp_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        
+        return {
+            'success': True,
+            'backup_name': backup_name,
+            'backup_path': backup_path,  # 返回完整路径
+            'backup_size': os.path.getsize(backup_path),
+            'timestamp': timestamp,
+            'description': description,
+            'type': metadata['type'],
+            'base': metadata['base'],
+            'elapsed': time.perf_counter() - started
+        }
+    
+    def _unique_backup_name(self, timestamp: str) -> str:
+        """同一秒内多次备份时加序号，避免覆盖增量链中的备份"""
+        name = f"backup_{timestamp}.zip"
+        index = 1
+        while os.path.exists(os.path.join(self.backup_dir, name)):
+            name = f"backup_{timestamp}_{index}.zip"
+            index += 1
+        return name
+    
+    def _collect_files(self):
+        """数据目录中需要备份的文件，返回 (数据库列表, 普通文件列表)，元素为 (路径, 存档名)"""
+        databases, files = [], []
+        backup_dir = os.path.abspath(self.backup_dir)
+        for root, dirs, names in os.walk(self.data_dir):
+            # 备份目录位于数据目录中时不能把备份本身再打包
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != backup_dir]
+            for name in names:
+                file_path = os.path.join(root, name)
+                # 计算相对路径
+                arcname = os.path.relpath(file_path, os.path.dirname(self.data_dir)).replace(os.sep, '/')
+                if name.endswith(_SQLITE_SIDE_FILES) and is_sqlite_file(file_path.rsplit('-', 1)[0]):
+                    continue
+                if is_sqlite_file(file_path):
+                    databases.append((file_path, arcname))
+                else:
+                    files.append((file_path, arcname))
+        return databases, files
+    
+    def _add_database(self, zipf, file_path, arcname, snapshot_path, base_name, base_info):
+        """写入数据库快照（有基准时只写变化的页），返回该数据库的元数据"""
+        snapshot_database(file_path, snapshot_path, pages=self.pages_per_step)
+        page_size = page_size_of(snapshot_path)
+        digests, sha256 = page_digests(snapshot_path, page_size)
+        page_count = len(digests) // 16
+        
+        previous_digests = None
+        if base_info and base_info.get('page_size') == page_size:
+            previous_digests = self._read_member(base_name, arcname + '.pages')
+        
+        if previous_digests is None:
+            zipf.write(snapshot_path, arcname)
+            mode, stored = 'full', page_count
+        else:
+            pages = changed_pages(digests, previous_digests)
+            with open(snapshot_path, 'rb') as src, zipf.open(arcname + '.delta', 'w', force_zip64=True) as out:
+                write_pages(src, out, pages, page_size)
+            mode, stored = 'delta', len(pages)
+        zipf.writestr(arcname + '.pages', digests)
+        
+        return {
+            'mode': mode,
+            'page_size': page_size,
+            'page_count': page_count,
+            'pages_stored': stored,
+            'sha256': sha256,
+        }
+    
+    def _read_member(self, backup_name: str, member: str) -> Optional[bytes]:
+        """读取备份中的一个成员，不存在时返回None"""
+        try:
+            with zipfile.ZipFile(os.path.join(self.backup_dir, backup_name), 'r') as zipf:
+                return zipf.read(member)
+        except (KeyError, OSError, zipfile.BadZipFile):
+            return None
+    
+    def _read_metadata(self, backup_name: str) -> Dict[str, Any]:
+        """读取备份元数据（旧格式备份没有 databases 等字段）"""
+        try:
+            with zipfile.ZipFile(os.path.join(self.backup_dir, backup_name), 'r') as zipf:
+                if 'metadata.txt' in zipf.namelist():
+                    metadata = ast.literal_eval(zipf.read('metadata.txt').decode('utf-8'))
+                    if isinstance(metadata, dict):
+                        return metadata
+        except Exception:
+            pass
+        return {}
+    
+    def _latest_backup_metadata(self) -> Optional[Dict[str, Any]]:
+        """最新备份的元数据（可作为增量基准时）"""
+        backups = self.list_backups()
+        if not backups:
+            return None
+        metadata = self._read_metadata(backups[0]['name'])
+        if 'databases' not in metadata:
+            return None
+        metadata['name'] = backups[0]['name']
+        metadata.setdefault('chain_length', 0)
+        return metadata
+    
     def restore_backup(self, backup_name: str) -> Dict[str, Any]:
         """恢复备份
         
+        所有文件先写入同目录下的临时文件（数据库沿增量链重建并校验），全部成功后
+        才逐个原子替换；任何一步失败都不会改动现有数据。
+        
         Args:
             backup_name: 备份文件名
             
@@ -145,42 +293,54 @@ class BackupService:
                     'error': 'Backup file not found'
                 }
             
-            # 备份当前数据库（以防恢复失败）
-            if os.path.exists(self.db_path):
-                temp_backup = f"{self.db_path}.temp_backup"
-                shutil.copy2(self.db_path, temp_backup)
-            else:
-                temp_backup = None
-            
+            staged = []  # (临时文件, 目标路径)
             try:
-                # 解压备份文件到临时目录
-                temp_restore_dir = f"{self.data_dir}_restore_temp"
-                with zipfile.ZipFile(backup_path, 'r') as zipf:
-                    # 提取所有文件（除了metadata.txt）
-                    for member in zipf.namelist():
-                        if member != 'metadata.txt':
-                            zipf.extract(member, os.path.dirname(self.data_dir))
-                
-                # 删除临时备份
-                if temp_backup and os.path.exists(temp_backup):
-                    os.remove(temp_backup)
-                
-                if self.logger:
-                    self.logger.info(f"Backup restored: {backup_name}")
-                
-                return {
-                    'success': True,
-                    'backup_name': backup_name,
-                    'message': 'Backup restored successfully'
-                }
+                with self._backup_lock:
+                    metadata = self._read_metadata(backup_name)
+                    databases = metadata.get('databases', {})
+                    skip = set(databases)
+                    for arcname in databases:
+                        skip.update((arcname + '.pages', arcname + '.delta'))
+                    
+                    with zipfile.ZipFile(backup_path, 'r') as zipf:
+                        for member in zipf.namelist():
+                            if member == 'metadata.txt' or member in skip or member.endswith('/'):
+                                continue
+                            target = self._target_path(member)
+                            temp_path = target + '.restore_tmp'
+                            staged.append((temp_path, target))
+                            os.makedirs(os.path.dirname(target), exist_ok=True)
+                            with zipf.open(member) as src, open(temp_path, 'wb') as dst:
+                                shutil.copyfileobj(src, dst, _COPY_CHUNK)
+                    
+                    for arcname, info in databases.items():
+                        target = self._target_path(arcname)
+                        temp_path = target + '.restore_tmp'
+                        staged.append((temp_path, target))
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        self._rebuild_database(backup_name, arcname, info, temp_path)
+                    
+                    # 全部就绪后替换（数据库的旧日志文件属于旧内容，须先删除）
+                    for temp_path, target in staged:
+                        if temp_path.endswith('.restore_tmp') and is_sqlite_file(temp_path):
+                            for suffix in _SQLITE_SIDE_FILES:
+                                if os.path.exists(target + suffix):
+                                    os.remove(target + suffix)
+                        os.replace(temp_path, target)
+                    staged = []
+            finally:
+                for temp_path, _ in staged:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
             
-            except Exception as e:
-                # 恢复失败，还原原数据库
-                if temp_backup and os.path.exists(temp_backup):
-                    shutil.copy2(temp_backup, self.db_path)
-                    os.remove(temp_backup)
-                
-                raise e
+            if self.logger:
+                self.logger.info(f"Backup restored: {backup_name}")
+            
+            return {
+                'success': True,
+                'backup_name': backup_name,
+                'message': 'Backup restored successfully'
+            }
         
         except Exception as e:
             if self.logger:
@@ -191,11 +351,50 @@ class BackupService:
                 'error': str(e)
             }
     
+    def _target_path(self, arcname: str) -> str:
+        """存档名对应的恢复路径（限制在数据目录的上级目录内）"""
+        root = os.path.abspath(os.path.dirname(self.data_dir))
+        target = os.path.abspath(os.path.join(root, arcname))
+        if os.path.commonpath([root, target]) != root:
+            raise ValueError(f"Unsafe path in backup: {arcname}")
+        return target
+    
+    def _rebuild_database(self, backup_name: str, arcname: str, info: Dict[str, Any], output_path: str):
+        """沿增量链重建数据库并校验 SHA-256"""
+        chain = [(backup_name, info)]
+        while chain[-1][1]['mode'] == 'delta':
+            base = self._read_metadata(chain[-1][0]).get('base')
+            base_info = self._read_metadata(base).get('databases', {}).get(arcname) if base else None
+            if not base_info:
+                raise ValueError(f"Incremental chain of {backup_name} is broken at {base}")
+            chain.append((base, base_info))
+        chain.reverse()
+        
+        with open(output_path, 'wb') as target:
+            for name, step in chain:
+                with zipfile.ZipFile(os.path.join(self.backup_dir, name), 'r') as zipf:
+                    if step['mode'] == 'full':
+                        with zipf.open(arcname) as src:
+                            shutil.copyfileobj(src, target, _COPY_CHUNK)
+                    else:
+                        with zipf.open(arcname + '.delta') as records:
+                            apply_pages(records, target, step['page_size'])
+                target.truncate(step['page_size'] * step['page_count'])
+            target.flush()
+            os.fsync(target.fileno())
+        
+        sha256 = hashlib.sha256()
+        with open(output_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_COPY_CHUNK), b''):
+                sha256.update(chunk)
+        if sha256.hexdigest() != info['sha256']:
+            raise ValueError(f"Checksum mismatch restoring {arcname} from {backup_name}")
+    
     def list_backups(self) -> List[Dict[str, Any]]:
         """列出所有备份
         
         Returns:
-            备份列表
+            备份列表（type 为 full/incremental，增量备份的 base 为其依赖的备份）
         """
         try:
             backups = []
@@ -208,26 +407,20 @@ class BackupService:
                     stat = os.stat(filepath)
                     
                     # 尝试读取元数据
-                    description = ""
-                    try:
-                        with zipfile.ZipFile(filepath, 'r') as zipf:
-                            if 'metadata.txt' in zipf.namelist():
-                                metadata_str = zipf.read('metadata.txt').decode('utf-8')
-                                metadata = ast.literal_eval(metadata_str)
-                                description = metadata.get('description', '')
-                    except Exception:
-                        pass
+                    metadata = self._read_metadata(filename)
                     
                     backups.append({
                         'name': filename,
                         'path': filepath,
                         'size': stat.st_size,
                         'created_time': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                        'description': description
+                        'description': metadata.get('description', ''),
+                        'type': metadata.get('type', 'full'),
+                        'base': metadata.get('base')
                     })
             
             # 按创建时间倒序排序
-            backups.sort(key=lambda x: x['created_time'], reverse=True)
+            backups.sort(key=lambda x: (x['created_time'], x['name']), reverse=True)
             
             return backups
         
@@ -237,7 +430,7 @@ class BackupService:
             return []
     
     def delete_backup(self, backup_name: str) -> Dict[str, Any]:
-        """删除备份
+        """删除备份（仍被增量备份依赖的备份不能删除）
         
         Args:
             backup_name: 备份文件名
@@ -254,6 +447,13 @@ class BackupService:
                     'error': 'Backup file not found'
                 }
             
+            dependents = [b['name'] for b in self.list_backups() if b['base'] == backup_name]
+            if dependents:
+                return {
+                    'success': False,
+                    'error': f"Backup is the base of incremental backups: {', '.join(dependents)}"
+                }
+            
             os.remove(backup_path)
             
             if self.logger:
@@ -291,25 +491,18 @@ class BackupService:
             stat = os.stat(backup_path)
             
             # 读取元数据
-            description = ""
-            db_size = 0
-            try:
-                with zipfile.ZipFile(backup_path, 'r') as zipf:
-                    if 'metadata.txt' in zipf.namelist():
-                        metadata_str = zipf.read('metadata.txt').decode('utf-8')
-                        metadata = ast.literal_eval(metadata_str)
-                        description = metadata.get('description', '')
-                        db_size = metadata.get('db_size', 0)
-            except Exception:
-                pass
+            metadata = self._read_metadata(backup_name)
             
             return {
                 'name': backup_name,
                 'path': backup_path,
                 'size': stat.st_size,
                 'created_time': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'description': description,
-                'db_size': db_size
+                'description': metadata.get('description', ''),
+                'db_size': metadata.get('db_size', 0),
+                'type': metadata.get('type', 'full'),
+                'base': metadata.get('base'),
+                'databases': metadata.get('databases', {})
             }
         
         except Exception as e:
@@ -320,6 +513,8 @@ class BackupService:
     def cleanup_old_backups(self, keep_count: int = None) -> int:
         """清理旧备份（公共方法）
         
+        保留最新的 keep_count 个备份，以及恢复它们所需的增量链上的备份。
+        
         Args:
             keep_count: 保留的备份数量，如果为None则使用默认值
             
@@ -334,12 +529,21 @@ class BackupService:
             
             # 如果备份数量超过限制，删除最旧的
             if len(backups) > keep_count:
-                backups_to_delete = backups[keep_count:]
-                
-                for backup in backups_to_delete:
-                    self.delete_backup(backup['name'])
+                bases = {b['name']: b['base'] for b in backups}
+                required = set()
+                for backup in backups[:keep_count]:
+                    name = backup['name']
+                    while name and name not in required:
+                        required.add(name)
+                        name = bases.get(name)
                 
-                deleted_count = len(backups_to_delete)
+                deleted_count = 0
+                # 从新到旧删除，依赖它们的增量备份总是先被删除
+                for backup in backups[keep_count:]:
+                    if backup['name'] in required:
+                        continue
+                    if self.delete_backup(backup['name'])['success']:
+                        deleted_count += 1
                 
                 if self.logger:
                     self.logger.info(f"Cleaned up {deleted_count} old backups")
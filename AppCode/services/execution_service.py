@@ -9,10 +9,34 @@ import threading
 import time
 import random
 
+from AppCode.core.duration_model import DurationModel
 from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.core.process_sampler import unpack_samples
+from AppCode.core.script_fingerprint import diff_fingerprints
+from AppCode.core.trace_exporter import build_chrome_trace, write_chrome_trace
 from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
 from AppCode.repositories.batch_execution_repository import BatchExecutionRepository
-from AppCode.utils.constants import ExecutionStatus
+from AppCode.utils.constants import ExecutionStatus, TestResult
+
+
+# 增量执行时指纹各组成部分变化的说明
+_FINGERPRINT_CHANGE_TEXT = {
+    'version': '无输入指纹记录',
+    'script': '脚本已修改',
+    'helpers': '辅助模块已修改',
+    'unresolved': '辅助模块无法确认是否变化',
+    'ecu_version': 'ECU软件版本变化',
+    'dbc': 'DBC文件变化',
+}
+
+# 执行历史中的测试结果代码对应的显示文本
+_TEST_RESULT_TEXT = {
+    'pass': TestResult.PASS,
+    'fail': TestResult.FAIL,
+    'pending': TestResult.PENDING,
+    'error': TestResult.ERROR,
+    'timeout': TestResult.TIMEOUT,
+}
 
 
 class ExecutionService:
@@ -23,7 +47,11 @@ class ExecutionService:
         execution_engine: ExecutionEngine,
         execution_repo: ExecutionHistoryRepository,
         batch_repo: BatchExecutionRepository,
-        logger=None
+        logger=None,
+        measurement_service=None,
+        recording_service=None,
+        artifact_repo=None,
+        fingerprinter=None
     ):
         """初始化执行服务
         
@@ -32,11 +60,19 @@ class ExecutionService:
             execution_repo: 执行历史仓储
             batch_repo: 批次执行仓储
             logger: 日志记录器
+            measurement_service: 测量值服务（可选，保存结果时提取测量值）
+            recording_service: CAN记录文件服务（可选，保存结果时关联BLF文件）
+            artifact_repo: 执行附加数据仓储（可选，保存剖析结果等）
+            fingerprinter: 脚本输入指纹计算器（可选，保存每次执行的输入指纹，用于增量执行）
         """
         self.engine = execution_engine
         self.execution_repo = execution_repo
         self.batch_repo = batch_repo
         self.logger = logger
+        self.measurement_service = measurement_service
+        self.recording_service = recording_service
+        self.artifact_repo = artifact_repo
+        self.fingerprinter = fingerprinter
     
     def execute_single_script(
         self,
@@ -70,11 +106,14 @@ class ExecutionService:
             execution_id = self.engine.execute_script(
                 script_path,
                 params,
-                callback=on_complete
+                callback=on_complete,
+                limits=self._get_adaptive_limits([script_path]).get(script_path),
+                resources=self.engine.get_resource_limits(suite_name)
             )
             
             # 创建执行记录
             self._create_execution_record(execution_id, script_path, params, user_id, suite_id, suite_name)
+            self._save_fingerprints({execution_id: script_path})
             
             return {
                 'success': True,
@@ -123,6 +162,8 @@ class ExecutionService:
             
             # 为每个脚本创建执行任务（关键修复：为每个脚本设置回调）
             execution_ids = []
+            adaptive_limits = self._get_adaptive_limits(script_paths)
+            resources = self.engine.get_resource_limits(suite_name)
             for script_path in script_paths:
                 # 创建执行回调，传递suite和batch信息
                 def on_complete(execution_id, execution_info, sp=script_path):
@@ -142,7 +183,9 @@ class ExecutionService:
                     script_path,
                     params,
                     callback=on_complete,
-                    batch_id=batch_id
+                    batch_id=batch_id,
+                    limits=adaptive_limits.get(script_path),
+                    resources=resources
                 )
                 
                 # 创建执行记录（包含batch_id）
@@ -157,6 +200,9 @@ class ExecutionService:
                 )
                 
                 execution_ids.append(exec_id)
+
+            # 保存每个执行的输入指纹
+            self._save_fingerprints(dict(zip(execution_ids, script_paths)))
             
             # 创建批次监控回调
             def on_batch_complete(bid, batch_info):
@@ -377,6 +423,288 @@ class ExecutionService:
         
         return output
     
+    def get_execution_profile(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """获取执行的剖析结果（剖析模式下运行的脚本才有）
+        
+        Args:
+            execution_id: 执行ID
+            
+        Returns:
+            剖析结果（wall_ms、breakdown 各类耗时、calls 调用明细），不存在时返回None
+        """
+        if not self.artifact_repo:
+            return None
+        return self.artifact_repo.get(execution_id, 'profile')
+    
+    def get_execution_resources(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """获取执行时脚本进程实际生效的资源限制
+        
+        Args:
+            execution_id: 执行ID
+            
+        Returns:
+            资源限制（limits 配置、applied 生效值、errors 未能设置的项），未设置限制时返回None
+        """
+        if not self.artifact_repo:
+            return None
+        return self.artifact_repo.get(execution_id, 'resources')
+    
+    def get_execution_samples(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """获取执行期间脚本进程树的资源采样
+        
+        Args:
+            execution_id: 执行ID
+            
+        Returns:
+            {'interval': 采样间隔, 'summary': 摘要, 'columns': {列名: 数值列表}}，没有采样时返回None
+        """
+        if not self.artifact_repo:
+            return None
+        packed = self.artifact_repo.get(execution_id, 'samples')
+        if not packed:
+            return None
+        return {
+            'interval': packed.get('interval'),
+            'summary': packed.get('summary', {}),
+            'columns': unpack_samples(packed)
+        }
+    
+    def get_execution_hang_dumps(self, execution_id: str) -> List[Dict[str, Any]]:
+        """获取执行期间疑似挂起时记录的调用栈
+        
+        Args:
+            execution_id: 执行ID
+            
+        Returns:
+            调用栈记录列表（time、silence_s、cpu_percent、stack），没有时返回空列表
+        """
+        if not self.artifact_repo:
+            return []
+        return self.artifact_repo.get(execution_id, 'hang_dump') or []
+    
+    def export_batch_trace(self, batch_id: str, file_path: str) -> Dict[str, Any]:
+        """导出批次执行时间线（Chrome trace-event 格式）
+        
+        Args:
+            batch_id: 批次ID
+            file_path: 输出文件路径
+            
+        Returns:
+            导出结果
+        """
+        if not self.artifact_repo:
+            return {
+                'success': False,
+                'error': 'Execution artifacts not available'
+            }
+        
+        try:
+            executions = self.execution_repo.get_by_batch(batch_id)
+            timelines = self.artifact_repo.get_many([e['id'] for e in executions], 'timeline')
+            if not timelines:
+                return {
+                    'success': False,
+                    'error': f'No timeline recorded for batch {batch_id}'
+                }
+            
+            for execution in executions:
+                execution['timeline'] = timelines.get(execution['id'])
+            
+            batch = self.batch_repo.get_by_id(batch_id) or {}
+            trace = build_chrome_trace(
+                executions,
+                name=batch.get('name') or batch_id,
+                metadata={'batch_id': batch_id, 'start_time': batch.get('start_time')}
+            )
+            write_chrome_trace(trace, file_path)
+            
+            if self.logger:
+                self.logger.info(f"Exported trace for batch {batch_id} to {file_path}")
+            
+            return {
+                'success': True,
+                'file_path': file_path,
+                'scripts': trace['otherData']['scripts'],
+                'phase_totals': trace['otherData']['phase_totals_s']
+            }
+        
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to export batch trace: {e}")
+            
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_duration_model(self, script_paths: List[str]) -> DurationModel:
+        """根据执行历史建立脚本耗时模型
+
+        墙钟耗时取最近正常结束的执行；收尾耗时（结果关键词到进程自行退出）
+        取这些执行保存的时间线，被空闲超时或总超时结束的执行不计入。
+        模拟台架执行使用虚拟时钟，耗时不反映真实台架，也不计入。
+
+        Args:
+            script_paths: 脚本路径列表
+
+        Returns:
+            DurationModel 对象
+        """
+        settings = self.engine.get_timeout_settings()
+        model = DurationModel(
+            min_samples=settings.get('min_samples', 5),
+            timeout_multiplier=settings.get('multiplier', 1.5)
+        )
+        try:
+            samples = self.execution_repo.get_duration_samples(list(dict.fromkeys(script_paths)))
+            if self.artifact_repo and samples:
+                dry_runs = self.artifact_repo.get_many(
+                    [s['id'] for items in samples.values() for s in items], 'dry_run'
+                )
+                if dry_runs:
+                    samples = {
+                        path: [s for s in items if s['id'] not in dry_runs]
+                        for path, items in samples.items()
+                    }
+            durations = {
+                path: [s['duration'] for s in items] for path, items in samples.items()
+            }
+            tails = {}
+            if self.artifact_repo and samples:
+                owners = {s['id']: path for path, items in samples.items() for s in items}
+                timelines = self.artifact_repo.get_many(list(owners), 'timeline')
+                for execution_id, timeline in timelines.items():
+                    if not timeline or 'timeout' in timeline or 'idle_timeout' in timeline:
+                        continue
+                    if 'result_detected' in timeline and 'process_exit' in timeline:
+                        tails.setdefault(owners[execution_id], []).append(
+                            timeline['process_exit'] - timeline['result_detected']
+                        )
+            model.fit(durations, tails)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to build duration model: {e}")
+        return model
+
+    def get_duration_estimates(self, script_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """获取脚本的历史耗时统计
+
+        Args:
+            script_paths: 脚本路径列表
+
+        Returns:
+            {脚本路径: 统计信息（count、median、p95、p99 等，秒）}，没有历史的脚本不包含在内
+        """
+        model = self.get_duration_model(script_paths)
+        estimates = {}
+        for script_path in script_paths:
+            stats = model.get(script_path)
+            if stats and stats['count']:
+                estimates[script_path] = stats
+        return estimates
+
+    def _get_adaptive_limits(self, script_paths: List[str]) -> Dict[str, Dict[str, float]]:
+        """计算脚本的自适应超时（未启用时返回空字典）"""
+        settings = self.engine.get_timeout_settings()
+        if not settings.get('adaptive'):
+            return {}
+        model = self.get_duration_model(script_paths)
+        limits = {}
+        for script_path in script_paths:
+            script_limits = model.adaptive_limits(
+                script_path, settings['timeout'], settings['result_idle_timeout']
+            )
+            if script_limits:
+                limits[script_path] = script_limits
+        if self.logger:
+            self.logger.info(f"Adaptive timeouts applied to {len(limits)}/{len(script_paths)} scripts")
+        return limits
+
+    def select_incremental_scripts(self, script_paths: List[str]) -> Dict[str, Any]:
+        """增量执行选择：只选择输入指纹变化或上次结果不是合格的脚本
+
+        Args:
+            script_paths: 候选脚本路径列表
+
+        Returns:
+            {'success': bool, 'selected': [脚本路径], 'skipped': [脚本路径],
+             'reasons': {脚本路径: 选择或跳过的原因}}
+        """
+        if not self.fingerprinter or not self.artifact_repo:
+            return {
+                'success': False,
+                'error': 'Script fingerprinting not available'
+            }
+
+        try:
+            fingerprints = self.fingerprinter.fingerprint_many(script_paths)
+            latest = self.execution_repo.get_latest_by_scripts(script_paths)
+            latest_ids = [record['id'] for record in latest.values()]
+            previous = self.artifact_repo.get_many(latest_ids, 'fingerprint')
+            dry_runs = self.artifact_repo.get_many(latest_ids, 'dry_run')
+
+            selected, skipped, reasons = [], [], {}
+            for script_path in script_paths:
+                record = latest.get(script_path)
+                current = fingerprints.get(script_path)
+                if current is None:
+                    reason = '无法计算输入指纹'
+                elif record is None:
+                    reason = '无执行记录'
+                elif record['id'] in dry_runs:
+                    reason = '上次为模拟台架执行'
+                elif record.get('test_result') != 'pass':
+                    result_text = _TEST_RESULT_TEXT.get(record.get('test_result'), record.get('test_result'))
+                    reason = f"上次结果: {result_text}"
+                else:
+                    changes = diff_fingerprints(current, previous.get(record['id']))
+                    if not changes:
+                        skipped.append(script_path)
+                        reasons[script_path] = '输入未变化且上次合格'
+                        continue
+                    reason = '、'.join(_FINGERPRINT_CHANGE_TEXT[c] for c in changes)
+                selected.append(script_path)
+                reasons[script_path] = reason
+
+            if self.logger:
+                self.logger.info(
+                    f"Incremental selection: {len(selected)} selected, {len(skipped)} skipped "
+                    f"of {len(script_paths)} scripts"
+                )
+            return {
+                'success': True,
+                'selected': selected,
+                'skipped': skipped,
+                'reasons': reasons
+            }
+
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to select incremental scripts: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def _save_fingerprints(self, scripts_by_execution: Dict[str, str]):
+        """保存执行开始时脚本的输入指纹
+
+        Args:
+            scripts_by_execution: {执行ID: 脚本路径}
+        """
+        if not self.fingerprinter or not self.artifact_repo:
+            return
+        try:
+            fingerprints = self.fingerprinter.fingerprint_many(
+                list(dict.fromkeys(scripts_by_execution.values()))
+            )
+            for execution_id, script_path in scripts_by_execution.items():
+                if script_path in fingerprints:
+                    self.artifact_repo.save(execution_id, 'fingerprint', fingerprints[script_path])
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to save script fingerprints: {e}")
+
     def get_recent_executions(self, limit: int = 10) -> List[Dict[str, Any]]:
         """获取最近的执行记录
         
@@ -563,6 +891,8 @@ class ExecutionService:
         batch_id: Optional[str] = None
     ):
         """保存执行结果"""
+        persist_start = time.time()
+
         # 确保时间格式正确
         start_time = execution_info.get('start_time')
         if isinstance(start_time, datetime):
@@ -584,6 +914,53 @@ class ExecutionService:
         }
         
         self.execution_repo.update(execution_id, update_data)
+
+        # 标记模拟台架执行（不计入耗时统计和测量值，增量执行不视为真实合格）
+        dry_run = execution_info.get('dry_run')
+        if self.artifact_repo and dry_run:
+            self.artifact_repo.save(execution_id, 'dry_run', dry_run)
+
+        # 提取结构化测量值（模拟台架的输出是仿真值，不提取）
+        if self.measurement_service and not dry_run:
+            self.measurement_service.capture(
+                execution_id,
+                execution_info.get('output', []),
+                script_path=execution_info.get('script_path'),
+                timestamp=end_time or start_time
+            )
+
+        # 关联执行期间录制的BLF文件
+        if self.recording_service and not dry_run:
+            try:
+                self.recording_service.discover_recordings(
+                    execution_id, execution_info.get('script_path'), start_time, end_time
+                )
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Failed to discover recordings for {execution_id}: {e}")
+
+        # 保存剖析模式下的脚本内部耗时分布
+        if self.artifact_repo and execution_info.get('profile'):
+            self.artifact_repo.save(execution_id, 'profile', execution_info['profile'])
+
+        # 保存实际生效的资源限制
+        if self.artifact_repo and execution_info.get('resources'):
+            self.artifact_repo.save(execution_id, 'resources', execution_info['resources'])
+
+        # 保存脚本进程树的资源采样（打包为一条记录）
+        if self.artifact_repo and execution_info.get('resource_samples'):
+            self.artifact_repo.save(execution_id, 'samples', execution_info['resource_samples'])
+
+        # 保存挂起诊断记录的调用栈
+        if self.artifact_repo and execution_info.get('hang_dumps'):
+            self.artifact_repo.save(execution_id, 'hang_dump', execution_info['hang_dumps'])
+
+        # 保存执行时间线（含本次结果保存耗时），用于导出批次 trace
+        if self.artifact_repo and execution_info.get('timeline'):
+            timeline = dict(execution_info['timeline'])
+            timeline['persist_start'] = persist_start
+            timeline['persist_end'] = time.time()
+            self.artifact_repo.save(execution_id, 'timeline', timeline)
         
         if self.logger:
             self.logger.info(
@@ -0,0 +1,243 @@
+"""测量值服务
+
+在执行结果保存时提取结构化测量值，并为报告和趋势分析提供查询。
+启用本功能之前的历史执行由后台线程补提取一次（解析过的执行持久记录，重启后不再解析）。
+"""
+
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from AppCode.core.measurement_extractor import MeasurementExtractor
+from AppCode.repositories.measurement_repository import MeasurementRepository
+
+
+class MeasurementService:
+    """测量值服务"""
+
+    def __init__(
+        self,
+        extractor: MeasurementExtractor,
+        measurement_repo: MeasurementRepository,
+        logger=None,
+        execution_repo=None
+    ):
+        """初始化测量值服务
+
+        Args:
+            extractor: 测量值提取器
+            measurement_repo: 测量值仓储
+            logger: 日志记录器
+            execution_repo: 执行历史仓储（可选，用于从历史输出补提取测量值）
+        """
+        self.extractor = extractor
+        self.measurement_repo = measurement_repo
+        self.logger = logger
+        self.execution_repo = execution_repo
+        self._stop = threading.Event()
+        self._thread = None
+
+    def capture(
+        self,
+        execution_id: str,
+        output,
+        script_path: Optional[str] = None,
+        timestamp: Optional[str] = None
+    ) -> int:
+        """从执行输出中提取测量值并保存
+
+        Args:
+            execution_id: 执行ID
+            output: 输出文本或输出行列表
+            script_path: 脚本路径
+            timestamp: 测量时间（ISO格式，一般为执行结束时间）
+
+        Returns:
+            保存的测量值数量
+        """
+        try:
+            rows = self.extractor.extract(output, {
+                'execution_id': execution_id,
+                'script_path': script_path,
+                'timestamp': timestamp
+            })
+            count = self.measurement_repo.save_for_execution(execution_id, rows)
+            if not rows:
+                # 没有测量值：记录已解析，补提取时不再重复解析
+                self.measurement_repo.mark_scanned([execution_id])
+            return count
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to capture measurements for {execution_id}: {e}")
+            return 0
+
+    def backfill(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+        """从已保存的历史输出中补提取测量值（每个执行只解析一次，可被 stop 中断）
+
+        Args:
+            start_date: 开始日期（yyyy-MM-dd 或 ISO 时间，可选）
+            end_date: 结束日期（yyyy-MM-dd 或 ISO 时间，可选）
+
+        Returns:
+            新保存的测量值数量
+        """
+        if not self.execution_repo:
+            return 0
+
+        start_time, end_time = self._expand_range(start_date, end_date)
+        execution_ids = self.measurement_repo.get_uncaptured_execution_ids(start_time, end_time)
+
+        total = 0
+        for execution_id in execution_ids:
+            if self._stop.is_set():
+                break
+            record = self.execution_repo.get_by_id(execution_id)
+            if not record:
+                continue
+            total += self.capture(
+                execution_id,
+                record.get('output') or '',
+                script_path=record.get('script_path'),
+                timestamp=record.get('end_time') or record.get('start_time')
+            )
+
+        if execution_ids and self.logger:
+            self.logger.info(f"Backfilled {total} measurements from {len(execution_ids)} executions")
+        return total
+
+    def start_backfill(self):
+        """启动后台线程补提取历史测量值（执行一次）"""
+        if not self.execution_repo or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_backfill, daemon=True, name='MeasurementBackfill')
+        self._thread.start()
+
+    def stop(self):
+        """停止后台补提取"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run_backfill(self):
+        try:
+            self.backfill()
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to backfill measurements: {e}")
+
+    def get_execution_measurements(self, execution_id: str) -> List[Dict[str, Any]]:
+        """获取一次执行的测量值
+
+        Args:
+            execution_id: 执行ID
+
+        Returns:
+            测量值列表
+        """
+        return self.measurement_repo.get_by_execution(execution_id)
+
+    def get_signal_history(
+        self,
+        name: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        script_path: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """获取信号/指标的历史测量值
+
+        Args:
+            name: 信号名或指标名
+            start_date: 开始日期（yyyy-MM-dd，可选）
+            end_date: 结束日期（yyyy-MM-dd，可选）
+            script_path: 脚本路径（可选）
+
+        Returns:
+            测量值列表
+        """
+        start_time, end_time = self._expand_range(start_date, end_date)
+        return self.measurement_repo.get_by_name(name, start_time, end_time, script_path)
+
+    def load_numeric_series(
+        self,
+        names: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        script_path: Optional[str] = None
+    ):
+        """批量载入数值型测量值（供趋势统计使用）
+
+        Args:
+            names: 信号名列表（None表示全部）
+            start_date: 开始日期（yyyy-MM-dd，可选）
+            end_date: 结束日期（yyyy-MM-dd，可选）
+            script_path: 脚本路径（可选）
+
+        Returns:
+            (groups, values) 元组：groups 为
+            (name, count, first_time, last_time, lower_limit, upper_limit) 列表，
+            values 为按分组顺序排列的 NumPy 数组
+        """
+        start_time, end_time = self._expand_range(start_date, end_date)
+        # 只读取截至当前数据版本的行，与统计缓存键保持一致
+        max_id = self.measurement_repo.get_data_version()[0]
+        if max_id is None:
+            return [], np.empty(0)
+
+        groups = []
+        arrays = []
+        for group, rows in self.measurement_repo.iter_numeric_series(
+            names, start_time, end_time, script_path, max_id
+        ):
+            # 结构化 dtype 直接接收 (value,) 元组，免去逐行解包
+            arrays.append(np.fromiter(rows, dtype=[('value', float)], count=group[1])['value'])
+            groups.append(group)
+        return groups, np.concatenate(arrays) if arrays else np.empty(0)
+
+    def get_data_version(self) -> tuple:
+        """获取测量值数据版本，用于判断统计缓存是否失效"""
+        return self.measurement_repo.get_data_version()
+
+    def get_measurement_names(self, script_path: Optional[str] = None) -> List[str]:
+        """获取已记录的信号/指标名称
+
+        Args:
+            script_path: 脚本路径（可选）
+
+        Returns:
+            名称列表
+        """
+        return self.measurement_repo.get_names(script_path)
+
+    @staticmethod
+    def _expand_range(start_date: Optional[str], end_date: Optional[str]):
+        """将 yyyy-MM-dd 日期扩展为当天起止的 ISO 时间"""
+        start_time = f"{start_date}T00:00:00" if start_date and len(start_date) == 10 else start_date
+        end_time = f"{end_date}T23:59:59" if end_date and len(end_date) == 10 else end_date
+        return start_time, end_time
+
+    @staticmethod
+    def format_measurements(rows: List[Dict[str, Any]]) -> str:
+        """将测量值格式化为报告文本（同名信号只保留最后一次的值）
+
+        Args:
+            rows: 测量值列表
+
+        Returns:
+            形如 "IFB_CCCP_CC_Res=120Ω; OBC_CHRG_CONN_CONF=2" 的文本
+        """
+        latest = {}
+        for row in rows:
+            latest[row.get('name')] = row
+
+        parts = []
+        for name, row in latest.items():
+            value = row.get('value')
+            if value is None:
+                text = row.get('text_value') or ''
+            else:
+                text = f"{value:g}{row.get('unit') or ''}"
+            parts.append(f"{name}={text}")
+        return '; '.join(parts)
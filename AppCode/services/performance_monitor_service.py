@@ -1,8 +1,13 @@
 """性能监控服务
 
 提供系统性能监控和统计功能。
+
+监控采样按轮转的保留层级保存：原始采样保留1天，1分钟聚合保留30天，1小时聚合保留1年
+（可配置）。监控线程每分钟在后台完成聚合和过期数据删除；查询历史时按时间范围和所需点数
+自动选择层级，并在数据库中聚合到不超过所需点数，图表加载耗时与历史长度无关。
 """
 
+import math
 import psutil
 import os
 import time
@@ -12,6 +17,17 @@ from threading import Thread, Lock
 
 from AppCode.repositories.performance_metrics_repository import PerformanceMetricsRepository
 
+# 保留层级：(名称, 分辨率秒, 默认保留天数)，分辨率0为原始采样
+METRIC_TIERS = (
+    ('raw', 0, 1),
+    ('1m', 60, 30),
+    ('1h', 3600, 365),
+)
+# 后台聚合间隔（秒）
+ROLLUP_INTERVAL = 60
+# 选择层级时允许扫描的行数（相对所需点数的倍数）
+_TIER_SCAN_FACTOR = 10
+
 
 class PerformanceMonitorService:
     """性能监控服务"""
@@ -19,16 +35,22 @@ class PerformanceMonitorService:
     def __init__(
         self,
         metrics_repo: PerformanceMetricsRepository,
-        logger=None
+        logger=None,
+        retention_days: Optional[Dict[str, float]] = None
     ):
         """初始化性能监控服务
         
         Args:
             metrics_repo: 性能指标仓储
             logger: 日志记录器
+            retention_days: 各层级保留天数 {'raw': 1, '1m': 30, '1h': 365}，未给出的使用默认值
         """
         self.metrics_repo = metrics_repo
         self.logger = logger
+        self._retention = {
+            name: (retention_days or {}).get(name, days) for name, _, days in METRIC_TIERS
+        }
+        self._last_rollup = 0.0
         
         self._monitoring = False
         self._monitor_thread = None
@@ -140,20 +162,74 @@ class PerformanceMonitorService:
         end_time: Optional[str] = None,
         limit: int = 100
     ) -> List[Dict[str, Any]]:
-        """获取历史性能指标
+        """获取历史性能指标（系统监控时间序列）
+        
+        按时间范围和点数自动选择保留层级，并聚合为不超过 limit 个点。
+        
+        Args:
+            start_time: 开始时间（ISO格式，默认为最近 limit 个监控周期）
+            end_time: 结束时间（ISO格式，默认为当前时间）
+            limit: 最多返回的点数
+            
+        Returns:
+            按时间升序的点列表（timestamp、samples、cpu_avg/cpu_max、memory_avg/memory_max、
+            disk_avg、process_memory_max）
+        """
+        end = datetime.fromisoformat(end_time).timestamp() if end_time else time.time()
+        start = datetime.fromisoformat(start_time).timestamp() if start_time else end - limit * self._interval
+        _, resolution, step = self.select_tier(start, end, limit)
+        
+        points = self.metrics_repo.get_series(resolution, start, end, step)
+        for point in points:
+            point['timestamp'] = datetime.fromtimestamp(point['ts']).isoformat()
+        return points
+    
+    def select_tier(self, start: float, end: float, max_points: int, now: Optional[float] = None):
+        """选择能覆盖时间范围、且扫描行数不超过所需点数一定倍数的最细层级
         
         Args:
-            start_time: 开始时间
-            end_time: 结束时间
-            limit: 返回数量限制
+            start: 开始时间戳
+            end: 结束时间戳
+            max_points: 所需点数
+            now: 当前时间戳（默认为当前时间）
             
         Returns:
-            性能指标列表
+            (层级名称, 分辨率秒, 输出桶宽秒)
         """
-        if start_time and end_time:
-            return self.metrics_repo.get_by_time_range(start_time, end_time)
-        else:
-            return self.metrics_repo.get_recent(limit)
+        now = now if now is not None else time.time()
+        span = max(end - start, 1.0)
+        max_points = max(1, max_points)
+        for index, (name, resolution, _) in enumerate(METRIC_TIERS):
+            coarsest = index == len(METRIC_TIERS) - 1
+            covers = start >= now - self._retention[name] * 86400
+            rows = span / (resolution or self._interval)
+            if coarsest or (covers and rows <= max_points * _TIER_SCAN_FACTOR):
+                unit = resolution or 1
+                step = max(unit, math.ceil(span / max_points / unit) * unit)
+                return name, resolution, step
+    
+    def run_rollups(self, now: Optional[float] = None):
+        """聚合已完整的时间桶并删除超出保留期的数据（可重复执行）
+        
+        Args:
+            now: 当前时间戳（默认为当前时间）
+        """
+        now = now if now is not None else time.time()
+        source = 0
+        for _, resolution, _ in METRIC_TIERS[1:]:
+            until = int(now) - int(now) % resolution
+            latest = self.metrics_repo.latest_bucket(resolution)
+            since = latest + resolution if latest is not None else 0
+            if since < until:
+                self.metrics_repo.rollup(resolution, source, since, until)
+            source = resolution
+        
+        for name, resolution, _ in METRIC_TIERS:
+            cutoff = now - self._retention[name] * 86400
+            if resolution == 0:
+                self.metrics_repo.delete_samples_before(cutoff)
+            else:
+                self.metrics_repo.delete_rollups_before(resolution, cutoff)
     
     def get_execution_statistics(
         self,
@@ -257,17 +333,23 @@ class PerformanceMonitorService:
             return 0
     
     def _monitor_loop(self):
-        """监控循环"""
+        """监控循环
+        
+        CPU 使用率按两次采样之间计算（不阻塞等待），首次采样前先建立基准。
+        """
+        process = psutil.Process()
+        psutil.cpu_percent(interval=None)
+        process.cpu_percent(interval=None)
+        time.sleep(min(1.0, self._interval))
         while self._monitoring:
             try:
                 # 收集系统指标
-                cpu_percent = psutil.cpu_percent(interval=1)
+                cpu_percent = psutil.cpu_percent(interval=None)
                 memory = psutil.virtual_memory()
                 disk = psutil.disk_usage(os.getcwd())
                 
                 # 收集进程指标
-                process = psutil.Process()
-                process_cpu = process.cpu_percent(interval=0.1)
+                process_cpu = process.cpu_percent(interval=None)
                 process_memory = process.memory_info()
                 
                 # 更新当前指标
@@ -292,10 +374,23 @@ class PerformanceMonitorService:
                 with self._lock:
                     self._current_metrics = metrics
                 
-                # 休眠到下一个监控周期
-                time.sleep(self._interval)
+                self.metrics_repo.add_sample({
+                    'ts': time.time(),
+                    'cpu_percent': cpu_percent,
+                    'memory_percent': memory.percent,
+                    'disk_percent': disk.percent,
+                    'process_cpu': process_cpu,
+                    'process_memory_mb': metrics['process']['memory_mb']
+                })
+                
+                # 后台聚合（每分钟一次）
+                if time.time() - self._last_rollup >= ROLLUP_INTERVAL:
+                    self._last_rollup = time.time()
+                    self.run_rollups()
             
             except Exception as e:
                 if self.logger:
                     self.logger.error(f"Error in monitor loop: {e}")
-                time.sleep(self._interval)
\ No newline at end of file
+            
+            # 休眠到下一个监控周期
+            time.sleep(self._interval)
\ No newline at end of file
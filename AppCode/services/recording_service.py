@@ -0,0 +1,370 @@
+"""CAN记录文件服务
+
+将脚本录制的 BLF 文件关联到执行记录，并基于离线索引重新计算报文周期，
+无需连接台架即可复核 Case03_Period 的判定结果。
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Union
+
+from AppCode.core.blf_reader import BLFReader, BLFIndex
+from AppCode.infrastructure.cache import BoundedCache
+from AppCode.repositories.recording_repository import RecordingRepository
+
+
+# 报文名末尾的十六进制仲裁ID：VCU_BSI_Wakeup_27A -> 0x27A
+_MESSAGE_ID_PATTERN = re.compile(r'_([0-9A-Fa-f]{3,8})$')
+# 报文周期脚本名：MessagePeriod_01-VCU_BSI_Wakeup_27A.py
+_MSG_SCRIPT_PATTERN = re.compile(r'MessagePeriod_\d+-(?P<message>[^.]+)')
+# 脚本中的预期周期：ExpectOfFramePeriod = 100
+_EXPECT_PERIOD_PATTERN = re.compile(r'^\s*ExpectOfFramePeriod\s*=\s*([\d.]+)', re.MULTILINE)
+# 目录修改时间的精度（秒）：刚修改过的目录不缓存列表，避免同一时间刻度内新增的文件被遗漏
+_DIR_MTIME_RESOLUTION = 2.0
+
+
+class RecordingService:
+    """CAN记录文件服务"""
+
+    def __init__(
+        self,
+        recording_repo: RecordingRepository,
+        index_dir: str,
+        logger=None,
+        search_dirs: Optional[List[str]] = None,
+        match_slack: float = 5.0,
+        index_cache_bytes: int = 256 * 1024 * 1024,
+        cache_manager=None
+    ):
+        """初始化记录文件服务
+
+        Args:
+            recording_repo: 记录文件仓储
+            index_dir: 索引缓存目录
+            logger: 日志记录器
+            search_dirs: 执行结束后查找 BLF 文件的目录列表
+            match_slack: 匹配文件修改时间的宽限秒数
+            index_cache_bytes: 内存中 BLF 索引缓存的预算（字节）
+            cache_manager: 缓存管理器（可选，登记缓存统计）
+        """
+        self.recording_repo = recording_repo
+        self.index_dir = index_dir
+        self.logger = logger
+        self.search_dirs = list(search_dirs or [])
+        self.match_slack = match_slack
+        # 目录 -> (目录修改时间, 子目录列表, BLF 文件名列表)；目录未变化时不重新列出
+        self._dir_index: Dict[str, tuple] = {}
+        self._dir_lock = threading.Lock()
+        # BLF 索引按数组实际大小计入预算，大文件不会因条目数少而占满内存
+        self._index_cache = BoundedCache('recording_index', max_bytes=index_cache_bytes, policy='lru')
+        if cache_manager:
+            cache_manager.register_cache('recording_index', self._index_cache)
+
+    def link_recording(self, execution_id: str, file_path: str,
+                       script_path: Optional[str] = None) -> Dict[str, Any]:
+        """手动关联记录文件
+
+        Args:
+            execution_id: 执行ID
+            file_path: BLF 文件路径
+            script_path: 脚本路径（可选）
+
+        Returns:
+            操作结果
+        """
+        if not os.path.isfile(file_path):
+            return {
+                'success': False,
+                'error': f'Recording not found: {file_path}'
+            }
+
+        stat = os.stat(file_path)
+        success = self.recording_repo.link(
+            execution_id, os.path.abspath(file_path), script_path, stat.st_size, stat.st_mtime
+        )
+        return {'success': success}
+
+    def discover_recordings(
+        self,
+        execution_id: str,
+        script_path: Optional[str],
+        start_time: Optional[str],
+        end_time: Optional[str]
+    ) -> int:
+        """在配置的目录中查找执行期间生成的 BLF 文件并关联
+
+        文件名须包含脚本名（``get_current_filename()`` 的返回值），
+        且修改时间落在执行时间段内（含宽限时间）。目录列表按目录修改时间缓存，
+        每次只需检查各目录是否变化，只对文件名匹配的候选文件取修改时间。
+
+        Args:
+            execution_id: 执行ID
+            script_path: 脚本路径
+            start_time: 执行开始时间（ISO格式）
+            end_time: 执行结束时间（ISO格式）
+
+        Returns:
+            关联的文件数量
+        """
+        if not self.search_dirs or not script_path or not start_time:
+            return 0
+
+        try:
+            window_start = datetime.fromisoformat(start_time).timestamp() - self.match_slack
+            window_end = (
+                datetime.fromisoformat(end_time).timestamp() if end_time else datetime.now().timestamp()
+            ) + self.match_slack
+        except ValueError:
+            return 0
+
+        script_stem = os.path.splitext(os.path.basename(script_path))[0]
+        linked = 0
+        for file_path in self._iter_blf_files():
+            if script_stem not in os.path.basename(file_path):
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            if window_start <= stat.st_mtime <= window_end:
+                if self.recording_repo.link(
+                    execution_id, os.path.abspath(file_path), script_path,
+                    stat.st_size, stat.st_mtime
+                ):
+                    linked += 1
+
+        if linked and self.logger:
+            self.logger.info(f"Discovered {linked} recordings for {execution_id}")
+        return linked
+
+    def _iter_blf_files(self):
+        """列出搜索目录下的 BLF 文件路径（目录修改时间未变化时使用缓存的列表）"""
+        with self._dir_lock:
+            pending = list(self.search_dirs)
+            seen = set()
+            files = []
+            while pending:
+                directory = pending.pop()
+                if directory in seen:
+                    continue
+                seen.add(directory)
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    self._dir_index.pop(directory, None)
+                    continue
+                cached = self._dir_index.get(directory)
+                if not cached or cached[0] != mtime:
+                    subdirs, blf_names = [], []
+                    try:
+                        with os.scandir(directory) as entries:
+                            for entry in entries:
+                                if entry.is_dir(follow_symlinks=False):
+                                    subdirs.append(entry.path)
+                                elif entry.name.lower().endswith('.blf'):
+                                    blf_names.append(entry.name)
+                    except OSError:
+                        continue
+                    if time.time() - mtime / 1e9 < _DIR_MTIME_RESOLUTION:
+                        mtime = None
+                    cached = (mtime, subdirs, blf_names)
+                    self._dir_index[directory] = cached
+                pending.extend(cached[1])
+                files.extend(os.path.join(directory, name) for name in cached[2])
+            # 已删除的目录不再保留
+            for directory in list(self._dir_index):
+                if directory not in seen:
+                    del self._dir_index[directory]
+        return files
+
+    def get_recordings(self, execution_id: str) -> List[Dict[str, Any]]:
+        """获取执行关联的记录文件
+
+        Args:
+            execution_id: 执行ID
+
+        Returns:
+            记录文件列表
+        """
+        return self.recording_repo.get_by_execution(execution_id)
+
+    def get_index(self, file_path: str) -> BLFIndex:
+        """获取记录文件的仲裁ID时间戳索引（内存和磁盘两级缓存，文件变化后重建）
+
+        Args:
+            file_path: BLF 文件路径
+
+        Returns:
+            BLFIndex 对象
+        """
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}|{stat.st_size}|{int(stat.st_mtime)}"
+        # 多个界面同时请求同一文件时只构建一次索引
+        return self._index_cache.get_or_load(key, lambda: self._load_index(file_path, key))
+
+    def _load_index(self, file_path: str, key: str) -> BLFIndex:
+        """从磁盘缓存加载索引，没有时读取 BLF 文件构建并保存"""
+        index = None
+        index_path = os.path.join(
+            self.index_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.npz'
+        )
+        if os.path.exists(index_path):
+            try:
+                index = BLFIndex.load(index_path)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"Failed to load recording index {index_path}: {e}")
+
+        if index is None:
+            with BLFReader(file_path) as reader:
+                index = reader.build_index()
+            try:
+                os.makedirs(self.index_dir, exist_ok=True)
+                index.save(index_path)
+            except OSError as e:
+                if self.logger:
+                    self.logger.warning(f"Failed to save recording index {index_path}: {e}")
+
+        return index
+
+    def get_message_statistics(
+        self,
+        execution_id: str,
+        message: Union[str, int],
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """计算执行关联记录中某报文的计数和周期
+
+        Args:
+            execution_id: 执行ID
+            message: 仲裁ID或以十六进制ID结尾的报文名（如 VCU_BSI_Wakeup_27A）
+            start: 窗口开始时间（Unix 秒，可选）
+            end: 窗口结束时间（Unix 秒，可选）
+
+        Returns:
+            统计结果
+        """
+        try:
+            arbitration_id = self.resolve_arbitration_id(message)
+            recordings = self.get_recordings(execution_id)
+            if not recordings:
+                return {
+                    'success': False,
+                    'error': f'No recordings linked to {execution_id}'
+                }
+
+            # 通常一次执行只有一个记录文件，多个时取报文最多的一个
+            best = None
+            for recording in recordings:
+                stats = self.get_index(recording['file_path']).message_stats(arbitration_id, start, end)
+                stats['file_path'] = recording['file_path']
+                if best is None or stats['count'] > best['count']:
+                    best = stats
+
+            return {
+                'success': True,
+                'statistics': best
+            }
+
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to get message statistics: {e}")
+
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def evaluate_message_period(
+        self,
+        execution_id: str,
+        message: Optional[str] = None,
+        expected_ms: Optional[float] = None,
+        tolerance_ms: float = 2.0,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """离线复核报文周期判定（与 Case03_Period 脚本的判定规则一致）
+
+        报文名和预期周期未指定时，从脚本名和脚本中的 ``ExpectOfFramePeriod`` 推断。
+
+        Args:
+            execution_id: 执行ID
+            message: 报文名或仲裁ID（可选）
+            expected_ms: 预期周期（毫秒，可选）
+            tolerance_ms: 允许偏差（毫秒）
+            start: 窗口开始时间（Unix 秒，可选）
+            end: 窗口结束时间（Unix 秒，可选）
+
+        Returns:
+            判定结果
+        """
+        recordings = self.get_recordings(execution_id)
+        script_path = recordings[0].get('script_path') if recordings else None
+
+        if message is None and script_path:
+            match = _MSG_SCRIPT_PATTERN.search(os.path.basename(script_path))
+            message = match.group('message') if match else None
+        if expected_ms is None and script_path:
+            expected_ms = self._read_expected_period(script_path)
+        if message is None or expected_ms is None:
+            return {
+                'success': False,
+                'error': 'Message name and expected period are required'
+            }
+
+        result = self.get_message_statistics(execution_id, message, start, end)
+        if not result['success']:
+            return result
+
+        stats = result['statistics']
+        passed = (
+            stats['period_avg'] is not None
+            and abs(stats['period_avg'] - expected_ms) <= tolerance_ms
+        )
+        return {
+            'success': True,
+            'message': message,
+            'expected_ms': expected_ms,
+            'tolerance_ms': tolerance_ms,
+            'statistics': stats,
+            'passed': passed
+        }
+
+    @staticmethod
+    def resolve_arbitration_id(message: Union[str, int]) -> int:
+        """解析仲裁ID
+
+        Args:
+            message: 仲裁ID（整数或 "0x27A"）或以十六进制ID结尾的报文名
+
+        Returns:
+            仲裁ID
+
+        Raises:
+            ValueError: 无法解析
+        """
+        if isinstance(message, int):
+            return message
+        text = message.strip()
+        if text.lower().startswith('0x'):
+            return int(text, 16)
+        match = _MESSAGE_ID_PATTERN.search(text)
+        if not match:
+            raise ValueError(f"Cannot determine arbitration id of message: {message}")
+        return int(match.group(1), 16)
+
+    @staticmethod
+    def _read_expected_period(script_path: str) -> Optional[float]:
+        """从脚本源码中读取预期周期"""
+        try:
+            with open(script_path, 'r', encoding='utf-8', errors='ignore') as f:
+                match = _EXPECT_PERIOD_PATTERN.search(f.read())
+            return float(match.group(1)) if match else None
+        except OSError:
+            return None
@@ -4,6 +4,7 @@
 """
 
 from typing import List, Dict, Any, Optional
+import os
 
 from AppCode.core.script_manager import ScriptManager
 from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
@@ -17,7 +18,8 @@ class ScriptService:
         script_manager: ScriptManager,
         execution_repo: ExecutionHistoryRepository,
         logger=None,
-        cache_manager=None
+        cache_manager=None,
+        script_analyzer=None
     ):
         """初始化脚本服务
         
@@ -26,11 +28,13 @@ class ScriptService:
             execution_repo: 执行历史仓储
             logger: 日志记录器
             cache_manager: 缓存管理器
+            script_analyzer: 脚本静态分析器（可选）
         """
         self.script_manager = script_manager
         self.execution_repo = execution_repo
         self.logger = logger
         self.cache_manager = cache_manager
+        self.script_analyzer = script_analyzer
     
     def scan_and_load_scripts(self, root_path: str) -> Dict[str, Any]:
         """扫描并加载脚本
@@ -216,6 +220,93 @@ class ScriptService:
         if self.logger:
             self.logger.info("Script cache cleared")
     
+    def analyze_scripts(self, script_paths: List[str]) -> Dict[str, Any]:
+        """静态分析脚本（等待预算、设备、信号）
+        
+        Args:
+            script_paths: 脚本路径列表
+            
+        Returns:
+            分析结果
+        """
+        if not self.script_analyzer:
+            return {
+                'success': False,
+                'error': 'Script analyzer not available'
+            }
+        
+        try:
+            return {
+                'success': True,
+                'results': self.script_analyzer.analyze_many(script_paths)
+            }
+        
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to analyze scripts: {e}")
+            
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_sleep_report(self, script_paths: List[str]) -> Dict[str, Any]:
+        """生成等待时间报告（静态等待预算与历史平均耗时对比）
+        
+        Args:
+            script_paths: 脚本路径列表（通常为一个测试方案的脚本）
+            
+        Returns:
+            报告结果
+        """
+        result = self.analyze_scripts(script_paths)
+        if not result['success']:
+            return result
+        
+        analyses = result['results']
+        durations = self.execution_repo.get_average_durations(list(analyses))
+        
+        scripts = []
+        devices = {}
+        total_sleep_ms = 0.0
+        total_duration = 0.0
+        measured_sleep_ms = 0.0
+        for path, analysis in analyses.items():
+            sleep_ms = analysis.get('sleep_ms', 0.0)
+            avg_duration = durations.get(path)
+            total_sleep_ms += sleep_ms
+            if avg_duration:
+                total_duration += avg_duration
+                measured_sleep_ms += sleep_ms
+            for device in analysis.get('devices', {}):
+                devices[device] = devices.get(device, 0) + 1
+            
+            scripts.append({
+                'path': path,
+                'name': os.path.basename(path),
+                'sleep_ms': sleep_ms,
+                'avg_duration': avg_duration,
+                'sleep_share': (sleep_ms / 1000.0 / avg_duration) if avg_duration else None,
+                'dynamic_sleeps': analysis.get('dynamic_sleeps', 0),
+                'unbounded_sleeps': analysis.get('unbounded_sleeps', 0),
+                'error': analysis.get('error')
+            })
+        
+        scripts.sort(key=lambda item: item['sleep_ms'], reverse=True)
+        
+        return {
+            'success': True,
+            'report': {
+                'total_scripts': len(scripts),
+                'total_sleep_ms': total_sleep_ms,
+                'total_avg_duration': total_duration,
+                # 只用有历史耗时的脚本计算占比
+                'sleep_share': (measured_sleep_ms / 1000.0 / total_duration) if total_duration else None,
+                'devices': dict(sorted(devices.items(), key=lambda item: item[1], reverse=True)),
+                'scripts': scripts
+            }
+        }
+    
     def _group_by_category(self, scripts: List[Dict[str, Any]]) -> Dict[str, int]:
         """按分类分组统计
         
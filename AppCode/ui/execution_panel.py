@@ -13,6 +13,7 @@ from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QColor, QTextCursor
 from datetime import datetime
 import threading
+import time
 
 
 class ExecutionPanel(QWidget):
@@ -39,12 +40,20 @@ class ExecutionPanel(QWidget):
         self.container = container
         self.logger = container.resolve('log_manager').get_logger('ui')
         self.execution_service = container.resolve('execution_service')
+        metrics = container.resolve('metrics')
+        # 界面刷新延迟：定时器实际触发比预期晚多少，以及一次刷新本身的耗时
+        self._timer_lag = metrics.histogram('ui_timer_lag_seconds', '执行状态刷新定时器的触发延迟')
+        self._update_duration = metrics.histogram('ui_update_seconds', '执行状态刷新耗时')
+        self._last_tick = None
         
         self._current_execution_id = None
         self._current_batch_id = None
         self._is_executing = False
         self._displayed_lines = {}  # 记录每个执行ID已显示的行数
         self._start_time = None  # 记录开始时间
+        self._script_paths = []  # 执行列表中各行对应的脚本路径
+        self._duration_model = None  # 脚本历史耗时模型（预估剩余时间）
+        self._row_started = {}  # 行号 -> 开始执行的时间
         self._is_stopping = False  # 标记是否正在停止
         self.current_suite = None  # 当前测试方案
         
@@ -274,6 +283,9 @@ class ExecutionPanel(QWidget):
             self._start_time = datetime.now()  # 记录开始时间
             self._is_stopping = False  # 重置停止标记
             self._last_update_time = {}  # 重置更新时间记录
+            self._script_paths = list(script_paths)
+            self._row_started = {}
+            self._duration_model = self.execution_service.get_duration_model(script_paths)
             
             # 优化：禁用UI更新，批量添加完成后再刷新
             self.execution_table.setUpdatesEnabled(False)
@@ -330,6 +342,7 @@ class ExecutionPanel(QWidget):
                 self._update_statistics()
                 
                 # 启动更新定时器
+                self._last_tick = None
                 self._update_timer.start()
                 self._time_timer.start()
                 
@@ -430,10 +443,21 @@ class ExecutionPanel(QWidget):
                 parent.stop_action.setEnabled(True)
     
     def _update_execution_status(self):
-        """更新执行状态（优化版 - 增量更新）"""
+        """更新执行状态（记录刷新延迟和耗时）"""
+        started = time.perf_counter()
+        if self._last_tick is not None:
+            self._timer_lag.observe(started - self._last_tick - self._update_timer.interval() / 1000)
+        self._last_tick = started
         # 如果不在执行中，或者正在停止，跳过更新
         if not self._is_executing or self._is_stopping:
             return
+        try:
+            self._refresh_execution_status()
+        finally:
+            self._update_duration.observe(time.perf_counter() - started)
+
+    def _refresh_execution_status(self):
+        """更新执行状态（优化版 - 增量更新）"""
 
         try:
             exec_id = self._current_execution_id or self._current_batch_id
@@ -741,6 +765,7 @@ class ExecutionPanel(QWidget):
         
         # 停止更新定时器
         self._update_timer.stop()
+        self._last_tick = None
         self._time_timer.stop()
         
         # 更新状态
@@ -854,24 +879,55 @@ class ExecutionPanel(QWidget):
             else:
                 self.pass_rate_label.setText("0.0%")
             
-            # 预估剩余时间
+            # 预估剩余时间：有历史的脚本按历史耗时中位数，其余按本次已完成脚本的平均耗时
             total_scripts = self.execution_table.rowCount()
-            if total_completed > 0 and total_completed < total_scripts:
-                if self._start_time:
-                    elapsed = (datetime.now() - self._start_time).total_seconds()
-                    avg_time_per_script = elapsed / total_completed
-                    remaining_scripts = total_scripts - total_completed
-                    eta_seconds = int(avg_time_per_script * remaining_scripts)
-                    
-                    eta_minutes = eta_seconds // 60
-                    eta_seconds = eta_seconds % 60
-                    self.eta_label.setText(f"{eta_minutes:02d}:{eta_seconds:02d}")
+            eta = self._estimate_remaining_seconds(total_completed)
+            if eta is not None and total_completed < total_scripts:
+                eta_seconds = int(eta)
+                eta_minutes = eta_seconds // 60
+                eta_seconds = eta_seconds % 60
+                self.eta_label.setText(f"{eta_minutes:02d}:{eta_seconds:02d}")
             else:
                 self.eta_label.setText("--:--")
         
         except Exception as e:
             self.logger.error(f"Error updating statistics: {e}")
 
+    def _estimate_remaining_seconds(self, total_completed: int):
+        """预估剩余执行时间（秒），无法预估时返回None
+
+        Args:
+            total_completed: 本次已完成的脚本数
+        """
+        from AppCode.utils.constants import TestResult
+        finished = (TestResult.PASS, TestResult.FAIL, TestResult.ERROR, TestResult.TIMEOUT)
+
+        pending_paths = []
+        running_path = None
+        running_elapsed = 0.0
+        for row in range(min(self.execution_table.rowCount(), len(self._script_paths))):
+            result_item = self.execution_table.item(row, 4)
+            status_item = self.execution_table.item(row, 1)
+            if result_item and result_item.text() in finished:
+                continue
+            if status_item and status_item.text() == "执行中" and running_path is None:
+                started = self._row_started.setdefault(row, datetime.now())
+                running_path = self._script_paths[row]
+                running_elapsed = (datetime.now() - started).total_seconds()
+            else:
+                pending_paths.append(self._script_paths[row])
+
+        default = None
+        if total_completed > 0 and self._start_time:
+            default = (datetime.now() - self._start_time).total_seconds() / total_completed
+        if self._duration_model is None:
+            if default is None:
+                return None
+            return default * (len(pending_paths) + (1 if running_path else 0))
+        return self._duration_model.estimate_remaining(
+            pending_paths, running_path, running_elapsed, default
+        )
+
     # ========== 控制按钮回调方法 ==========
     def _on_refresh_clicked(self):
         """刷新按钮点击"""
@@ -18,6 +18,7 @@ class ExecutionQueuePanel(QWidget):
     # 信号定义
     queue_changed = pyqtSignal(list)  # 队列改变时发出
     execute_requested = pyqtSignal(list)  # 请求执行
+    incremental_requested = pyqtSignal(list)  # 请求增量执行
 
     def __init__(self, parent=None):
         """初始化执行队列面板"""
@@ -116,6 +117,12 @@ class ExecutionQueuePanel(QWidget):
         self.execute_btn.setEnabled(False)
         execute_layout.addWidget(self.execute_btn)
 
+        self.incremental_btn = QPushButton("增量执行")
+        self.incremental_btn.setToolTip("只执行输入（脚本、辅助模块、ECU软件版本、DBC）变化或上次未合格的脚本")
+        self.incremental_btn.clicked.connect(self._on_incremental)
+        self.incremental_btn.setEnabled(False)
+        execute_layout.addWidget(self.incremental_btn)
+
         execute_layout.addStretch()
         layout.addLayout(execute_layout)
 
@@ -251,6 +258,7 @@ class ExecutionQueuePanel(QWidget):
 
             # 更新执行按钮状态
             self.execute_btn.setEnabled(len(self._queue) > 0)
+            self.incremental_btn.setEnabled(len(self._queue) > 0)
 
         finally:
             # 恢复UI更新
@@ -390,3 +398,10 @@ class ExecutionQueuePanel(QWidget):
             return
 
         self.execute_requested.emit(self._queue.copy())
+
+    def _on_incremental(self):
+        """增量执行队列中的脚本"""
+        if not self._queue:
+            return
+
+        self.incremental_requested.emit(self._queue.copy())
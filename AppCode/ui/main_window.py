@@ -8,7 +8,7 @@ from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QSplitter, QTabWidget, QStatusBar, QMenuBar,
     QMenu, QAction, QToolBar, QMessageBox, QFileDialog,
-    QSystemTrayIcon
+    QSystemTrayIcon, QInputDialog
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QIcon
@@ -50,6 +50,11 @@ class MainWindow(QMainWindow):
         self.backup_service = container.resolve('backup_service')
         self.user_service = container.resolve('user_service')
         self.plugin_manager = container.resolve('plugin_manager')
+        self.process_registry = container.resolve('process_registry')
+        self.performance_service = container.resolve('performance_monitor_service')
+        self.metrics_exporter = container.resolve('metrics_exporter')
+        self.history_archive = container.resolve('data_access').archive
+        self.measurement_service = container.resolve('measurement_service')
         
         # 当前登录用户信息
         self.current_user = None
@@ -69,6 +74,20 @@ class MainWindow(QMainWindow):
         self._disable_all_functions()
         
         self.logger.info("Main window initialized")
+        # 窗口显示后回收上次异常退出遗留的脚本进程
+        QTimer.singleShot(0, self._recover_bench)
+        # 系统监控（后台采样并按保留层级聚合）
+        config_manager = container.resolve('config_manager')
+        if config_manager.get('performance.monitoring', True):
+            self.performance_service.start_monitoring(config_manager.get('performance.interval', 5))
+        # 运行指标定期写入 Prometheus 文本和 JSON 文件
+        if config_manager.get('metrics.export', True):
+            self.metrics_exporter.start()
+        # 旧执行历史后台按月归档
+        if self.history_archive:
+            self.history_archive.start()
+        # 历史执行输出后台补提取测量值（已解析的执行不再重复）
+        self.measurement_service.start_backfill()
         # 移除自动更新检查，改为手动检查
         # QTimer.singleShot(3000, lambda: show_update_dialog(self, force_check=False))
     
@@ -296,6 +315,7 @@ class MainWindow(QMainWindow):
         
         # 执行队列信号
         self.execution_queue.execute_requested.connect(self._on_execute_queue)
+        self.execution_queue.incremental_requested.connect(self._on_execute_incremental)
         self.execution_queue.queue_changed.connect(self._on_queue_changed)
         
         # 执行面板信号
@@ -373,6 +393,65 @@ class MainWindow(QMainWindow):
         # 开始执行
         self.execution_panel.start_execution(script_paths)
     
+    def _on_execute_incremental(self, script_paths):
+        """增量执行：只执行输入指纹变化或上次未合格的脚本
+
+        Args:
+            script_paths: 候选脚本路径列表
+        """
+        if not script_paths:
+            return
+
+        try:
+            # ECU 软件版本由用户声明（刷写新版本后所有脚本视为输入变化）
+            config_manager = self.container.resolve('config_manager')
+            ecu_version, ok = QInputDialog.getText(
+                self, "增量执行", "ECU软件版本:",
+                text=config_manager.get('selection.ecu_version', '')
+            )
+            if not ok:
+                return
+            config_manager.set('selection.ecu_version', ecu_version.strip())
+            config_manager.save()
+            self.container.resolve('script_fingerprinter').configure(
+                search_paths=config_manager.get('selection.helper_paths', None) or None,
+                ecu_version=ecu_version,
+                dbc_path=config_manager.get('selection.dbc_path', '')
+            )
+
+            execution_service = self.container.resolve('execution_service')
+            result = execution_service.select_incremental_scripts(script_paths)
+            if not result['success']:
+                QMessageBox.critical(self, "错误", f"增量选择失败: {result.get('error')}")
+                return
+
+            selected, skipped, reasons = result['selected'], result['skipped'], result['reasons']
+            details = [f"执行 ({len(selected)}):"]
+            details += [f"  {os.path.basename(p)}: {reasons[p]}" for p in selected]
+            details += ["", f"跳过 ({len(skipped)}):"]
+            details += [f"  {os.path.basename(p)}: {reasons[p]}" for p in skipped]
+
+            box = QMessageBox(self)
+            box.setWindowTitle("增量执行")
+            box.setDetailedText('\n'.join(details))
+            if not selected:
+                box.setIcon(QMessageBox.Information)
+                box.setText(f"{len(skipped)} 个脚本的输入均未变化且上次合格，无需执行")
+                box.exec_()
+                return
+            box.setIcon(QMessageBox.Question)
+            box.setText(
+                f"共 {len(script_paths)} 个脚本，需要执行 {len(selected)} 个，"
+                f"跳过 {len(skipped)} 个。是否开始执行？"
+            )
+            box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+            if box.exec_() == QMessageBox.Yes:
+                self.logger.info(f"Incremental execution: {len(selected)}/{len(script_paths)} scripts")
+                self._on_execute_queue(selected)
+        except Exception as e:
+            self.logger.error(f"Error in incremental execution: {e}")
+            QMessageBox.critical(self, "错误", f"增量执行时出错: {e}")
+
     def _on_start_execution(self):
         """开始执行 - 从执行队列执行"""
         queue = self.execution_queue.get_queue()
@@ -469,6 +548,28 @@ class MainWindow(QMainWindow):
                 if engine:
                     engine.set_timeout(config_manager.get('execution.script_timeout', 3600))
                     engine.set_result_idle_timeout(config_manager.get('execution.result_idle_timeout', 300))
+                    engine.set_adaptive_timeouts(config_manager.get('execution.adaptive_timeouts', False))
+                    engine.set_profiling(config_manager.get('execution.profiling', False))
+                    engine.set_resource_limits(
+                        config_manager.get('execution.resource_limits', {}),
+                        config_manager.get('execution.suite_resource_limits', {})
+                    )
+                    engine.set_hang_diagnostics(
+                        config_manager.get('execution.hang_silence', 120),
+                        config_manager.get('execution.hang_action', 'continue')
+                    )
+                    engine.set_dry_run(
+                        config_manager.get('execution.dry_run', False),
+                        config_manager.get('execution.dry_run_config', '') or None
+                    )
+                    engine.set_zygote(
+                        config_manager.get('execution.zygote', False),
+                        config_manager.get('execution.zygote_preload', None)
+                    )
+                self.container.resolve('script_fingerprinter').configure(
+                    search_paths=config_manager.get('selection.helper_paths', None) or None,
+                    dbc_path=config_manager.get('selection.dbc_path', '')
+                )
                 self.logger.info("Settings saved and applied to engine")
                 self.status_bar.showMessage("设置已保存", 3000)
                 # 刷新插件菜单
@@ -653,6 +754,64 @@ tr:nth-child(even) {{ background-color: #f2f2f2; }}
         """结果被选中"""
         self.status_bar.showMessage(f"查看执行结果: {execution_id}")
     
+    def _recover_bench(self):
+        """回收上次异常退出遗留的脚本进程并占用台架
+
+        按 execution.orphan_policy 处理：ask 询问后终止，kill 直接终止，ignore 不处理
+        （登记保留到下次启动）。另一个程序实例仍在运行时只提示，不回收其进程。
+        """
+        try:
+            config_manager = self.container.resolve('config_manager')
+            policy = config_manager.get('execution.orphan_policy', 'ask')
+
+            others = self.process_registry.other_sessions()
+            if others:
+                pids = ', '.join(str(s['pid']) for s in others)
+                self.logger.warning(f"Another instance is using the bench: {pids}")
+                QMessageBox.warning(
+                    self,
+                    "台架占用",
+                    f"另一个测试程序实例（PID {pids}）正在运行，可能正在使用台架设备。\n"
+                    "同时执行脚本会造成 CAN 卡和电源冲突。"
+                )
+
+            orphans = self.process_registry.find_orphans() if policy != 'ignore' else []
+            if orphans:
+                lines = '\n'.join(
+                    f"PID {o['pid']} {o['name']}  {os.path.basename(o['script_path'] or '')}"
+                    for o in orphans[:10]
+                )
+                if len(orphans) > 10:
+                    lines += f"\n... 共 {len(orphans)} 个进程"
+                reply = QMessageBox.Yes
+                if policy == 'ask':
+                    reply = QMessageBox.question(
+                        self,
+                        "遗留脚本进程",
+                        f"上次程序异常退出，以下脚本进程仍在运行并可能占用台架设备：\n\n{lines}\n\n"
+                        "是否终止这些进程？",
+                        QMessageBox.Yes | QMessageBox.No,
+                        QMessageBox.Yes
+                    )
+                if reply == QMessageBox.Yes:
+                    result = self.process_registry.reap_orphans(
+                        config_manager.get('execution.terminate_grace', 0.5),
+                        config_manager.get('execution.kill_timeout', 1.0)
+                    )
+                    if result['survivors']:
+                        QMessageBox.warning(
+                            self, "警告",
+                            f"以下进程无法终止，请手动结束：{result['survivors']}"
+                        )
+                    else:
+                        self.status_bar.showMessage(
+                            f"已终止 {len(result['terminated'])} 个遗留脚本进程", 5000
+                        )
+
+            self.process_registry.claim()
+        except Exception as e:
+            self.logger.error(f"Error recovering bench: {e}")
+
     def closeEvent(self, event):
         """窗口关闭事件"""
         reply = QMessageBox.question(
@@ -665,6 +824,12 @@ tr:nth-child(even) {{ background-color: #f2f2f2; }}
         
         if reply == QMessageBox.Yes:
             self.logger.info("Application closing")
+            self.performance_service.stop_monitoring()
+            self.metrics_exporter.stop()
+            if self.history_archive:
+                self.history_archive.stop()
+            self.measurement_service.stop()
+            self.process_registry.release()
             event.accept()
         else:
             event.ignore()
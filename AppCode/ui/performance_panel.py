@@ -3,18 +3,23 @@
 显示系统性能指标和执行统计信息。
 """
 
+import time
+
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
     QLabel, QProgressBar, QPushButton, QTableWidget,
     QTableWidgetItem, QHeaderView
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QColor
 
 
 class PerformancePanel(QWidget):
     """性能监控面板组件"""
     
+    # 执行引擎采样线程推送的脚本进程树资源采样（转到界面线程处理）
+    script_sample_received = pyqtSignal(str, dict)
+    
     def __init__(self, container, parent=None):
         """初始化性能监控面板
         
@@ -27,12 +32,23 @@ class PerformancePanel(QWidget):
         self.container = container
         self.logger = container.resolve('log_manager').get_logger('ui')
         self.performance_service = container.resolve('performance_monitor_service')
+        self.execution_engine = container.resolve('execution_engine')
+        self.cache_manager = container.resolve('cache_manager')
+        self.metrics = container.resolve('metrics')
+        self._counter_history = {}  # 计数器 -> (上次时间, 上次值)，用于计算速率
+        self._script_peak_rss = {}  # execution_id -> 峰值内存（MB）
         
         self._init_ui()
         
+        # 脚本进程树资源由执行引擎后台采样后推送，面板不在界面线程中调用 psutil
+        self.script_sample_received.connect(self._on_script_sample)
+        self.execution_engine.register_callback('resource_sample', self._on_engine_sample)
+        
         # 创建定时器用于更新性能指标
         self._update_timer = QTimer()
         self._update_timer.timeout.connect(self._update_metrics)
+        self._update_timer.timeout.connect(self._update_cache_stats)
+        self._update_timer.timeout.connect(self._update_internal_metrics)
         self._update_timer.setInterval(2000)  # 每2秒更新一次
         self._update_timer.start()
     
@@ -114,6 +130,46 @@ class PerformancePanel(QWidget):
         process_group.setLayout(process_layout)
         layout.addWidget(process_group)
         
+        # 当前脚本进程树
+        script_group = QGroupBox("当前脚本")
+        script_layout = QVBoxLayout()
+        self.script_name_label = QLabel("无运行中的脚本")
+        script_layout.addWidget(self.script_name_label)
+        self.script_cpu_label = QLabel("CPU: -")
+        script_layout.addWidget(self.script_cpu_label)
+        self.script_memory_label = QLabel("内存: -")
+        script_layout.addWidget(self.script_memory_label)
+        self.script_detail_label = QLabel("进程/线程/句柄: -")
+        script_layout.addWidget(self.script_detail_label)
+        self.script_io_label = QLabel("读/写: -")
+        script_layout.addWidget(self.script_io_label)
+        script_group.setLayout(script_layout)
+        layout.addWidget(script_group)
+        
+        # 缓存统计组
+        cache_group = QGroupBox("缓存")
+        cache_layout = QVBoxLayout()
+        self.cache_table = QTableWidget()
+        self.cache_table.setColumnCount(5)
+        self.cache_table.setHorizontalHeaderLabels(["缓存", "命中率", "命中/未命中", "淘汰/过期", "内存"])
+        self.cache_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.cache_table.setMaximumHeight(150)
+        cache_layout.addWidget(self.cache_table)
+        cache_group.setLayout(cache_layout)
+        layout.addWidget(cache_group)
+        
+        # 运行指标组（执行引擎、数据层和界面的内部指标）
+        metrics_group = QGroupBox("运行指标")
+        metrics_layout = QVBoxLayout()
+        self.metrics_table = QTableWidget()
+        self.metrics_table.setColumnCount(2)
+        self.metrics_table.setHorizontalHeaderLabels(["指标", "值"])
+        self.metrics_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.metrics_table.setMaximumHeight(200)
+        metrics_layout.addWidget(self.metrics_table)
+        metrics_group.setLayout(metrics_layout)
+        layout.addWidget(metrics_group)
+        
         # 执行统计组
         stats_group = QGroupBox("执行统计 (最近7天)")
         stats_layout = QVBoxLayout()
@@ -175,6 +231,87 @@ class PerformancePanel(QWidget):
         except Exception as e:
             self.logger.error(f"Error updating metrics: {e}")
     
+    def _update_cache_stats(self):
+        """更新缓存命中、淘汰和内存占用"""
+        try:
+            stats = self.cache_manager.get_cache_stats()
+            self.cache_table.setRowCount(len(stats))
+            for row, (name, item) in enumerate(sorted(stats.items())):
+                values = (
+                    name,
+                    f"{item['hit_rate'] * 100:.1f}%",
+                    f"{item['hits']} / {item['misses']}",
+                    f"{item['evictions']} / {item['expirations']}",
+                    f"{item['bytes'] / (1024 * 1024):.1f} / {item['max_bytes'] / (1024 * 1024):.0f} MB"
+                )
+                for column, value in enumerate(values):
+                    self.cache_table.setItem(row, column, QTableWidgetItem(value))
+        except Exception as e:
+            self.logger.error(f"Error updating cache stats: {e}")
+    
+    def _update_internal_metrics(self):
+        """更新运行指标：直方图显示次数和分位数（毫秒），计数器显示累计值和每秒速率"""
+        try:
+            items = [item for item in self.metrics.collect() if not item['name'].startswith('cache_')]
+            self.metrics_table.setRowCount(len(items))
+            now = time.time()
+            for row, item in enumerate(items):
+                labels = ', '.join(f"{k}={v}" for k, v in item['labels'].items())
+                name = f"{item['name']} ({labels})" if labels else item['name']
+                value = item['value']
+                if item['type'] == 'histogram':
+                    text = (
+                        f"n={value['count']}  p50={value['p50'] * 1000:.2f}ms  "
+                        f"p99={value['p99'] * 1000:.2f}ms  max={value['max'] * 1000:.2f}ms"
+                    )
+                elif item['type'] == 'counter':
+                    key = (item['name'], tuple(item['labels'].items()))
+                    last_time, last_value = self._counter_history.get(key, (now, value))
+                    self._counter_history[key] = (now, value)
+                    rate = (value - last_value) / (now - last_time) if now > last_time else 0.0
+                    text = f"{value:g}  ({rate:.1f}/s)"
+                else:
+                    text = f"{value:g}"
+                self.metrics_table.setItem(row, 0, QTableWidgetItem(name))
+                self.metrics_table.setItem(row, 1, QTableWidgetItem(text))
+        except Exception as e:
+            self.logger.error(f"Error updating internal metrics: {e}")
+    
+    def _on_engine_sample(self, execution_id: str, sample: dict):
+        """执行引擎采样线程中的回调，只转发信号"""
+        self.script_sample_received.emit(execution_id, sample)
+    
+    def _on_script_sample(self, execution_id: str, sample: dict):
+        """显示当前脚本进程树的资源采样
+        
+        Args:
+            execution_id: 执行ID
+            sample: 采样数据（cpu、rss、read、write、threads、handles、procs）
+        """
+        try:
+            rss_mb = sample.get('rss', 0) / (1024 * 1024)
+            if execution_id not in self._script_peak_rss:
+                self._script_peak_rss = {execution_id: rss_mb}
+            peak_mb = max(self._script_peak_rss[execution_id], rss_mb)
+            self._script_peak_rss[execution_id] = peak_mb
+            
+            status = self.execution_engine.get_execution_status(execution_id)
+            script_path = status.get('script_path') if status else None
+            self.script_name_label.setText(
+                f"{script_path or execution_id} (PID {sample.get('pid')}, {sample.get('t', 0):.0f} 秒)"
+            )
+            self.script_cpu_label.setText(f"CPU: {sample.get('cpu', 0):.1f}%")
+            self.script_memory_label.setText(f"内存: {rss_mb:.1f} MB (峰值 {peak_mb:.1f} MB)")
+            self.script_detail_label.setText(
+                f"进程/线程/句柄: {sample.get('procs', 0)} / {sample.get('threads', 0)} / {sample.get('handles', 0)}"
+            )
+            self.script_io_label.setText(
+                f"读/写: {sample.get('read', 0) / (1024 * 1024):.2f} MB / "
+                f"{sample.get('write', 0) / (1024 * 1024):.2f} MB"
+            )
+        except Exception as e:
+            self.logger.error(f"Error updating script sample: {e}")
+    
     def _refresh_statistics(self):
         """刷新统计信息"""
         try:
@@ -224,4 +361,5 @@ class PerformancePanel(QWidget):
     def closeEvent(self, event):
         """关闭事件"""
         self._update_timer.stop()
+        self.execution_engine.unregister_callback('resource_sample', self._on_engine_sample)
         super().closeEvent(event)
\ No newline at end of file
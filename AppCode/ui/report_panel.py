@@ -31,6 +31,7 @@ DATA_FIELDS = [
     ("end_time", "结束时间"),
     ("output", "标准输出"),
     ("error", "错误输出"),
+    ("measurements", "实测数据"),
 ]
 
 # 匹配字段定义
@@ -49,6 +50,7 @@ class ReportPanel(QWidget):
         self.logger = container.resolve('log_manager').get_logger('report_panel')
         self.history_repo = container.resolve('execution_history_repo')
         self.test_suite_repo = container.resolve('test_suite_repository')
+        self.measurement_service = container.resolve('measurement_service')
 
         self._excel_columns = []  # 当前模板的 Excel 列名列表
         self._cached_records = []  # 加载的执行记录缓存
@@ -497,19 +499,18 @@ class ReportPanel(QWidget):
         for r in records:
             bid = r.get('batch_id', '')
             if bid:
-                batch_map[bid] = batch_map.get(bid, 0) + 1
+                count, started_at = batch_map.get(bid, (0, None))
+                batch_map[bid] = (count + 1, r.get('batch_started_at'))
 
-        # 按时间倒序排列
-        sorted_batches = sorted(batch_map.items(), key=lambda x: x[0], reverse=True)
-        for bid, count in sorted_batches:
+        # 按批次开始时间倒序排列
+        sorted_batches = sorted(
+            batch_map.items(), key=lambda x: (x[1][1] or 0, x[0]), reverse=True
+        )
+        for bid, (count, started_at) in sorted_batches:
             label = bid
-            try:
-                parts = bid.split('_')
-                ts = int(parts[1]) / 1000000
-                dt = datetime.fromtimestamp(ts)
+            if started_at is not None:
+                dt = datetime.fromtimestamp(started_at / 1000)
                 label = f"{dt.strftime('%m-%d %H:%M:%S')} ({count}条)"
-            except Exception:
-                pass
             self.batch_combo.addItem(label, bid)
 
         self.batch_combo.blockSignals(False)
@@ -797,6 +798,10 @@ class ReportPanel(QWidget):
                 val = round(float(val), 2)
             except (ValueError, TypeError):
                 pass
+        elif field == 'measurements':
+            # 从测量值表查询，而不是重新解析输出文本
+            rows = self.measurement_service.get_execution_measurements(record.get('id'))
+            val = self.measurement_service.format_measurements(rows)
         return val if val is not None else ''
 
     def refresh(self):
@@ -15,6 +15,8 @@ import csv
 import json
 from datetime import datetime
 
+from AppCode.data_access.time_columns import record_duration
+
 
 class ResultViewer(QWidget):
     """结果查看器组件"""
@@ -36,6 +38,7 @@ class ResultViewer(QWidget):
         self.execution_service = container.resolve('execution_service')
         self.analysis_service = container.resolve('analysis_service')
         self.suite_service = container.resolve('test_suite_service')
+        self.measurement_service = container.resolve('measurement_service')
         
         self._all_results = []  # 存储所有结果
         
@@ -121,6 +124,11 @@ class ResultViewer(QWidget):
         self.export_json_btn.clicked.connect(self._export_to_json)
         row2_layout.addWidget(self.export_json_btn)
 
+        self.export_trace_btn = QPushButton("导出时间线")
+        self.export_trace_btn.setToolTip("导出选中记录所在批次的执行时间线（Chrome trace 格式，可在 chrome://tracing 中打开）")
+        self.export_trace_btn.clicked.connect(self._export_batch_trace)
+        row2_layout.addWidget(self.export_trace_btn)
+
         self.compare_btn = QPushButton("对比选中")
         self.compare_btn.setToolTip("选中2条记录后点击进行对比")
         self.compare_btn.clicked.connect(self._on_compare)
@@ -287,30 +295,8 @@ class ResultViewer(QWidget):
             self.logger.info(f"Found {len(results)} results matching criteria")
             
             # 先收集所有批次时间（在应用批次时间筛选之前）
-            all_batch_times = set()
-            for result in results:
-                batch_id = result.get('batch_id', '')
-                if batch_id and batch_id.startswith('batch_'):
-                    try:
-                        parts = batch_id.split('_')
-                        if len(parts) >= 2:
-                            timestamp_us = int(parts[1])
-                            timestamp_s = timestamp_us / 1000000
-                            dt = datetime.fromtimestamp(timestamp_s)
-                            batch_time = dt.strftime('%H:%M:%S')
-                            all_batch_times.add(batch_time)
-                    except Exception:
-                        pass
-                elif not batch_id:
-                    # 如果没有batch_id，使用start_time
-                    start_time = result.get('start_time', '')
-                    if start_time:
-                        try:
-                            dt = datetime.fromisoformat(start_time.replace('T', ' ').split('.')[0])
-                            batch_time = dt.strftime('%H:%M:%S')
-                            all_batch_times.add(batch_time)
-                        except Exception:
-                            pass
+            all_batch_times = {self._batch_time(result) for result in results}
+            all_batch_times.discard('-')
             
             # 更新批次时间下拉框（使用所有批次时间）
             self._update_batch_combo(all_batch_times)
@@ -322,22 +308,7 @@ class ResultViewer(QWidget):
             
             # 应用批次时间过滤
             if batch_time_filter:
-                filtered_results = []
-                for result in results:
-                    batch_id = result.get('batch_id', '')
-                    if batch_id and batch_id.startswith('batch_'):
-                        try:
-                            parts = batch_id.split('_')
-                            if len(parts) >= 2:
-                                timestamp_us = int(parts[1])
-                                timestamp_s = timestamp_us / 1000000
-                                dt = datetime.fromtimestamp(timestamp_s)
-                                batch_time = dt.strftime('%H:%M:%S')
-                                if batch_time == batch_time_filter:
-                                    filtered_results.append(result)
-                        except Exception:
-                            pass
-                results = filtered_results
+                results = [r for r in results if self._batch_time(r) == batch_time_filter]
 
             # 应用测试结果过滤（合格/不合格/待判定等）
             if test_result_values:
@@ -379,33 +350,8 @@ class ResultViewer(QWidget):
                 suite_item.setTextAlignment(Qt.AlignCenter)
                 self.result_table.setItem(row, 1, suite_item)
                 
-                # 批次时间（从batch_id提取或使用start_time）
-                batch_id = result.get('batch_id', '')
-                batch_time = '-'
-                if batch_id and batch_id.startswith('batch_'):
-                    # batch_id格式：batch_1765560702018331_59635
-                    # 提取时间戳部分（微秒）
-                    try:
-                        parts = batch_id.split('_')
-                        if len(parts) >= 2:
-                            timestamp_us = int(parts[1])
-                            timestamp_s = timestamp_us / 1000000
-                            dt = datetime.fromtimestamp(timestamp_s)
-                            batch_time = dt.strftime('%H:%M:%S')
-                    except Exception:
-                        pass
-                
-                if batch_time == '-':
-                    # 如果无法从batch_id提取，使用start_time
-                    start_time = result.get('start_time', '')
-                    if start_time:
-                        try:
-                            dt = datetime.fromisoformat(start_time.replace('T', ' ').split('.')[0])
-                            batch_time = dt.strftime('%H:%M:%S')
-                        except Exception:
-                            pass
-                
-                batch_time_item = QTableWidgetItem(batch_time)
+                # 批次时间（批次开始时间，没有批次时使用开始时间）
+                batch_time_item = QTableWidgetItem(self._batch_time(result))
                 batch_time_item.setTextAlignment(Qt.AlignCenter)
                 self.result_table.setItem(row, 2, batch_time_item)
                 
@@ -479,20 +425,22 @@ class ResultViewer(QWidget):
         Returns:
             时长（秒）
         """
-        try:
-            from datetime import datetime
-            
-            start_time = result.get('start_time')
-            end_time = result.get('end_time')
+        duration = record_duration(result)
+        return duration if duration is not None else 0.0
+    
+    def _batch_time(self, result: dict) -> str:
+        """批次时间（HH:MM:SS），没有批次时使用开始时间
+        
+        Args:
+            result: 执行结果
             
-            if start_time and end_time:
-                start = datetime.fromisoformat(start_time)
-                end = datetime.fromisoformat(end_time)
-                return (end - start).total_seconds()
-        except Exception:
-            pass
-        
-        return 0.0
+        Returns:
+            批次时间，没有时间信息时为 '-'
+        """
+        epoch_ms = result.get('batch_started_at') or result.get('start_ms')
+        if epoch_ms is None:
+            return '-'
+        return datetime.fromtimestamp(epoch_ms / 1000).strftime('%H:%M:%S')
     
     def _translate_test_result(self, test_result: str) -> str:
         """将测试结果转换为中文显示（兼容中英文格式）
@@ -572,25 +520,12 @@ class ResultViewer(QWidget):
             duration = self._calculate_duration(r)
             total_duration += duration
 
-            try:
-                st = r.get('start_time')
-                if st:
-                    if isinstance(st, str):
-                        st = datetime.fromisoformat(st.replace('T', ' ').split('.')[0])
-                    if earliest_start is None or st < earliest_start:
-                        earliest_start = st
-            except Exception:
-                pass
-
-            try:
-                et = r.get('end_time')
-                if et:
-                    if isinstance(et, str):
-                        et = datetime.fromisoformat(et.replace('T', ' ').split('.')[0])
-                    if latest_end is None or et > latest_end:
-                        latest_end = et
-            except Exception:
-                pass
+            start_ms = r.get('start_ms')
+            if start_ms is not None and (earliest_start is None or start_ms < earliest_start):
+                earliest_start = start_ms
+            end_ms = r.get('end_ms')
+            if end_ms is not None and (latest_end is None or end_ms > latest_end):
+                latest_end = end_ms
 
         self.batch_total_label.setText(f"总计: {total} 条")
         self.batch_pass_label.setText(f"合格: {pass_count}")
@@ -598,8 +533,8 @@ class ResultViewer(QWidget):
         self.batch_pending_label.setText(f"待判定: {pending_count}")
 
         # 计算总运行时间
-        if earliest_start and latest_end:
-            total_time = (latest_end - earliest_start).total_seconds()
+        if earliest_start is not None and latest_end is not None:
+            total_time = (latest_end - earliest_start) / 1000
             if total_time >= 3600:
                 hours = int(total_time // 3600)
                 mins = int((total_time % 3600) // 60)
@@ -670,6 +605,57 @@ class ResultViewer(QWidget):
         if result.get('params'):
             detail_lines.append(f"\n参数: {result.get('params')}")
         
+        measurements = self.measurement_service.get_execution_measurements(result.get('id'))
+        if measurements:
+            detail_lines.append("\n实测数据:")
+            for m in measurements:
+                value = m.get('text_value') if m.get('value') is None else f"{m['value']:g}{m.get('unit') or ''}"
+                limits = ''
+                if m.get('lower_limit') is not None and m.get('upper_limit') is not None:
+                    limits = f"  [{m['lower_limit']:g}, {m['upper_limit']:g}]"
+                detail_lines.append(f"  {m.get('name')} = {value}{limits}")
+        
+        profile = self.execution_service.get_execution_profile(result.get('id'))
+        if profile:
+            breakdown = profile.get('breakdown', {})
+            wall_ms = profile.get('wall_ms') or 0
+            detail_lines.append("\n耗时分布:" + ("" if profile.get('complete') else " (进程被强制结束，数据不完整)"))
+            for key, label in (('sleep_ms', '等待'), ('device_ms', '设备I/O'), ('can_ms', 'CAN'),
+                               ('import_ms', '模块导入'), ('python_ms', 'Python')):
+                value = breakdown.get(key, 0)
+                share = f" ({value / wall_ms * 100:.1f}%)" if wall_ms else ""
+                detail_lines.append(f"  {label}: {value / 1000.0:.2f} 秒{share}")
+            for call in profile.get('calls', [])[:10]:
+                detail_lines.append(
+                    f"    {call['name']} x{call['count']}: {call['total_ms'] / 1000.0:.2f} 秒"
+                )
+        
+        resources = self.execution_service.get_execution_resources(result.get('id'))
+        if resources:
+            applied = ", ".join(f"{k}={v}" for k, v in resources.get('applied', {}).items())
+            detail_lines.append(f"\n资源限制: {applied or '无'}")
+            for key, error in resources.get('errors', {}).items():
+                detail_lines.append(f"  未能设置 {key}: {error}")
+        
+        samples = self.execution_service.get_execution_samples(result.get('id'))
+        if samples and samples['summary']:
+            summary = samples['summary']
+            detail_lines.append(
+                f"\n资源占用: CPU 峰值 {summary['peak_cpu_percent']:.1f}% / 平均 {summary['avg_cpu_percent']:.1f}%, "
+                f"内存峰值 {summary['peak_rss_mb']:.1f} MB"
+            )
+            detail_lines.append(
+                f"  内存增长 {summary['rss_growth_mb']:+.1f} MB ({summary['rss_slope_mb_per_min']:+.2f} MB/分钟), "
+                f"进程 {summary['peak_procs']}, 线程 {summary['peak_threads']}, 句柄 {summary['peak_handles']}, "
+                f"读 {summary['read_mb']:.2f} MB / 写 {summary['write_mb']:.2f} MB"
+            )
+        
+        for dump in self.execution_service.get_execution_hang_dumps(result.get('id')):
+            detail_lines.append(
+                f"\n疑似挂起: {dump.get('silence_s', 0):.0f} 秒无输出，CPU {dump.get('cpu_percent', 0):.1f}%"
+            )
+            detail_lines.append(dump.get('stack') or "  (脚本未响应调用栈请求)")
+        
         if result.get('output'):
             detail_lines.append(f"\n输出:\n{result.get('output')}")
         
@@ -716,19 +702,12 @@ class ResultViewer(QWidget):
                 for idx, result in enumerate(self._all_results, 1):
                     duration = self._calculate_duration(result)
                     
-                    # 提取批次时间
-                    batch_id = result.get('batch_id', '')
-                    batch_time = '-'
-                    if batch_id and batch_id.startswith('batch_'):
-                        try:
-                            parts = batch_id.split('_')
-                            if len(parts) >= 2:
-                                timestamp_us = int(parts[1])
-                                timestamp_s = timestamp_us / 1000000
-                                dt = datetime.fromtimestamp(timestamp_s)
-                                batch_time = dt.strftime('%Y-%m-%d %H:%M:%S')
-                        except Exception:
-                            batch_time = batch_id
+                    # 批次时间
+                    batch_started_at = result.get('batch_started_at')
+                    if batch_started_at is not None:
+                        batch_time = datetime.fromtimestamp(batch_started_at / 1000).strftime('%Y-%m-%d %H:%M:%S')
+                    else:
+                        batch_time = result.get('batch_id') or '-'
                     
                     # 转换测试结果为中文
                     test_result = self._translate_test_result(result.get('test_result', '-'))
@@ -756,6 +735,36 @@ class ResultViewer(QWidget):
             self.logger.error(f"Error exporting to CSV: {e}")
             QMessageBox.critical(self, "错误", f"导出失败: {e}")
     
+    def _export_batch_trace(self):
+        """导出选中记录所在批次的执行时间线"""
+        selected_items = self.result_table.selectedItems()
+        result = self.result_table.item(selected_items[0].row(), 0).data(Qt.UserRole) if selected_items else None
+        batch_id = result.get('batch_id') if result else None
+        if not batch_id:
+            QMessageBox.warning(self, "警告", "请先选择一条批次执行的记录")
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出时间线",
+            f"trace_{batch_id}.json",
+            "Trace Files (*.json);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        export_result = self.execution_service.export_batch_trace(batch_id, file_path)
+        if not export_result['success']:
+            QMessageBox.critical(self, "错误", f"导出时间线失败: {export_result.get('error')}")
+            return
+        
+        totals = export_result.get('phase_totals', {})
+        summary = "\n".join(f"{phase}: {seconds:.1f} 秒" for phase, seconds in totals.items())
+        QMessageBox.information(
+            self, "成功",
+            f"已导出 {export_result['scripts']} 个脚本的时间线到:\n{file_path}\n\n{summary}"
+        )
+    
     def _export_to_json(self):
         """导出为JSON"""
         if not self._all_results:
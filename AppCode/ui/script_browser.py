@@ -42,9 +42,11 @@ class ScriptBrowser(QWidget):
         self._filtered_scripts = []
         self._current_suite = None  # 当前加载的方案
         self._root_path = None  # 脚本根目录
+        self._analysis = {}  # 脚本静态分析结果 {path: analysis}
         
         # 保持线程引用，防止被垃圾回收导致崩溃
         self._scan_thread = None
+        self._analyze_thread = None
         
         self._init_ui()
         self._load_scripts()
@@ -82,11 +84,16 @@ class ScriptBrowser(QWidget):
         self.expand_all_btn.clicked.connect(self._on_expand_all)
         suite_layout.addWidget(self.expand_all_btn)
 
+        self.sleep_report_btn = QPushButton("等待报告")
+        self.sleep_report_btn.setToolTip("统计选中脚本（未选中时为当前方案）的静态等待时间")
+        self.sleep_report_btn.clicked.connect(self._on_sleep_report)
+        suite_layout.addWidget(self.sleep_report_btn)
+
         layout.addLayout(suite_layout)
         
         # 脚本树
         self.tree_widget = QTreeWidget()
-        self.tree_widget.setHeaderLabels(["脚本名称", "路径", "状态"])
+        self.tree_widget.setHeaderLabels(["脚本名称", "路径", "状态", "等待(s)"])
         self.tree_widget.setColumnWidth(0, 250)
         self.tree_widget.setColumnWidth(1, 350)
         # 不使用ExtendedSelection，改用复选框模式
@@ -105,7 +112,8 @@ class ScriptBrowser(QWidget):
         self._column_visibility = {
             0: True,   # 脚本名称 - 始终显示
             1: False,  # 路径 - 默认隐藏
-            2: False   # 状态 - 默认隐藏
+            2: False,  # 状态 - 默认隐藏
+            3: True    # 静态等待时间
         }
         self._apply_column_visibility()
         
@@ -203,6 +211,9 @@ class ScriptBrowser(QWidget):
             
             # 加载方案列表
             self._load_suites()
+
+            # 后台静态分析脚本（等待时间、设备、信号）
+            self._start_analysis()
             
             self.logger.info(f"Loaded {len(self._scripts)} scripts (including {len(self._custom_paths)} custom paths)")
         
@@ -333,6 +344,7 @@ class ScriptBrowser(QWidget):
                         script_item.setText(1, script['path'])
                         script_item.setText(2, script.get('status', 'idle'))
                         script_item.setData(0, Qt.UserRole, script)
+                        self._apply_analysis_to_item(script_item, script['path'])
                         
                         # 脚本节点添加复选框
                         script_item.setFlags(script_item.flags() | Qt.ItemIsUserCheckable)
@@ -525,6 +537,12 @@ class ScriptBrowser(QWidget):
         status_action.setChecked(self._column_visibility[2])
         status_action.triggered.connect(lambda: self._toggle_column(2))
         menu.addAction(status_action)
+
+        # 等待时间列选项
+        sleep_action = QAction("显示等待时间", self, checkable=True)
+        sleep_action.setChecked(self._column_visibility[3])
+        sleep_action.triggered.connect(lambda: self._toggle_column(3))
+        menu.addAction(sleep_action)
         
         # 在按钮下方显示菜单
         menu.exec_(self.column_settings_btn.mapToGlobal(
@@ -684,6 +702,127 @@ class ScriptBrowser(QWidget):
     def refresh(self):
         """刷新脚本列表"""
         self._load_scripts()
+
+    def _start_analysis(self):
+        """在后台线程中静态分析已加载的脚本，完成后更新等待时间列"""
+        from PyQt5.QtCore import QThread, pyqtSignal
+
+        if self._analyze_thread is not None or not self._scripts:
+            return
+
+        class AnalyzeThread(QThread):
+            finished = pyqtSignal(dict)
+            error = pyqtSignal(str)
+
+            def __init__(self, script_service, paths):
+                super().__init__()
+                self.script_service = script_service
+                self.paths = paths
+
+            def run(self):
+                result = self.script_service.analyze_scripts(self.paths)
+                if result['success']:
+                    self.finished.emit(result['results'])
+                else:
+                    self.error.emit(result.get('error', ''))
+
+        paths = [script['path'] for script in self._scripts]
+        self._analyze_thread = AnalyzeThread(self.script_service, paths)
+
+        def on_finished(results):
+            self._analysis = results
+            self._analyze_thread = None
+            self.tree_widget.itemChanged.disconnect(self._on_item_checked)
+            try:
+                self._apply_analysis_recursive(self.tree_widget.invisibleRootItem())
+            finally:
+                self.tree_widget.itemChanged.connect(self._on_item_checked)
+
+        def on_error(error_msg):
+            self.logger.warning(f"Script analysis failed: {error_msg}")
+            self._analyze_thread = None
+
+        self._analyze_thread.finished.connect(on_finished)
+        self._analyze_thread.error.connect(on_error)
+        self._analyze_thread.start()
+
+    def _apply_analysis_recursive(self, parent_item):
+        """递归更新脚本节点的等待时间列"""
+        for i in range(parent_item.childCount()):
+            item = parent_item.child(i)
+            script = item.data(0, Qt.UserRole)
+            if script:
+                self._apply_analysis_to_item(item, script.get('path'))
+            else:
+                self._apply_analysis_recursive(item)
+
+    def _apply_analysis_to_item(self, item, script_path):
+        """将静态分析结果显示到脚本节点（等待时间列和提示信息）"""
+        analysis = self._analysis.get(script_path)
+        if not analysis:
+            return
+
+        item.setText(3, f"{analysis.get('sleep_ms', 0) / 1000.0:.1f}")
+        lines = [f"静态等待: {analysis.get('sleep_ms', 0) / 1000.0:.1f} 秒"]
+        if analysis.get('dynamic_sleeps') or analysis.get('unbounded_sleeps'):
+            lines.append(
+                f"  (另有 {analysis.get('dynamic_sleeps', 0)} 处非常量等待，"
+                f"{analysis.get('unbounded_sleeps', 0)} 处位于次数未知的循环中)"
+            )
+        if analysis.get('devices'):
+            lines.append("设备: " + ", ".join(analysis['devices']))
+        if analysis.get('signals_read'):
+            lines.append("读取信号: " + ", ".join(analysis['signals_read']))
+        if analysis.get('signals_written'):
+            lines.append("写入信号: " + ", ".join(analysis['signals_written']))
+        if analysis.get('error'):
+            lines.append(f"分析失败: {analysis['error']}")
+        tooltip = "\n".join(lines)
+        item.setToolTip(0, tooltip)
+        item.setToolTip(3, tooltip)
+
+    def _on_sleep_report(self):
+        """显示等待时间报告（选中脚本，未选中时使用当前方案）"""
+        script_paths = self._get_checked_scripts()
+        title = "选中脚本"
+        if not script_paths and self._current_suite:
+            script_paths = self.suite_service.get_suite_scripts(self._current_suite['id'])
+            title = f"方案 '{self._current_suite['name']}'"
+        if not script_paths:
+            QMessageBox.warning(self, "警告", "请先选择脚本或测试方案")
+            return
+
+        result = self.script_service.get_sleep_report(script_paths)
+        if not result['success']:
+            QMessageBox.critical(self, "错误", f"生成等待报告失败: {result.get('error')}")
+            return
+
+        report = result['report']
+        summary = [
+            f"{title}: {report['total_scripts']} 个脚本",
+            f"静态等待合计: {report['total_sleep_ms'] / 3600000.0:.2f} 小时",
+        ]
+        if report['total_avg_duration']:
+            summary.append(f"历史平均耗时合计: {report['total_avg_duration'] / 3600.0:.2f} 小时")
+        if report['sleep_share'] is not None:
+            summary.append(f"等待占比: {report['sleep_share'] * 100:.1f}%")
+
+        details = ["等待时间最长的脚本:"]
+        for item in report['scripts'][:50]:
+            share = f"，占比 {item['sleep_share'] * 100:.0f}%" if item['sleep_share'] is not None else ""
+            details.append(f"  {item['sleep_ms'] / 1000.0:8.1f} s  {item['name']}{share}")
+        if report['devices']:
+            details.append("")
+            details.append("设备使用（脚本数）:")
+            for device, count in report['devices'].items():
+                details.append(f"  {device}: {count}")
+
+        box = QMessageBox(self)
+        box.setWindowTitle("等待时间报告")
+        box.setIcon(QMessageBox.Information)
+        box.setText("\n".join(summary))
+        box.setDetailedText("\n".join(details))
+        box.exec_()
     
     def get_selected_scripts(self):
         """获取选中的脚本
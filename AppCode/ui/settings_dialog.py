@@ -2,11 +2,12 @@
 设置对话框
 """
 import os
+import sys
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QSpinBox, QCheckBox, QPushButton, QGroupBox,
                              QFormLayout, QMessageBox, QTabWidget, QWidget,
                              QTableWidget, QTableWidgetItem, QHeaderView,
-                             QAbstractItemView, QFileDialog)
+                             QAbstractItemView, QFileDialog, QLineEdit)
 from PyQt5.QtCore import Qt
 from AppCode.infrastructure.config_manager import ConfigManager
 
@@ -189,6 +190,60 @@ class SettingsDialog(QDialog):
 
         execution_layout.addRow("结果输出空闲超时:", idle_layout)
 
+        # 自适应超时
+        self.adaptive_timeout_checkbox = QCheckBox("按脚本历史耗时（P99）收紧超时，历史不足时使用上面的设置")
+        execution_layout.addRow("自适应超时:", self.adaptive_timeout_checkbox)
+
+        # 剖析模式
+        self.profiling_checkbox = QCheckBox("记录脚本内部耗时分布（等待/设备I/O/CAN/Python）")
+        execution_layout.addRow("剖析模式:", self.profiling_checkbox)
+
+        # 挂起诊断
+        self.hang_silence_spinbox = QSpinBox()
+        self.hang_silence_spinbox.setMinimum(0)  # 0表示关闭
+        self.hang_silence_spinbox.setMaximum(86400)
+        self.hang_silence_spinbox.setValue(120)
+        self.hang_silence_spinbox.setSingleStep(30)
+        self.hang_terminate_checkbox = QCheckBox("记录后终止脚本（标记为超时）")
+
+        hang_layout = QHBoxLayout()
+        hang_layout.addWidget(self.hang_silence_spinbox)
+        hang_layout.addWidget(QLabel("秒"))
+        hang_layout.addWidget(self.hang_terminate_checkbox)
+        hang_label = QLabel("(未出现结果、无输出且CPU空闲时记录调用栈，0表示关闭)")
+        hang_label.setStyleSheet("color: gray; font-size: 10px;")
+        hang_layout.addWidget(hang_label)
+        hang_layout.addStretch()
+
+        execution_layout.addRow("挂起诊断:", hang_layout)
+
+        # 预热进程（仅 Linux）
+        self.zygote_checkbox = QCheckBox("预先导入公共模块，由常驻进程 fork 启动脚本（仅 Linux）")
+        self.zygote_checkbox.setEnabled(sys.platform.startswith('linux'))
+        execution_layout.addRow("预热进程:", self.zygote_checkbox)
+
+        # 模拟台架（无硬件验证脚本和执行流程）
+        self.dry_run_checkbox = QCheckBox("以模拟的设备/CAN模块运行脚本，等待不占用真实时间（无需台架）")
+        execution_layout.addRow("模拟台架:", self.dry_run_checkbox)
+        self.dry_run_config_edit = QLineEdit()
+        self.dry_run_config_edit.setPlaceholderText("可选，信号/SCPI/Modbus 应答配置（JSON）")
+        dry_run_browse_btn = QPushButton("浏览...")
+        dry_run_browse_btn.clicked.connect(self._browse_dry_run_config)
+        dry_run_layout = QHBoxLayout()
+        dry_run_layout.addWidget(self.dry_run_config_edit)
+        dry_run_layout.addWidget(dry_run_browse_btn)
+        execution_layout.addRow("模拟应答配置:", dry_run_layout)
+
+        # 增量执行的 DBC 文件（变化时重新执行所有脚本）
+        self.dbc_path_edit = QLineEdit()
+        self.dbc_path_edit.setPlaceholderText("可选，增量执行时DBC文件变化视为输入变化")
+        dbc_browse_btn = QPushButton("浏览...")
+        dbc_browse_btn.clicked.connect(self._browse_dbc_path)
+        dbc_layout = QHBoxLayout()
+        dbc_layout.addWidget(self.dbc_path_edit)
+        dbc_layout.addWidget(dbc_browse_btn)
+        execution_layout.addRow("DBC文件:", dbc_layout)
+
         # 添加说明
         info_label = QLabel(
             "单脚本最大运行时间：脚本执行超过此时间将被强制停止并标记为超时，继续执行下一条脚本。\n"
@@ -315,6 +370,22 @@ class SettingsDialog(QDialog):
         self.plugin_table.setItem(row, 0, QTableWidgetItem("新插件"))
         self.plugin_table.setItem(row, 1, QTableWidgetItem(""))
 
+    def _browse_dbc_path(self):
+        """浏览选择DBC文件"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "选择DBC文件", "", "DBC文件 (*.dbc);;所有文件 (*)"
+        )
+        if path:
+            self.dbc_path_edit.setText(path)
+
+    def _browse_dry_run_config(self):
+        """浏览选择模拟台架应答配置文件"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "选择模拟应答配置", "", "JSON文件 (*.json);;所有文件 (*)"
+        )
+        if path:
+            self.dry_run_config_edit.setText(path)
+
     def _browse_plugin_path(self):
         """浏览选择插件exe路径"""
         current_row = self.plugin_table.currentRow()
@@ -351,6 +422,17 @@ class SettingsDialog(QDialog):
             result_idle_timeout = self.config_manager.get('execution.result_idle_timeout', 300)
             self.result_idle_timeout_spinbox.setValue(result_idle_timeout)
 
+            self.adaptive_timeout_checkbox.setChecked(self.config_manager.get('execution.adaptive_timeouts', False))
+            self.profiling_checkbox.setChecked(self.config_manager.get('execution.profiling', False))
+            self.hang_silence_spinbox.setValue(self.config_manager.get('execution.hang_silence', 120))
+            self.hang_terminate_checkbox.setChecked(
+                self.config_manager.get('execution.hang_action', 'continue') == 'terminate'
+            )
+            self.zygote_checkbox.setChecked(self.config_manager.get('execution.zygote', False))
+            self.dry_run_checkbox.setChecked(self.config_manager.get('execution.dry_run', False))
+            self.dry_run_config_edit.setText(self.config_manager.get('execution.dry_run_config', ''))
+            self.dbc_path_edit.setText(self.config_manager.get('selection.dbc_path', ''))
+
             # 备份设置
             auto_backup = self.config_manager.get('backup.auto_backup', True)
             self.auto_backup_checkbox.setChecked(auto_backup)
@@ -394,6 +476,17 @@ class SettingsDialog(QDialog):
 
             result_idle_timeout = self.result_idle_timeout_spinbox.value()
             self.config_manager.set('execution.result_idle_timeout', result_idle_timeout)
+            self.config_manager.set('execution.adaptive_timeouts', self.adaptive_timeout_checkbox.isChecked())
+            self.config_manager.set('execution.profiling', self.profiling_checkbox.isChecked())
+            self.config_manager.set('execution.hang_silence', self.hang_silence_spinbox.value())
+            self.config_manager.set(
+                'execution.hang_action',
+                'terminate' if self.hang_terminate_checkbox.isChecked() else 'continue'
+            )
+            self.config_manager.set('execution.zygote', self.zygote_checkbox.isChecked())
+            self.config_manager.set('execution.dry_run', self.dry_run_checkbox.isChecked())
+            self.config_manager.set('execution.dry_run_config', self.dry_run_config_edit.text().strip())
+            self.config_manager.set('selection.dbc_path', self.dbc_path_edit.text().strip())
 
             # 备份设置
             self.config_manager.set('backup.auto_backup', self.auto_backup_checkbox.isChecked())
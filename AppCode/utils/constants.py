@@ -127,6 +127,7 @@ DEFAULT_RETRY_COUNT = 0        # 默认重试次数
 # 缓存配置
 DEFAULT_CACHE_SIZE = 100       # 默认缓存大小
 DEFAULT_CACHE_TTL = 3600       # 默认缓存过期时间（秒）
+DEFAULT_CACHE_BYTES = 16 * 1024 * 1024  # 默认缓存内存预算（字节）
 
 # 日志配置
 DEFAULT_LOG_LEVEL = "INFO"
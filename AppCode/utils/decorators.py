@@ -137,13 +137,15 @@ def require_permission(permission: str) -> Callable:
     return decorator
 
 
-def cache_result(ttl: int = 3600) -> Callable:
+def cache_result(ttl: int = 3600, max_bytes: int = None) -> Callable:
     """结果缓存装饰器
     
-    缓存函数返回结果。
+    缓存函数返回结果，按内存预算淘汰（BoundedCache），过期条目在访问时删除。
+    参数不可哈希时不缓存，直接调用函数。
     
     Args:
         ttl: 缓存过期时间（秒）
+        max_bytes: 内存预算（字节），None 使用默认值
     
     Example:
         @cache_result(ttl=300)
@@ -151,36 +153,26 @@ def cache_result(ttl: int = 3600) -> Callable:
             return x ** 2
     """
     def decorator(func: Callable) -> Callable:
-        cache = {}
-        call_count = [0]
+        # 延迟导入：cache 模块依赖本模块的 singleton
+        from AppCode.infrastructure.cache import BoundedCache
+        from .constants import DEFAULT_CACHE_BYTES
+
+        cache = BoundedCache(
+            func.__qualname__, max_bytes=max_bytes or DEFAULT_CACHE_BYTES, default_ttl=ttl
+        )
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # 创建缓存键
-            key = str(args) + str(kwargs)
-
-            # 检查缓存
-            if key in cache:
-                result, timestamp = cache[key]
-                if time.time() - timestamp < ttl:
-                    return result
-
-            # 执行函数并缓存结果
-            result = func(*args, **kwargs)
-            cache[key] = (result, time.time())
-
-            # 定期清理过期缓存条目
-            call_count[0] += 1
-            if call_count[0] % 100 == 0:
-                now = time.time()
-                expired = [k for k, (_, ts) in cache.items() if now - ts >= ttl]
-                for k in expired:
-                    del cache[k]
-
-            return result
+            key = (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            return cache.get_or_load(key, lambda: func(*args, **kwargs))
         
         # 添加清除缓存的方法
-        wrapper.clear_cache = lambda: cache.clear()
+        wrapper.clear_cache = cache.clear
+        wrapper.cache = cache
         return wrapper
     return decorator
 
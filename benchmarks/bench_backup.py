@@ -0,0 +1,146 @@
+"""数据库备份基准：在大数据库上测量全量/增量备份的耗时、大小和对写入的影响
+
+生成含 ``--rows`` 条执行历史的数据库，依次：
+
+- 全量备份（同时由另一线程持续写入，记录写事务最长等待时间）；
+- 插入 ``--changes`` 条记录后做增量备份；
+- 从增量备份恢复（沿增量链重建并校验）。
+
+用法（在项目根目录）::
+
+    python -m benchmarks.bench_backup [--rows 1000000] [--changes 1000] [--json result.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from AppCode.services.backup_service import BackupService  # noqa: E402
+
+OUTPUT = '步骤1 上电 输出电压 12.01V 电流 3.2A 判定: 合格\n' * 4
+
+
+def create_database(path: str, rows: int):
+    """生成执行历史数据库"""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE execution_history (id INTEGER PRIMARY KEY, script_path TEXT, "
+        "status TEXT, start_time TEXT, output TEXT)"
+    )
+    batch = 10000
+    for start in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO execution_history (script_path, status, start_time, output) VALUES (?, ?, ?, ?)",
+            [(f"scripts/Case_{i % 500:04d}.py", 'success', '2026-01-01T00:00:00', OUTPUT)
+             for i in range(start, min(rows, start + batch))]
+        )
+        conn.commit()
+    conn.close()
+
+
+def insert_rows(path: str, count: int):
+    """追加执行记录"""
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO execution_history (script_path, status, start_time, output) VALUES (?, ?, ?, ?)",
+        [('scripts/Case_New.py', 'failed', '2026-01-02T00:00:00', OUTPUT) for _ in range(count)]
+    )
+    conn.commit()
+    conn.close()
+
+
+class Writer(threading.Thread):
+    """备份期间持续写入，记录单个写事务的最长耗时"""
+
+    def __init__(self, path: str):
+        super().__init__(daemon=True)
+        self.path = path
+        self.stop = threading.Event()
+        self.max_wait = 0.0
+        self.commits = 0
+
+    def run(self):
+        conn = sqlite3.connect(self.path, timeout=60)
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            conn.execute(
+                "UPDATE execution_history SET status = 'success' WHERE id = ?", (self.commits % 1000 + 1,)
+            )
+            conn.commit()
+            self.max_wait = max(self.max_wait, time.perf_counter() - started)
+            self.commits += 1
+            time.sleep(0.01)
+        conn.close()
+
+
+def run(rows: int, changes: int) -> dict:
+    work_dir = tempfile.mkdtemp(prefix='bench_backup_')
+    try:
+        data_dir = os.path.join(work_dir, 'data')
+        os.makedirs(data_dir)
+        db_path = os.path.join(data_dir, 'script_executor.db')
+
+        started = time.perf_counter()
+        create_database(db_path, rows)
+        print(f"database: {rows} rows, {os.path.getsize(db_path) / 1e6:.1f} MB "
+              f"({time.perf_counter() - started:.1f}s to generate)")
+
+        service = BackupService(data_dir, os.path.join(data_dir, 'backups'))
+        writer = Writer(db_path)
+        writer.start()
+        full = service.create_backup('full')
+        writer.stop.set()
+        writer.join()
+
+        insert_rows(db_path, changes)
+        incremental = service.create_backup('incremental')
+
+        started = time.perf_counter()
+        restored = service.restore_backup(incremental['backup_name'])
+        restore_s = time.perf_counter() - started
+        if not (full['success'] and incremental['success'] and restored['success']):
+            raise RuntimeError(full.get('error') or incremental.get('error') or restored.get('error'))
+
+        return {
+            'rows': rows,
+            'db_mb': round(os.path.getsize(db_path) / 1e6, 2),
+            'full_s': round(full['elapsed'], 3),
+            'full_mb': round(full['backup_size'] / 1e6, 2),
+            'incremental_s': round(incremental['elapsed'], 3),
+            'incremental_mb': round(incremental['backup_size'] / 1e6, 3),
+            'restore_s': round(restore_s, 3),
+            'writer_commits': writer.commits,
+            'writer_max_wait_ms': round(writer.max_wait * 1000, 1),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--changes', type=int, default=1000)
+    parser.add_argument('--json', help='结果写入 JSON 文件')
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.changes)
+    for key, value in result.items():
+        print(f"{key:>20}: {value}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""批量执行编排开销基准：生成合成脚本，经 ExecutionService.execute_batch_scripts 执行
+
+每个合成脚本先等待 ``--duration`` 秒，再连续输出 ``--lines`` 行（每行 ``--line-bytes``
+字节），最后输出结果关键词后退出。根据每次执行保存的时间线统计：
+
+- spawn_ms：启动子进程（spawn_start → spawned）；
+- per_line_us：输出读取开销（first_output → result_detected，除以行数）；
+- gap_ms：脚本间隔（上一脚本进程退出 → 下一脚本开始启动）；
+- db_write_ms：结果保存（persist_start → persist_end）；
+- memory_growth_kb：批次前后本进程常驻内存增长（按脚本数平均）；
+- overhead_ms：批次总耗时减去直接运行同一脚本的耗时，按脚本数平均。
+
+结果可写入 JSON，并与提交在仓库中的基线比较（超出容差时返回码为 1）。
+
+用法（在项目根目录）::
+
+    python -m benchmarks.bench_orchestrator [--scripts 20] [--lines 100] [--duration 0.05]
+        [--json result.json] [--baseline benchmarks/baselines/orchestrator.json]
+        [--tolerance 0.5] [--update-baseline]
+"""
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from AppCode.core.execution_engine import ExecutionEngine  # noqa: E402
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess  # noqa: E402
+from AppCode.repositories.batch_execution_repository import BatchExecutionRepository  # noqa: E402
+from AppCode.repositories.execution_artifact_repository import ExecutionArtifactRepository  # noqa: E402
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository  # noqa: E402
+from AppCode.services.execution_service import ExecutionService  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, 'benchmarks', 'baselines', 'orchestrator.json')
+
+# 参与基线比较的指标（越小越好）及其绝对容差（抵消小数值上的计时抖动）
+METRICS = {
+    'spawn_ms': 2.0,
+    'per_line_us': 5.0,
+    'gap_ms': 5.0,
+    'db_write_ms': 2.0,
+    'memory_growth_kb': 64.0,
+    'overhead_ms': 10.0,
+}
+
+SCRIPT_TEMPLATE = '''import time
+
+time.sleep({duration})
+PAD = 'x' * {pad}
+for i in range({lines}):
+    print(f"line {{i:06d}} {{PAD}}")
+print("Case_{index:04d} 测试结果: 合格")
+'''
+
+
+def generate_scripts(target_dir: str, count: int, lines: int, line_bytes: int, duration: float):
+    """生成合成脚本，返回脚本路径列表"""
+    paths = []
+    for index in range(count):
+        path = os.path.join(target_dir, f"Case_{index:04d}.py")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(SCRIPT_TEMPLATE.format(
+                duration=duration, lines=lines, pad=max(0, line_bytes - 12), index=index
+            ))
+        paths.append(path)
+    return paths
+
+
+def measure_direct(scripts, sample: int = 10) -> float:
+    """直接运行（不经过执行引擎）的脚本耗时中位数（秒）"""
+    durations = []
+    for script in scripts[:sample]:
+        start = time.perf_counter()
+        subprocess.run(['python', script], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def _rss_kb() -> float:
+    """本进程常驻内存（KB）"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024.0
+    except ImportError:
+        import resource
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 3) if values else None
+
+
+def _span(timeline, start, end):
+    if start in timeline and end in timeline:
+        return timeline[end] - timeline[start]
+    return None
+
+
+def run_batch(scripts, work_dir: str, timeout: float = 600.0):
+    """经执行服务批量执行，返回 (按执行顺序的时间线列表, 批次耗时（秒）, 内存增长（KB）)"""
+    data_access = SQLiteDataAccess(os.path.join(work_dir, 'bench.db'))
+    engine = ExecutionEngine()
+    execution_repo = ExecutionHistoryRepository(data_access)
+    artifact_repo = ExecutionArtifactRepository(data_access)
+    service = ExecutionService(
+        engine, execution_repo, BatchExecutionRepository(data_access), artifact_repo=artifact_repo
+    )
+
+    gc.collect()
+    rss_before = _rss_kb()
+    started = time.perf_counter()
+    try:
+        result = service.execute_batch_scripts(scripts)
+        if not result.get('success'):
+            raise RuntimeError(result.get('error'))
+        execution_ids = [r['id'] for r in execution_repo.get_by_batch(result['batch_id'])]
+
+        # 时间线在结果保存的最后写入，全部写入即批次完成
+        deadline = time.monotonic() + timeout
+        timelines = {}
+        while len(timelines) < len(execution_ids):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{len(timelines)}/{len(execution_ids)} scripts finished")
+            time.sleep(0.05)
+            timelines = artifact_repo.get_many(execution_ids, 'timeline')
+        elapsed = time.perf_counter() - started
+        gc.collect()
+        rss_growth = _rss_kb() - rss_before
+    finally:
+        # 批次已结束（或超时放弃），只需停止工作线程
+        engine._running = False
+
+    ordered = sorted(timelines.values(), key=lambda t: t.get('spawn_start', 0))
+    return ordered, elapsed, rss_growth
+
+
+def summarize(timelines, elapsed: float, rss_growth: float, direct: float, args) -> dict:
+    """由时间线计算各项指标"""
+    count = len(timelines)
+    spawn = [_span(t, 'spawn_start', 'spawned') for t in timelines]
+    reading = [_span(t, 'first_output', 'result_detected') for t in timelines]
+    db_write = [_span(t, 'persist_start', 'persist_end') for t in timelines]
+    gaps = [
+        current['spawn_start'] - previous['process_exit']
+        for previous, current in zip(timelines, timelines[1:])
+        if 'process_exit' in previous and 'spawn_start' in current
+    ]
+
+    metrics = {
+        'spawn_ms': _median([v * 1000 for v in spawn if v is not None]),
+        'per_line_us': _median([v * 1e6 / args.lines for v in reading if v is not None]) if args.lines else None,
+        'gap_ms': _median([v * 1000 for v in gaps]),
+        'db_write_ms': _median([v * 1000 for v in db_write if v is not None]),
+        'memory_growth_kb': round(rss_growth / count, 3) if count else None,
+        'overhead_ms': round((elapsed - direct * count) * 1000 / count, 3) if count else None,
+    }
+    return {
+        'params': {
+            'scripts': args.scripts,
+            'lines': args.lines,
+            'line_bytes': args.line_bytes,
+            'duration_s': args.duration,
+        },
+        'platform': sys.platform,
+        'python': sys.version.split()[0],
+        'batch_s': round(elapsed, 3),
+        'direct_script_ms': round(direct * 1000, 3),
+        'scripts_per_minute': round(count * 60.0 / elapsed, 1) if elapsed else None,
+        'metrics': metrics,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float):
+    """与基线比较，返回超出容差的指标说明列表"""
+    regressions = []
+    for name, slack in METRICS.items():
+        value = report['metrics'].get(name)
+        reference = baseline.get('metrics', {}).get(name)
+        if value is None or reference is None:
+            continue
+        limit = reference * (1 + tolerance) + slack if reference >= 0 else slack
+        if value > limit:
+            regressions.append(f"{name}: {value} > {round(limit, 3)} (baseline {reference})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scripts', type=int, default=20, help='合成脚本数量')
+    parser.add_argument('--lines', type=int, default=100, help='每个脚本输出行数')
+    parser.add_argument('--line-bytes', type=int, default=80, help='每行字节数')
+    parser.add_argument('--duration', type=float, default=0.05, help='每个脚本的等待时间（秒）')
+    parser.add_argument('--json', help='结果输出文件')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='相对基线的容差（0.5 表示 +50%%）')
+    parser.add_argument('--update-baseline', action='store_true', help='用本次结果覆盖基线')
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='autotest_bench_')
+    try:
+        scripts = generate_scripts(work_dir, args.scripts, args.lines, args.line_bytes, args.duration)
+        direct = measure_direct(scripts)
+        timelines, elapsed, rss_growth = run_batch(scripts, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = summarize(timelines, elapsed, rss_growth, direct, args)
+    print(f"{args.scripts} scripts x {args.lines} lines, {args.duration}s each: "
+          f"batch {report['batch_s']} s ({report['scripts_per_minute']} scripts/min), "
+          f"direct run {report['direct_script_ms']} ms/script")
+    for name, value in report['metrics'].items():
+        print(f"{name:>18}: {value}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print(f"no baseline at {args.baseline}, skipped comparison")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('params') != report['params']:
+        print(f"baseline parameters differ ({baseline.get('params')}), skipped comparison")
+        return 0
+    regressions = compare(report, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"within {int(args.tolerance * 100)}% of baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""信号趋势统计基准：生成一年的逐次测量值，测量 AnalysisService.get_signal_statistics 耗时
+
+按 CAN 矩阵规模合成测量值：``--signals`` 个信号，``--days`` 天内每天 ``--runs-per-day``
+次执行，每次执行每个信号一行（默认 600 × 365 × 5 ≈ 110 万行），写入临时 SQLite 数据库后统计：
+
+- summarize_ms：全部信号的统计（首次调用，无缓存；``--repeat`` 次取中位数）；
+- summarize_cached_ms：相同参数的重复调用（命中统计缓存）；
+- month_ms：限定一个月日期范围的全部信号统计（首次调用）；
+- trend_ms：单个信号全年的逐次趋势（首次调用）。
+
+summarize_ms 超过 ``--max-ms``（默认 1000，即一年数据 1 秒内完成汇总的目标）时返回码为 1；
+结果也可写入 JSON，并与提交在仓库中的基线比较（超出容差时返回码为 1）。
+
+用法（在项目根目录）::
+
+    python -m benchmarks.bench_trend [--signals 600] [--days 365] [--runs-per-day 5]
+        [--repeat 3] [--max-ms 1000] [--json result.json] [--baseline benchmarks/baselines/trend.json]
+        [--tolerance 0.5] [--update-baseline]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from AppCode.core.measurement_extractor import MeasurementExtractor  # noqa: E402
+from AppCode.core.trend_engine import TrendEngine  # noqa: E402
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess  # noqa: E402
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository  # noqa: E402
+from AppCode.repositories.measurement_repository import MeasurementRepository  # noqa: E402
+from AppCode.services.analysis_service import AnalysisService  # noqa: E402
+from AppCode.services.measurement_service import MeasurementService  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, 'benchmarks', 'baselines', 'trend.json')
+
+# 参与基线比较的指标（越小越好）及其绝对容差（抵消小数值上的计时抖动）
+METRICS = {
+    'summarize_ms': 50.0,
+    'summarize_cached_ms': 1.0,
+    'month_ms': 20.0,
+    'trend_ms': 10.0,
+}
+
+START_DATE = datetime.datetime(2025, 1, 1, 8, 0, 0)
+
+
+def generate_measurements(db_path: str, signals: int, days: int, runs_per_day: int, seed: int = 1):
+    """生成合成测量值，返回 (行数, 耗时秒)
+
+    每个信号有固定的标称值和上下限，数值按正态分布抖动并带缓慢漂移。
+    """
+    rng = random.Random(seed)
+    specs = []
+    for index in range(signals):
+        nominal = rng.uniform(1.0, 500.0)
+        specs.append((f"CAN_SIG_{index:04d}", nominal, nominal * 0.9, nominal * 1.1, nominal * 0.01))
+
+    SQLiteDataAccess(db_path)  # 建表和索引
+    conn = sqlite3.connect(db_path)
+    sql = (
+        "INSERT INTO measurements (execution_id, script_path, name, value, unit, "
+        "lower_limit, upper_limit, source, line_no, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    runs = days * runs_per_day
+    step = datetime.timedelta(hours=24.0 / runs_per_day)
+    started = time.perf_counter()
+    total = 0
+    try:
+        for run in range(runs):
+            execution_id = f"exec_{run:06d}"
+            timestamp = (START_DATE + step * run).isoformat(timespec='seconds')
+            drift = run / runs
+            rows = [
+                (execution_id, 'bench/Case_CAN.py', name, nominal + sigma * (rng.gauss(0, 1) + drift),
+                 'V', lower, upper, 'key_value', line_no, timestamp)
+                for line_no, (name, nominal, lower, upper, sigma) in enumerate(specs, 1)
+            ]
+            conn.executemany(sql, rows)
+            total += len(rows)
+            if run % 100 == 99:
+                conn.commit()
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return total, time.perf_counter() - started
+
+
+def build_service(db_path: str) -> AnalysisService:
+    """创建与应用一致的分析服务（不启动后台补提取）"""
+    data_access = SQLiteDataAccess(db_path)
+    execution_repo = ExecutionHistoryRepository(data_access)
+    measurement_service = MeasurementService(
+        MeasurementExtractor(), MeasurementRepository(data_access), execution_repo=execution_repo
+    )
+    return AnalysisService(
+        None, execution_repo, None,
+        measurement_service=measurement_service,
+        trend_engine=TrendEngine()
+    )
+
+
+def _timed(func, *args, **kwargs):
+    """调用并返回 (结果, 耗时毫秒)，结果不成功时抛出异常"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = (time.perf_counter() - started) * 1000
+    if not result.get('success'):
+        raise RuntimeError(result.get('error'))
+    return result, elapsed
+
+
+def run_queries(db_path: str, args):
+    """依次执行各项查询，返回 (指标字典, 信号数)
+
+    首次调用的指标取 ``--repeat`` 个新建服务（统计缓存为空）的中位数。
+    """
+    month_start = START_DATE + datetime.timedelta(days=args.days // 2)
+    month_range = {
+        'start_date': month_start.strftime('%Y-%m-%d'),
+        'end_date': (month_start + datetime.timedelta(days=30)).strftime('%Y-%m-%d'),
+    }
+    samples = {'summarize_ms': [], 'summarize_cached_ms': [], 'month_ms': [], 'trend_ms': []}
+    signals = 0
+    for _ in range(args.repeat):
+        service = build_service(db_path)
+        result, elapsed = _timed(service.get_signal_statistics)
+        samples['summarize_ms'].append(elapsed)
+        samples['summarize_cached_ms'].append(_timed(service.get_signal_statistics)[1])
+        samples['month_ms'].append(_timed(service.get_signal_statistics, **month_range)[1])
+        samples['trend_ms'].append(_timed(service.get_signal_trend, 'CAN_SIG_0000')[1])
+        signals = len(result['statistics'])
+
+    metrics = {name: round(statistics.median(values), 3) for name, values in samples.items()}
+    return metrics, signals
+
+
+def summarize(metrics: dict, rows: int, signals: int, generate_s: float, args):
+    """生成基准报告"""
+    return {
+        'params': {
+            'signals': args.signals,
+            'days': args.days,
+            'runs_per_day': args.runs_per_day,
+        },
+        'platform': sys.platform,
+        'python': sys.version.split()[0],
+        'rows': rows,
+        'signals_summarized': signals,
+        'generate_s': round(generate_s, 3),
+        'max_ms': args.max_ms,
+        'metrics': metrics,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float):
+    """与基线比较，返回超出容差的指标说明列表"""
+    regressions = []
+    for name, slack in METRICS.items():
+        value = report['metrics'].get(name)
+        reference = baseline.get('metrics', {}).get(name)
+        if value is None or reference is None:
+            continue
+        limit = reference * (1 + tolerance) + slack if reference >= 0 else slack
+        if value > limit:
+            regressions.append(f"{name}: {value} > {round(limit, 3)} (baseline {reference})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--signals', type=int, default=600, help='信号数量')
+    parser.add_argument('--days', type=int, default=365, help='天数')
+    parser.add_argument('--runs-per-day', type=int, default=5, help='每天执行次数')
+    parser.add_argument('--repeat', type=int, default=3, help='首次调用计时的重复次数（取中位数）')
+    parser.add_argument('--max-ms', type=float, default=1000.0, help='全部信号统计的耗时上限（毫秒）')
+    parser.add_argument('--json', help='结果输出文件')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='相对基线的容差（0.5 表示 +50%%）')
+    parser.add_argument('--update-baseline', action='store_true', help='用本次结果覆盖基线')
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='autotest_bench_')
+    try:
+        db_path = os.path.join(work_dir, 'trend.db')
+        rows, generate_s = generate_measurements(db_path, args.signals, args.days, args.runs_per_day)
+        metrics, signals = run_queries(db_path, args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = summarize(metrics, rows, signals, generate_s, args)
+    print(f"{args.signals} signals x {args.days * args.runs_per_day} runs: {rows} rows "
+          f"(generated in {report['generate_s']} s)")
+    for name, value in report['metrics'].items():
+        print(f"{name:>20}: {value}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    status = 0
+    if metrics['summarize_ms'] > args.max_ms:
+        print(f"TARGET MISSED summarize_ms: {metrics['summarize_ms']} > {args.max_ms}")
+        status = 1
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"baseline updated: {args.baseline}")
+        return status
+
+    if not os.path.isfile(args.baseline):
+        print(f"no baseline at {args.baseline}, skipped comparison")
+        return status
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('params') != report['params']:
+        print(f"baseline parameters differ ({baseline.get('params')}), skipped comparison")
+        return status
+    regressions = compare(report, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"within {int(args.tolerance * 100)}% of baseline")
+    return 1 if regressions else status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""脚本启动方式基准：subprocess 与预热进程（zygote）的首行输出耗时对比
+
+对 TestScripts/Demo 下的脚本（使用模拟硬件模块）分别以两种方式启动，
+测量从启动到读到第一行标准输出的时间，读到后结束脚本进程。
+
+用法（在项目根目录，仅 Linux）::
+
+    python -m benchmarks.bench_zygote [--repeat 3] [--import-delay 0.3] [--json result.json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from AppCode.core.zygote import ZygoteLauncher, zygote_supported  # noqa: E402
+from benchmarks.mock_hardware import build_mock_packages  # noqa: E402
+
+
+def _first_line_time(process, start: float, timeout: float = 30.0) -> float:
+    """读取第一行输出并结束进程，返回首行耗时（秒），无输出时返回None"""
+    line = process.stdout.readline()
+    elapsed = time.perf_counter() - start if line else None
+    process.kill()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        pass
+    process.stdout.close()
+    process.stderr.close()
+    return elapsed
+
+
+def run_subprocess(script: str, env: dict) -> float:
+    """以 subprocess 方式启动（与执行引擎默认方式相同）"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        ['python', script], stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+    )
+    return _first_line_time(process, start)
+
+
+def run_zygote(launcher: ZygoteLauncher, script: str, env: dict) -> float:
+    """以预热进程方式启动"""
+    start = time.perf_counter()
+    process = launcher.spawn([script], env)
+    return _first_line_time(process, start)
+
+
+def _summary(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    return {
+        'count': len(values),
+        'mean_ms': round(statistics.mean(values) * 1000, 2),
+        'median_ms': round(statistics.median(values) * 1000, 2),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        'min_ms': round(ordered[0] * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scripts', default=os.path.join(PROJECT_ROOT, 'TestScripts', 'Demo'),
+                        help='脚本目录')
+    parser.add_argument('--repeat', type=int, default=3, help='每个脚本每种方式的运行次数')
+    parser.add_argument('--import-delay', type=float, default=0.3,
+                        help='模拟公共模块加载耗时（秒）')
+    parser.add_argument('--json', help='结果输出文件')
+    args = parser.parse_args(argv)
+
+    if not zygote_supported():
+        print('zygote mode requires Linux')
+        return 1
+
+    scripts = sorted(glob.glob(os.path.join(args.scripts, '*.py')))
+    mock_dir = tempfile.mkdtemp(prefix='autotest_mock_')
+    try:
+        modules = build_mock_packages(mock_dir, scripts, args.import_delay)
+        env = dict(os.environ, PYTHONPATH=mock_dir, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+        preload = [m for m in modules if m.split('.')[0] in ('CommonFunction', 'CommonFuction', 'UtilityClass')]
+
+        launcher = ZygoteLauncher('python', preload)
+        started = time.perf_counter()
+        launcher.spawn([os.path.join(PROJECT_ROOT, 'version.py')], env).wait(30)
+        zygote_startup = time.perf_counter() - started
+
+        results = {'subprocess': [], 'zygote': []}
+        try:
+            for _ in range(args.repeat):
+                for script in scripts:
+                    results['subprocess'].append(run_subprocess(script, env))
+                    results['zygote'].append(run_zygote(launcher, script, env))
+        finally:
+            launcher.stop()
+    finally:
+        shutil.rmtree(mock_dir, ignore_errors=True)
+
+    report = {
+        'scripts': len(scripts),
+        'repeat': args.repeat,
+        'import_delay_s': args.import_delay,
+        'preloaded': preload,
+        'zygote_startup_ms': round(zygote_startup * 1000, 2),
+        'subprocess': _summary(results['subprocess']),
+        'zygote': _summary(results['zygote']),
+    }
+    if report['subprocess'].get('median_ms') and report['zygote'].get('median_ms'):
+        report['median_speedup'] = round(report['subprocess']['median_ms'] / report['zygote']['median_ms'], 2)
+
+    print(f"{len(scripts)} scripts x {args.repeat}, mocked helper import delay {args.import_delay}s")
+    print(f"zygote startup (one-off): {report['zygote_startup_ms']} ms")
+    for mode in ('subprocess', 'zygote'):
+        s = report[mode]
+        print(f"{mode:>10}: n={s.get('count')} median={s.get('median_ms')} ms "
+              f"mean={s.get('mean_ms')} ms p95={s.get('p95_ms')} ms")
+    if 'median_speedup' in report:
+        print(f"time-to-first-line speedup (median): {report['median_speedup']}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
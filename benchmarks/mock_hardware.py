@@ -0,0 +1,151 @@
+"""基准测试用的模拟硬件辅助模块
+
+根据脚本的导入语句生成同名的模拟包（CommonFunction、UtilityClass、clr 等），
+使脚本无需台架即可运行到第一行输出：
+
+- 显式导入的名称和星号导入后脚本用到的自由名称都定义为 ``_Mock`` 对象，
+  调用时打印 ``[mock] 名称``，属性访问返回新的 ``_Mock``；
+- ``time.sleep`` 被替换为空操作，脚本不会真的等待；
+- 公共模块导入时模拟加载 .NET 程序集等开销（导入若干标准库模块并等待 ``import_delay`` 秒）。
+"""
+
+import ast
+import builtins
+import importlib.util
+import os
+from typing import Dict, List, Set
+
+
+MOCK_SOURCE = '''
+import sys
+import time
+{heavy_imports}
+
+time.sleep = lambda seconds: None
+
+
+class _Mock:
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return _Mock(self._name + '.' + attr)
+
+    def __call__(self, *args, **kwargs):
+        print('[mock] ' + self._name, flush=True)
+        return _Mock(self._name + '()')
+
+    def __iter__(self):
+        return iter((True, _Mock(self._name + '[1]')))
+
+    def __getitem__(self, key):
+        return _Mock(self._name + '[]')
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return '<mock ' + self._name + '>'
+
+
+def Sleep(ms):
+    pass
+
+'''
+
+# 模拟公共模块导入开销时额外导入的标准库模块
+HEAVY_IMPORTS = ('asyncio', 'decimal', 'email.mime.multipart', 'http.client',
+                 'logging.handlers', 'unittest', 'xml.dom.minidom', 'sqlite3')
+
+
+def _free_names(tree: ast.Module) -> Set[str]:
+    """脚本中使用但未定义的名称（来自星号导入）"""
+    defined, used = set(dir(builtins)), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            (used if isinstance(node.ctx, ast.Load) else defined).add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defined.add(node.name)
+        elif isinstance(node, ast.arg):
+            defined.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                defined.add((alias.asname or alias.name).split('.')[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            defined.add(node.name)
+    return used - defined
+
+
+def _is_available(module: str) -> bool:
+    """模块在当前环境中是否真实存在（存在时不生成模拟）"""
+    try:
+        return importlib.util.find_spec(module.split('.')[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def build_mock_packages(target_dir: str, scripts: List[str], import_delay: float = 0.3) -> List[str]:
+    """生成模拟包
+
+    Args:
+        target_dir: 输出目录（运行脚本时加入 PYTHONPATH）
+        scripts: 脚本路径列表
+        import_delay: 每个星号导入模块模拟的加载耗时（秒）
+
+    Returns:
+        生成的模块名列表
+    """
+    modules: Dict[str, Set[str]] = {}
+    star_modules: Set[str] = set()
+    free_names: Set[str] = set()
+
+    for script in scripts:
+        with open(script, 'rb') as f:
+            try:
+                tree = ast.parse(f.read().decode('utf-8-sig', errors='replace'))
+            except SyntaxError:
+                continue
+        free_names |= _free_names(tree)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                if _is_available(node.module):
+                    continue
+                names = modules.setdefault(node.module, set())
+                for alias in node.names:
+                    if alias.name == '*':
+                        star_modules.add(node.module)
+                    else:
+                        names.add(alias.name)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if not _is_available(alias.name):
+                        modules.setdefault(alias.name, set())
+
+    for module, names in modules.items():
+        is_star = module in star_modules
+        body = MOCK_SOURCE.format(
+            heavy_imports='\n'.join(f'import {m}' for m in HEAVY_IMPORTS) if is_star else ''
+        )
+        if is_star and import_delay:
+            # 用忙等而不是 sleep 模拟加载耗时（time.sleep 已被替换）
+            body += (f"_deadline = time.perf_counter() + {import_delay!r}\n"
+                     f"while time.perf_counter() < _deadline:\n    pass\n")
+        exported = sorted(names | (free_names if is_star else set()))
+        for name in exported:
+            if name != 'Sleep':
+                body += f"{name} = _Mock({name!r})\n"
+
+        parts = module.split('.')
+        package_dir = target_dir
+        for part in parts[:-1]:
+            package_dir = os.path.join(package_dir, part)
+            os.makedirs(package_dir, exist_ok=True)
+            init_path = os.path.join(package_dir, '__init__.py')
+            if not os.path.exists(init_path):
+                open(init_path, 'w').close()
+        with open(os.path.join(package_dir, parts[-1] + '.py'), 'w', encoding='utf-8') as f:
+            f.write(body)
+
+    return sorted(modules)
@@ -23,6 +23,11 @@ datas = [
     ('version.py', '.'),
     ('README.md', '.'),
     ('requirements.txt', '.'),
+    # 脚本子进程启动垫片，须以源文件形式随包发布
+    ('AppCode/core/script_shim/sitecustomize.py', 'AppCode/core/script_shim'),
+    ('AppCode/core/script_shim/zygote_server.py', 'AppCode/core/script_shim'),
+    ('AppCode/core/script_shim/bench_emulator.py', 'AppCode/core/script_shim'),
+    ('AppCode/core/script_shim/hang_dump.py', 'AppCode/core/script_shim'),
 ]
 
 # 隐藏导入
@@ -47,7 +52,6 @@ binaries = []
 # 排除的模块（减小打包体积）
 excludes = [
     'matplotlib',
-    'numpy',
     'pandas',
     'scipy',
     'PIL',
@@ -14,4 +14,7 @@ sys.path.insert(0, project_root)
 from AppCode.main import main
 
 if __name__ == '__main__':
+    # 打包后的程序使用多进程（脚本静态分析）时需要
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
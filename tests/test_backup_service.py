@@ -8,6 +8,7 @@ import shutil
 import zipfile
 import json
 from datetime import datetime
+import sqlite3
 
 from AppCode.services.backup_service import BackupService
 
@@ -243,5 +244,89 @@ class TestBackupServiceEdgeCases(unittest.TestCase):
         self.assertEqual(len(backups), 0)
 
 
+class TestIncrementalBackup(unittest.TestCase):
+    """SQLite 数据库在线增量备份测试"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.temp_dir, 'data')
+        self.backup_dir = os.path.join(self.data_dir, 'backups')
+        os.makedirs(self.data_dir)
+        
+        self.db_path = os.path.join(self.data_dir, 'script_executor.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE execution_history (id INTEGER PRIMARY KEY, output TEXT)")
+        conn.executemany(
+            "INSERT INTO execution_history (output) VALUES (?)",
+            [('x' * 200,) for _ in range(5000)]
+        )
+        conn.commit()
+        conn.close()
+        
+        self.service = BackupService(self.data_dir, self.backup_dir, Mock(), full_every=3)
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _insert(self, count):
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany(
+            "INSERT INTO execution_history (output) VALUES (?)",
+            [('y' * 200,) for _ in range(count)]
+        )
+        conn.commit()
+        conn.close()
+    
+    def _row_count(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM execution_history").fetchone()[0]
+        finally:
+            conn.close()
+    
+    def test_incremental_chain_restore(self):
+        """测试增量备份只保存变化页，沿增量链恢复到对应时刻的数据"""
+        full = self.service.create_backup("full")
+        self._insert(10)
+        delta1 = self.service.create_backup("delta 1")
+        self._insert(10)
+        delta2 = self.service.create_backup("delta 2")
+        self._insert(10)
+        full2 = self.service.create_backup("full again")
+        
+        self.assertEqual(full['type'], 'full')
+        self.assertEqual((delta1['type'], delta1['base']), ('incremental', full['backup_name']))
+        self.assertEqual(delta2['base'], delta1['backup_name'])
+        self.assertEqual(full2['type'], 'full')
+        self.assertLess(delta1['backup_size'], full['backup_size'] / 4)
+        info = self.service.get_backup_info(delta1['backup_name'])
+        db_info = info['databases']['data/script_executor.db']
+        self.assertLess(db_info['pages_stored'], db_info['page_count'])
+        
+        # 恢复前留下的日志文件不能覆盖恢复的内容
+        with open(self.db_path + '-journal', 'wb') as f:
+            f.write(b'stale')
+        result = self.service.restore_backup(delta2['backup_name'])
+        
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertEqual(self._row_count(), 5020)
+        self.assertFalse(os.path.exists(self.db_path + '-journal'))
+        self.assertEqual(len(self.service.list_backups()), 4)
+    
+    def test_cleanup_keeps_chain(self):
+        """测试清理和删除时保留被增量备份依赖的备份"""
+        full = self.service.create_backup("full")
+        self._insert(10)
+        delta = self.service.create_backup("delta")
+        
+        self.assertFalse(self.service.delete_backup(full['backup_name'])['success'])
+        self.assertEqual(self.service.cleanup_old_backups(keep_count=1), 0)
+        
+        self.assertTrue(self.service.restore_backup(delta['backup_name'])['success'])
+        self.assertEqual(self._row_count(), 5010)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""模拟台架（dry-run）单元测试"""
+
+import unittest
+import os
+import json
+import tempfile
+import shutil
+import threading
+from datetime import datetime
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.core.measurement_extractor import MeasurementExtractor
+from AppCode.core.script_fingerprint import ScriptFingerprinter
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+from AppCode.repositories.batch_execution_repository import BatchExecutionRepository
+from AppCode.repositories.execution_artifact_repository import ExecutionArtifactRepository
+from AppCode.repositories.measurement_repository import MeasurementRepository
+from AppCode.services.execution_service import ExecutionService
+from AppCode.services.measurement_service import MeasurementService
+from AppCode.utils.constants import ExecutionStatus
+
+
+# 台架脚本：公共库、设备和 .NET 模块在测试环境中都不存在
+SCRIPT_SOURCE = '''
+import time
+import clr
+from CommonFunction.Common01_InitDevice import *
+
+if __name__ == '__main__':
+    start = time.time()
+    低压辅源.SCPI.Write(':OUTP ON')
+    Sleep(60000)
+    Test, State = STLA_CAN.DBC.GetSignal(1, 'OBC_Msg', 'OBC_State', 0)
+    Test, State = STLA_CAN.DBC.GetSignal(1, 'OBC_Msg', 'OBC_State', 0)
+    Test, Volt = 低压辅源.SCPI.Query(':MEAS:VOLT? CH1')
+    Test, Stamps, StampList = STLA_CAN.DBC.FindValueOfSignal(1, 'OBC_State', 3, ConditionEnum.Equal, 0, 0)
+    print(f"elapsed={time.time() - start:.0f} state={State} volt={Volt[0]} find={Test}")
+    print('合格' if State == 3 and Volt[0] == 13.5 else '不合格')
+'''
+
+
+class TestBenchEmulator(unittest.TestCase):
+    """模拟台架测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.script_path = os.path.join(self.temp_dir, 'Case_DryRun.py')
+        with open(self.script_path, 'w', encoding='utf-8') as f:
+            f.write(SCRIPT_SOURCE)
+        self.config_path = os.path.join(self.temp_dir, 'bench.json')
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'signals': {'OBC_State': [0, 3]},
+                'scpi': {':MEAS:VOLT? CH1': '13.5,0.8'}
+            }, f)
+
+        data_access = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'))
+        self.engine = ExecutionEngine()
+        self.execution_repo = ExecutionHistoryRepository(data_access)
+        self.artifact_repo = ExecutionArtifactRepository(data_access)
+        self.measurement_service = MeasurementService(
+            MeasurementExtractor(),
+            MeasurementRepository(data_access),
+            execution_repo=self.execution_repo
+        )
+        self.service = ExecutionService(
+            self.engine,
+            self.execution_repo,
+            BatchExecutionRepository(data_access),
+            measurement_service=self.measurement_service,
+            artifact_repo=self.artifact_repo,
+            fingerprinter=ScriptFingerprinter([])
+        )
+
+    def tearDown(self):
+        """测试后清理"""
+        self.engine._running = False
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self):
+        """执行脚本并等待回调"""
+        done = threading.Event()
+        results = {}
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        self.engine.execute_script(self.script_path, callback=on_complete)
+        self.assertTrue(done.wait(30))
+        return results
+
+    def test_dry_run_script(self):
+        """测试模拟台架下脚本按配置应答运行，等待使用虚拟时钟"""
+        self.engine.set_dry_run(True, self.config_path)
+
+        info = self._run()
+
+        self.assertEqual(info['status'], ExecutionStatus.SUCCESS)
+        self.assertIn('elapsed=60 state=3 volt=13.5 find=0', info['output'])
+        self.assertEqual(info['test_result'], 'pass')
+        self.assertEqual(info['dry_run'], {'config': self.config_path})
+
+    def test_dry_run_disabled(self):
+        """测试默认不注入模拟模块（缺少公共库时脚本失败）"""
+        info = self._run()
+
+        self.assertEqual(info['status'], ExecutionStatus.FAILED)
+        self.assertNotIn('dry_run', info)
+
+    def test_dry_run_not_a_real_pass(self):
+        """测试上次为模拟台架执行时增量执行仍选择该脚本"""
+        self.execution_repo.create({
+            'id': 'exec_dry',
+            'script_path': self.script_path,
+            'status': ExecutionStatus.SUCCESS,
+            'start_time': datetime.now().isoformat(),
+            'test_result': 'pass',
+        })
+        self.service._save_fingerprints({'exec_dry': self.script_path})
+        self.artifact_repo.save('exec_dry', 'dry_run', {'config': None})
+
+        result = self.service.select_incremental_scripts([self.script_path])
+
+        self.assertEqual(result['selected'], [self.script_path])
+        self.assertEqual(result['reasons'][self.script_path], '上次为模拟台架执行')
+
+    def test_dry_run_not_measured(self):
+        """测试模拟台架执行不产生测量值，也不计入平均耗时"""
+        for execution_id, dry_run in (('exec_real', None), ('exec_dry', {'config': None})):
+            self.execution_repo.create({
+                'id': execution_id, 'script_path': self.script_path, 'status': ExecutionStatus.RUNNING,
+            })
+            info = {
+                'script_path': self.script_path,
+                'status': ExecutionStatus.SUCCESS,
+                'start_time': '2026-03-01T10:00:00',
+                'end_time': '2026-03-01T10:00:02' if dry_run is None else '2026-03-01T10:01:00',
+                'output': ['IFB_CCCP_CC_Res:120'],
+            }
+            if dry_run:
+                info['dry_run'] = dry_run
+            self.service._save_execution_result(execution_id, info, None)
+
+        self.assertEqual(self.measurement_service.get_execution_measurements('exec_dry'), [])
+        self.assertEqual(len(self.measurement_service.get_execution_measurements('exec_real')), 1)
+        self.assertEqual(self.measurement_service.backfill(), 0)
+        self.assertEqual(self.execution_repo.get_average_durations([self.script_path]), {self.script_path: 2.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
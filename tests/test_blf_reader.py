@@ -0,0 +1,173 @@
+"""BLF 记录文件读取单元测试"""
+
+import unittest
+import os
+import struct
+import tempfile
+import shutil
+import zlib
+from datetime import datetime
+
+from AppCode.core.blf_reader import (
+    BLFReader, BLFIndex, BLFParseError,
+    FILE_HEADER_STRUCT, OBJ_HEADER_BASE_STRUCT, OBJ_HEADER_V1_STRUCT,
+    LOG_CONTAINER_STRUCT, CAN_MSG_STRUCT, CAN_MESSAGE, LOG_CONTAINER, ZLIB_DEFLATE
+)
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.recording_repository import RecordingRepository
+from AppCode.services.recording_service import RecordingService
+
+
+def write_blf(path, frames, container_size=200, compress=True):
+    """写入最小 BLF 文件（frames 为 (相对时间秒, 仲裁ID) 列表）"""
+    stream = bytearray()
+    for seconds, arbitration_id in frames:
+        payload = CAN_MSG_STRUCT.pack(1, 0, 8, arbitration_id) + bytes(8)
+        obj_size = OBJ_HEADER_BASE_STRUCT.size + OBJ_HEADER_V1_STRUCT.size + len(payload)
+        stream += OBJ_HEADER_BASE_STRUCT.pack(b'LOBJ', 32, 1, obj_size, CAN_MESSAGE)
+        # flags=2：纳秒时间戳
+        stream += OBJ_HEADER_V1_STRUCT.pack(2, 0, 0, int(round(seconds * 1e9)))
+        stream += payload
+
+    body = bytearray()
+    # 按固定大小切分容器，对象会跨容器
+    for offset in range(0, len(stream), container_size):
+        chunk = bytes(stream[offset:offset + container_size])
+        data = zlib.compress(chunk) if compress else chunk
+        method = ZLIB_DEFLATE if compress else 0
+        obj_size = OBJ_HEADER_BASE_STRUCT.size + LOG_CONTAINER_STRUCT.size + len(data)
+        body += OBJ_HEADER_BASE_STRUCT.pack(b'LOBJ', 16, 1, obj_size, LOG_CONTAINER)
+        body += LOG_CONTAINER_STRUCT.pack(method, len(chunk))
+        body += data
+        body += bytes(obj_size % 4)
+
+    start = (2025, 1, 3, 1, 10, 0, 0, 0)
+    header = FILE_HEADER_STRUCT.pack(
+        b'LOGG', 144, 0, 0, 0, 0, 0, 0, 0, 0,
+        144 + len(body), len(stream), len(frames), 0, *start, *start
+    )
+    with open(path, 'wb') as f:
+        f.write(header + bytes(144 - len(header)) + body)
+
+
+class TestBLFReader(unittest.TestCase):
+    """BLF 读取器测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'MessagePeriod_01-VCU_BSI_Wakeup_27A.blf')
+        # 0x27A 周期 100ms，0x314 周期 50ms
+        frames = [(i * 0.1, 0x27A) for i in range(50)] + [(i * 0.05 + 0.01, 0x314) for i in range(100)]
+        frames.sort()
+        write_blf(self.path, frames)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_iter_messages_across_containers(self):
+        """测试跨容器对象可以完整读出"""
+        with BLFReader(self.path) as reader:
+            messages = list(reader)
+
+        self.assertEqual(len(messages), 150)
+        self.assertEqual({m[1] for m in messages}, {0x27A, 0x314})
+        self.assertAlmostEqual(messages[1][0] - messages[0][0], 0.01, places=6)
+
+    def test_message_stats(self):
+        """测试报文计数和周期统计"""
+        with BLFReader(self.path) as reader:
+            index = reader.build_index()
+            start = reader.start_timestamp
+
+        stats = index.message_stats(0x27A)
+        self.assertEqual(stats['count'], 50)
+        self.assertAlmostEqual(stats['period_avg'], 100.0, places=3)
+
+        window = index.message_stats(0x314, start + 1.0, start + 2.0)
+        self.assertEqual(window['count'], 20)
+        self.assertAlmostEqual(window['period_max'], 50.0, places=3)
+
+    def test_index_save_and_load(self):
+        """测试索引保存和加载"""
+        with BLFReader(self.path) as reader:
+            index = reader.build_index()
+        index_path = os.path.join(self.temp_dir, 'index.npz')
+        index.save(index_path)
+
+        loaded = BLFIndex.load(index_path)
+        self.assertEqual(loaded.arbitration_ids, [0x27A, 0x314])
+        self.assertEqual(loaded.message_stats(0x314), index.message_stats(0x314))
+
+    def test_invalid_file(self):
+        """测试非 BLF 文件"""
+        bad = os.path.join(self.temp_dir, 'bad.blf')
+        with open(bad, 'wb') as f:
+            f.write(b'x' * 200)
+
+        with self.assertRaises(BLFParseError):
+            BLFReader(bad)
+
+
+class TestRecordingService(unittest.TestCase):
+    """CAN记录文件服务测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        data_access = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'))
+        self.service = RecordingService(
+            RecordingRepository(data_access),
+            index_dir=os.path.join(self.temp_dir, 'index')
+        )
+        self.script_path = os.path.join(self.temp_dir, 'MessagePeriod_01-VCU_BSI_Wakeup_27A.py')
+        with open(self.script_path, 'w', encoding='utf-8') as f:
+            f.write("ExpectOfFramePeriod = 100\n")
+        self.blf_path = os.path.join(self.temp_dir, 'MessagePeriod_01-VCU_BSI_Wakeup_27A.blf')
+        write_blf(self.blf_path, [(i * 0.101, 0x27A) for i in range(30)])
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_evaluate_message_period(self):
+        """测试离线复核报文周期"""
+        self.service.link_recording('exec_1', self.blf_path, self.script_path)
+
+        result = self.service.evaluate_message_period('exec_1')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['message'], 'VCU_BSI_Wakeup_27A')
+        self.assertAlmostEqual(result['statistics']['period_avg'], 101.0, places=3)
+        self.assertTrue(result['passed'])
+        self.assertFalse(self.service.evaluate_message_period('exec_1', tolerance_ms=0.5)['passed'])
+
+    def test_discover_recordings(self):
+        """测试按文件名和修改时间关联录制文件，目录未变化时使用缓存的列表"""
+        record_dir = os.path.join(self.temp_dir, 'records')
+        os.makedirs(os.path.join(record_dir, 'day1'))
+        self.service.search_dirs = [record_dir]
+        old_path = os.path.join(record_dir, 'day1', 'MessagePeriod_01-VCU_BSI_Wakeup_27A_old.blf')
+        write_blf(old_path, [(0.0, 0x27A)])
+        os.utime(old_path, (0, 0))
+        start = datetime.now().isoformat()
+        self.assertEqual(self.service.discover_recordings('exec_0', self.script_path, start, None), 0)
+
+        new_path = os.path.join(record_dir, 'day1', 'MessagePeriod_01-VCU_BSI_Wakeup_27A.blf')
+        write_blf(new_path, [(0.0, 0x27A)])
+        write_blf(os.path.join(record_dir, 'Other_Case.blf'), [(0.0, 0x100)])
+        self.assertEqual(self.service.discover_recordings('exec_1', self.script_path, start, None), 1)
+        self.assertEqual(
+            [r['file_path'] for r in self.service.get_recordings('exec_1')], [os.path.abspath(new_path)]
+        )
+
+    def test_no_recording(self):
+        """测试没有关联记录文件"""
+        result = self.service.get_message_statistics('exec_x', 'VCU_BSI_Wakeup_27A')
+
+        self.assertFalse(result['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
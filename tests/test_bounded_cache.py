@@ -0,0 +1,78 @@
+"""按字节预算淘汰的缓存单元测试"""
+
+import unittest
+import threading
+import time
+
+from AppCode.infrastructure.cache import BoundedCache, estimate_size
+
+
+class TestBoundedCache(unittest.TestCase):
+    """字节预算缓存测试类"""
+
+    def test_evicts_by_bytes(self):
+        """测试按估算字节数淘汰，超过预算的单个条目不缓存"""
+        cache = BoundedCache('test', max_bytes=10000, policy='lru')
+        for i in range(10):
+            cache.put(i, 'x' * 2000)
+
+        self.assertLessEqual(cache.bytes_used(), 10000)
+        self.assertNotIn(0, cache)
+        self.assertIn(9, cache)
+        cache.put('big', 'x' * 20000)
+        self.assertNotIn('big', cache)
+        stats = cache.stats()
+        self.assertGreater(stats['evictions'], 0)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertGreater(estimate_size({'a': ['x' * 1000]}), 1000)
+
+    def test_slru_protects_reused_entries(self):
+        """测试分段LRU：再次命中的条目不会被一次性扫描冲掉"""
+        cache = BoundedCache('test', max_bytes=12000, policy='slru', sizeof=lambda v: 1000)
+        cache.put('hot', 1)
+        cache.get('hot')
+        for i in range(30):
+            cache.put(f"scan{i}", i)
+
+        self.assertEqual(cache.get('hot'), 1)
+        self.assertNotIn('scan0', cache)
+
+    def test_ttl_expires_lazily_and_in_cleanup(self):
+        """测试过期条目在访问时删除，也可由后台清理删除"""
+        cache = BoundedCache('test', default_ttl=0.05)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.cleanup_expired(), 1)
+        self.assertEqual(cache.stats()['expirations'], 2)
+        self.assertEqual(cache.bytes_used(), 0)
+
+    def test_single_flight_loading(self):
+        """测试并发请求同一键时只加载一次"""
+        cache = BoundedCache('test')
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(cache.stats()['loads'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""脚本耗时模型单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+from datetime import datetime, timedelta
+
+from AppCode.core.duration_model import DurationModel, percentile
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+from AppCode.repositories.batch_execution_repository import BatchExecutionRepository
+from AppCode.repositories.execution_artifact_repository import ExecutionArtifactRepository
+from AppCode.services.execution_service import ExecutionService
+from AppCode.utils.constants import ExecutionStatus
+
+
+class TestDurationModel(unittest.TestCase):
+    """耗时模型测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.model = DurationModel(min_samples=3, timeout_multiplier=1.5, min_timeout=60, min_idle_timeout=10)
+        self.model.fit(
+            {'a.py': [100, 110, 120, 130, 400], 'b.py': [50]},
+            {'a.py': [2, 3, 4, 5], 'b.py': [1]}
+        )
+
+    def test_percentile(self):
+        """测试线性插值分位数"""
+        self.assertIsNone(percentile([], 50))
+        self.assertEqual(percentile([3, 1, 2], 50), 2)
+        self.assertAlmostEqual(percentile([0, 10], 95), 9.5)
+
+    def test_estimate_remaining(self):
+        """测试剩余时间按历史中位数和已运行时间计算"""
+        self.assertEqual(self.model.estimate('a.py'), 120)
+        self.assertEqual(self.model.estimate_remaining(['a.py', 'b.py']), 170)
+        # 正在执行的脚本扣除已运行时间，未知脚本使用默认值
+        self.assertEqual(self.model.estimate_remaining(['c.py'], 'a.py', 100, default=30), 50)
+        self.assertEqual(self.model.estimate_remaining([], 'a.py', 500), 0)
+        self.assertIsNone(self.model.estimate_remaining(['c.py']))
+
+    def test_adaptive_limits(self):
+        """测试自适应超时只收紧全局配置且需要足够样本"""
+        limits = self.model.adaptive_limits('a.py', 3600, 300)
+
+        self.assertAlmostEqual(limits['timeout'], round(percentile([100, 110, 120, 130, 400], 99) * 1.5, 1))
+        self.assertEqual(limits['result_idle_timeout'], 10)  # 低于下限时取下限
+        self.assertEqual(self.model.adaptive_limits('a.py', 300, 5), {})
+        self.assertEqual(self.model.adaptive_limits('b.py', 3600, 300), {})
+        self.assertEqual(self.model.adaptive_limits('unknown.py', 3600, 300), {})
+
+
+class TestAdaptiveTimeouts(unittest.TestCase):
+    """执行服务自适应超时测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        data_access = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'))
+        self.engine = ExecutionEngine()
+        self.execution_repo = ExecutionHistoryRepository(data_access)
+        self.artifact_repo = ExecutionArtifactRepository(data_access)
+        self.service = ExecutionService(
+            self.engine,
+            self.execution_repo,
+            BatchExecutionRepository(data_access),
+            artifact_repo=self.artifact_repo
+        )
+        self.script_path = os.path.join(self.temp_dir, 'Case_Hang.py')
+        with open(self.script_path, 'w', encoding='utf-8') as f:
+            f.write("import time\nprint('start', flush=True)\ntime.sleep(60)\n")
+
+    def tearDown(self):
+        """测试后清理"""
+        self.engine._running = False
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _add_history(self, durations, status=ExecutionStatus.SUCCESS, tail=None):
+        start = datetime(2026, 1, 1, 8, 0, 0)
+        for i, duration in enumerate(durations):
+            execution_id = f"hist_{status}_{i}"
+            begin = start + timedelta(hours=i)
+            self.execution_repo.create({
+                'id': execution_id,
+                'script_path': self.script_path,
+                'status': status,
+                'start_time': begin.isoformat(),
+                'end_time': (begin + timedelta(seconds=duration)).isoformat(),
+            })
+            if tail is not None:
+                self.artifact_repo.save(execution_id, 'timeline', {
+                    'result_detected': 1000.0, 'process_exit': 1000.0 + tail
+                })
+
+    def test_duration_estimates_ignore_timeouts(self):
+        """测试耗时统计只使用正常结束的执行，收尾耗时取自时间线"""
+        self._add_history([1.0, 2.0, 3.0], tail=0.5)
+        self._add_history([3600.0], status=ExecutionStatus.TIMEOUT)
+
+        estimates = self.service.get_duration_estimates([self.script_path, 'missing.py'])
+
+        self.assertEqual(list(estimates), [self.script_path])
+        self.assertEqual(estimates[self.script_path]['count'], 3)
+        self.assertAlmostEqual(estimates[self.script_path]['median'], 2.0, places=3)
+        self.assertAlmostEqual(estimates[self.script_path]['tail_median'], 0.5)
+
+    def test_adaptive_timeout_kills_hung_script(self):
+        """测试启用自适应超时后按历史耗时提前结束卡住的脚本"""
+        self._add_history([0.2] * 5)
+        self.engine.set_adaptive_timeouts(True)
+        self.engine._adaptive_min_samples = 5
+        done = threading.Event()
+        results = {}
+
+        limits = self.service._get_adaptive_limits([self.script_path])
+        self.assertEqual(limits[self.script_path]['timeout'], 60)
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        self.engine.execute_script(self.script_path, callback=on_complete, limits={'timeout': 1})
+
+        self.assertTrue(done.wait(30))
+        self.assertEqual(results['status'], ExecutionStatus.TIMEOUT)
+        self.assertIn('timeout', results['timeline'])
+
+
+if __name__ == '__main__':
+    unittest.main()
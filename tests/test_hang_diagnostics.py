@@ -0,0 +1,77 @@
+"""脚本挂起诊断单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.utils.constants import ExecutionStatus
+
+
+# 脚本输出一行后阻塞在“等待设备应答”中（不占用 CPU）
+SCRIPT_SOURCE = '''
+import time
+
+def wait_for_device_response():
+    time.sleep({block})
+
+print('开始测试', flush=True)
+wait_for_device_response()
+print('合格')
+'''
+
+
+class TestHangDiagnostics(unittest.TestCase):
+    """挂起诊断测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = ExecutionEngine()
+        self.engine.set_hang_diagnostics(1)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.engine._running = False
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, block):
+        """执行脚本并等待回调"""
+        script_path = os.path.join(self.temp_dir, 'Case_Hang.py')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(SCRIPT_SOURCE.format(block=block))
+        done = threading.Event()
+        results = {}
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        self.engine.execute_script(script_path, callback=on_complete)
+        self.assertTrue(done.wait(60))
+        return results
+
+    def test_stack_dumped_and_run_continues(self):
+        """测试静默且CPU空闲时记录调用栈，脚本继续运行至完成"""
+        info = self._run(block=5)
+
+        self.assertEqual(info['status'], ExecutionStatus.SUCCESS)
+        self.assertEqual(info['test_result'], 'pass')
+        self.assertEqual(len(info['hang_dumps']), 1)
+        self.assertIn('wait_for_device_response', info['hang_dumps'][0]['stack'])
+        self.assertIn('hang_dump', info['timeline'])
+
+    def test_hang_terminates_when_configured(self):
+        """测试配置为终止时记录调用栈后结束脚本并标记为超时"""
+        self.engine.set_hang_diagnostics(1, 'terminate')
+
+        info = self._run(block=60)
+
+        self.assertEqual(info['status'], ExecutionStatus.TIMEOUT)
+        self.assertIn('wait_for_device_response', info['hang_dumps'][0]['stack'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""执行历史归档单元测试"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+import shutil
+from unittest.mock import patch
+
+from AppCode.data_access.history_archive import HistoryArchive
+from AppCode.data_access.query_cache import QueryCache
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.data_access.time_columns import to_epoch_ms
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+
+
+class TestHistoryArchive(unittest.TestCase):
+    """执行历史归档测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.archive_dir = os.path.join(self.temp_dir, 'archive')
+        self.archive = HistoryArchive(self.archive_dir)
+        self.db = SQLiteDataAccess(
+            os.path.join(self.temp_dir, 'test.db'), query_cache=QueryCache(), archive=self.archive
+        )
+        self.repo = ExecutionHistoryRepository(self.db)
+        for record_id, start_time in (
+            ('jan1', '2026-01-05T10:00:00'), ('jan2', '2026-01-31T23:59:59'),
+            ('feb1', '2026-02-10T08:00:00'), ('mar1', '2026-03-02T09:00:00'),
+        ):
+            self.repo.create({
+                'id': record_id, 'script_path': f'scripts/{record_id}.py', 'status': 'SUCCESS',
+                'start_time': start_time, 'end_time': start_time, 'output': 'x' * 100,
+            })
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _hot_ids(self):
+        return sorted(r['id'] for r in self.db.execute_query("SELECT id FROM execution_history"))
+
+    def test_archives_by_month_and_queries_transparently(self):
+        """测试旧记录按月移到归档文件，日期范围查询只在需要时附加归档"""
+        # 先缓存一次，归档后缓存必须失效
+        self.assertEqual(len(self.repo.get_by_date_range('2026-01-01', '2026-03-31')), 4)
+
+        moved = self.archive.archive_before(to_epoch_ms('2026-02-15T00:00:00'))
+        self.assertEqual(moved, {'2026-01': 2, '2026-02': 1})
+        self.assertEqual(self._hot_ids(), ['mar1'])
+        self.assertEqual(
+            sorted(os.listdir(self.archive_dir)), ['history_2026_01.db', 'history_2026_02.db']
+        )
+
+        self.assertEqual(
+            sorted(r['id'] for r in self.repo.get_by_date_range('2026-01-01', '2026-03-31')),
+            ['feb1', 'jan1', 'jan2', 'mar1']
+        )
+        archived = self.repo.get_by_date_range('2026-01-31', '2026-01-31')
+        self.assertEqual([r['id'] for r in archived], ['jan2'])
+        self.assertEqual(archived[0]['output'], 'x' * 100)
+
+        # 只查近期时不附加归档文件
+        with patch.object(self.db, 'attached', wraps=self.db.attached) as spy:
+            self.assertEqual([r['id'] for r in self.repo.get_by_date_range('2026-03-01', '2026-03-31')], ['mar1'])
+        spy.assert_not_called()
+
+    def test_lookup_by_id_and_batch_falls_back_to_archive(self):
+        """测试按 ID、批次查询在主库中找不到时从 ID 时间戳所在月份起查找归档"""
+        stamp = to_epoch_ms('2026-01-20T10:00:00') * 1000
+        execution_id, batch_id = f'exec_{stamp}_12345_1', f'batch_{stamp}_12345'
+        self.repo.create({
+            'id': execution_id, 'script_path': 'scripts/a.py', 'status': 'FAILED', 'batch_id': batch_id,
+            'start_time': '2026-01-20T10:00:01', 'end_time': '2026-01-20T10:00:05',
+        })
+        self.repo.create({
+            'id': 'mar2', 'script_path': 'scripts/b.py', 'status': 'SUCCESS', 'batch_id': batch_id,
+            'start_time': '2026-03-01T10:00:00',
+        })
+        self.archive.archive_before(to_epoch_ms('2026-02-15T00:00:00'))
+
+        self.assertEqual(self.repo.get_by_id(execution_id)['status'], 'FAILED')
+        self.assertEqual(self.repo.get_by_id('jan1')['id'], 'jan1')
+        self.assertIsNone(self.repo.get_by_id('missing'))
+        self.assertEqual([r['id'] for r in self.repo.get_by_batch(batch_id)], [execution_id, 'mar2'])
+
+        # ID 时间戳晚于已归档月份时不附加归档文件
+        later = to_epoch_ms('2026-03-01T00:00:00') * 1000
+        with patch.object(self.db, 'attached', wraps=self.db.attached) as spy:
+            self.assertIsNone(self.repo.get_by_id(f'exec_{later}_1_1'))
+            self.assertEqual(self.repo.get_by_batch(f'batch_{later}_1'), [])
+        spy.assert_not_called()
+
+    def test_statistics_and_latest_include_archive(self):
+        """测试统计、最近记录、按脚本查询和耗时统计包含已归档的记录"""
+        self.repo.update('jan1', {'end_time': '2026-01-05T10:00:04'})
+        self.repo.update('mar1', {'end_time': '2026-03-02T09:00:02'})
+        self.repo.create({
+            'id': 'mar2', 'script_path': 'scripts/jan1.py', 'status': 'FAILED',
+            'start_time': '2026-03-03T09:00:00', 'end_time': '2026-03-03T09:00:06',
+        })
+        before = self.repo.get_statistics()
+        self.archive.archive_before(to_epoch_ms('2026-02-15T00:00:00'))
+
+        self.assertEqual(self.repo.get_statistics(), before)
+        self.assertEqual(before['total'], 5)
+        self.assertEqual(before['by_script']['scripts/jan1.py'], 2)
+        self.assertAlmostEqual(before['total_duration'], 12.0)
+        latest = self.repo.get_latest_by_scripts(['scripts/jan1.py', 'scripts/jan2.py', 'scripts/new.py'])
+        self.assertEqual({path: row['id'] for path, row in latest.items()},
+                         {'scripts/jan1.py': 'mar2', 'scripts/jan2.py': 'jan2'})
+        self.assertEqual([r['id'] for r in self.repo.get_recent(4)], ['mar2', 'mar1', 'feb1', 'jan2'])
+        self.assertEqual([r['id'] for r in self.repo.get_by_script('scripts/jan1.py')], ['jan1', 'mar2'])
+        self.assertEqual(self.repo.get_average_durations(['scripts/jan1.py']), {'scripts/jan1.py': 5.0})
+        self.assertEqual(
+            [s['id'] for s in self.repo.get_duration_samples(['scripts/jan1.py'])['scripts/jan1.py']],
+            ['mar2', 'jan1']
+        )
+
+    def test_rearchive_extends_month_and_new_columns(self):
+        """测试同一月份再次归档追加记录，主库新增的列补到归档文件"""
+        self.archive.archive_before(to_epoch_ms('2026-01-10T00:00:00'))
+        self.db.execute_non_query("ALTER TABLE execution_history ADD COLUMN operator TEXT")
+        self.repo.update('jan2', {'operator': 'bench-2'})
+
+        self.assertEqual(self.archive.archive_before(to_epoch_ms('2026-02-01T00:00:00')), {'2026-01': 1})
+        conn = sqlite3.connect(self.archive.archive_path('2026-01'))
+        rows = conn.execute("SELECT id, operator FROM execution_history ORDER BY start_ms").fetchall()
+        conn.close()
+        self.assertEqual(rows, [('jan1', None), ('jan2', 'bench-2')])
+
+        # 新实例从目录发现已有归档
+        self.assertEqual(HistoryArchive(self.archive_dir).months(), ['2026-01'])
+        self.assertEqual(self.archive.archive_before(to_epoch_ms('2026-02-01T00:00:00')), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
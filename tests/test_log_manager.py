@@ -0,0 +1,80 @@
+"""日志管理器单元测试"""
+
+import unittest
+import glob
+import gzip
+import json
+import logging
+import os
+import tempfile
+import shutil
+
+from AppCode.infrastructure.log_manager import LogManager
+
+
+class TestLogManager(unittest.TestCase):
+    """异步日志测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = None
+
+    def tearDown(self):
+        """测试后清理"""
+        if self.manager:
+            self.manager.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _log_files(self, pattern):
+        return sorted(glob.glob(os.path.join(self.temp_dir, pattern)))
+
+    def test_json_format_and_compressed_rotation(self):
+        """测试 JSON 日志每行一个对象，轮转后的旧文件被压缩"""
+        self.manager = LogManager(
+            self.temp_dir, json_format=True, max_bytes=2048, backup_count=2,
+            console_level=logging.CRITICAL
+        )
+        logger = self.manager.get_logger('test.json')
+        for i in range(100):
+            logger.info(f"执行记录 {i}")
+        self.manager.shutdown()
+
+        current = self._log_files('app_*.jsonl')
+        self.assertEqual(len(current), 1)
+        with open(current[0], encoding='utf-8') as f:
+            entry = json.loads(f.readline())
+        self.assertEqual(entry['logger'], 'test.json')
+        self.assertEqual(entry['level'], 'INFO')
+
+        rotated = self._log_files('app_*.jsonl.*.gz')
+        self.assertEqual(len(rotated), 2)
+        with gzip.open(rotated[0], 'rt', encoding='utf-8') as f:
+            self.assertIn('执行记录', json.loads(f.readline())['message'])
+
+    def test_full_queue_drops_and_reports(self):
+        """测试队列满时不阻塞调用方，丢弃数被统计并写入日志"""
+        self.manager = LogManager(self.temp_dir, queue_size=5, console_level=logging.CRITICAL)
+        # 暂停后台线程，模拟磁盘卡顿
+        self.manager._listener.enqueue_sentinel()
+        self.manager._listener._thread.join()
+        logger = self.manager.get_logger('test.drop')
+        for i in range(20):
+            logger.debug(f"line {i}")
+
+        stats = self.manager.get_stats()
+        self.assertEqual(stats['queued'], 5)
+        self.assertEqual(stats['dropped'], 15)
+        self.assertEqual(stats['dropped_by_level'], {'DEBUG': 15})
+
+        # 恢复后台线程，下一条记录前写入丢弃统计
+        self.manager._listener._thread = None
+        self.manager._listener.start()
+        self.manager.shutdown()
+        with open(self._log_files('app_*.log')[0], encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('丢弃了 15 条日志', content)
+
+
+if __name__ == '__main__':
+    unittest.main()
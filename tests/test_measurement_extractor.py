@@ -0,0 +1,169 @@
+"""测量值提取单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+
+from AppCode.core.measurement_extractor import (
+    MeasurementExtractor, MeasurementParser, KeyValueParser, default_parsers
+)
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.measurement_repository import MeasurementRepository
+from AppCode.services.measurement_service import MeasurementService
+
+
+class TestMeasurementExtractor(unittest.TestCase):
+    """测量值提取器测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.extractor = MeasurementExtractor()
+
+    def test_key_value_output(self):
+        """测试键值对输出解析"""
+        rows = self.extractor.extract(
+            ['IFB_CCCP_CC_Res:120,OBC_CHRG_CONN_CONF:2', 'DCDC_VOLT_OUT=13.5V'],
+            {'execution_id': 'exec_1', 'timestamp': '2025-01-01T00:00:00'}
+        )
+        values = {r['name']: (r['value'], r['unit']) for r in rows}
+
+        self.assertEqual(values['IFB_CCCP_CC_Res'], (120.0, None))
+        self.assertEqual(values['OBC_CHRG_CONN_CONF'], (2.0, None))
+        self.assertEqual(values['DCDC_VOLT_OUT'], (13.5, 'V'))
+        self.assertTrue(all(r['execution_id'] == 'exec_1' for r in rows))
+
+    def test_plain_text_ignored(self):
+        """测试普通日志文本不产生测量值"""
+        rows = self.extractor.extract('开始测试\nStep 1: 等待 5s\n测试完成')
+
+        self.assertEqual(rows, [])
+
+    def test_message_period_output(self):
+        """测试报文周期统计解析"""
+        output = [
+            '预期报文周期为: 50ms',
+            'MsgStatisticsInfo: 报文累计收发次数 200, 报文平均周期 50.2, 报文最大周期 52, 报文最小周期 48',
+        ]
+        rows = self.extractor.extract(output, {
+            'script_path': 'TestScripts/Case03_Period/MessagePeriod_01-VCU_BSI_Wakeup_27A.py'
+        })
+        values = {r['name']: r for r in rows}
+
+        avg = values['VCU_BSI_Wakeup_27A.period_avg']
+        self.assertEqual(avg['value'], 50.2)
+        self.assertEqual((avg['lower_limit'], avg['upper_limit']), (48.0, 52.0))
+        self.assertEqual(values['VCU_BSI_Wakeup_27A.count']['value'], 200.0)
+
+    def test_report_block(self):
+        """测试报告块解析"""
+        rows = self.extractor.extract(
+            '$Report:Test result:合格#,$Actual test result:IFB_CCCP_CC_Res:120#'
+        )
+        values = {r['name']: r for r in rows}
+
+        self.assertEqual(values['Report.Test result']['text_value'], '合格')
+        self.assertEqual(values['IFB_CCCP_CC_Res']['value'], 120.0)
+        self.assertEqual(len([r for r in rows if r['name'] == 'IFB_CCCP_CC_Res']), 1)
+
+    def test_configured_tolerance_keeps_order(self):
+        """测试配置周期容差时内置解析器顺序不变"""
+        extractor = MeasurementExtractor(parsers=default_parsers(5.0))
+        rows = extractor.extract('预期报文周期为: 50ms\nMsgStatisticsInfo: 报文累计收发次数 10, '
+                                 '报文平均周期 50, 报文最大周期 50, 报文最小周期 50',
+                                 {'script_path': 'MessagePeriod_01-VCU_Msg.py'})
+
+        self.assertEqual(extractor.get_parser_names(), self.extractor.get_parser_names())
+        avg = [r for r in rows if r['name'] == 'VCU_Msg.period_avg'][0]
+        self.assertEqual((avg['lower_limit'], avg['upper_limit']), (45.0, 55.0))
+
+    def test_custom_parser(self):
+        """测试注册自定义解析器"""
+        class CountParser(MeasurementParser):
+            name = 'line_count'
+
+            def parse(self, lines, context):
+                return [{'name': 'lines', 'value': float(len(lines))}]
+
+        extractor = MeasurementExtractor(parsers=[KeyValueParser()])
+        extractor.register_parser(CountParser())
+        rows = extractor.extract('a\nb')
+
+        self.assertIn('line_count', extractor.get_parser_names())
+        self.assertEqual(rows[0]['source'], 'line_count')
+        self.assertEqual(rows[0]['value'], 2.0)
+
+
+class TestMeasurementService(unittest.TestCase):
+    """测量值服务测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        data_access = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'))
+        self.service = MeasurementService(
+            MeasurementExtractor(),
+            MeasurementRepository(data_access)
+        )
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_capture_and_query(self):
+        """测试保存并按名称查询测量值"""
+        self.service.capture('exec_1', ['IFB_CCCP_CC_Res:120'], 'a.py', '2025-01-01T10:00:00')
+        self.service.capture('exec_2', ['IFB_CCCP_CC_Res:121'], 'a.py', '2025-01-02T10:00:00')
+
+        history = self.service.get_signal_history('IFB_CCCP_CC_Res', '2025-01-02', '2025-01-02')
+
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0]['value'], 121.0)
+        self.assertEqual(self.service.get_measurement_names(), ['IFB_CCCP_CC_Res'])
+
+    def test_capture_idempotent(self):
+        """测试重复保存同一执行不会产生重复行"""
+        self.service.capture('exec_1', ['IFB_CCCP_CC_Res:120'])
+        count = self.service.capture('exec_1', ['IFB_CCCP_CC_Res:120'])
+
+        self.assertEqual(count, 1)
+        self.assertEqual(len(self.service.get_execution_measurements('exec_1')), 1)
+
+    def test_save_is_atomic(self):
+        """测试写入失败时保留旧值，并发保存同一执行不会产生重复行"""
+        repo = self.service.measurement_repo
+        repo.save_for_execution('exec_1', [{'name': 'A', 'value': 1.0}])
+        self.assertEqual(repo.save_for_execution('exec_1', [{'name': None, 'value': 2.0}]), 0)
+        self.assertEqual([r['value'] for r in repo.get_by_execution('exec_1')], [1.0])
+
+        rows = [{'name': f'S{i}', 'value': float(i)} for i in range(50)]
+        threads = [
+            threading.Thread(target=repo.save_for_execution, args=('exec_2', rows)) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(repo.get_by_execution('exec_2')), 50)
+
+    def test_group_limits_follow_filters(self):
+        """测试分组上下限取过滤范围内最近的记录"""
+        output = '预期报文周期为: {0}ms\nMsgStatisticsInfo: 报文累计收发次数 10, 报文平均周期 {0}, 报文最大周期 {0}, 报文最小周期 {0}'
+        self.service.capture('exec_1', output.format(50), 'a/MessagePeriod_01-VCU_Msg.py', '2025-01-01T10:00:00')
+        self.service.capture('exec_2', output.format(100), 'b/MessagePeriod_01-VCU_Msg.py', '2025-01-02T10:00:00')
+        name = 'VCU_Msg.period_avg'
+
+        repo = self.service.measurement_repo
+        groups = [g for g, _ in repo.iter_numeric_series([name], script_path='a/MessagePeriod_01-VCU_Msg.py')]
+        self.assertEqual(groups[0][1], 1)
+        self.assertEqual(groups[0][4:], (48.0, 52.0))
+        groups = [g for g, _ in repo.iter_numeric_series([name], end_time='2025-01-01T23:59:59')]
+        self.assertEqual(groups[0][4:], (48.0, 52.0))
+        groups = [g for g, _ in repo.iter_numeric_series([name])]
+        self.assertEqual((groups[0][1], groups[0][4:]), (2, (98.0, 102.0)))
+        self.assertEqual([g for g, _ in repo.iter_numeric_series([name], script_path='c.py')], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
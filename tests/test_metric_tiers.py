@@ -0,0 +1,75 @@
+"""性能监控时间序列分层保留单元测试"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+import shutil
+from datetime import datetime
+
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.performance_metrics_repository import PerformanceMetricsRepository
+from AppCode.services.performance_monitor_service import PerformanceMonitorService
+
+
+# 整点对齐的“当前时间”
+NOW = 1_700_000_000 - 1_700_000_000 % 3600
+
+
+class TestMetricTiers(unittest.TestCase):
+    """分层保留测试类"""
+
+    def setUp(self):
+        """测试前准备：写入3小时、每5秒一条的原始采样"""
+        self.temp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(self.temp_dir, 'metrics.db')
+        self.repo = PerformanceMetricsRepository(SQLiteDataAccess(db_path))
+        self.service = PerformanceMonitorService(self.repo, retention_days={'raw': 1 / 24})
+        conn = sqlite3.connect(db_path)
+        conn.executemany(
+            "INSERT INTO performance_samples (ts, cpu_percent, memory_percent, disk_percent, "
+            "process_cpu, process_memory_mb) VALUES (?, ?, 50, 10, 1, 100)",
+            [(ts, 10.0 if ts % 60 < 30 else 30.0) for ts in range(NOW - 3 * 3600, NOW, 5)]
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _count(self, sql):
+        return self.repo.db.execute_query(sql)[0]['n']
+
+    def test_rollup_and_retention(self):
+        """测试聚合为分钟和小时桶、加权平均正确、过期原始采样被删除且可重复执行"""
+        self.service.run_rollups(now=NOW)
+        self.service.run_rollups(now=NOW)
+
+        self.assertEqual(self._count("SELECT COUNT(*) AS n FROM performance_rollups WHERE resolution = 60"), 180)
+        hours = self.repo.get_series(3600, NOW - 3 * 3600, NOW, 3600)
+        self.assertEqual(len(hours), 3)
+        self.assertEqual(hours[0]['samples'], 720)
+        self.assertAlmostEqual(hours[0]['cpu_avg'], 20.0)
+        self.assertEqual(hours[0]['cpu_max'], 30.0)
+        # 原始采样只保留最近1小时
+        self.assertEqual(self._count("SELECT COUNT(*) AS n FROM performance_samples"), 720)
+
+    def test_tier_selection_bounds_points(self):
+        """测试按时间范围选择层级，返回点数不超过所需点数"""
+        self.service.run_rollups(now=NOW)
+        self.service._interval = 5
+
+        self.assertEqual(self.service.select_tier(NOW - 600, NOW, 100, now=NOW)[0], 'raw')
+        self.assertEqual(self.service.select_tier(NOW - 3 * 3600, NOW, 100, now=NOW)[0], '1m')
+        self.assertEqual(self.service.select_tier(NOW - 30 * 86400, NOW, 100, now=NOW)[0], '1h')
+
+        points = self.service.get_metrics_history(
+            datetime.fromtimestamp(NOW - 3 * 3600).isoformat(), datetime.fromtimestamp(NOW).isoformat(), 50
+        )
+        self.assertLessEqual(len(points), 51)
+        self.assertEqual(sum(p['samples'] for p in points), 3 * 720)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""进程内指标注册表单元测试"""
+
+import unittest
+import json
+import os
+import random
+import tempfile
+import shutil
+import threading
+import time
+
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.infrastructure.metrics import MetricsRegistry, MetricsExporter, TimedLock
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """指标注册表测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.registry = MetricsRegistry()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_histogram_percentiles_within_bucket_precision(self):
+        """测试直方图分位数的相对误差在分桶精度内"""
+        histogram = self.registry.histogram('latency_seconds')
+        rng = random.Random(1)
+        values = sorted(rng.lognormvariate(-6, 1.5) for _ in range(20000))
+        for value in values:
+            histogram.observe(value)
+
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 20000)
+        self.assertEqual(summary['max'], values[-1])
+        for q, key in ((0.5, 'p50'), (0.99, 'p99')):
+            exact = values[int(q * len(values)) - 1]
+            self.assertAlmostEqual(summary[key], exact, delta=exact * 0.07 + 1e-6)
+
+    def test_prometheus_and_json_export(self):
+        """测试带标签指标、绑定函数的仪表和收集函数的导出格式"""
+        self.registry.counter('lines_total', '输出行数').inc(3)
+        self.registry.gauge('queue_depth', '队列长度', fn=lambda: 7)
+        self.registry.histogram('db_query_seconds', '耗时', {'statement': 'SELECT "t"'}).observe(0.002)
+        self.registry.register_collector(lambda: [
+            ('cache_hits_total', 'counter', '', {'cache': 'a'}, 1),
+            ('cache_bytes', 'gauge', '', {'cache': 'a'}, 10),
+            ('cache_hits_total', 'counter', '', {'cache': 'b'}, 2),
+        ])
+
+        exporter = MetricsExporter(self.registry, self.temp_dir)
+        self.assertTrue(exporter.export())
+        with open(os.path.join(self.temp_dir, 'metrics.prom'), encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn('lines_total 3', text)
+        self.assertIn('queue_depth 7.0', text)
+        self.assertIn('# TYPE db_query_seconds summary', text)
+        self.assertIn('db_query_seconds_count{statement="SELECT \\"t\\""} 1', text)
+        # 同名样本连续输出，只声明一次类型
+        self.assertEqual(text.count('# TYPE cache_hits_total counter'), 1)
+        lines = text.splitlines()
+        hits = [i for i, line in enumerate(lines) if line.startswith('cache_hits_total{')]
+        self.assertEqual(hits, [hits[0], hits[0] + 1])
+
+        with open(os.path.join(self.temp_dir, 'metrics.json'), encoding='utf-8') as f:
+            metrics = {item['name']: item for item in json.load(f)['metrics']}
+        self.assertEqual(metrics['db_query_seconds']['value']['count'], 1)
+        self.assertEqual(metrics['queue_depth']['value'], 7.0)
+
+    def test_timed_lock_and_data_access_instrumentation(self):
+        """测试锁只在争用时记录等待时间，数据访问按语句记录耗时"""
+        waits = self.registry.histogram('lock_wait_seconds')
+        lock = TimedLock(waits)
+        with lock:
+            pass
+        self.assertEqual(waits.count, 0)
+
+        lock.acquire()
+        waiter = threading.Thread(target=lambda: (lock.acquire(), lock.release()))
+        waiter.start()
+        time.sleep(0.05)
+        lock.release()
+        waiter.join()
+        self.assertEqual(waits.count, 1)
+        self.assertGreater(waits.summary()['max'], 0.02)
+
+        db = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'), metrics=self.registry)
+        db.insert('users', {'username': 'u1', 'password_hash': 'x'})
+        db.execute_query("SELECT * FROM users")
+        db.execute_query("SELECT * FROM users WHERE id = ?", (1,))
+        statements = {
+            item['labels']['statement']: item['value']['count']
+            for item in self.registry.collect() if item['name'] == 'db_query_seconds'
+        }
+        self.assertEqual(statements, {'INSERT users': 1, 'SELECT users': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
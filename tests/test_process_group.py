@@ -0,0 +1,119 @@
+"""脚本进程组终止单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+import time
+
+import psutil
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.utils.constants import ExecutionStatus
+
+
+# 脚本启动一个孙进程（模拟 C# DLL 宿主），输出其PID
+SPAWN_SOURCE = '''
+import signal
+import subprocess
+import sys
+import time
+
+child = subprocess.Popen([sys.executable, '-c', 'import signal, time; {child}; time.sleep(60)'])
+print('child', child.pid, flush=True)
+{parent}
+'''
+
+
+def _alive(pid):
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+@unittest.skipUnless(os.name == 'posix', "process groups require POSIX")
+class TestProcessGroup(unittest.TestCase):
+    """进程组终止测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = ExecutionEngine()
+        self.engine._terminate_grace = 0.3
+        self.engine._kill_timeout = 1.0
+        self.child_pid = None
+
+    def tearDown(self):
+        """测试后清理"""
+        self.engine._running = False
+        if self.child_pid and _alive(self.child_pid):
+            psutil.Process(self.child_pid).kill()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _start(self, child='pass', parent='time.sleep(60)'):
+        """启动脚本，返回 (执行ID, 完成事件, 结果)"""
+        script_path = os.path.join(self.temp_dir, 'Case_Group.py')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(SPAWN_SOURCE.format(child=child, parent=parent))
+        done = threading.Event()
+        results = {}
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        execution_id = self.engine.execute_script(script_path, callback=on_complete)
+        return execution_id, done, results
+
+    def _wait_child(self, execution_id):
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            for line in self.engine.get_execution_output(execution_id):
+                if line.startswith('child '):
+                    self.child_pid = int(line.split()[1])
+                    return
+            time.sleep(0.05)
+        self.fail('script did not report child pid')
+
+    def test_cancel_escalates_to_kill(self):
+        """测试取消时整组终止：忽略 SIGTERM 的脚本和孙进程在时限内被强制结束"""
+        execution_id, done, results = self._start(
+            child='signal.signal(signal.SIGTERM, signal.SIG_IGN)',
+            parent='signal.signal(signal.SIGTERM, signal.SIG_IGN)\ntime.sleep(60)'
+        )
+        self._wait_child(execution_id)
+
+        started = time.monotonic()
+        self.assertTrue(self.engine.cancel_execution(execution_id))
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.3 + 1.0 + 0.5)
+        self.assertTrue(done.wait(10))
+        self.assertEqual(results['status'], ExecutionStatus.CANCELLED)
+        self.assertFalse(_alive(self.child_pid))
+
+    def test_leftover_descendants_reaped(self):
+        """测试脚本自行退出后，遗留的孙进程在回调前被清理"""
+        execution_id, done, results = self._start(parent="print('合格')")
+        self.assertTrue(done.wait(20))
+        self._wait_child(execution_id)
+
+        self.assertEqual(results['status'], ExecutionStatus.SUCCESS)
+        self.assertFalse(_alive(self.child_pid))
+
+    def test_setsid_descendant_reaped(self):
+        """测试运行中自行 setsid 脱离进程组的孙进程也在回调前被清理"""
+        execution_id, done, results = self._start(
+            child='import os; os.setsid()', parent="time.sleep(2.5)\nprint('合格')"
+        )
+        self._wait_child(execution_id)
+        self.assertTrue(done.wait(20))
+
+        self.assertEqual(results['status'], ExecutionStatus.SUCCESS)
+        self.assertFalse(_alive(self.child_pid))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""脚本进程登记（孤儿进程回收）单元测试"""
+
+import unittest
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import shutil
+import threading
+
+import psutil
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.core.process_registry import ProcessRegistry
+
+
+# 脚本检查自己是否已登记在状态文件中（登记在进程启动后写入，稍作等待）
+REGISTERED_SOURCE = '''
+import json, os, time
+
+found = False
+for _ in range(100):
+    try:
+        with open({state_path!r}, encoding='utf-8') as f:
+            state = json.load(f)
+        found = any(r['pid'] == os.getpid() for r in state['processes'].values())
+    except (OSError, ValueError):
+        pass
+    if found:
+        break
+    time.sleep(0.05)
+print('registered' if found else 'missing')
+print('合格')
+'''
+
+
+def _alive(pid):
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+class TestProcessRegistry(unittest.TestCase):
+    """脚本进程登记测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.temp_dir, 'running_processes.json')
+        self.registry = ProcessRegistry(self.state_path)
+        self.processes = []
+
+    def tearDown(self):
+        """测试后清理"""
+        for process in self.processes:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _spawn(self):
+        """启动一个长时间运行的进程（模拟占用台架的脚本）"""
+        process = subprocess.Popen(
+            [sys.executable, '-c', 'import time; time.sleep(60)'],
+            start_new_session=(os.name == 'posix')
+        )
+        self.processes.append(process)
+        return process
+
+    def _write_state(self, processes):
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({'sessions': [], 'processes': processes}, f)
+
+    def test_reap_orphans_of_dead_session(self):
+        """测试已结束会话遗留的进程被终止，存活会话和复用PID的记录不受影响"""
+        orphan = self._spawn()
+        other = self._spawn()
+        reused = self._spawn()
+        dead_session = [2 ** 22 + 1, 0.0]
+        live_session = [os.getppid(), psutil.Process(os.getppid()).create_time()]
+        self._write_state({
+            'exec_orphan': {
+                'pid': orphan.pid, 'create_time': psutil.Process(orphan.pid).create_time(),
+                'pgid': orphan.pid if os.name == 'posix' else None,
+                'script_path': 'Case_A.py', 'session': dead_session, 'descendants': []
+            },
+            'exec_other': {
+                'pid': other.pid, 'create_time': psutil.Process(other.pid).create_time(),
+                'pgid': None, 'script_path': 'Case_B.py', 'session': live_session, 'descendants': []
+            },
+            'exec_reused': {
+                'pid': reused.pid, 'create_time': 1.0,
+                'pgid': None, 'script_path': 'Case_C.py', 'session': dead_session, 'descendants': []
+            },
+        })
+
+        orphans = self.registry.find_orphans()
+        self.assertEqual([o['pid'] for o in orphans], [orphan.pid])
+        self.assertEqual(orphans[0]['script_path'], 'Case_A.py')
+
+        result = self.registry.reap_orphans(grace=0.5, kill_timeout=1.0)
+
+        self.assertEqual(result, {'terminated': [orphan.pid], 'survivors': []})
+        orphan.wait(5)
+        self.assertTrue(_alive(other.pid))
+        self.assertTrue(_alive(reused.pid))
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        self.assertEqual(sorted(state['processes']), ['exec_other'])
+
+    def test_claim_and_release(self):
+        """测试本会话占用台架后不把自己视为其他实例，退出时注销"""
+        self.registry.claim()
+        self.assertEqual(self.registry.other_sessions(), [])
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['sessions']), 1)
+
+        self.registry.release()
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['sessions'], [])
+
+    def test_engine_registers_running_script(self):
+        """测试执行引擎在脚本运行期间登记进程，结束后移除"""
+        script_path = os.path.join(self.temp_dir, 'Case_Registry.py')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(REGISTERED_SOURCE.format(state_path=self.state_path))
+        engine = ExecutionEngine(process_registry=self.registry)
+        done = threading.Event()
+        results = {}
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        try:
+            engine.execute_script(script_path, callback=on_complete)
+            self.assertTrue(done.wait(20))
+        finally:
+            engine._running = False
+
+        self.assertIn('registered', results['output'])
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['processes'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
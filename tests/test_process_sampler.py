@@ -0,0 +1,88 @@
+"""脚本进程树资源采样单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.core.process_sampler import ProcessTreeSampler, unpack_samples
+from AppCode.utils.constants import ExecutionStatus
+
+
+# 脚本启动一个子进程，并持续增加内存占用
+SCRIPT_SOURCE = '''
+import subprocess
+import sys
+import time
+
+child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(2)'])
+blocks = []
+for i in range(20):
+    blocks.append(bytearray(4 * 1024 * 1024))
+    time.sleep(0.1)
+child.wait()
+print('合格')
+'''
+
+
+class TestProcessSampler(unittest.TestCase):
+    """进程树采样测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = ExecutionEngine()
+        self.engine.set_sample_interval(0.1)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.engine._running = False
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_tree_sampled_and_pushed(self):
+        """测试采样包含子进程、内存增长可见，并按事件推送最新采样"""
+        script_path = os.path.join(self.temp_dir, 'Case_Leak.py')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(SCRIPT_SOURCE)
+        done = threading.Event()
+        results = {}
+        pushed = []
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        self.engine.register_callback('resource_sample', lambda eid, sample: pushed.append(sample))
+        self.engine.execute_script(script_path, callback=on_complete)
+        self.assertTrue(done.wait(30))
+
+        self.assertEqual(results['status'], ExecutionStatus.SUCCESS)
+        packed = results['resource_samples']
+        summary = packed['summary']
+        self.assertGreaterEqual(summary['peak_procs'], 2)
+        self.assertGreater(summary['rss_growth_mb'], 40)
+        self.assertGreater(summary['rss_slope_mb_per_min'], 0)
+        columns = unpack_samples(packed)
+        self.assertEqual(len(columns['rss']), packed['count'])
+        self.assertEqual(columns['t'], sorted(columns['t']))
+        self.assertTrue(pushed)
+        self.assertGreater(pushed[-1]['rss'], 0)
+
+    def test_downsampling_bounds_memory(self):
+        """测试采样数达到上限后降采样并加倍采样间隔"""
+        sampler = ProcessTreeSampler(os.getpid(), interval=0.01, max_samples=10)
+        for i in range(25):
+            sampler._append({'t': i, 'cpu': 1.0, 'rss': i * 1024, 'read': 0, 'write': 0,
+                             'threads': 1, 'handles': 3, 'procs': 1})
+
+        packed = sampler.stop()
+
+        self.assertLessEqual(packed['count'], 10)
+        self.assertEqual(packed['interval'], 0.01 * sampler._stride)
+        self.assertEqual(unpack_samples(packed)['t'][-1], 24)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""仓储查询结果缓存单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+from unittest.mock import patch
+
+from AppCode.data_access.query_cache import QueryCache
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+from AppCode.data_access.time_columns import to_epoch_ms
+
+
+def _record(record_id, start_time, status='success'):
+    return {
+        'id': record_id,
+        'script_path': f'scripts/{record_id}.py',
+        'status': status,
+        'start_time': start_time,
+    }
+
+
+class TestQueryCache(unittest.TestCase):
+    """查询缓存测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = QueryCache()
+        self.db = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'), query_cache=self.cache)
+        self.repo = ExecutionHistoryRepository(self.db)
+        self.repo.create(_record('e1', '2026-03-01T10:00:00'))
+        self.repo.create(_record('e2', '2026-03-02T10:00:00'))
+        self.repo.create(_record('e3', '2026-03-05T10:00:00'))
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_repeated_query_served_from_cache(self):
+        """测试相同查询第二次不访问数据库，返回的是拷贝"""
+        with patch.object(self.db, 'execute_query', wraps=self.db.execute_query) as spy:
+            first = self.repo.get_by_date_range('2026-03-01', '2026-03-02')
+            first[0]['status'] = 'changed'
+            second = self.repo.get_by_date_range('2026-03-01', '2026-03-02')
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(sorted(r['id'] for r in second), ['e1', 'e2'])
+        self.assertTrue(all(r['status'] == 'success' for r in second))
+
+    def test_writes_invalidate_only_affected_ranges(self):
+        """测试写入只失效范围匹配的缓存项，且查询结果始终是最新的"""
+        self.repo.get_by_date_range('2026-03-01', '2026-03-02')
+        self.repo.get_by_date_range('2026-03-05', '2026-03-05')
+        self.repo.get_by_id('e3')
+
+        # 范围外的插入不影响3月1-2日和e3的缓存
+        self.repo.create(_record('e4', '2026-03-09T10:00:00'))
+        with patch.object(self.db, 'execute_query', wraps=self.db.execute_query) as spy:
+            self.repo.get_by_date_range('2026-03-01', '2026-03-02')
+            self.repo.get_by_id('e3')
+        self.assertEqual(spy.call_count, 0)
+
+        # 更新把 e3 移入3月1-2日：新旧两个范围和 e3 都失效
+        self.repo.update('e3', {'start_time': '2026-03-02T12:00:00', 'status': 'failed'})
+        self.assertEqual(
+            sorted(r['id'] for r in self.repo.get_by_date_range('2026-03-01', '2026-03-02')),
+            ['e1', 'e2', 'e3']
+        )
+        self.assertEqual(self.repo.get_by_date_range('2026-03-05', '2026-03-05'), [])
+        self.assertEqual(self.repo.get_by_id('e3')['status'], 'failed')
+
+        self.repo.delete('e1')
+        self.assertIsNone(self.repo.get_by_id('e1'))
+        self.assertEqual(self.repo.count(), 3)
+
+    def test_raw_sql_write_invalidates_table(self):
+        """测试任意 SQL 写语句使整张表的缓存失效"""
+        self.assertEqual(len(self.repo.get_by_status('success')), 3)
+        self.db.execute_non_query("UPDATE execution_history SET status = 'failed' WHERE id = ?", ('e2',))
+        self.assertEqual(len(self.repo.get_by_status('success')), 2)
+        self.assertEqual(self.repo.get_recent(1)[0]['id'], 'e3')
+        # 直接写 SQL 时需自行填写数值时间列
+        self.db.execute_many(
+            "INSERT INTO execution_history (id, script_path, status, start_time, start_ms) VALUES (?, ?, ?, ?, ?)",
+            [('e5', 'scripts/e5.py', 'success', '2026-04-01T00:00:00', to_epoch_ms('2026-04-01T00:00:00'))]
+        )
+        self.assertEqual(self.repo.get_recent(1)[0]['id'], 'e5')
+
+
+if __name__ == '__main__':
+    unittest.main()
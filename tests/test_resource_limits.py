@@ -0,0 +1,80 @@
+"""脚本进程资源限制单元测试"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import threading
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.core.resource_limits import merge_limits
+from AppCode.utils.constants import ExecutionStatus
+
+
+# 脚本报告自身的调度参数后尝试分配超过上限的内存
+SCRIPT_SOURCE = '''
+import os
+import time
+
+time.sleep(0.3)
+print('nice', os.nice(0), 'cores', sorted(os.sched_getaffinity(0)), flush=True)
+data = bytearray(512 * 1024 * 1024)
+print('合格')
+'''
+
+
+class TestResourceLimits(unittest.TestCase):
+    """资源限制测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = ExecutionEngine()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.engine._running = False
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_suite_overrides_default(self):
+        """测试方案配置覆盖全局配置，null 取消全局限制"""
+        self.engine.set_resource_limits(
+            {'memory_mb': 2048, 'nice': 5},
+            {'PowerCycle': {'nice': None, 'max_processes': 64}}
+        )
+
+        self.assertEqual(self.engine.get_resource_limits(), {'memory_mb': 2048, 'nice': 5})
+        self.assertEqual(
+            self.engine.get_resource_limits('PowerCycle'), {'memory_mb': 2048, 'max_processes': 64}
+        )
+        self.assertEqual(merge_limits(None, None), {})
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "rlimits and affinity require Linux")
+    def test_limits_applied_and_reported(self):
+        """测试内存上限、nice 和 CPU 亲和性作用于脚本进程并记录在执行信息中"""
+        script_path = os.path.join(self.temp_dir, 'Case_Limits.py')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(SCRIPT_SOURCE)
+        done = threading.Event()
+        results = {}
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        self.engine.execute_script(
+            script_path, callback=on_complete,
+            resources={'memory_mb': 256, 'nice': 5, 'cpu_affinity': [0]}
+        )
+        self.assertTrue(done.wait(30))
+
+        self.assertEqual(results['status'], ExecutionStatus.FAILED)
+        self.assertIn('MemoryError', results['error'])
+        self.assertIn(f"nice {os.nice(0) + 5} cores [0]", results['output'])
+        self.assertEqual(results['resources']['applied'], {'memory_mb': 256, 'nice': 5, 'cpu_affinity': [0]})
+        self.assertEqual(results['resources']['errors'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""脚本静态分析器单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+
+from AppCode.core.script_analyzer import ScriptAnalyzer, analyze_source
+from AppCode.core.script_manager import ScriptManager
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+from AppCode.services.script_service import ScriptService
+
+
+SCRIPT_SOURCE = '''
+import time
+
+def Case01_Init():
+    低压辅源.SCPI.Write("OUTP ON")
+    Sleep(500)
+
+def Case02_Check():
+    for i in range(3):
+        STLA_CAN.DBC.SetSignal("VCU", "VCU_BSI_Wakeup_27A", "VCU_WakeupReq", 1)
+        Sleep(100)
+    value = STLA_CAN.DBC.GetSignal("OBC", "OBC_Status", "OBC_Mode")
+    if value:
+        time.sleep(2)
+    else:
+        Sleep(200)
+    while True:
+        Sleep(10)
+        break
+
+Case01_Init()
+Case02_Check()
+Case01_Init()
+'''
+
+
+class TestAnalyzeSource(unittest.TestCase):
+    """源码分析测试类"""
+
+    def test_sleep_budget(self):
+        """测试等待预算：循环按次数累计，函数按调用处展开，分支取较长者"""
+        result = analyze_source(SCRIPT_SOURCE)
+
+        # 500*2 + 100*3 + 2000 + 10
+        self.assertEqual(result['sleep_ms'], 3310.0)
+        self.assertEqual(result['unbounded_sleeps'], 1)
+        self.assertIsNone(result['error'])
+
+    def test_devices_and_signals(self):
+        """测试设备和信号提取"""
+        result = analyze_source(SCRIPT_SOURCE)
+
+        self.assertEqual(list(result['devices']), ['低压辅源'])
+        self.assertEqual(result['signals_read'], ['OBC_Mode'])
+        self.assertEqual(result['signals_written'], ['VCU_WakeupReq'])
+
+    def test_dynamic_sleep_and_syntax_error(self):
+        """测试非常量等待和语法错误"""
+        self.assertEqual(analyze_source('Sleep(delay)')['dynamic_sleeps'], 1)
+        self.assertIn('SyntaxError', analyze_source('def (:')['error'])
+
+
+class TestScriptAnalyzer(unittest.TestCase):
+    """脚本分析器测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.temp_dir, 'cache.json')
+        self.script_path = os.path.join(self.temp_dir, 'Case_Wakeup.py')
+        with open(self.script_path, 'w', encoding='utf-8') as f:
+            f.write(SCRIPT_SOURCE)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cache_by_content_hash(self):
+        """测试按内容哈希缓存，内容变化后重新分析"""
+        ScriptAnalyzer(self.cache_file).analyze(self.script_path)
+        self.assertTrue(os.path.exists(self.cache_file))
+
+        analyzer = ScriptAnalyzer(self.cache_file)
+        self.assertEqual(len(analyzer._cache), 1)
+        self.assertEqual(analyzer.analyze(self.script_path)['sleep_ms'], 3310.0)
+
+        with open(self.script_path, 'w', encoding='utf-8') as f:
+            f.write('Sleep(1000)\n')
+        self.assertEqual(analyzer.analyze(self.script_path)['sleep_ms'], 1000.0)
+        self.assertEqual(len(analyzer._cache), 2)
+
+    def test_sleep_report(self):
+        """测试等待时间报告与历史耗时对比"""
+        data_access = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'))
+        execution_repo = ExecutionHistoryRepository(data_access)
+        execution_repo.create({
+            'id': 'exec_1',
+            'script_path': self.script_path,
+            'status': 'completed',
+            'start_time': '2025-01-01T10:00:00',
+            'end_time': '2025-01-01T10:00:10'
+        })
+        service = ScriptService(
+            ScriptManager(), execution_repo, script_analyzer=ScriptAnalyzer()
+        )
+
+        result = service.get_sleep_report([self.script_path])
+
+        self.assertTrue(result['success'])
+        report = result['report']
+        self.assertEqual(report['total_scripts'], 1)
+        self.assertAlmostEqual(report['total_avg_duration'], 10.0, places=3)
+        self.assertAlmostEqual(report['sleep_share'], 0.331, places=3)
+        self.assertEqual(report['devices'], {'低压辅源': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""脚本输入指纹与增量执行选择单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+from datetime import datetime
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.core.script_fingerprint import ScriptFingerprinter, diff_fingerprints
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+from AppCode.repositories.batch_execution_repository import BatchExecutionRepository
+from AppCode.repositories.execution_artifact_repository import ExecutionArtifactRepository
+from AppCode.services.execution_service import ExecutionService
+from AppCode.utils.constants import ExecutionStatus
+
+
+SCRIPT_SOURCE = '''
+import os
+from CommonFunction.Common01_InitDevice import *
+from CommonFunction import Helper
+from UtilityClass.FunctionClass_V2 import *
+'''
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+class TestScriptFingerprint(unittest.TestCase):
+    """输入指纹测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.lib_dir = os.path.join(self.temp_dir, 'lib')
+        package = os.path.join(self.lib_dir, 'CommonFunction')
+        _write(os.path.join(package, '__init__.py'), '')
+        _write(os.path.join(package, 'Common01_InitDevice.py'), 'from .Base import *\n')
+        self.base_path = os.path.join(package, 'Base.py')
+        _write(self.base_path, 'VALUE = 1\n')
+        _write(os.path.join(package, 'Helper.py'), 'import json\n')
+        # 没有 __init__.py 的命名空间包
+        self.namespace_path = os.path.join(self.lib_dir, 'UtilityClass', 'FunctionClass_V2.py')
+        _write(self.namespace_path, 'LIMIT = 1\n')
+        self.script_path = os.path.join(self.temp_dir, 'scripts', 'Case_A.py')
+        _write(self.script_path, SCRIPT_SOURCE)
+        self.dbc_path = os.path.join(self.temp_dir, 'STLA.dbc')
+        _write(self.dbc_path, 'BO_ 100 Msg: 8 ECU\n')
+        self.fingerprinter = ScriptFingerprinter([self.lib_dir], ecu_version='V1.0')
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _touch(self, path, content):
+        stat = os.stat(path)
+        _write(path, content)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_transitive_helpers(self):
+        """测试递归收集辅助模块（含命名空间包），标准库不计入"""
+        result = self.fingerprinter.fingerprint(self.script_path)
+
+        self.assertEqual(sorted(result['helper_files']), [
+            'CommonFunction/Base.py', 'CommonFunction/Common01_InitDevice.py',
+            'CommonFunction/Helper.py', 'CommonFunction/__init__.py',
+            'UtilityClass/FunctionClass_V2.py'
+        ])
+        self.assertEqual(result['unresolved'], [])
+        self.assertEqual(result['installed'], [])
+        self.assertEqual(result['ecu_version'], 'V1.0')
+        self.assertIsNone(result['dbc'])
+
+    def test_changes_detected(self):
+        """测试间接导入的辅助模块、脚本、ECU版本和DBC变化都能被识别"""
+        first = self.fingerprinter.fingerprint(self.script_path)
+        self.assertEqual(diff_fingerprints(first, self.fingerprinter.fingerprint(self.script_path)), [])
+
+        self._touch(self.base_path, 'VALUE = 2\n')
+        second = self.fingerprinter.fingerprint(self.script_path)
+        self.assertEqual(diff_fingerprints(second, first), ['helpers'])
+
+        self._touch(self.namespace_path, 'LIMIT = 2\n')
+        namespace_changed = self.fingerprinter.fingerprint(self.script_path)
+        self.assertEqual(diff_fingerprints(namespace_changed, second), ['helpers'])
+        second = namespace_changed
+
+        self._touch(self.script_path, SCRIPT_SOURCE + 'print(1)\n')
+        self.fingerprinter.configure([self.lib_dir], ecu_version='V1.1', dbc_path=self.dbc_path)
+        third = self.fingerprinter.fingerprint(self.script_path)
+        self.assertEqual(diff_fingerprints(third, second), ['script', 'ecu_version', 'dbc'])
+        self.assertNotEqual(third['digest'], second['digest'])
+        self.assertEqual(diff_fingerprints(third, None), ['version'])
+
+    def test_unresolved_never_matches(self):
+        """测试找不到的模块和已安装的第三方包使指纹总是视为变化"""
+        _write(self.script_path, SCRIPT_SOURCE + 'import clr\nimport numpy\n')
+        first = self.fingerprinter.fingerprint(self.script_path)
+        second = self.fingerprinter.fingerprint(self.script_path)
+
+        self.assertEqual(first['unresolved'], ['clr'])
+        self.assertEqual(first['installed'], ['numpy'])
+        self.assertNotEqual(first['digest'], second['digest'])
+        self.assertEqual(diff_fingerprints(second, first), ['unresolved'])
+
+
+class TestIncrementalSelection(unittest.TestCase):
+    """增量执行选择测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        data_access = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'))
+        self.execution_repo = ExecutionHistoryRepository(data_access)
+        self.fingerprinter = ScriptFingerprinter([], ecu_version='V1')
+        self.service = ExecutionService(
+            ExecutionEngine(),
+            self.execution_repo,
+            BatchExecutionRepository(data_access),
+            artifact_repo=ExecutionArtifactRepository(data_access),
+            fingerprinter=self.fingerprinter
+        )
+        self.scripts = {}
+        for name in ('passed', 'failed', 'changed', 'new'):
+            path = os.path.join(self.temp_dir, f'Case_{name}.py')
+            _write(path, f"print('{name}')\n")
+            self.scripts[name] = path
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _record(self, name, test_result):
+        execution_id = f"exec_{name}"
+        self.execution_repo.create({
+            'id': execution_id,
+            'script_path': self.scripts[name],
+            'status': ExecutionStatus.SUCCESS,
+            'start_time': datetime.now().isoformat(),
+            'test_result': test_result,
+        })
+        self.service._save_fingerprints({execution_id: self.scripts[name]})
+
+    def test_select_changed_or_not_passed(self):
+        """测试只选择指纹变化、上次未合格或没有记录的脚本，并给出原因"""
+        self._record('passed', 'pass')
+        self._record('failed', 'fail')
+        self._record('changed', 'pass')
+        _write(self.scripts['changed'], "print('changed again')\n")
+
+        result = self.service.select_incremental_scripts(list(self.scripts.values()))
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['skipped'], [self.scripts['passed']])
+        self.assertEqual(
+            result['selected'],
+            [self.scripts['failed'], self.scripts['changed'], self.scripts['new']]
+        )
+        self.assertEqual(result['reasons'][self.scripts['passed']], '输入未变化且上次合格')
+        self.assertEqual(result['reasons'][self.scripts['failed']], '上次结果: 不合格')
+        self.assertEqual(result['reasons'][self.scripts['changed']], '脚本已修改')
+        self.assertEqual(result['reasons'][self.scripts['new']], '无执行记录')
+
+        # ECU 软件版本变化后全部重新执行
+        self.fingerprinter.configure([], ecu_version='V2')
+        result = self.service.select_incremental_scripts([self.scripts['passed']])
+        self.assertEqual(result['reasons'][self.scripts['passed']], 'ECU软件版本变化')
+
+
+if __name__ == '__main__':
+    unittest.main()
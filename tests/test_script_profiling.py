@@ -0,0 +1,127 @@
+"""脚本剖析模式单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.execution_artifact_repository import ExecutionArtifactRepository
+
+
+# 模拟台架公共库：设备实例、CAN对象和 Sleep 都定义在 CommonFunction 包中
+COMMON_SOURCE = '''
+import time
+
+class _SCPI:
+    def Write(self, cmd):
+        time.sleep(0.05)
+
+class _Device:
+    def __init__(self):
+        self.SCPI = _SCPI()
+        self.Name = 'PSU'
+
+class _DBC:
+    def SetSignal(self, channel, message, signal, value):
+        time.sleep(0.02)
+
+class _CAN:
+    def __init__(self):
+        self.DBC = _DBC()
+
+低压辅源 = _Device()
+STLA_CAN = _CAN()
+
+def Sleep(ms):
+    time.sleep(ms / 1000.0)
+
+time.sleep(0.03)
+'''
+
+SCRIPT_SOURCE = '''
+from CommonFunction.Common00_Fuction import *
+
+if __name__ == '__main__':
+    低压辅源.SCPI.Write(':OUTP ON')
+    Sleep(100)
+    STLA_CAN.DBC.SetSignal(1, 'VCU_BSI_Wakeup_27A', 'VCU_WakeupReq', 1)
+    print(低压辅源.Name)
+'''
+
+
+class TestScriptProfiling(unittest.TestCase):
+    """脚本剖析模式测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, 'CommonFunction'))
+        open(os.path.join(self.temp_dir, 'CommonFunction', '__init__.py'), 'w').close()
+        with open(os.path.join(self.temp_dir, 'CommonFunction', 'Common00_Fuction.py'), 'w', encoding='utf-8') as f:
+            f.write(COMMON_SOURCE)
+        self.script_path = os.path.join(self.temp_dir, 'Case_Profile.py')
+        with open(self.script_path, 'w', encoding='utf-8') as f:
+            f.write(SCRIPT_SOURCE)
+        self.engine = ExecutionEngine()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.engine._running = False
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self):
+        """执行脚本并等待回调"""
+        done = threading.Event()
+        results = {}
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        self.engine.execute_script(self.script_path, callback=on_complete)
+        self.assertTrue(done.wait(30))
+        return results
+
+    def test_profile_breakdown(self):
+        """测试剖析模式下按类别统计脚本内部耗时"""
+        self.engine.set_profiling(True)
+
+        info = self._run()
+
+        self.assertEqual(info['output'], ['PSU'])
+        profile = info['profile']
+        self.assertTrue(profile['complete'])
+        breakdown = profile['breakdown']
+        self.assertGreaterEqual(breakdown['sleep_ms'], 100)
+        self.assertGreaterEqual(breakdown['device_ms'], 50)
+        self.assertGreaterEqual(breakdown['can_ms'], 20)
+        self.assertGreaterEqual(breakdown['import_ms'], 30)
+        names = {call['name'] for call in profile['calls']}
+        self.assertIn('低压辅源.SCPI.Write', names)
+        self.assertIn('STLA_CAN.DBC.SetSignal', names)
+        self.assertIn('CommonFunction.Common00_Fuction', names)
+
+    def test_profiling_disabled(self):
+        """测试默认不注入垫片"""
+        info = self._run()
+
+        self.assertEqual(info['output'], ['PSU'])
+        self.assertNotIn('profile', info)
+
+    def test_artifact_repository(self):
+        """测试剖析结果按执行保存，重复保存时覆盖"""
+        repo = ExecutionArtifactRepository(SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db')))
+
+        self.assertTrue(repo.save('exec_1', 'profile', {'wall_ms': 1}))
+        self.assertTrue(repo.save('exec_1', 'profile', {'wall_ms': 2}))
+
+        self.assertEqual(repo.get('exec_1', 'profile'), {'wall_ms': 2})
+        self.assertEqual(repo.get_by_execution('exec_1'), {'profile': {'wall_ms': 2}})
+        self.assertIsNone(repo.get('exec_2', 'profile'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""SQL 语句剖析器单元测试"""
+
+import unittest
+import json
+import logging
+import os
+import tempfile
+import shutil
+from unittest.mock import Mock
+
+from AppCode.data_access.sql_profiler import SqlProfiler, normalize_statement, build_report, main
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+
+
+class TestSqlProfiler(unittest.TestCase):
+    """SQL 剖析测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'test.db')
+        self.profile_path = os.path.join(self.temp_dir, 'sql_profile.json')
+        self.logger = Mock(spec=logging.Logger)
+        self.profiler = SqlProfiler(slow_query_ms=0, logger=self.logger)
+        self.db = SQLiteDataAccess(self.db_path, profiler=self.profiler)
+        for i in range(5):
+            self.db.insert('execution_history', {
+                'id': f'e{i}', 'script_path': f'scripts/{i}.py', 'status': 'success',
+                'start_time': f'2026-03-0{i + 1}T10:00:00', 'batch_id': 'b1',
+            })
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_normalize_statement(self):
+        """测试字面量、空白和 IN 列表被规范化"""
+        self.assertEqual(
+            normalize_statement("SELECT *  FROM t\n WHERE a = 'x''y' AND b IN (?, ?, ?) AND c > 10"),
+            "SELECT * FROM t WHERE a = ? AND b IN (?...) AND c > ?"
+        )
+        self.assertEqual(
+            normalize_statement("UPDATE t SET a = NULL WHERE b IS NULL AND c IS NOT NULL"),
+            "UPDATE t SET a = ? WHERE b IS NULL AND c IS NOT NULL"
+        )
+        self.assertEqual(normalize_statement("SELECT col1 FROM t2"), "SELECT col1 FROM t2")
+
+    def test_aggregates_and_logs_slow_queries_with_plan(self):
+        """测试按语句聚合次数，慢查询带查询计划，trace 统计实际执行的语句"""
+        for i in range(3):
+            self.db.execute_query("SELECT * FROM execution_history WHERE status = ?", ('success',))
+        self.db.query('execution_history', {'batch_id': 'b1'})
+
+        stats = {item['statement']: item for item in self.profiler.get_statistics()}
+        scan = stats['SELECT * FROM execution_history WHERE status = ?']
+        self.assertEqual(scan['count'], 3)
+        self.assertGreaterEqual(scan['executed'], 3)
+        self.assertGreater(scan['p99_ms'], 0)
+        inserts = [item for key, item in stats.items() if key.startswith('INSERT INTO execution_history')]
+        self.assertEqual([item['count'] for item in inserts], [5])
+
+        slow = {entry['statement']: entry for entry in self.profiler.get_slow_queries()}
+        self.assertIn('SCAN execution_history', slow['SELECT * FROM execution_history WHERE status = ?']['plan'])
+        self.assertTrue(any(
+            'USING INDEX idx_execution_history_batch_id' in step
+            for step in slow['SELECT * FROM execution_history WHERE batch_id = ?']['plan']
+        ))
+        self.assertTrue(self.logger.warning.called)
+
+    def test_report_flags_full_scans(self):
+        """测试报告只标出对大表的全表扫描，索引查询不标出"""
+        self.db.execute_query("SELECT * FROM execution_history WHERE status = ?", ('failed',))
+        self.db.query('execution_history', {'batch_id': 'b1'})
+        self.db.execute_query("SELECT * FROM users")
+        self.assertTrue(self.profiler.save(self.profile_path))
+
+        with open(self.profile_path, encoding='utf-8') as f:
+            report = build_report(json.load(f), self.db_path)
+        self.assertEqual(
+            [item['statement'] for item in report['full_scans']],
+            ['SELECT * FROM execution_history WHERE status = ?']
+        )
+        # 有全表扫描时报告命令返回非零
+        self.assertEqual(main(['--db', self.db_path, '--profile', self.profile_path]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
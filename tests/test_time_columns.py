@@ -0,0 +1,101 @@
+"""执行记录数值时间列单元测试"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+import shutil
+from datetime import datetime
+
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.data_access.time_columns import to_epoch_ms, batch_epoch_ms
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+from AppCode.repositories.batch_execution_repository import BatchExecutionRepository
+
+BATCH_ID = 'batch_1772330400123456_12345'
+
+
+class TestTimeColumns(unittest.TestCase):
+    """数值时间列测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'test.db')
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_conversions(self):
+        """测试 ISO 文本、批次ID 到毫秒时间戳的转换"""
+        self.assertEqual(
+            to_epoch_ms('2026-03-01T10:00:00.250000'),
+            int(datetime(2026, 3, 1, 10, 0, 0, 250000).timestamp() * 1000)
+        )
+        self.assertEqual(to_epoch_ms('2026-03-01T02:00:00Z'), 1772330400000)
+        self.assertIsNone(to_epoch_ms('not a time'))
+        self.assertIsNone(to_epoch_ms(None))
+        self.assertEqual(batch_epoch_ms(BATCH_ID), 1772330400123)
+        self.assertIsNone(batch_epoch_ms('manual_batch'))
+
+    def test_populated_on_write(self):
+        """测试插入和更新时填充数值列，只更新结束时间时按已有开始时间计算耗时"""
+        db = SQLiteDataAccess(self.db_path)
+        repo = ExecutionHistoryRepository(db)
+        repo.create({
+            'id': 'e1', 'script_path': 'a.py', 'status': 'running', 'batch_id': BATCH_ID,
+            'start_time': '2026-03-01T10:00:00', 'end_time': None,
+        })
+        record = repo.get_by_id('e1')
+        self.assertEqual(record['start_ms'], to_epoch_ms('2026-03-01T10:00:00'))
+        self.assertEqual(record['batch_started_at'], 1772330400123)
+        self.assertIsNone(record['duration_ms'])
+
+        repo.update('e1', {'status': 'success', 'end_time': '2026-03-01T10:00:12.500000'})
+        record = repo.get_by_id('e1')
+        self.assertEqual(record['duration_ms'], 12500)
+        self.assertEqual(repo.get_average_durations(['a.py']), {'a.py': 12.5})
+        self.assertEqual(repo.get_statistics()['total_duration'], 12.5)
+        self.assertEqual([r['id'] for r in repo.get_by_date_range('2026-03-01', '2026-03-01')], ['e1'])
+        self.assertEqual(repo.get_by_date_range('2026-03-02', '2026-03-02'), [])
+
+    def test_backfill_existing_database(self):
+        """测试旧数据库打开时添加列并回填一次"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE execution_history (id TEXT PRIMARY KEY, script_path TEXT NOT NULL, params TEXT, "
+            "user_id TEXT, status TEXT NOT NULL, start_time TEXT, end_time TEXT, output TEXT, error TEXT, "
+            "batch_id TEXT, suite_id INTEGER, suite_name VARCHAR(100), test_result VARCHAR(20), "
+            "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.execute(
+            "CREATE TABLE batch_executions (id TEXT PRIMARY KEY, name TEXT, total_scripts INTEGER, "
+            "status TEXT NOT NULL, start_time TEXT, end_time TEXT, suite_id INTEGER)"
+        )
+        conn.executemany(
+            "INSERT INTO execution_history (id, script_path, status, start_time, end_time, batch_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [('e1', 'a.py', 'SUCCESS', '2026-03-01T10:00:00', '2026-03-01T10:00:02', BATCH_ID),
+             ('e2', 'a.py', 'SUCCESS', '2026-03-01T11:00:00', '2026-03-01T11:00:04', None),
+             ('e3', 'b.py', 'RUNNING', '2026-03-01T12:00:00', None, None)]
+        )
+        conn.execute(
+            "INSERT INTO batch_executions (id, total_scripts, status, start_time, end_time) VALUES (?, ?, ?, ?, ?)",
+            (BATCH_ID, 2, 'completed', '2026-03-01T10:00:00', '2026-03-01T11:00:04')
+        )
+        conn.commit()
+        conn.close()
+
+        db = SQLiteDataAccess(self.db_path)
+        repo = ExecutionHistoryRepository(db)
+        self.assertEqual(repo.get_average_durations(['a.py', 'b.py']), {'a.py': 3.0})
+        self.assertEqual(repo.get_by_id('e1')['batch_started_at'], 1772330400123)
+        self.assertEqual([r['id'] for r in repo.get_recent(2)], ['e3', 'e2'])
+        batch = BatchExecutionRepository(db).get_recent(1)[0]
+        self.assertEqual(batch['duration_ms'], 3604000)
+        self.assertEqual(db.execute_query("PRAGMA user_version")[0]['user_version'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
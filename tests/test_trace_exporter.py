@@ -0,0 +1,118 @@
+"""执行时间线导出单元测试"""
+
+import unittest
+import os
+import json
+import tempfile
+import shutil
+import time
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.core.trace_exporter import build_chrome_trace
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+from AppCode.repositories.batch_execution_repository import BatchExecutionRepository
+from AppCode.repositories.execution_artifact_repository import ExecutionArtifactRepository
+from AppCode.services.execution_service import ExecutionService
+
+
+class TestBuildChromeTrace(unittest.TestCase):
+    """trace 构建测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.executions = [
+            {
+                'id': 'exec_1', 'script_path': '/s/a.py', 'status': 'success', 'test_result': 'pass',
+                'timeline': {
+                    'queued': 100.0, 'started': 100.0, 'spawn_start': 100.1, 'spawned': 100.2,
+                    'first_output': 101.0, 'result_detected': 110.0, 'idle_timeout': 410.0,
+                    'terminate_start': 410.0, 'terminate_end': 411.0, 'finished': 411.0,
+                    'persist_start': 411.1, 'persist_end': 411.3
+                }
+            },
+            {
+                'id': 'exec_2', 'script_path': '/s/b.py', 'status': 'success', 'test_result': 'pass',
+                'timeline': {
+                    'queued': 100.0, 'started': 412.0, 'spawn_start': 412.0, 'spawned': 412.1,
+                    'first_output': 413.0, 'process_exit': 420.0, 'finished': 420.5,
+                    'persist_start': 420.5, 'persist_end': 420.6
+                }
+            },
+        ]
+
+    def test_phase_totals(self):
+        """测试阶段划分和汇总（含结果后空闲等待和脚本间隔）"""
+        trace = build_chrome_trace(self.executions)
+        totals = trace['otherData']['phase_totals_s']
+
+        self.assertAlmostEqual(totals['result_idle_wait'], 300.0)
+        self.assertAlmostEqual(totals['terminate'], 1.0)
+        self.assertAlmostEqual(totals['gap'], 0.7)
+        self.assertAlmostEqual(totals['running'], 9.0 + 7.0)
+        self.assertAlmostEqual(totals['persist'], 0.3, places=6)
+
+    def test_trace_events(self):
+        """测试事件格式（微秒时间戳，相对批次开始）"""
+        events = build_chrome_trace(self.executions, name='Suite A')['traceEvents']
+
+        scripts = [e for e in events if e.get('cat') == 'script']
+        self.assertEqual([e['name'] for e in scripts], ['a.py', 'b.py'])
+        self.assertEqual(scripts[0]['ts'], 0)
+        self.assertAlmostEqual(scripts[0]['dur'], 311.3e6, delta=1)
+        queue = [e for e in events if e.get('cat') == 'queue']
+        self.assertAlmostEqual(queue[1]['dur'], 312.0e6, delta=1)
+        self.assertIn('Suite A', [e['args']['name'] for e in events if e['ph'] == 'M'])
+
+
+class TestBatchTraceExport(unittest.TestCase):
+    """批次时间线导出测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        data_access = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'))
+        self.engine = ExecutionEngine()
+        self.batch_repo = BatchExecutionRepository(data_access)
+        self.service = ExecutionService(
+            self.engine,
+            ExecutionHistoryRepository(data_access),
+            self.batch_repo,
+            artifact_repo=ExecutionArtifactRepository(data_access)
+        )
+        self.scripts = []
+        for name in ('a.py', 'b.py'):
+            path = os.path.join(self.temp_dir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("print('hello')\n")
+            self.scripts.append(path)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.engine._running = False
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_export_batch_trace(self):
+        """测试批次执行后导出 trace 文件"""
+        batch_id = self.service.execute_batch_scripts(self.scripts)['batch_id']
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            batch = self.batch_repo.get_by_id(batch_id)
+            if batch and batch.get('end_time'):
+                break
+            time.sleep(0.2)
+
+        file_path = os.path.join(self.temp_dir, 'trace.json')
+        result = self.service.export_batch_trace(batch_id, file_path)
+
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertEqual(result['scripts'], 2)
+        self.assertIn('persist', result['phase_totals'])
+        with open(file_path, 'r', encoding='utf-8') as f:
+            trace = json.load(f)
+        names = {e['name'] for e in trace['traceEvents']}
+        self.assertTrue({'a.py', 'b.py', 'spawn', 'startup', 'gap', 'first_output'} <= names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""趋势统计引擎单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+
+import numpy as np
+
+from AppCode.core.trend_engine import TrendEngine
+from AppCode.core.measurement_extractor import MeasurementExtractor
+from AppCode.data_access.sqlite_data_access import SQLiteDataAccess
+from AppCode.repositories.measurement_repository import MeasurementRepository
+from AppCode.repositories.execution_history_repository import ExecutionHistoryRepository
+from AppCode.services.measurement_service import MeasurementService
+from AppCode.services.analysis_service import AnalysisService
+
+
+class TestTrendEngine(unittest.TestCase):
+    """趋势统计引擎测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.engine = TrendEngine()
+        rng = np.random.default_rng(1)
+        self.a = rng.normal(50, 0.5, 300)
+        self.b = rng.normal(120, 2, 40)
+        self.groups = [
+            ('A.period_avg', 300, 't0', 't1', 48.0, 52.0),
+            ('B', 40, 't0', 't1', None, None),
+        ]
+        self.values = np.concatenate((self.a, self.b))
+
+    def test_summarize_matches_numpy(self):
+        """测试分组统计与 NumPy 逐组计算结果一致"""
+        stats = self.engine.summarize(self.groups, self.values)
+
+        for name, data in (('A.period_avg', self.a), ('B', self.b)):
+            self.assertAlmostEqual(stats[name]['mean'], data.mean())
+            self.assertAlmostEqual(stats[name]['std'], data.std(ddof=1))
+            self.assertAlmostEqual(stats[name]['min'], data.min())
+            self.assertAlmostEqual(stats[name]['max'], data.max())
+            self.assertAlmostEqual(stats[name]['percentiles']['p95'], np.percentile(data, 95))
+            self.assertEqual(stats[name]['count'], len(data))
+
+    def test_capability(self):
+        """测试 Cp/Cpk 计算，缺少限值时为 None"""
+        stats = self.engine.summarize(self.groups, self.values)
+        mean, std = self.a.mean(), self.a.std(ddof=1)
+
+        self.assertAlmostEqual(stats['A.period_avg']['cp'], 4 / (6 * std))
+        self.assertAlmostEqual(
+            stats['A.period_avg']['cpk'], min(52 - mean, mean - 48) / (3 * std)
+        )
+        self.assertIsNone(stats['B']['cp'])
+
+    def test_rolling(self):
+        """测试滑动窗口均值和标准差"""
+        rolling = self.engine.rolling(self.a, 10)
+
+        self.assertIsNone(rolling['mean'][8])
+        self.assertAlmostEqual(rolling['mean'][9], self.a[:10].mean())
+        self.assertAlmostEqual(rolling['std'][-1], self.a[-10:].std(ddof=1))
+
+
+class TestSignalStatistics(unittest.TestCase):
+    """信号统计服务测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        data_access = SQLiteDataAccess(os.path.join(self.temp_dir, 'test.db'))
+        execution_repo = ExecutionHistoryRepository(data_access)
+        self.measurement_service = MeasurementService(
+            MeasurementExtractor(), MeasurementRepository(data_access),
+            execution_repo=execution_repo
+        )
+        self.service = AnalysisService(
+            None, execution_repo, None,
+            measurement_service=self.measurement_service,
+            trend_engine=TrendEngine()
+        )
+        self.execution_repo = execution_repo
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_statistics_backfill_and_cache(self):
+        """测试从历史输出补提取，并在数据变化后重新计算"""
+        for i, output in enumerate(('DCDC_VOLT_OUT:10', 'DCDC_VOLT_OUT:12', 'DCDC_VOLT_OUT:14', '测试完成')):
+            self.execution_repo.create({
+                'id': f'exec_{i}',
+                'script_path': 'a.py',
+                'status': 'completed',
+                'start_time': f'2025-01-0{i + 1}T10:00:00',
+                'end_time': f'2025-01-0{i + 1}T10:01:00',
+                'output': output
+            })
+        self.assertEqual(self.measurement_service.backfill(), 3)
+        # 解析过的执行（包括没有测量值的）持久记录，重启后不再解析
+        self.assertEqual(self.measurement_service.measurement_repo.get_uncaptured_execution_ids(), [])
+
+        result = self.service.get_signal_statistics()
+        self.assertTrue(result['success'])
+        self.assertAlmostEqual(result['statistics']['DCDC_VOLT_OUT']['mean'], 12.0)
+        self.assertIs(self.service.get_signal_statistics()['statistics'], result['statistics'])
+
+        self.measurement_service.capture('exec_4', 'DCDC_VOLT_OUT:20', 'a.py', '2025-01-05T10:00:00')
+        updated = self.service.get_signal_statistics()['statistics']
+        self.assertEqual(updated['DCDC_VOLT_OUT']['count'], 4)
+
+    def test_signal_trend(self):
+        """测试单个信号趋势"""
+        for i in range(5):
+            self.measurement_service.capture(
+                f'exec_{i}', f'DCDC_VOLT_OUT:{i}', 'a.py', f'2025-01-0{i + 1}T10:00:00'
+            )
+
+        trend = self.service.get_signal_trend('DCDC_VOLT_OUT', window=2)['trend']
+
+        self.assertEqual(trend['values'], [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertAlmostEqual(trend['rolling_mean'][-1], 3.5)
+        self.assertEqual(trend['summary']['count'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
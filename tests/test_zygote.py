@@ -0,0 +1,184 @@
+"""脚本预热进程单元测试"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import subprocess
+import threading
+import time
+from unittest import mock
+
+from AppCode.core.execution_engine import ExecutionEngine
+from AppCode.core.process_group import ProcessGroup
+from AppCode.core.zygote import ZygoteLauncher, zygote_supported
+from AppCode.utils.exceptions import ExecutionError
+
+
+HELPER_SOURCE = '''
+import os
+COUNTER = [0]
+LOADED_PID = os.getpid()
+'''
+
+SCRIPT_SOURCE = '''
+import os
+import sys
+from CommonFunction.Helper import COUNTER, LOADED_PID
+
+COUNTER[0] += 1
+print('counter', COUNTER[0])
+print('preloaded', LOADED_PID != os.getpid())
+print('argv', sys.argv[1:])
+print('env', os.environ.get('TEST_MARKER'))
+print('path0', sys.path[0] == os.path.dirname(os.path.abspath(__file__)))
+print('main', __name__)
+sys.exit(3)
+'''
+
+
+@unittest.skipUnless(zygote_supported(), "zygote requires Linux")
+class TestZygoteLauncher(unittest.TestCase):
+    """预热进程测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        package_dir = os.path.join(self.temp_dir, 'lib', 'CommonFunction')
+        os.makedirs(package_dir)
+        open(os.path.join(package_dir, '__init__.py'), 'w').close()
+        self.helper_path = os.path.join(package_dir, 'Helper.py')
+        with open(self.helper_path, 'w', encoding='utf-8') as f:
+            f.write(HELPER_SOURCE)
+        self.script_path = os.path.join(self.temp_dir, 'Case_Zygote.py')
+        with open(self.script_path, 'w', encoding='utf-8') as f:
+            f.write(SCRIPT_SOURCE)
+        self.env = dict(
+            os.environ, PYTHONPATH=os.path.join(self.temp_dir, 'lib'),
+            PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8', TEST_MARKER='child'
+        )
+        self.launcher = ZygoteLauncher(preload=['CommonFunction.Helper'])
+
+    def tearDown(self):
+        """测试后清理"""
+        self.launcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, argv):
+        process = self.launcher.spawn(argv, self.env)
+        output = process.stdout.read().decode('utf-8').splitlines()
+        return process.wait(10), output
+
+    def test_child_matches_fresh_process(self):
+        """测试子进程的输出、退出码、参数、环境和 __main__ 与全新进程一致"""
+        code, output = self._run([self.script_path, '--mode', 'a'])
+
+        self.assertEqual(code, 3)
+        self.assertEqual(output, [
+            'counter 1', 'preloaded True', "argv ['--mode', 'a']",
+            'env child', 'path0 True', 'main __main__'
+        ])
+        self.assertEqual(self.launcher.info['loaded'], ['CommonFunction.Helper'])
+
+    def test_state_not_shared_between_children(self):
+        """测试前一个脚本修改的模块状态不会影响下一个脚本"""
+        self._run([self.script_path])
+        _, output = self._run([self.script_path])
+
+        self.assertEqual(output[0], 'counter 1')
+
+    def test_terminate(self):
+        """测试终止子进程后返回负的信号值"""
+        hang_path = os.path.join(self.temp_dir, 'hang.py')
+        with open(hang_path, 'w', encoding='utf-8') as f:
+            f.write("import time\nprint('ready', flush=True)\ntime.sleep(60)\n")
+
+        process = self.launcher.spawn([hang_path], self.env)
+        self.assertEqual(process.stdout.readline(), b'ready\n')
+        self.assertIsNone(process.poll())
+        process.terminate()
+
+        self.assertEqual(process.wait(5), -15)
+
+    def test_own_group_before_pid_reported(self):
+        """测试拿到 PID 时子进程已在自己的进程组中（引擎可整组终止）"""
+        hang_path = os.path.join(self.temp_dir, 'hang.py')
+        with open(hang_path, 'w', encoding='utf-8') as f:
+            f.write("import time\ntime.sleep(60)\n")
+
+        process = self.launcher.spawn([hang_path], self.env)
+        group = ProcessGroup(process.pid)
+        process.kill()
+        process.wait(5)
+
+        self.assertEqual(group.pgid, process.pid)
+
+    def test_restart_when_helper_changes(self):
+        """测试预加载模块源文件修改后重启预热进程"""
+        self._run([self.script_path])
+        first_pid = self.launcher.info['pid']
+
+        time.sleep(0.01)
+        with open(self.helper_path, 'a', encoding='utf-8') as f:
+            f.write("# changed\n")
+        os.utime(self.helper_path, (time.time() + 5, time.time() + 5))
+        self._run([self.script_path])
+
+        self.assertNotEqual(self.launcher.info['pid'], first_pid)
+
+    def test_threaded_preload_not_forked(self):
+        """测试预加载模块启动线程后不 fork，模块未变化前不再重启预热进程"""
+        with open(self.helper_path, 'a', encoding='utf-8') as f:
+            f.write("import threading, time\nthreading.Thread(target=time.sleep, args=(60,), daemon=True).start()\n")
+
+        for _ in range(2):
+            with mock.patch('subprocess.Popen', wraps=subprocess.Popen) as popen:
+                with self.assertRaises(ExecutionError):
+                    self.launcher.spawn([self.script_path], self.env)
+            started = popen.call_count
+        self.assertEqual(self.launcher.info['threads'], 2)
+        self.assertEqual(started, 0)
+
+    def test_engine_uses_zygote(self):
+        """测试执行引擎在预热进程模式下执行脚本"""
+        engine = ExecutionEngine()
+        engine.set_zygote(True, ['CommonFunction.Helper'])
+        done = threading.Event()
+        results = {}
+
+        def on_complete(execution_id, execution_info):
+            results.update(execution_info)
+            done.set()
+
+        try:
+            with mock.patch.dict(os.environ, {'PYTHONPATH': self.env['PYTHONPATH'], 'TEST_MARKER': 'engine'}):
+                engine.execute_script(self.script_path, callback=on_complete)
+                self.assertTrue(done.wait(30))
+        finally:
+            engine._running = False
+            engine.set_zygote(False)
+
+        self.assertIn('preloaded True', results['output'])
+        self.assertIn('env engine', results['output'])
+        self.assertEqual(results['error'], 'Exit code: 3')
+
+    def test_engine_shutdown_stops_zygote(self):
+        """测试有执行记录时关闭引擎不会死锁，并停止预热进程"""
+        engine = ExecutionEngine()
+        engine.set_zygote(True, ['CommonFunction.Helper'])
+        done = threading.Event()
+        with mock.patch.dict(os.environ, {'PYTHONPATH': self.env['PYTHONPATH']}):
+            engine.execute_script(self.script_path, callback=lambda *args: done.set())
+            self.assertTrue(done.wait(30))
+        zygote = engine._zygote
+
+        closer = threading.Thread(target=engine.shutdown, daemon=True)
+        closer.start()
+        closer.join(10)
+
+        self.assertFalse(closer.is_alive())
+        self.assertIsNone(zygote._server)
+
+
+if __name__ == '__main__':
+    unittest.main()